@@ -0,0 +1,406 @@
+#ifndef JMETriggerAnalysis_FastCutObjectSelector_h
+#define JMETriggerAnalysis_FastCutObjectSelector_h
+
+#include <FWCore/Utilities/interface/Exception.h>
+#include <CommonTools/Utils/interface/StringCutObjectSelector.h>
+
+#include <string>
+#include <vector>
+#include <regex>
+#include <cmath>
+#include <cctype>
+#include <type_traits>
+#include <utility>
+
+// selector equivalent to StringCutObjectSelector<T, true>:
+// cuts made of a logical AND of simple comparisons, e.g. '(pt > 10.) && (abs(eta) < 2.4) && userInt("ID") > 0',
+// are converted to native predicates at construction, all other cuts are evaluated with StringCutObjectSelector;
+// supported variables: pt, eta, abs(eta), pdgId, abs(pdgId), userFloat("name"), userInt("name")
+template <class T>
+class FastCutObjectSelector {
+
+ public:
+  explicit FastCutObjectSelector(const std::string& cut="");
+  FastCutObjectSelector(const FastCutObjectSelector&);
+  FastCutObjectSelector& operator=(const FastCutObjectSelector&);
+  virtual ~FastCutObjectSelector() {}
+
+  bool operator()(const T& obj) const { return isFast_ ? this->passesTerms(obj) : generic_(obj); }
+
+  const std::string& cut() const { return cut_; }
+  bool isFast() const { return isFast_; }
+
+  // terms of the top-level logical AND of a cut (whitespaces removed, outer parentheses stripped)
+  static std::vector<std::string> conjunctionTerms(const std::string& cut){ return splitConjunction(removeWhitespaces(cut)); }
+
+  // number of calls to beginEvent for which validate() is to be used
+  void setValidationEvents(const unsigned int num){ nValidationEvents_ = num; }
+
+  // to be called once per collection (event):
+  // returns true if the objects of the current collection are to be checked with validate()
+  bool beginEvent();
+
+  // evaluates both the native predicates and StringCutObjectSelector,
+  // and throws if the results differ
+  bool validate(const T&) const;
+
+ protected:
+
+  enum class Variable { pt, eta, absEta, pdgId, absPdgId, userFloat, userInt };
+  enum class Operator { lt, le, gt, ge, eq, ne };
+
+  struct Term {
+
+    Variable variable;
+    Operator op;
+    double value;
+    std::string key;
+  };
+
+  bool parse(const std::string&);
+  bool parseTerm(const std::string&);
+  bool passesTerms(const T&) const;
+  double value(const T&, const Term&) const;
+
+  static std::string removeWhitespaces(const std::string&);
+  static std::string removeOuterParentheses(const std::string&);
+  static std::vector<std::string> splitConjunction(const std::string&);
+
+  template <class C, class = void> struct has_pt : std::false_type {};
+  template <class C> struct has_pt<C, decltype(void(std::declval<const C&>().pt()))> : std::true_type {};
+
+  template <class C, class = void> struct has_eta : std::false_type {};
+  template <class C> struct has_eta<C, decltype(void(std::declval<const C&>().eta()))> : std::true_type {};
+
+  template <class C, class = void> struct has_pdgId : std::false_type {};
+  template <class C> struct has_pdgId<C, decltype(void(std::declval<const C&>().pdgId()))> : std::true_type {};
+
+  template <class C, class = void> struct has_userFloat : std::false_type {};
+  template <class C> struct has_userFloat<C, decltype(void(std::declval<const C&>().userFloat(std::string())))> : std::true_type {};
+
+  template <class C, class = void> struct has_userInt : std::false_type {};
+  template <class C> struct has_userInt<C, decltype(void(std::declval<const C&>().userInt(std::string())))> : std::true_type {};
+
+  std::string cut_;
+  StringCutObjectSelector<T, true> generic_;
+
+  bool isFast_;
+  std::vector<Term> terms_;
+
+  unsigned int nValidationEvents_;
+};
+
+template<class T>
+FastCutObjectSelector<T>::FastCutObjectSelector(const std::string& cut)
+  : cut_(cut), generic_(cut), isFast_(false), nValidationEvents_(0) {
+
+  isFast_ = this->parse(cut_);
+}
+
+// the copy rebuilds the generic StringCutObjectSelector from the cut string (so that copies, e.g. the ones
+// used in different streams, do not share it) and copies the parsed terms of the fast path (no re-parsing)
+template<class T>
+FastCutObjectSelector<T>::FastCutObjectSelector(const FastCutObjectSelector<T>& other)
+  : cut_(other.cut_), generic_(other.cut_), isFast_(other.isFast_), terms_(other.terms_), nValidationEvents_(other.nValidationEvents_) {
+}
+
+template<class T>
+FastCutObjectSelector<T>& FastCutObjectSelector<T>::operator=(const FastCutObjectSelector<T>& other){
+
+  if(this != &other){
+
+    cut_ = other.cut_;
+    generic_ = StringCutObjectSelector<T, true>(other.cut_);
+    isFast_ = other.isFast_;
+    terms_ = other.terms_;
+    nValidationEvents_ = other.nValidationEvents_;
+  }
+
+  return *this;
+}
+
+template<class T>
+bool FastCutObjectSelector<T>::beginEvent(){
+
+  if(nValidationEvents_ == 0){
+
+    return false;
+  }
+
+  --nValidationEvents_;
+
+  return isFast_;
+}
+
+template<class T>
+bool FastCutObjectSelector<T>::validate(const T& obj) const {
+
+  const bool res_generic(generic_(obj));
+
+  if(isFast_){
+
+    const bool res_fast(this->passesTerms(obj));
+
+    if(res_fast != res_generic){
+
+      throw cms::Exception("LogicError") << "FastCutObjectSelector: results of native predicates (" << res_fast
+        << ") and StringCutObjectSelector (" << res_generic << ") differ for cut \"" << cut_ << "\"";
+    }
+  }
+
+  return res_generic;
+}
+
+template<class T>
+bool FastCutObjectSelector<T>::passesTerms(const T& obj) const {
+
+  for(const auto& term : terms_){
+
+    const double val(this->value(obj, term));
+
+    bool pass(false);
+
+    switch(term.op){
+      case Operator::lt: pass = (val <  term.value); break;
+      case Operator::le: pass = (val <= term.value); break;
+      case Operator::gt: pass = (val >  term.value); break;
+      case Operator::ge: pass = (val >= term.value); break;
+      case Operator::eq: pass = (val == term.value); break;
+      case Operator::ne: pass = (val != term.value); break;
+    }
+
+    if(not pass){
+
+      return false;
+    }
+  }
+
+  return true;
+}
+
+template<class T>
+double FastCutObjectSelector<T>::value(const T& obj, const Term& term) const {
+
+  switch(term.variable){
+    case Variable::pt:
+      if constexpr(has_pt<T>::value){ return obj.pt(); }
+      break;
+    case Variable::eta:
+      if constexpr(has_eta<T>::value){ return obj.eta(); }
+      break;
+    case Variable::absEta:
+      if constexpr(has_eta<T>::value){ return std::abs(obj.eta()); }
+      break;
+    case Variable::pdgId:
+      if constexpr(has_pdgId<T>::value){ return obj.pdgId(); }
+      break;
+    case Variable::absPdgId:
+      if constexpr(has_pdgId<T>::value){ return std::abs(obj.pdgId()); }
+      break;
+    case Variable::userFloat:
+      if constexpr(has_userFloat<T>::value){ return obj.userFloat(term.key); }
+      break;
+    case Variable::userInt:
+      if constexpr(has_userInt<T>::value){ return obj.userInt(term.key); }
+      break;
+  }
+
+  throw cms::Exception("LogicError") << "FastCutObjectSelector: unsupported variable in cut \"" << cut_ << "\"";
+}
+
+template<class T>
+bool FastCutObjectSelector<T>::parse(const std::string& cut){
+
+  terms_.clear();
+
+  const auto& terms = splitConjunction(removeWhitespaces(cut));
+
+  for(const auto& term : terms){
+
+    if(not this->parseTerm(term)){
+
+      terms_.clear();
+
+      return false;
+    }
+  }
+
+  return true;
+}
+
+template<class T>
+bool FastCutObjectSelector<T>::parseTerm(const std::string& str){
+
+  static const std::string var("(pt|eta|abs\\(eta\\)|pdgId|abs\\(pdgId\\)|userFloat\\(\"([^\"]+)\"\\)|userInt\\(\"([^\"]+)\"\\))");
+  static const std::string op("(<=|>=|==|!=|<|>)");
+  static const std::string num("([-+]?(?:[0-9]+\\.?[0-9]*|\\.[0-9]+)(?:[eE][-+]?[0-9]+)?)");
+
+  static const std::regex re_var_op_num("^"+var+op+num+"$");
+  static const std::regex re_num_op_var("^"+num+op+var+"$");
+  static const std::regex re_var("^"+var+"$");
+
+  std::smatch match;
+
+  std::string str_var, str_key, str_op, str_num;
+  bool flip(false);
+
+  if(std::regex_match(str, match, re_var_op_num)){
+
+    str_var = match[1];
+    str_key = match[2].matched ? match[2].str() : match[3].str();
+    str_op = match[4];
+    str_num = match[5];
+  }
+  else if(std::regex_match(str, match, re_num_op_var)){
+
+    str_num = match[1];
+    str_op = match[2];
+    str_var = match[3];
+    str_key = match[4].matched ? match[4].str() : match[5].str();
+    flip = true;
+  }
+  else if(std::regex_match(str, match, re_var)){
+
+    // variable used as boolean
+    str_var = match[1];
+    str_key = match[2].matched ? match[2].str() : match[3].str();
+    str_op = "!=";
+    str_num = "0";
+  }
+  else {
+
+    return false;
+  }
+
+  Term term;
+  term.key = str_key;
+  term.value = std::stod(str_num);
+
+  if(str_var == "pt"){ term.variable = Variable::pt; if(not has_pt<T>::value){ return false; } }
+  else if(str_var == "eta"){ term.variable = Variable::eta; if(not has_eta<T>::value){ return false; } }
+  else if(str_var == "abs(eta)"){ term.variable = Variable::absEta; if(not has_eta<T>::value){ return false; } }
+  else if(str_var == "pdgId"){ term.variable = Variable::pdgId; if(not has_pdgId<T>::value){ return false; } }
+  else if(str_var == "abs(pdgId)"){ term.variable = Variable::absPdgId; if(not has_pdgId<T>::value){ return false; } }
+  else if(str_var.compare(0, 9, "userFloat") == 0){ term.variable = Variable::userFloat; if(not has_userFloat<T>::value){ return false; } }
+  else if(str_var.compare(0, 7, "userInt") == 0){ term.variable = Variable::userInt; if(not has_userInt<T>::value){ return false; } }
+  else { return false; }
+
+  // "num op var" is converted to "var op' num"
+  if(str_op == "<"){ term.op = flip ? Operator::gt : Operator::lt; }
+  else if(str_op == "<="){ term.op = flip ? Operator::ge : Operator::le; }
+  else if(str_op == ">"){ term.op = flip ? Operator::lt : Operator::gt; }
+  else if(str_op == ">="){ term.op = flip ? Operator::le : Operator::ge; }
+  else if(str_op == "=="){ term.op = Operator::eq; }
+  else if(str_op == "!="){ term.op = Operator::ne; }
+  else { return false; }
+
+  terms_.emplace_back(term);
+
+  return true;
+}
+
+template<class T>
+std::string FastCutObjectSelector<T>::removeWhitespaces(const std::string& str){
+
+  std::string ret;
+  ret.reserve(str.size());
+
+  bool inQuotes(false);
+
+  for(const auto ch : str){
+
+    if(ch == '"'){ inQuotes = not inQuotes; }
+
+    if(inQuotes or (not std::isspace(static_cast<unsigned char>(ch)))){
+
+      ret += ch;
+    }
+  }
+
+  return ret;
+}
+
+template<class T>
+std::string FastCutObjectSelector<T>::removeOuterParentheses(const std::string& str){
+
+  std::string ret(str);
+
+  while((ret.size() >= 2) and (ret.front() == '(') and (ret.back() == ')')){
+
+    // check that the first parenthesis is closed by the last character
+    int depth(0);
+    bool enclosing(true);
+
+    for(size_t idx=0; idx<ret.size(); ++idx){
+
+      if(ret[idx] == '('){ ++depth; }
+      else if(ret[idx] == ')'){ --depth; }
+
+      if((depth == 0) and (idx < ret.size()-1)){
+
+        enclosing = false;
+        break;
+      }
+    }
+
+    if(not enclosing){
+
+      break;
+    }
+
+    ret = ret.substr(1, ret.size()-2);
+  }
+
+  return ret;
+}
+
+template<class T>
+std::vector<std::string> FastCutObjectSelector<T>::splitConjunction(const std::string& str){
+
+  std::vector<std::string> ret;
+
+  const std::string expr(removeOuterParentheses(str));
+
+  if(expr.empty()){
+
+    return ret;
+  }
+
+  int depth(0);
+  bool inQuotes(false);
+  size_t start(0);
+
+  for(size_t idx=0; idx<expr.size(); ++idx){
+
+    const char ch(expr[idx]);
+
+    if(ch == '"'){ inQuotes = not inQuotes; }
+    if(inQuotes){ continue; }
+
+    if(ch == '('){ ++depth; }
+    else if(ch == ')'){ --depth; }
+    else if((depth == 0) and (ch == '&') and (idx+1 < expr.size()) and (expr[idx+1] == '&')){
+
+      const auto& subterms = splitConjunction(expr.substr(start, idx-start));
+      ret.insert(ret.end(), subterms.begin(), subterms.end());
+
+      start = idx+2;
+      ++idx;
+    }
+  }
+
+  if(start == 0){
+
+    // no top-level logical AND: single term
+    ret.emplace_back(expr);
+  }
+  else {
+
+    const auto& subterms = splitConjunction(expr.substr(start));
+    ret.insert(ret.end(), subterms.begin(), subterms.end());
+  }
+
+  return ret;
+}
+
+#endif
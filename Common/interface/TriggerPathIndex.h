@@ -0,0 +1,53 @@
+#ifndef JMETriggerAnalysis_TriggerPathIndex_h
+#define JMETriggerAnalysis_TriggerPathIndex_h
+
+#include <FWCore/Framework/interface/Event.h>
+#include <DataFormats/Common/interface/TriggerResults.h>
+#include <DataFormats/Provenance/interface/ParameterSetID.h>
+
+#include <string>
+#include <vector>
+#include <unordered_map>
+
+// maps a list of path names (with or without version, e.g. "HLT_IsoMu24" or "HLT_IsoMu24_v10")
+// to the positions of the matching paths in edm::TriggerResults;
+// the index is rebuilt only when the parameterSetID of edm::TriggerResults changes
+class TriggerPathIndex {
+
+ public:
+  explicit TriggerPathIndex() {}
+  virtual ~TriggerPathIndex() {}
+
+  // register a path name and return its key
+  unsigned int add(const std::string&);
+
+  // update the index for the current menu, returns false if edm::TriggerResults and TriggerNames are inconsistent
+  bool update(const edm::TriggerResults&, const edm::Event&);
+
+  // true if at least one of the paths matching the key is accepted
+  bool accept(const edm::TriggerResults&, const unsigned int) const;
+
+  // false if at least one of the paths matching the key is not accepted
+  bool acceptAll(const edm::TriggerResults&, const unsigned int) const;
+
+  bool isValid() const { return valid_; }
+
+  const std::vector<std::string>& names() const { return names_; }
+  const std::vector<unsigned int>& positions(const unsigned int key) const { return positions_[key]; }
+
+  unsigned long long numberOfRebuilds() const { return nRebuilds_; }
+  unsigned long long numberOfHits() const { return nHits_; }
+
+ protected:
+  std::vector<std::string> names_;
+  std::unordered_map<std::string, unsigned int> keys_;
+
+  std::vector<std::vector<unsigned int> > positions_;
+  edm::ParameterSetID parameterSetID_;
+  bool valid_ = false;
+
+  unsigned long long nRebuilds_ = 0;
+  unsigned long long nHits_ = 0;
+};
+
+#endif
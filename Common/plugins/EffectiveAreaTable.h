@@ -0,0 +1,198 @@
+#ifndef JMETriggerAnalysis_EffectiveAreaTable_h
+#define JMETriggerAnalysis_EffectiveAreaTable_h
+
+#include <FWCore/Utilities/interface/Exception.h>
+
+#include <string>
+#include <vector>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <fstream>
+#include <sstream>
+#include <limits>
+#include <cmath>
+#include <cstdint>
+#include <algorithm>
+#include <utility>
+
+// effective areas vs |eta| from a text file in the format of RecoEgamma/EgammaTools/interface/EffectiveAreas.h
+// (lines "absEtaMin absEtaMax effectiveArea", comments starting with '#'), with the same result as EffectiveAreas::getEffectiveArea:
+//  - the bins (plus zero-valued bins for gaps and for |eta| above the last bin) are mapped onto a uniform grid of cells
+//    of width smaller than the narrowest bin, so that every cell overlaps at most two bins
+//  - the lookup is one multiplication to find the cell, and two comparisons (one per neighbouring bin) with the float edges of the file
+// tables are immutable, and shared by all the modules (and threads) of the process loading the same file (see EffectiveAreaTable::get)
+class EffectiveAreaTable {
+
+ public:
+  explicit EffectiveAreaTable(const std::string& content, const std::string& name="");
+
+  float effectiveArea(const float eta) const {
+
+    const float absEta(std::abs(eta));
+
+    // NaN is mapped to the last cell (overflow, zero)
+    const size_t cell(std::min(double(cellBins_.size()-1), double(absEta) * invCellWidth_));
+
+    int bin(cellBins_[cell]);
+    bin -= int(absEta < binMin_[bin]);
+    bin += int(absEta >= binMax_[bin]);
+
+    return binValue_[bin];
+  }
+
+  size_t numberOfBins() const { return binValue_.size(); }
+  size_t numberOfCells() const { return cellBins_.size(); }
+
+  // table of a file shared by the whole process (key: path and checksum of the file content)
+  static std::shared_ptr<const EffectiveAreaTable> get(const std::string& path);
+
+  // 64-bit FNV-1a hash
+  static uint64_t checksum(const std::string&);
+
+ protected:
+  std::vector<float> binMin_;
+  std::vector<float> binMax_;
+  std::vector<float> binValue_;
+
+  std::vector<int> cellBins_;
+  double invCellWidth_;
+};
+
+inline EffectiveAreaTable::EffectiveAreaTable(const std::string& content, const std::string& name) : invCellWidth_(0.) {
+
+  std::istringstream stream(content);
+  std::string line;
+
+  std::vector<float> fileMin, fileMax, fileValue;
+
+  while(std::getline(stream, line)){
+
+    const auto pos(line.find_first_not_of(" \t\r"));
+
+    if((pos == std::string::npos) or (line[pos] == '#')){
+
+      continue;
+    }
+
+    std::istringstream lineStream(line);
+    float etaMin(0.), etaMax(0.), value(0.);
+
+    if(not (lineStream >> etaMin >> etaMax >> value)){
+
+      throw cms::Exception("Configuration") << "EffectiveAreaTable: invalid line in file \"" << name << "\": " << line;
+    }
+
+    if((etaMin < 0.) or (etaMax <= etaMin) or ((not fileMax.empty()) and (etaMin < fileMax.back()))){
+
+      throw cms::Exception("Configuration") << "EffectiveAreaTable: |eta| bins not ordered or overlapping in file \"" << name << "\": " << line;
+    }
+
+    fileMin.emplace_back(etaMin);
+    fileMax.emplace_back(etaMax);
+    fileValue.emplace_back(value);
+  }
+
+  if(fileValue.empty()){
+
+    throw cms::Exception("Configuration") << "EffectiveAreaTable: no |eta| bins in file \"" << name << "\"";
+  }
+
+  // contiguous bins over [0, inf): bins of the file, plus zero-valued bins for gaps and overflow
+  float lastMax(0.);
+  for(size_t idx=0; idx<fileValue.size(); ++idx){
+
+    if(fileMin[idx] > lastMax){
+
+      binMin_.emplace_back(lastMax);
+      binMax_.emplace_back(fileMin[idx]);
+      binValue_.emplace_back(0.);
+    }
+
+    binMin_.emplace_back(fileMin[idx]);
+    binMax_.emplace_back(fileMax[idx]);
+    binValue_.emplace_back(fileValue[idx]);
+
+    lastMax = fileMax[idx];
+  }
+
+  binMin_.emplace_back(lastMax);
+  binMax_.emplace_back(std::numeric_limits<float>::infinity());
+  binValue_.emplace_back(0.);
+
+  // cells half as wide as the narrowest bin: rounding in the computation of the cell can not skip a bin
+  double minWidth(std::numeric_limits<double>::max());
+  for(size_t idx=0; idx+1<binValue_.size(); ++idx){
+
+    minWidth = std::min(minWidth, double(binMax_[idx]) - double(binMin_[idx]));
+  }
+
+  const double cellWidth(0.5 * minWidth);
+  const double numCells(std::ceil(double(lastMax) / cellWidth) + 1.);
+
+  if(numCells > (1 << 20)){
+
+    throw cms::Exception("Configuration") << "EffectiveAreaTable: |eta| bins too narrow in file \"" << name << "\" (" << numCells << " cells)";
+  }
+
+  invCellWidth_ = 1. / cellWidth;
+  cellBins_.resize(size_t(numCells));
+
+  // bin containing the centre of every cell
+  int bin(0);
+  for(size_t cell=0; cell<cellBins_.size(); ++cell){
+
+    const double centre((cell + 0.5) * cellWidth);
+
+    while(centre >= binMax_[bin]){
+
+      ++bin;
+    }
+
+    cellBins_[cell] = bin;
+  }
+}
+
+inline uint64_t EffectiveAreaTable::checksum(const std::string& str){
+
+  uint64_t hash(14695981039346656037ULL);
+
+  for(const auto ch : str){
+
+    hash ^= static_cast<unsigned char>(ch);
+    hash *= 1099511628211ULL;
+  }
+
+  return hash;
+}
+
+inline std::shared_ptr<const EffectiveAreaTable> EffectiveAreaTable::get(const std::string& path){
+
+  std::ifstream file(path);
+
+  if(not file){
+
+    throw cms::Exception("Configuration") << "EffectiveAreaTable: failed to open file \"" << path << "\"";
+  }
+
+  std::stringstream content;
+  content << file.rdbuf();
+
+  const auto key(std::make_pair(path, checksum(content.str())));
+
+  static std::mutex mutex;
+  static std::map<std::pair<std::string, uint64_t>, std::shared_ptr<const EffectiveAreaTable> > cache;
+
+  std::lock_guard<std::mutex> lock(mutex);
+
+  auto& table(cache[key]);
+
+  if(not table){
+
+    table = std::make_shared<const EffectiveAreaTable>(content.str(), path);
+  }
+
+  return table;
+}
+
+#endif
@@ -1,22 +1,26 @@
 #include <FWCore/Framework/interface/Frameworkfwd.h>
-#include <FWCore/Framework/interface/EDProducer.h>
+#include <FWCore/Framework/interface/stream/EDProducer.h>
 #include <FWCore/Framework/interface/Event.h>
 #include <FWCore/Framework/interface/MakerMacros.h>
 #include <FWCore/ParameterSet/interface/ParameterSet.h>
-#include <CommonTools/Utils/interface/StringCutObjectSelector.h>
+#include <FWCore/ParameterSet/interface/FileInPath.h>
+#include <JMETriggerAnalysis/Common/interface/FastCutObjectSelector.h>
 #include <CommonTools/Utils/interface/StringObjectFunction.h>
 #include <DataFormats/Common/interface/ValueMap.h>
 #include <DataFormats/PatCandidates/interface/Electron.h>
 #include <DataFormats/VertexReco/interface/Vertex.h>
 #include <DataFormats/VertexReco/interface/VertexFwd.h>
-#include <RecoEgamma/EgammaTools/interface/EffectiveAreas.h>
+
+#include "PATUserDataBatch.h"
+#include "EffectiveAreaTable.h"
 
 #include <string>
 #include <vector>
 #include <memory>
 #include <utility>
+#include <algorithm>
 
-class ElectronPATUserData : public edm::EDProducer {
+class ElectronPATUserData : public edm::stream::EDProducer<> {
 
  public:
   explicit ElectronPATUserData(const edm::ParameterSet&);
@@ -24,7 +28,7 @@ class ElectronPATUserData : public edm::EDProducer {
   static void fillDescriptions(edm::ConfigurationDescriptions&);
 
  private:
-  virtual void produce(edm::Event&, const edm::EventSetup&);
+  void produce(edm::Event&, const edm::EventSetup&) override;
 
   edm::EDGetToken src_;
 
@@ -36,17 +40,49 @@ class ElectronPATUserData : public edm::EDProducer {
 
   std::vector<std::pair<std::string, std::string> > v_float_copycats_;
 
-  std::vector<std::pair<std::string, StringCutObjectSelector<pat::Electron, true> > > userInt_stringSelects_;
+  std::vector<std::pair<std::string, FastCutObjectSelector<pat::Electron> > > userInt_stringSelects_;
   std::vector<std::pair<std::string, StringObjectFunction   <pat::Electron, true> > > userFloat_stringFuncs_;
 
   edm::EDGetTokenT<edm::View<reco::Vertex> > primaryVertices_;
 
-  EffectiveAreas effAreas_;
+  std::shared_ptr<const EffectiveAreaTable> effAreas_;
   edm::EDGetToken rho_;
+
+  // batch mode: ValueMaps resolved once per event, user data of every object attached in three blocks
+  // ([ValueMaps, copycats, impact parameters, isolation], [selectors], [functions])
+  void produceBatch(pat::ElectronCollection&, const edm::View<pat::Electron>&,
+                    const std::vector<edm::Handle<edm::ValueMap<bool> > >&, const std::vector<edm::Handle<edm::ValueMap<float> > >&,
+                    const reco::Vertex*, const float);
+
+  const bool batchMode_;
+
+  PATUserDataBatch::Labels batchFloats_;
+  PATUserDataBatch::Labels batchInts_;
+  PATUserDataBatch::Labels batchSelectorInts_;
+  PATUserDataBatch::Labels batchFunctionFloats_;
+  PATUserDataBatch::Selectors<pat::Electron> batchSelectors_;
+
+  // index of the ValueMap [float] used by every copycat (-1: user-float of the input object)
+  std::vector<int> copycatValueMapIndices_;
+
+  // per-event buffers
+  std::vector<edm::ProductID> refIDs_;
+  std::vector<size_t> refKeys_;
+  std::vector<int> vmapBoolTable_;
+  std::vector<float> vmapFloatTable_;
+  std::vector<float> floatValues_;
+  std::vector<int> intValues_;
+  std::vector<int> selectorValues_;
+  std::vector<float> functionValues_;
 };
 
 ElectronPATUserData::ElectronPATUserData(const edm::ParameterSet& iConfig)
-  : effAreas_(iConfig.getParameter<edm::FileInPath>("effAreas_file").fullPath()) {
+  : effAreas_(EffectiveAreaTable::get(iConfig.getParameter<edm::FileInPath>("effAreas_file").fullPath()))
+  , batchMode_(iConfig.exists("batchMode") ? iConfig.getParameter<bool>("batchMode") : false)
+  , batchFloats_("ElectronPATUserData")
+  , batchInts_("ElectronPATUserData")
+  , batchSelectorInts_("ElectronPATUserData")
+  , batchFunctionFloats_("ElectronPATUserData") {
 
   src_ = consumes<edm::View<pat::Electron> >(iConfig.getParameter<edm::InputTag>("src"));
 
@@ -83,7 +119,7 @@ ElectronPATUserData::ElectronPATUserData(const edm::ParameterSet& iConfig)
   const edm::ParameterSet& pset_userInt_stringSelects = iConfig.exists("userInt_stringSelectors") ? iConfig.getParameter<edm::ParameterSet>("userInt_stringSelectors") : edm::ParameterSet();
   for(const std::string& vname : pset_userInt_stringSelects.getParameterNamesForType<std::string>())
   {
-    userInt_stringSelects_.emplace_back(std::pair<std::string, StringCutObjectSelector<pat::Electron, true> >(vname, pset_userInt_stringSelects.getParameter<std::string>(vname)));
+    userInt_stringSelects_.emplace_back(std::pair<std::string, FastCutObjectSelector<pat::Electron> >(vname, pset_userInt_stringSelects.getParameter<std::string>(vname)));
   }
   // -----------------
 
@@ -95,6 +131,46 @@ ElectronPATUserData::ElectronPATUserData(const edm::ParameterSet& iConfig)
   }
   // -----------------
 
+  // batch mode (same order of the values as in produceBatch)
+  if(batchMode_)
+  {
+    for(const auto& vm_str : vmaps_float_){ batchFloats_.add(vm_str); }
+
+    for(const auto& userfloat_copycat : v_float_copycats_)
+    {
+      batchFloats_.add(userfloat_copycat.first);
+
+      const auto it = std::find(vmaps_float_.begin(), vmaps_float_.end(), userfloat_copycat.second);
+      copycatValueMapIndices_.emplace_back((it != vmaps_float_.end()) ? int(std::distance(vmaps_float_.begin(), it)) : -1);
+    }
+
+    for(const std::string& label : {"dxyPV", "dzPV", "SIP3D", "pfIso_CH", "pfIso_NH", "pfIso_Ph", "pfIso_rA", "pfIso"})
+    {
+      batchFloats_.add(label);
+    }
+
+    for(const auto& vm_str : vmaps_bool_){ batchInts_.add(vm_str); }
+
+    for(const auto& i_strNfunc : userInt_stringSelects_)
+    {
+      batchSelectorInts_.add(i_strNfunc.first);
+      batchSelectors_.add(i_strNfunc.first, i_strNfunc.second.cut());
+    }
+
+    for(const auto& i_strNfunc : userInt_stringSelects_)
+    {
+      PATUserDataBatch::checkNoReferences("ElectronPATUserData", i_strNfunc.second.cut(), "userInt", batchSelectorInts_.labels());
+    }
+
+    for(const auto& i_strNfunc : userFloat_stringFuncs_){ batchFunctionFloats_.add(i_strNfunc.first); }
+
+    for(const std::string& vname : pset_userFloat_stringFuncs.getParameterNamesForType<std::string>())
+    {
+      PATUserDataBatch::checkNoReferences("ElectronPATUserData", pset_userFloat_stringFuncs.getParameter<std::string>(vname), "userFloat", batchFunctionFloats_.labels());
+    }
+  }
+  // -----------------
+
   primaryVertices_ = consumes<edm::View<reco::Vertex> >(iConfig.getParameter<edm::InputTag>("primaryVertices"));
 
   rho_ = consumes<double>(iConfig.getParameter<edm::InputTag>("rho"));
@@ -148,6 +224,15 @@ void ElectronPATUserData::produce(edm::Event& iEvent, const edm::EventSetup& iSe
   std::unique_ptr<pat::ElectronCollection> newElecs(new pat::ElectronCollection);
   newElecs->reserve(patElecs->size());
 
+  if(batchMode_){
+
+    this->produceBatch(*newElecs, *patElecs, v_vmap_bool, v_vmap_float, PV, rho);
+
+    iEvent.put(std::move(newElecs));
+
+    return;
+  }
+
   for(unsigned int i_ele=0; i_ele<patElecs->size(); ++i_ele){
 
     newElecs->emplace_back(patElecs->at(i_ele));
@@ -234,7 +319,7 @@ void ElectronPATUserData::produce(edm::Event& iEvent, const edm::EventSetup& iSe
     const float pfIso_CH(ele.pfIsolationVariables().sumChargedHadronPt);
     const float pfIso_NH(ele.pfIsolationVariables().sumNeutralHadronEt);
     const float pfIso_Ph(ele.pfIsolationVariables().sumPhotonEt);
-    const float pfIso_rA(rho * effAreas_.getEffectiveArea(fabs(ele.superCluster()->eta())));
+    const float pfIso_rA(rho * effAreas_->effectiveArea(ele.superCluster()->eta()));
 
     const float pfIso = (ele.pt() != 0.) ? ((pfIso_CH + std::max(0.0f, pfIso_NH + pfIso_Ph - pfIso_rA)) / ele.pt()) : -1.;
 
@@ -281,6 +366,99 @@ void ElectronPATUserData::produce(edm::Event& iEvent, const edm::EventSetup& iSe
   return;
 }
 
+void ElectronPATUserData::produceBatch(pat::ElectronCollection& newElecs, const edm::View<pat::Electron>& patElecs,
+                                       const std::vector<edm::Handle<edm::ValueMap<bool> > >& v_vmap_bool, const std::vector<edm::Handle<edm::ValueMap<float> > >& v_vmap_float,
+                                       const reco::Vertex* PV, const float rho)
+{
+  // ValueMaps: one lookup per (object, ValueMap)
+  PATUserDataBatch::fillRefKeys(patElecs, refIDs_, refKeys_);
+  PATUserDataBatch::fillValueMapTable(vmapBoolTable_, v_vmap_bool, vmaps_bool_, refIDs_, refKeys_, "ElectronPATUserData::produce");
+  PATUserDataBatch::fillValueMapTable(vmapFloatTable_, v_vmap_float, vmaps_float_, refIDs_, refKeys_, "ElectronPATUserData::produce");
+
+  const size_t nVMapsBool(vmaps_bool_.size());
+  const size_t nVMapsFloat(vmaps_float_.size());
+
+  floatValues_.resize(batchFloats_.size());
+  intValues_.resize(batchInts_.size());
+  selectorValues_.resize(batchSelectorInts_.size());
+  functionValues_.resize(batchFunctionFloats_.size());
+
+  for(size_t i_ele=0; i_ele<patElecs.size(); ++i_ele)
+  {
+    newElecs.emplace_back(patElecs.at(i_ele));
+    pat::Electron& ele = newElecs.back();
+
+    float* floats = floatValues_.data();
+
+    // ValueMaps
+    const float* vmapFloats = vmapFloatTable_.data() + i_ele * nVMapsFloat;
+    floats = std::copy(vmapFloats, vmapFloats + nVMapsFloat, floats);
+    std::copy(vmapBoolTable_.data() + i_ele * nVMapsBool, vmapBoolTable_.data() + (i_ele+1) * nVMapsBool, intValues_.data());
+
+    // userFloat copycat(s)
+    for(size_t i=0; i<v_float_copycats_.size(); ++i)
+    {
+      if(copycatValueMapIndices_[i] >= 0)
+      {
+        *floats++ = vmapFloats[copycatValueMapIndices_[i]];
+      }
+      else if(ele.hasUserFloat(v_float_copycats_[i].second))
+      {
+        *floats++ = ele.userFloat(v_float_copycats_[i].second);
+      }
+      else
+      {
+        throw cms::Exception("InputError") << "@@@ ElectronPATUserData::produce -- PAT user-float key \""+v_float_copycats_[i].second+"\" not found";
+      }
+    }
+
+    // Impact Parameter(s)
+    const reco::GsfTrackRef gsfTrack(ele.gsfTrack());
+    const bool hasTrackPV(PV && gsfTrack.isNonnull());
+
+    *floats++ = hasTrackPV ? gsfTrack->dxy(PV->position()) : -9999.;
+    *floats++ = hasTrackPV ? gsfTrack->dz (PV->position()) : -9999.;
+
+    const double edB3D(ele.edB(pat::Electron::PV3D));
+    *floats++ = (edB3D != 0.) ? (ele.dB(pat::Electron::PV3D) / edB3D) : +9999.;
+
+    // PF-Isolation used for EGamma Cut-Based ID (see produce)
+    const auto& elePFIso(ele.pfIsolationVariables());
+
+    const float pfIso_CH(elePFIso.sumChargedHadronPt);
+    const float pfIso_NH(elePFIso.sumNeutralHadronEt);
+    const float pfIso_Ph(elePFIso.sumPhotonEt);
+    const float pfIso_rA(rho * effAreas_->effectiveArea(ele.superCluster()->eta()));
+
+    *floats++ = pfIso_CH;
+    *floats++ = pfIso_NH;
+    *floats++ = pfIso_Ph;
+    *floats++ = pfIso_rA;
+    *floats++ = (ele.pt() != 0.) ? ((pfIso_CH + std::max(0.0f, pfIso_NH + pfIso_Ph - pfIso_rA)) / ele.pt()) : -1.;
+
+    batchFloats_.addUserFloats(ele, floatValues_.data());
+    batchInts_.addUserInts(ele, intValues_.data());
+
+    // Selectors [int]
+    if(not selectorValues_.empty())
+    {
+      batchSelectors_.evaluate(ele, selectorValues_.data());
+      batchSelectorInts_.addUserInts(ele, selectorValues_.data());
+    }
+
+    // Functions [float]
+    if(not functionValues_.empty())
+    {
+      for(size_t i=0; i<userFloat_stringFuncs_.size(); ++i)
+      {
+        functionValues_[i] = float(userFloat_stringFuncs_[i].second(ele));
+      }
+
+      batchFunctionFloats_.addUserFloats(ele, functionValues_.data());
+    }
+  }
+}
+
 void ElectronPATUserData::fillDescriptions(edm::ConfigurationDescriptions& descriptions){
 
   edm::ParameterSetDescription desc;
@@ -0,0 +1,241 @@
+#include <FWCore/Framework/interface/Frameworkfwd.h>
+#include <FWCore/Framework/interface/stream/EDFilter.h>
+#include <FWCore/Framework/interface/Event.h>
+#include <FWCore/Framework/interface/MakerMacros.h>
+#include <FWCore/ParameterSet/interface/ParameterSet.h>
+#include <FWCore/MessageLogger/interface/MessageLogger.h>
+#include <FWCore/Utilities/interface/Exception.h>
+#include <DataFormats/Common/interface/View.h>
+#include <DataFormats/METReco/interface/MET.h>
+#include <DataFormats/PatCandidates/interface/MET.h>
+#include <JMETriggerAnalysis/Common/plugins/METCorrectionLevel.h>
+
+#include <string>
+#include <vector>
+#include <memory>
+#include <limits>
+#include <cmath>
+#include <algorithm>
+
+// comparison of several online METs (any type derived from reco::MET, e.g. reco::PFMET and reco::CaloMET)
+// with offline METs (pat::MET, at a given correction level), with a list of rules (parameter "rules");
+// every input collection is read once per event, also if it is used by more than one rule,
+// and the correction levels are resolved in the constructor
+//
+// rule i accepts the event if |online-pT - offline-pT| > minRelDiff * offline-pT (false if one of the inputs is not available)
+//
+// event products:
+//  - bool (instance label: name of the rule) : decision of the rule (e.g. InputTag of a fill condition of JMETriggerNTuple)
+//  - unsigned int                            : decisions of all rules (bit i: rule i)
+//  - std::vector<float> (instance "relDiff") : (online-pT - offline-pT) / offline-pT of every rule (NaN if not available)
+// the filter accepts the event if at least one rule accepts it
+class METComparisonFilter : public edm::stream::EDFilter<> {
+
+ public:
+  explicit METComparisonFilter(const edm::ParameterSet&);
+
+  static void fillDescriptions(edm::ConfigurationDescriptions&);
+
+ private:
+  bool filter(edm::Event&, const edm::EventSetup&) override;
+
+  struct Rule {
+
+    std::string name;
+    unsigned int online;
+    unsigned int offline;
+    pat::MET::METCorrectionLevel offlineCorrectionLevel;
+    double minRelDiff;
+  };
+
+  std::vector<Rule> rules_;
+
+  // input collections (without duplicates)
+  std::vector<edm::InputTag> onlineInputTags_;
+  std::vector<edm::EDGetTokenT<edm::View<reco::MET> > > onlineTokens_;
+  std::vector<edm::InputTag> offlineInputTags_;
+  std::vector<edm::EDGetTokenT<edm::View<pat::MET> > > offlineTokens_;
+
+  // METs of the inputs in the current event (null if not available)
+  std::vector<const reco::MET*> onlineMETs_;
+  std::vector<const pat::MET*> offlineMETs_;
+};
+
+METComparisonFilter::METComparisonFilter(const edm::ParameterSet& iConfig){
+
+  const auto& pset_rules = iConfig.getParameter<std::vector<edm::ParameterSet> >("rules");
+
+  if(pset_rules.empty()){
+
+    throw cms::Exception("Input") << "empty list of rules (parameter \"rules\")";
+  }
+
+  const unsigned int maxRules(std::numeric_limits<unsigned int>::digits);
+
+  if(pset_rules.size() > maxRules){
+
+    throw cms::Exception("Input") << "too many rules (parameter \"rules\"): " << pset_rules.size() << " (max: " << maxRules << ", one bit per rule)";
+  }
+
+  rules_.reserve(pset_rules.size());
+
+  for(const auto& pset_rule : pset_rules){
+
+    Rule rule;
+
+    rule.name = pset_rule.getParameter<std::string>("name");
+
+    if(rule.name.empty() or std::find_if(rules_.begin(), rules_.end(), [&rule](const Rule& rule_i){ return rule_i.name == rule.name; }) != rules_.end()){
+
+      throw cms::Exception("Input") << "invalid (empty or duplicate) name of rule: \"" << rule.name << "\"";
+    }
+
+    const auto& online = pset_rule.getParameter<edm::InputTag>("online");
+    const auto online_it = std::find(onlineInputTags_.begin(), onlineInputTags_.end(), online);
+
+    rule.online = online_it - onlineInputTags_.begin();
+
+    if(online_it == onlineInputTags_.end()){
+
+      onlineInputTags_.emplace_back(online);
+      onlineTokens_.emplace_back(consumes<edm::View<reco::MET> >(online));
+    }
+
+    const auto& offline = pset_rule.getParameter<edm::InputTag>("offline");
+    const auto offline_it = std::find(offlineInputTags_.begin(), offlineInputTags_.end(), offline);
+
+    rule.offline = offline_it - offlineInputTags_.begin();
+
+    if(offline_it == offlineInputTags_.end()){
+
+      offlineInputTags_.emplace_back(offline);
+      offlineTokens_.emplace_back(consumes<edm::View<pat::MET> >(offline));
+    }
+
+    rule.offlineCorrectionLevel = metCorrectionLevel(pset_rule.getParameter<std::string>("offlineCorrectionLevel"));
+
+    rule.minRelDiff = pset_rule.getParameter<double>("minRelDiff");
+
+    if(rule.minRelDiff <= 0.){
+
+      throw cms::Exception("Input") << "invalid (non-positive) value for parameter \"minRelDiff\" of rule \"" << rule.name << "\": " << rule.minRelDiff;
+    }
+
+    rules_.emplace_back(rule);
+
+    produces<bool>(rule.name);
+  }
+
+  onlineMETs_.assign(onlineTokens_.size(), nullptr);
+  offlineMETs_.assign(offlineTokens_.size(), nullptr);
+
+  produces<unsigned int>();
+  produces<std::vector<float> >("relDiff");
+}
+
+bool METComparisonFilter::filter(edm::Event& iEvent, const edm::EventSetup& iSetup){
+
+  // inputs
+  for(unsigned int idx=0; idx<onlineTokens_.size(); ++idx){
+
+    onlineMETs_[idx] = nullptr;
+
+    edm::Handle<edm::View<reco::MET> > handle;
+    iEvent.getByToken(onlineTokens_[idx], handle);
+
+    if(not handle.isValid()){
+
+      edm::LogWarning("Input") << "invalid handle for online MET: \"" << onlineInputTags_[idx].encode() << "\"";
+    }
+    else if(handle->empty()){
+
+      edm::LogWarning("Input") << "empty vector of candidates in online MET: \"" << onlineInputTags_[idx].encode() << "\"";
+    }
+    else {
+
+      onlineMETs_[idx] = &handle->at(0);
+    }
+  }
+
+  for(unsigned int idx=0; idx<offlineTokens_.size(); ++idx){
+
+    offlineMETs_[idx] = nullptr;
+
+    edm::Handle<edm::View<pat::MET> > handle;
+    iEvent.getByToken(offlineTokens_[idx], handle);
+
+    if(not handle.isValid()){
+
+      edm::LogWarning("Input") << "invalid handle for offline MET: \"" << offlineInputTags_[idx].encode() << "\"";
+    }
+    else if(handle->empty()){
+
+      edm::LogWarning("Input") << "empty vector of candidates in offline MET: \"" << offlineInputTags_[idx].encode() << "\"";
+    }
+    else {
+
+      offlineMETs_[idx] = &handle->at(0);
+    }
+  }
+
+  // rules
+  unsigned int bits(0);
+
+  auto relDiffs = std::make_unique<std::vector<float> >(rules_.size(), std::numeric_limits<float>::quiet_NaN());
+
+  for(unsigned int idx=0; idx<rules_.size(); ++idx){
+
+    const auto& rule = rules_[idx];
+
+    bool accept(false);
+
+    if(onlineMETs_[rule.online] and offlineMETs_[rule.offline]){
+
+      const auto online_pt = onlineMETs_[rule.online]->pt();
+      const auto offline_pt = offlineMETs_[rule.offline]->shiftedPt(pat::MET::NoShift, rule.offlineCorrectionLevel);
+
+      if(offline_pt == 0.){
+
+        edm::LogWarning("Input") << "offline pT value is zero, rule \"" << rule.name << "\" returns False";
+      }
+      else {
+
+        (*relDiffs)[idx] = (online_pt - offline_pt) / offline_pt;
+
+        accept = (std::abs(online_pt - offline_pt) > (rule.minRelDiff * offline_pt));
+      }
+
+      LogDebug("Output") << "rule \"" << rule.name << "\": online-MET pT=" << online_pt << ", offline-MET pT=" << offline_pt
+        << ", filter condition = (" << std::abs(online_pt - offline_pt) << " > " << (rule.minRelDiff * offline_pt) << ")";
+    }
+
+    if(accept){
+
+      bits |= (1u << idx);
+    }
+
+    iEvent.put(std::make_unique<bool>(accept), rule.name);
+  }
+
+  iEvent.put(std::make_unique<unsigned int>(bits));
+  iEvent.put(std::move(relDiffs), "relDiff");
+
+  return (bits != 0);
+}
+
+void METComparisonFilter::fillDescriptions(edm::ConfigurationDescriptions& descriptions){
+
+  edm::ParameterSetDescription desc_rule;
+  desc_rule.add<std::string>("name")->setComment("Name of the rule (instance label of its bool product)");
+  desc_rule.add<edm::InputTag>("online")->setComment("InputTag for online MET collection (type derived from reco::MET, e.g. reco::PFMET or reco::CaloMET)");
+  desc_rule.add<edm::InputTag>("offline")->setComment("InputTag for offline MET collection (type = pat::MET)");
+  desc_rule.add<std::string>("offlineCorrectionLevel")->setComment("String to select correction level of offline-MET (see enum pat::MET::METCorrectionLevel)");
+  desc_rule.add<double>("minRelDiff")->setComment("Minimum relative difference between online-pT and offline-pT (relative to offline-pT)");
+
+  edm::ParameterSetDescription desc;
+  desc.addVPSet("rules", desc_rule)->setComment("Comparisons of online and offline METs (max 32, one bit per rule)");
+
+  descriptions.add("METComparisonFilter", desc);
+}
+
+DEFINE_FWK_MODULE(METComparisonFilter);
@@ -0,0 +1,24 @@
+#ifndef JMETriggerAnalysis_METCorrectionLevel_h
+#define JMETriggerAnalysis_METCorrectionLevel_h
+
+#include <FWCore/Utilities/interface/Exception.h>
+#include <DataFormats/PatCandidates/interface/MET.h>
+
+#include <string>
+
+// correction level of pat::MET from its name (see enum pat::MET::METCorrectionLevel),
+// to be resolved once in the constructor of the modules (not for every event)
+inline pat::MET::METCorrectionLevel metCorrectionLevel(const std::string& name){
+
+  if(name == "Raw"){ return pat::MET::Raw; }
+  else if(name == "Type1"){ return pat::MET::Type1; }
+  else if(name == "Type1XY"){ return pat::MET::Type1XY; }
+  else if(name == "TypeXY"){ return pat::MET::TypeXY; }
+  else if(name == "RawCalo"){ return pat::MET::RawCalo; }
+  else if(name == "RawChs"){ return pat::MET::RawChs; }
+  else if(name == "RawTrk"){ return pat::MET::RawTrk; }
+
+  throw cms::Exception("Input") << "invalid string for correction level of offline-MET: " << name;
+}
+
+#endif
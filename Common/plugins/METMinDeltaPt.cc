@@ -1,12 +1,13 @@
 #include <FWCore/Framework/interface/Frameworkfwd.h>
-#include <FWCore/Framework/interface/EDFilter.h>
+#include <FWCore/Framework/interface/stream/EDFilter.h>
 #include <FWCore/Framework/interface/Event.h>
 #include <FWCore/Framework/interface/MakerMacros.h>
 #include <FWCore/ParameterSet/interface/ParameterSet.h>
 #include <DataFormats/METReco/interface/PFMET.h>
 #include <DataFormats/PatCandidates/interface/MET.h>
+#include <JMETriggerAnalysis/Common/plugins/METCorrectionLevel.h>
 
-class METMinDeltaPt : public edm::EDFilter {
+class METMinDeltaPt : public edm::stream::EDFilter<> {
 
  public:
   explicit METMinDeltaPt(const edm::ParameterSet&);
@@ -14,12 +15,12 @@ class METMinDeltaPt : public edm::EDFilter {
   static void fillDescriptions(edm::ConfigurationDescriptions&);
 
  private:
-  virtual bool filter(edm::Event&, const edm::EventSetup&);
+  bool filter(edm::Event&, const edm::EventSetup&) override;
 
   edm::EDGetToken online_;
   edm::EDGetToken offline_;
 
-  const std::string offlineCorrectionLevel_;
+  const pat::MET::METCorrectionLevel offlineCorrectionLevel_;
 
   const double minRelDiff_;
 };
@@ -27,7 +28,7 @@ class METMinDeltaPt : public edm::EDFilter {
 METMinDeltaPt::METMinDeltaPt(const edm::ParameterSet& iConfig)
   : online_(consumes<edm::View<reco::PFMET> >(iConfig.getParameter<edm::InputTag>("online")))
   , offline_(consumes<edm::View<pat::MET> >(iConfig.getParameter<edm::InputTag>("offline")))
-  , offlineCorrectionLevel_(iConfig.getParameter<std::string>("offlineCorrectionLevel"))
+  , offlineCorrectionLevel_(metCorrectionLevel(iConfig.getParameter<std::string>("offlineCorrectionLevel")))
   , minRelDiff_(iConfig.getParameter<double>("minRelDiff"))
 {
   if(minRelDiff_ <= 0.){
@@ -56,20 +57,7 @@ bool METMinDeltaPt::filter(edm::Event& iEvent, const edm::EventSetup& iSetup){
     return false;
   }
 
-  pat::MET::METCorrectionLevel offlineCorrLevel;
-  if(offlineCorrectionLevel_ == "Raw"){ offlineCorrLevel = pat::MET::Raw; }
-  else if(offlineCorrectionLevel_ == "Type1"){ offlineCorrLevel = pat::MET::Type1; }
-  else if(offlineCorrectionLevel_ == "Type1XY"){ offlineCorrLevel = pat::MET::Type1XY; }
-  else if(offlineCorrectionLevel_ == "TypeXY"){ offlineCorrLevel = pat::MET::TypeXY; }
-  else if(offlineCorrectionLevel_ == "RawCalo"){ offlineCorrLevel = pat::MET::RawCalo; }
-  else if(offlineCorrectionLevel_ == "RawChs"){ offlineCorrLevel = pat::MET::RawChs; }
-  else if(offlineCorrectionLevel_ == "RawTrk"){ offlineCorrLevel = pat::MET::RawTrk; }
-  else {
-
-    throw cms::Exception("Input") << "invalid string for correction level of offline-MET: " << offlineCorrectionLevel_;
-  }
-
-  const auto offline_pt = offline_handle->at(0).shiftedPt(pat::MET::NoShift, offlineCorrLevel);
+  const auto offline_pt = offline_handle->at(0).shiftedPt(pat::MET::NoShift, offlineCorrectionLevel_);
 
   if(offline_pt == 0.){
 
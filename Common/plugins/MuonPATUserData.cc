@@ -1,9 +1,9 @@
 #include <FWCore/Framework/interface/Frameworkfwd.h>
-#include <FWCore/Framework/interface/EDProducer.h>
+#include <FWCore/Framework/interface/stream/EDProducer.h>
 #include <FWCore/Framework/interface/Event.h>
 #include <FWCore/Framework/interface/MakerMacros.h>
 #include <FWCore/ParameterSet/interface/ParameterSet.h>
-#include <CommonTools/Utils/interface/StringCutObjectSelector.h>
+#include <JMETriggerAnalysis/Common/interface/FastCutObjectSelector.h>
 #include <CommonTools/Utils/interface/StringObjectFunction.h>
 #include <DataFormats/Common/interface/ValueMap.h>
 #include <DataFormats/PatCandidates/interface/Muon.h>
@@ -11,12 +11,15 @@
 #include <DataFormats/VertexReco/interface/VertexFwd.h>
 #include <DataFormats/MuonReco/interface/MuonSelectors.h>
 
+#include "PATUserDataBatch.h"
+
 #include <string>
 #include <vector>
 #include <memory>
 #include <utility>
+#include <algorithm>
 
-class MuonPATUserData : public edm::EDProducer {
+class MuonPATUserData : public edm::stream::EDProducer<> {
 
  public:
   explicit MuonPATUserData(const edm::ParameterSet&);
@@ -24,7 +27,7 @@ class MuonPATUserData : public edm::EDProducer {
   static void fillDescriptions(edm::ConfigurationDescriptions&);
 
  private:
-  virtual void produce(edm::Event&, const edm::EventSetup&);
+  void produce(edm::Event&, const edm::EventSetup&) override;
 
   edm::EDGetToken src_;
 
@@ -36,7 +39,7 @@ class MuonPATUserData : public edm::EDProducer {
 
   std::vector<std::pair<std::string, std::string> > v_float_copycats_;
 
-  std::vector<std::pair<std::string, StringCutObjectSelector<pat::Muon, true> > > userInt_stringSelects_;
+  std::vector<std::pair<std::string, FastCutObjectSelector<pat::Muon> > > userInt_stringSelects_;
   std::vector<std::pair<std::string, StringObjectFunction   <pat::Muon, true> > > userFloat_stringFuncs_;
 
   edm::EDGetTokenT<edm::View<reco::Vertex> > primaryVertices_;
@@ -44,9 +47,41 @@ class MuonPATUserData : public edm::EDProducer {
   // Muon IDs HZZ
   bool IDLooseHZZ(const reco::Muon&, const reco::Vertex&);
   bool IDTightHZZ(const reco::Muon&, const reco::Vertex&);
+
+  // batch mode: ValueMaps resolved once per event, user data of every object attached in three blocks
+  // ([ValueMaps, copycats, impact parameters, isolation, IDs], [selectors], [functions])
+  void produceBatch(pat::MuonCollection&, const edm::View<pat::Muon>&,
+                    const std::vector<edm::Handle<edm::ValueMap<bool> > >&, const std::vector<edm::Handle<edm::ValueMap<float> > >&,
+                    const reco::Vertex*, const bool);
+
+  const bool batchMode_;
+
+  PATUserDataBatch::Labels batchFloats_;
+  PATUserDataBatch::Labels batchInts_;
+  PATUserDataBatch::Labels batchSelectorInts_;
+  PATUserDataBatch::Labels batchFunctionFloats_;
+  PATUserDataBatch::Selectors<pat::Muon> batchSelectors_;
+
+  // index of the ValueMap [float] used by every copycat (-1: user-float of the input object)
+  std::vector<int> copycatValueMapIndices_;
+
+  // per-event buffers
+  std::vector<edm::ProductID> refIDs_;
+  std::vector<size_t> refKeys_;
+  std::vector<int> vmapBoolTable_;
+  std::vector<float> vmapFloatTable_;
+  std::vector<float> floatValues_;
+  std::vector<int> intValues_;
+  std::vector<int> selectorValues_;
+  std::vector<float> functionValues_;
 };
 
 MuonPATUserData::MuonPATUserData(const edm::ParameterSet& iConfig)
+  : batchMode_(iConfig.exists("batchMode") ? iConfig.getParameter<bool>("batchMode") : false)
+  , batchFloats_("MuonPATUserData")
+  , batchInts_("MuonPATUserData")
+  , batchSelectorInts_("MuonPATUserData")
+  , batchFunctionFloats_("MuonPATUserData")
 {
   src_ = consumes<edm::View<pat::Muon> >(iConfig.getParameter<edm::InputTag>("src"));
 
@@ -83,7 +118,7 @@ MuonPATUserData::MuonPATUserData(const edm::ParameterSet& iConfig)
   const edm::ParameterSet& pset_userInt_stringSelects = iConfig.exists("userInt_stringSelectors") ? iConfig.getParameter<edm::ParameterSet>("userInt_stringSelectors") : edm::ParameterSet();
   for(const std::string& vname : pset_userInt_stringSelects.getParameterNamesForType<std::string>())
   {
-    userInt_stringSelects_.emplace_back(std::pair<std::string, StringCutObjectSelector<pat::Muon, true> >(vname, pset_userInt_stringSelects.getParameter<std::string>(vname)));
+    userInt_stringSelects_.emplace_back(std::pair<std::string, FastCutObjectSelector<pat::Muon> >(vname, pset_userInt_stringSelects.getParameter<std::string>(vname)));
   }
   // -----------------
 
@@ -95,6 +130,53 @@ MuonPATUserData::MuonPATUserData(const edm::ParameterSet& iConfig)
   }
   // -----------------
 
+  // batch mode (same order of the values as in produceBatch)
+  if(batchMode_)
+  {
+    for(const auto& vm_str : vmaps_float_){ batchFloats_.add(vm_str); }
+
+    for(const auto& userfloat_copycat : v_float_copycats_)
+    {
+      batchFloats_.add(userfloat_copycat.first);
+
+      const auto it = std::find(vmaps_float_.begin(), vmaps_float_.end(), userfloat_copycat.second);
+      copycatValueMapIndices_.emplace_back((it != vmaps_float_.end()) ? int(std::distance(vmaps_float_.begin(), it)) : -1);
+    }
+
+    for(const std::string& label : {"dxyPV", "dzPV", "SIP3D",
+                                    "pfIsoR03_CH", "pfIsoR03_NH", "pfIsoR03_Ph", "pfIsoR03_PU", "pfIsoR03",
+                                    "pfIsoR04_CH", "pfIsoR04_NH", "pfIsoR04_Ph", "pfIsoR04_PU", "pfIsoR04"})
+    {
+      batchFloats_.add(label);
+    }
+
+    for(const auto& vm_str : vmaps_bool_){ batchInts_.add(vm_str); }
+
+    for(const std::string& label : {"IDLoose", "IDMedium", "IDTight", "IDSoft", "IDHighPt", "IDHighPtTRK", "IDLooseHZZ", "IDTightHZZ"})
+    {
+      batchInts_.add(label);
+    }
+
+    for(const auto& i_strNfunc : userInt_stringSelects_)
+    {
+      batchSelectorInts_.add(i_strNfunc.first);
+      batchSelectors_.add(i_strNfunc.first, i_strNfunc.second.cut());
+    }
+
+    for(const auto& i_strNfunc : userInt_stringSelects_)
+    {
+      PATUserDataBatch::checkNoReferences("MuonPATUserData", i_strNfunc.second.cut(), "userInt", batchSelectorInts_.labels());
+    }
+
+    for(const auto& i_strNfunc : userFloat_stringFuncs_){ batchFunctionFloats_.add(i_strNfunc.first); }
+
+    for(const std::string& vname : pset_userFloat_stringFuncs.getParameterNamesForType<std::string>())
+    {
+      PATUserDataBatch::checkNoReferences("MuonPATUserData", pset_userFloat_stringFuncs.getParameter<std::string>(vname), "userFloat", batchFunctionFloats_.labels());
+    }
+  }
+  // -----------------
+
   primaryVertices_ = consumes<edm::View<reco::Vertex> >(iConfig.getParameter<edm::InputTag>("primaryVertices"));
 
   produces<pat::MuonCollection>();
@@ -140,6 +222,17 @@ void MuonPATUserData::produce(edm::Event& iEvent, const edm::EventSetup& iSetup)
   std::unique_ptr<pat::MuonCollection> newMuons(new pat::MuonCollection);
   newMuons->reserve(patMuons->size());
 
+  if(batchMode_)
+  {
+    const bool isRun2016BCDEF = ((272728 <= iEvent.run()) && (iEvent.run() <= 278808));
+
+    this->produceBatch(*newMuons, *patMuons, v_vmap_bool, v_vmap_float, PV, isRun2016BCDEF);
+
+    iEvent.put(std::move(newMuons));
+
+    return;
+  }
+
   for(unsigned int i_muo=0; i_muo<patMuons->size(); ++i_muo)
   {
     newMuons->emplace_back(patMuons->at(i_muo));
@@ -306,6 +399,111 @@ void MuonPATUserData::produce(edm::Event& iEvent, const edm::EventSetup& iSetup)
   return;
 }
 
+void MuonPATUserData::produceBatch(pat::MuonCollection& newMuons, const edm::View<pat::Muon>& patMuons,
+                                   const std::vector<edm::Handle<edm::ValueMap<bool> > >& v_vmap_bool, const std::vector<edm::Handle<edm::ValueMap<float> > >& v_vmap_float,
+                                   const reco::Vertex* PV, const bool isRun2016BCDEF)
+{
+  // ValueMaps: one lookup per (object, ValueMap)
+  PATUserDataBatch::fillRefKeys(patMuons, refIDs_, refKeys_);
+  PATUserDataBatch::fillValueMapTable(vmapBoolTable_, v_vmap_bool, vmaps_bool_, refIDs_, refKeys_, "MuonPATUserData::produce");
+  PATUserDataBatch::fillValueMapTable(vmapFloatTable_, v_vmap_float, vmaps_float_, refIDs_, refKeys_, "MuonPATUserData::produce");
+
+  const size_t nVMapsBool(vmaps_bool_.size());
+  const size_t nVMapsFloat(vmaps_float_.size());
+
+  floatValues_.resize(batchFloats_.size());
+  intValues_.resize(batchInts_.size());
+  selectorValues_.resize(batchSelectorInts_.size());
+  functionValues_.resize(batchFunctionFloats_.size());
+
+  for(size_t i_muo=0; i_muo<patMuons.size(); ++i_muo)
+  {
+    newMuons.emplace_back(patMuons.at(i_muo));
+    pat::Muon& muo = newMuons.back();
+
+    float* floats = floatValues_.data();
+    int* ints = intValues_.data();
+
+    // ValueMaps
+    const float* vmapFloats = vmapFloatTable_.data() + i_muo * nVMapsFloat;
+    floats = std::copy(vmapFloats, vmapFloats + nVMapsFloat, floats);
+    ints = std::copy(vmapBoolTable_.data() + i_muo * nVMapsBool, vmapBoolTable_.data() + (i_muo+1) * nVMapsBool, ints);
+
+    // userFloat copycat(s)
+    for(size_t i=0; i<v_float_copycats_.size(); ++i)
+    {
+      if(copycatValueMapIndices_[i] >= 0)
+      {
+        *floats++ = vmapFloats[copycatValueMapIndices_[i]];
+      }
+      else if(muo.hasUserFloat(v_float_copycats_[i].second))
+      {
+        *floats++ = muo.userFloat(v_float_copycats_[i].second);
+      }
+      else
+      {
+        throw cms::Exception("InputError") << "@@@ MuonPATUserData::produce -- PAT user-float key \""+v_float_copycats_[i].second+"\" not found";
+      }
+    }
+
+    // Impact Parameter(s)
+    const reco::TrackRef bestTrack(muo.muonBestTrack());
+    const bool hasTrackPV(PV && bestTrack.isNonnull());
+
+    *floats++ = hasTrackPV ? bestTrack->dxy(PV->position()) : -9999.;
+    *floats++ = hasTrackPV ? bestTrack->dz (PV->position()) : -9999.;
+
+    const double edB3D(muo.edB(pat::Muon::PV3D));
+    *floats++ = (edB3D != 0.) ? (muo.dB(pat::Muon::PV3D) / edB3D) : +9999.;
+
+    // PF-isolation R=0.3 and R=0.4
+    for(const reco::MuonPFIsolation* muoPFIso : {&muo.pfIsolationR03(), &muo.pfIsolationR04()})
+    {
+      const float pfIso_CH(muoPFIso->sumChargedHadronPt);
+      const float pfIso_NH(muoPFIso->sumNeutralHadronEt);
+      const float pfIso_Ph(muoPFIso->sumPhotonEt);
+      const float pfIso_PU(muoPFIso->sumPUPt);
+
+      *floats++ = pfIso_CH;
+      *floats++ = pfIso_NH;
+      *floats++ = pfIso_Ph;
+      *floats++ = pfIso_PU;
+      *floats++ = (muo.pt() != 0.) ? ((pfIso_CH + std::max(0., pfIso_NH + pfIso_Ph - 0.5*pfIso_PU)) / muo.pt()) : -1.;
+    }
+
+    // Muon-ID booleans
+    *ints++ = int(muo.isLooseMuon());
+    *ints++ = int(muon::isMediumMuon(muo, isRun2016BCDEF));
+    *ints++ = int(PV ? muo.isTightMuon(*PV) : 0);
+    *ints++ = int(PV ? muon::isSoftMuon(muo, *PV, isRun2016BCDEF) : 0);
+    *ints++ = int(PV ? muo.isHighPtMuon(*PV) : 0);
+    *ints++ = int(PV ? muon::isTrackerHighPtMuon(muo, *PV) : 0);
+    *ints++ = int(PV ? this->IDLooseHZZ(muo, *PV) : 0);
+    *ints++ = int(PV ? this->IDTightHZZ(muo, *PV) : 0);
+
+    batchFloats_.addUserFloats(muo, floatValues_.data());
+    batchInts_.addUserInts(muo, intValues_.data());
+
+    // Selectors [int]
+    if(not selectorValues_.empty())
+    {
+      batchSelectors_.evaluate(muo, selectorValues_.data());
+      batchSelectorInts_.addUserInts(muo, selectorValues_.data());
+    }
+
+    // Functions [float]
+    if(not functionValues_.empty())
+    {
+      for(size_t i=0; i<userFloat_stringFuncs_.size(); ++i)
+      {
+        functionValues_[i] = float(userFloat_stringFuncs_[i].second(muo));
+      }
+
+      batchFunctionFloats_.addUserFloats(muo, functionValues_.data());
+    }
+  }
+}
+
 bool MuonPATUserData::IDLooseHZZ(const reco::Muon& muon, const reco::Vertex& vtx){
 
   const bool kin = ((muon.pt() > 5.) && (fabs(muon.eta()) < 2.4));
@@ -0,0 +1,11 @@
+#include <JMETriggerAnalysis/Common/plugins/PATObjectFastSelector.h>
+#include <FWCore/Framework/interface/MakerMacros.h>
+
+#include <DataFormats/PatCandidates/interface/Muon.h>
+#include <DataFormats/PatCandidates/interface/Electron.h>
+
+typedef PATObjectFastSelector<pat::Muon> PATMuonFastSelector;
+DEFINE_FWK_MODULE(PATMuonFastSelector);
+
+typedef PATObjectFastSelector<pat::Electron> PATElectronFastSelector;
+DEFINE_FWK_MODULE(PATElectronFastSelector);
@@ -0,0 +1,63 @@
+#ifndef JMETriggerAnalysis_PATObjectFastSelector_h
+#define JMETriggerAnalysis_PATObjectFastSelector_h
+
+#include <FWCore/Framework/interface/Frameworkfwd.h>
+#include <FWCore/Framework/interface/stream/EDProducer.h>
+#include <FWCore/Framework/interface/Event.h>
+#include <FWCore/ParameterSet/interface/ParameterSet.h>
+#include <JMETriggerAnalysis/Common/interface/FastCutObjectSelector.h>
+
+#include <memory>
+#include <utility>
+
+// replacement of the PAT object selectors (e.g. PATMuonSelector) based on FastCutObjectSelector
+template<class T>
+class PATObjectFastSelector : public edm::stream::EDProducer<> {
+
+ public:
+  explicit PATObjectFastSelector(const edm::ParameterSet&);
+
+ private:
+  void produce(edm::Event&, const edm::EventSetup&) override;
+
+  edm::EDGetToken src_;
+  FastCutObjectSelector<T> selector_;
+};
+
+template<class T>
+PATObjectFastSelector<T>::PATObjectFastSelector(const edm::ParameterSet& iConfig)
+  : selector_(iConfig.getParameter<std::string>("cut")) {
+
+  src_ = consumes<std::vector<T> >(iConfig.getParameter<edm::InputTag>("src"));
+
+  if(iConfig.exists("validationEvents")){
+
+    selector_.setValidationEvents(iConfig.getParameter<unsigned int>("validationEvents"));
+  }
+
+  produces<std::vector<T> >();
+}
+
+template<class T>
+void PATObjectFastSelector<T>::produce(edm::Event& iEvent, const edm::EventSetup& iSetup){
+
+  edm::Handle<std::vector<T> > handle;
+  iEvent.getByToken(src_, handle);
+
+  std::unique_ptr<std::vector<T> > output(new std::vector<T>());
+  output->reserve(handle->size());
+
+  const bool validate(selector_.beginEvent());
+
+  for(const auto& obj : *handle){
+
+    if(validate ? selector_.validate(obj) : selector_(obj)){
+
+      output->emplace_back(obj);
+    }
+  }
+
+  iEvent.put(std::move(output));
+}
+
+#endif
@@ -1,5 +1,5 @@
 #include <FWCore/Framework/interface/Frameworkfwd.h>
-#include <FWCore/Framework/interface/EDProducer.h>
+#include <FWCore/Framework/interface/stream/EDProducer.h>
 #include <FWCore/Framework/interface/Event.h>
 #include <FWCore/Framework/interface/MakerMacros.h>
 #include <FWCore/ParameterSet/interface/ParameterSet.h>
@@ -10,7 +10,7 @@
 #include <memory>
 #include <utility>
 
-class PATPackedCandidatesToRecoPFCandidatesConverter : public edm::EDProducer {
+class PATPackedCandidatesToRecoPFCandidatesConverter : public edm::stream::EDProducer<> {
 
  public:
   explicit PATPackedCandidatesToRecoPFCandidatesConverter(const edm::ParameterSet&);
@@ -18,7 +18,7 @@ class PATPackedCandidatesToRecoPFCandidatesConverter : public edm::EDProducer {
   static void fillDescriptions(edm::ConfigurationDescriptions&);
 
  private:
-  void produce(edm::Event&, const edm::EventSetup&);
+  void produce(edm::Event&, const edm::EventSetup&) override;
 
   edm::EDGetToken src_;
 };
@@ -35,13 +35,13 @@ void PATPackedCandidatesToRecoPFCandidatesConverter::produce(edm::Event& iEvent,
   edm::Handle<pat::PackedCandidateCollection> packedCands_;
   iEvent.getByToken(src_, packedCands_);
 
-  std::unique_ptr<reco::PFCandidateCollection> recoPFCands(new reco::PFCandidateCollection());
+  auto recoPFCands = std::make_unique<reco::PFCandidateCollection>();
+  recoPFCands->reserve(packedCands_->size());
 
   reco::PFCandidate dummy;
-  for(int iCand=0; iCand<int(packedCands_->size()); ++iCand){
+  for(const auto& packedCand : *packedCands_){
 
-    reco::PFCandidate intPFCand(packedCands_->at(iCand).charge(),packedCands_->at(iCand).p4(), dummy.translatePdgIdToType(packedCands_->at(iCand).pdgId()));
-    recoPFCands->push_back(intPFCand);
+    recoPFCands->emplace_back(packedCand.charge(), packedCand.p4(), dummy.translatePdgIdToType(packedCand.pdgId()));
   }
 
   iEvent.put(std::move(recoPFCands));
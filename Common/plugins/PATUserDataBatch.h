@@ -0,0 +1,203 @@
+#ifndef JMETriggerAnalysis_PATUserDataBatch_h
+#define JMETriggerAnalysis_PATUserDataBatch_h
+
+#include <FWCore/Utilities/interface/Exception.h>
+#include <DataFormats/Common/interface/Handle.h>
+#include <DataFormats/Common/interface/ValueMap.h>
+#include <DataFormats/Common/interface/View.h>
+#include <DataFormats/Provenance/interface/ProductID.h>
+#include <JMETriggerAnalysis/Common/interface/FastCutObjectSelector.h>
+
+#include <string>
+#include <vector>
+#include <numeric>
+#include <algorithm>
+#include <utility>
+#include <cctype>
+
+// helpers of the "batchMode" of the PAT user-data producers (MuonPATUserData, ElectronPATUserData):
+//  - Labels            : labels of a block of user data, attached to an object in one pass (in label order)
+//  - fillValueMapTable : values of a list of ValueMaps resolved once per event into a flat table [object][ValueMap]
+//  - Selectors         : userInt selectors split into the terms of their top-level logical AND,
+//                        so that terms shared by several selectors are evaluated once per object
+namespace PATUserDataBatch {
+
+  class Labels {
+
+   public:
+    explicit Labels(const std::string& producer) : producer_(producer) {}
+
+    // returns the position of the label in the array of values
+    size_t add(const std::string& label){
+
+      if(std::find(labels_.begin(), labels_.end(), label) != labels_.end()){
+
+        throw cms::Exception("Configuration") << "@@@ " << producer_ << " -- duplicate PAT user-data label: " << label;
+      }
+
+      labels_.emplace_back(label);
+
+      order_.resize(labels_.size());
+      std::iota(order_.begin(), order_.end(), 0);
+      std::sort(order_.begin(), order_.end(), [this](const size_t i1, const size_t i2){ return labels_[i1] < labels_[i2]; });
+
+      return labels_.size()-1;
+    }
+
+    size_t size() const { return labels_.size(); }
+    const std::vector<std::string>& labels() const { return labels_; }
+    bool contains(const std::string& label) const { return std::find(labels_.begin(), labels_.end(), label) != labels_.end(); }
+
+    // duplicate labels are rejected by pat::PATObject::addUserFloat/addUserInt
+    template<class T>
+    void addUserFloats(T& obj, const float* values) const { for(const auto idx : order_){ obj.addUserFloat(labels_[idx], values[idx]); } }
+
+    template<class T>
+    void addUserInts(T& obj, const int* values) const { for(const auto idx : order_){ obj.addUserInt(labels_[idx], values[idx]); } }
+
+   private:
+    std::string producer_;
+    std::vector<std::string> labels_;
+    std::vector<size_t> order_;
+  };
+
+  // the user data of a block are attached to the object only after all of them are evaluated,
+  // so an expression of a block can not use the labels of the same block (e.g. a selector using the userInt of another selector)
+  inline void checkNoReferences(const std::string& producer, const std::string& expr, const std::string& method, const std::vector<std::string>& labels){
+
+    std::string str(expr);
+    str.erase(std::remove_if(str.begin(), str.end(), [](const char ch){ return std::isspace(static_cast<unsigned char>(ch)); }), str.end());
+
+    for(const auto& label : labels){
+
+      if(str.find(method+"(\""+label+"\")") != std::string::npos){
+
+        throw cms::Exception("Configuration") << "@@@ " << producer << " -- expression uses " << method << "(\"" << label << "\")"
+          << " of the same block of user data (not supported in batchMode): " << expr;
+      }
+    }
+  }
+
+  // ProductIDs and keys of the objects of an edm::View (edm::View::refAt is called once per object)
+  template<class T>
+  void fillRefKeys(const edm::View<T>& view, std::vector<edm::ProductID>& ids, std::vector<size_t>& keys){
+
+    ids.clear();
+    keys.clear();
+    ids.reserve(view.size());
+    keys.reserve(view.size());
+
+    for(size_t idx=0; idx<view.size(); ++idx){
+
+      const auto& ref(view.refAt(idx));
+      ids.emplace_back(ref.id());
+      keys.emplace_back(ref.key());
+    }
+  }
+
+  // table[iObj * nValueMaps + iValueMap]
+  template<class V, class O>
+  void fillValueMapTable(std::vector<O>& table, const std::vector<edm::Handle<edm::ValueMap<V> > >& vmaps, const std::vector<std::string>& labels,
+                         const std::vector<edm::ProductID>& ids, const std::vector<size_t>& keys, const std::string& producer){
+
+    const size_t nMaps(vmaps.size());
+
+    table.resize(nMaps * ids.size());
+
+    for(size_t iMap=0; iMap<nMaps; ++iMap){
+
+      const auto& vmap(*vmaps[iMap]);
+
+      // objects of a View usually come from a single product
+      edm::ProductID lastID;
+
+      for(size_t iObj=0; iObj<ids.size(); ++iObj){
+
+        if(ids[iObj] != lastID){
+
+          if(not vmap.contains(ids[iObj])){
+
+            throw cms::Exception("InputError") << "@@@ " << producer << " -- object reference not found in ValueMap \"" << labels[iMap] << "\"";
+          }
+
+          lastID = ids[iObj];
+        }
+
+        table[iObj * nMaps + iMap] = O(vmap.get(ids[iObj], keys[iObj]));
+      }
+    }
+  }
+
+  template<class T>
+  class Selectors {
+
+   public:
+    Selectors() {}
+
+    void add(const std::string& label, const std::string& cut){
+
+      std::vector<size_t> termIndices;
+
+      for(const auto& term : FastCutObjectSelector<T>::conjunctionTerms(cut)){
+
+        const auto it = std::find(termCuts_.begin(), termCuts_.end(), term);
+
+        if(it == termCuts_.end()){
+
+          termCuts_.emplace_back(term);
+          terms_.emplace_back(term);
+          termIndices.emplace_back(terms_.size()-1);
+        }
+        else {
+
+          termIndices.emplace_back(std::distance(termCuts_.begin(), it));
+        }
+      }
+
+      labels_.emplace_back(label);
+      selectors_.emplace_back(termIndices);
+      termResults_.assign(terms_.size(), -1);
+    }
+
+    size_t size() const { return labels_.size(); }
+    size_t numberOfTerms() const { return terms_.size(); }
+    const std::vector<std::string>& labels() const { return labels_; }
+    const std::vector<std::string>& termCuts() const { return termCuts_; }
+
+    // results of all selectors for one object (values[iSelector])
+    void evaluate(const T& obj, int* values){
+
+      std::fill(termResults_.begin(), termResults_.end(), -1);
+
+      for(size_t iSel=0; iSel<selectors_.size(); ++iSel){
+
+        bool pass(true);
+
+        for(const auto iTerm : selectors_[iSel]){
+
+          if(termResults_[iTerm] < 0){
+
+            termResults_[iTerm] = terms_[iTerm](obj) ? 1 : 0;
+          }
+
+          if(termResults_[iTerm] == 0){
+
+            pass = false;
+            break;
+          }
+        }
+
+        values[iSel] = int(pass);
+      }
+    }
+
+   private:
+    std::vector<std::string> labels_;
+    std::vector<std::vector<size_t> > selectors_;
+    std::vector<std::string> termCuts_;
+    std::vector<FastCutObjectSelector<T> > terms_;
+    std::vector<signed char> termResults_;
+  };
+}
+
+#endif
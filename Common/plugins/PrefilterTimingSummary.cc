@@ -0,0 +1,166 @@
+#include <FWCore/Framework/interface/Frameworkfwd.h>
+#include <FWCore/Framework/interface/global/EDAnalyzer.h>
+#include <FWCore/Framework/interface/Event.h>
+#include <FWCore/Framework/interface/MakerMacros.h>
+#include <FWCore/ParameterSet/interface/ParameterSet.h>
+#include <FWCore/MessageLogger/interface/MessageLogger.h>
+#include <DataFormats/Common/interface/TriggerResults.h>
+#include <JMETriggerAnalysis/Common/interface/TriggerPathIndex.h>
+
+#include <chrono>
+#include <memory>
+#include <mutex>
+#include <string>
+
+// rough estimate of the wall time saved by a prefilter (a Path whose modules are also inserted at the beginning of all other Paths),
+// available at the end of every job:
+// the wall time of an event is approximated by the time elapsed since the end of the previous event in the same stream
+// (this includes the time spent in the source and waiting for a thread, and it is not the CPU time of the event),
+// and the wall time saved is the number of rejected events times the difference between the average times of accepted and rejected events;
+// the CPU time saved is measured with FastTimerService (option "profile" of jmeTriggerNTuple_cfg.py),
+// comparing jobs with and without prefilter (NTuplizers/scripts/comparePrefilterTiming.py)
+namespace {
+
+  struct PrefilterTimingCache {
+
+    TriggerPathIndex triggerPathIndex;
+    unsigned int pathIndexKey = 0;
+
+    std::chrono::steady_clock::time_point lastEventEnd;
+    bool hasLastEventEnd = false;
+
+    unsigned long long nAccepted = 0;
+    unsigned long long nRejected = 0;
+    double timeAccepted = 0.; // [s]
+    double timeRejected = 0.; // [s]
+  };
+}
+
+class PrefilterTimingSummary : public edm::global::EDAnalyzer<edm::StreamCache<PrefilterTimingCache> > {
+
+ public:
+  explicit PrefilterTimingSummary(const edm::ParameterSet&);
+
+  static void fillDescriptions(edm::ConfigurationDescriptions&);
+
+ private:
+  std::unique_ptr<PrefilterTimingCache> beginStream(edm::StreamID) const override;
+  void endStream(edm::StreamID) const override;
+  void analyze(edm::StreamID, const edm::Event&, const edm::EventSetup&) const override;
+  void endJob() override;
+
+  const edm::EDGetToken triggerResults_;
+  const std::string prefilterPath_;
+
+  // sums over all streams (filled at endStream)
+  mutable std::mutex mutex_;
+  mutable unsigned long long nAccepted_ = 0;
+  mutable unsigned long long nRejected_ = 0;
+  mutable double timeAccepted_ = 0.;
+  mutable double timeRejected_ = 0.;
+};
+
+PrefilterTimingSummary::PrefilterTimingSummary(const edm::ParameterSet& iConfig)
+  : triggerResults_(consumes<edm::TriggerResults>(iConfig.getParameter<edm::InputTag>("TriggerResults")))
+  , prefilterPath_(iConfig.getParameter<std::string>("prefilterPath")) {
+}
+
+std::unique_ptr<PrefilterTimingCache> PrefilterTimingSummary::beginStream(edm::StreamID) const {
+
+  auto cache = std::make_unique<PrefilterTimingCache>();
+  cache->pathIndexKey = cache->triggerPathIndex.add(prefilterPath_);
+
+  return cache;
+}
+
+void PrefilterTimingSummary::analyze(edm::StreamID streamID, const edm::Event& iEvent, const edm::EventSetup& iSetup) const {
+
+  auto& cache = *(this->streamCache(streamID));
+
+  const auto now = std::chrono::steady_clock::now();
+  const double deltaTime(cache.hasLastEventEnd ? std::chrono::duration<double>(now - cache.lastEventEnd).count() : -1.);
+
+  cache.lastEventEnd = now;
+  cache.hasLastEventEnd = true;
+
+  // the first event of every stream is not used (no previous event)
+  if(deltaTime < 0.){
+
+    return;
+  }
+
+  edm::Handle<edm::TriggerResults> triggerResults;
+  iEvent.getByToken(triggerResults_, triggerResults);
+
+  if(not triggerResults.isValid()){
+
+    edm::LogWarning("PrefilterTimingSummary::analyze") << "invalid handle for input collection under \"TriggerResults\"";
+
+    return;
+  }
+
+  if(not cache.triggerPathIndex.update(*triggerResults, iEvent)){
+
+    return;
+  }
+
+  if(cache.triggerPathIndex.positions(cache.pathIndexKey).empty()){
+
+    edm::LogWarning("PrefilterTimingSummary::analyze") << "path \"" << prefilterPath_ << "\" not found in edm::TriggerResults";
+
+    return;
+  }
+
+  if(cache.triggerPathIndex.accept(*triggerResults, cache.pathIndexKey)){
+
+    ++cache.nAccepted;
+    cache.timeAccepted += deltaTime;
+  }
+  else {
+
+    ++cache.nRejected;
+    cache.timeRejected += deltaTime;
+  }
+}
+
+void PrefilterTimingSummary::endStream(edm::StreamID streamID) const {
+
+  const auto& cache = *(this->streamCache(streamID));
+
+  std::lock_guard<std::mutex> lock(mutex_);
+
+  nAccepted_ += cache.nAccepted;
+  nRejected_ += cache.nRejected;
+  timeAccepted_ += cache.timeAccepted;
+  timeRejected_ += cache.timeRejected;
+}
+
+void PrefilterTimingSummary::endJob(){
+
+  const double meanAccepted(nAccepted_ > 0 ? timeAccepted_ / nAccepted_ : 0.);
+  const double meanRejected(nRejected_ > 0 ? timeRejected_ / nRejected_ : 0.);
+
+  // wall time the rejected events would have taken without the prefilter, minus the wall time they actually took
+  const double timeSaved((nAccepted_ > 0) ? nRejected_ * (meanAccepted - meanRejected) : 0.);
+  const double timeTotal(timeAccepted_ + timeRejected_);
+
+  edm::LogPrint("PrefilterTimingSummary::endJob")
+    << "prefilter \"" << prefilterPath_ << "\": "
+    << nAccepted_ << " events accepted (wall time between events: " << meanAccepted << " s/event), "
+    << nRejected_ << " events rejected (wall time between events: " << meanRejected << " s/event)\n"
+    << "  estimated wall time saved: " << timeSaved << " s"
+    << " (" << (timeTotal + timeSaved > 0. ? 100. * timeSaved / (timeTotal + timeSaved) : 0.) << "% of the estimated wall time without prefilter;"
+    << " not CPU time, see comparePrefilterTiming.py)";
+}
+
+void PrefilterTimingSummary::fillDescriptions(edm::ConfigurationDescriptions& descriptions){
+
+  edm::ParameterSetDescription desc;
+
+  desc.add<edm::InputTag>("TriggerResults", edm::InputTag("TriggerResults"))->setComment("edm::InputTag of edm::TriggerResults of the current process");
+  desc.add<std::string>("prefilterPath", "prefilterPath")->setComment("name of the Path of the prefilter");
+
+  descriptions.add("PrefilterTimingSummary", desc);
+}
+
+DEFINE_FWK_MODULE(PrefilterTimingSummary);
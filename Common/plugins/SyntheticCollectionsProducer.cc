@@ -0,0 +1,175 @@
+#include <FWCore/Framework/interface/Frameworkfwd.h>
+#include <FWCore/Framework/interface/stream/EDProducer.h>
+#include <FWCore/Framework/interface/Event.h>
+#include <FWCore/Framework/interface/MakerMacros.h>
+#include <FWCore/ParameterSet/interface/ParameterSet.h>
+#include <FWCore/Utilities/interface/Exception.h>
+#include <DataFormats/ParticleFlowCandidate/interface/PFCandidate.h>
+#include <DataFormats/JetReco/interface/PFJet.h>
+#include <DataFormats/METReco/interface/PFMET.h>
+#include <DataFormats/METReco/interface/SpecificPFMETData.h>
+#include <DataFormats/VertexReco/interface/Vertex.h>
+
+#include <cmath>
+#include <memory>
+#include <random>
+
+// synthetic collections (PF candidates, PF jets, PF MET, vertices) for benchmarks of the NTuple step without input files:
+// multiplicities are Poisson-distributed, and the random numbers of every event are seeded with (seed, run, event),
+// so that the content of an event does not depend on the number of threads/streams
+class SyntheticCollectionsProducer : public edm::stream::EDProducer<> {
+
+ public:
+  explicit SyntheticCollectionsProducer(const edm::ParameterSet&);
+
+  static void fillDescriptions(edm::ConfigurationDescriptions&);
+
+ private:
+  void produce(edm::Event&, const edm::EventSetup&) override;
+
+  const unsigned int seed_;
+  const double meanNumberOfPFCandidates_;
+  const double meanNumberOfPFJets_;
+  const double meanNumberOfVertices_;
+  const double meanPtPFCandidates_;
+  const double meanPtPFJets_;
+};
+
+SyntheticCollectionsProducer::SyntheticCollectionsProducer(const edm::ParameterSet& iConfig)
+  : seed_(iConfig.getParameter<unsigned int>("seed"))
+  , meanNumberOfPFCandidates_(iConfig.getParameter<double>("meanNumberOfPFCandidates"))
+  , meanNumberOfPFJets_(iConfig.getParameter<double>("meanNumberOfPFJets"))
+  , meanNumberOfVertices_(iConfig.getParameter<double>("meanNumberOfVertices"))
+  , meanPtPFCandidates_(iConfig.getParameter<double>("meanPtPFCandidates"))
+  , meanPtPFJets_(iConfig.getParameter<double>("meanPtPFJets"))
+{
+  if((meanNumberOfPFCandidates_ <= 0.) or (meanNumberOfPFJets_ <= 0.) or (meanNumberOfVertices_ <= 0.)){
+
+    throw cms::Exception("Configuration") << "invalid (non-positive) mean number of objects";
+  }
+
+  if((meanPtPFCandidates_ <= 0.) or (meanPtPFJets_ <= 0.)){
+
+    throw cms::Exception("Configuration") << "invalid (non-positive) mean pT of objects";
+  }
+
+  produces<reco::PFCandidateCollection>();
+  produces<reco::PFJetCollection>();
+  produces<reco::PFMETCollection>();
+  produces<reco::VertexCollection>();
+}
+
+void SyntheticCollectionsProducer::produce(edm::Event& iEvent, const edm::EventSetup& iSetup){
+
+  std::seed_seq seedSeq{seed_, iEvent.id().run(), static_cast<unsigned int>(iEvent.id().event() & 0xFFFFFFFF), static_cast<unsigned int>(iEvent.id().event() >> 32)};
+  std::mt19937 rng(seedSeq);
+
+  std::uniform_real_distribution<double> uniform(0., 1.);
+
+  // vertices
+  const size_t nVertices(std::max(1, std::poisson_distribution<int>(meanNumberOfVertices_)(rng)));
+
+  auto vertices = std::make_unique<reco::VertexCollection>();
+  vertices->reserve(nVertices);
+
+  reco::Vertex::Error vtxError;
+  vtxError(0, 0) = vtxError(1, 1) = 1e-6;
+  vtxError(2, 2) = 1e-4;
+
+  std::normal_distribution<double> vtxZ(0., 3.5);
+  for(size_t idx=0; idx<nVertices; ++idx){
+
+    vertices->emplace_back(reco::Vertex::Point(0., 0., vtxZ(rng)), vtxError, 10. * uniform(rng), 2. + 20. * uniform(rng), 0);
+  }
+
+  // PF candidates (types with the relative abundances of a typical event)
+  static const reco::PFCandidate::ParticleType pfTypes[] = {
+    reco::PFCandidate::h, reco::PFCandidate::h, reco::PFCandidate::h, reco::PFCandidate::h, reco::PFCandidate::h,
+    reco::PFCandidate::gamma, reco::PFCandidate::gamma, reco::PFCandidate::gamma,
+    reco::PFCandidate::h0, reco::PFCandidate::h_HF, reco::PFCandidate::egamma_HF,
+    reco::PFCandidate::e, reco::PFCandidate::mu,
+  };
+  static const size_t nPFTypes(sizeof(pfTypes) / sizeof(pfTypes[0]));
+
+  const size_t nPFCandidates(std::poisson_distribution<int>(meanNumberOfPFCandidates_)(rng));
+
+  auto pfCandidates = std::make_unique<reco::PFCandidateCollection>();
+  pfCandidates->reserve(nPFCandidates);
+
+  std::exponential_distribution<double> pfCandPt(1. / meanPtPFCandidates_);
+
+  double metX(0.), metY(0.), sumEt(0.);
+  double etByType[reco::PFCandidate::egamma_HF+1] = {0.};
+
+  for(size_t idx=0; idx<nPFCandidates; ++idx){
+
+    const auto pfType(pfTypes[size_t(uniform(rng) * nPFTypes) % nPFTypes]);
+    const bool isForward((pfType == reco::PFCandidate::h_HF) or (pfType == reco::PFCandidate::egamma_HF));
+    const bool isCharged((pfType == reco::PFCandidate::h) or (pfType == reco::PFCandidate::e) or (pfType == reco::PFCandidate::mu));
+
+    const double pt(0.1 + pfCandPt(rng));
+    const double eta(isForward ? (uniform(rng) > 0.5 ? 1. : -1.) * (3. + 2. * uniform(rng)) : (isCharged ? 5. : 6.) * (uniform(rng) - 0.5));
+    const double phi(M_PI * (2. * uniform(rng) - 1.));
+    const double mass(isCharged ? 0.13957 : 0.);
+
+    const reco::Candidate::PolarLorentzVector p4(pt, eta, phi, mass);
+    pfCandidates->emplace_back(isCharged ? (uniform(rng) > 0.5 ? 1 : -1) : 0, reco::Candidate::LorentzVector(p4), pfType);
+    pfCandidates->back().setVertex(vertices->front().position());
+
+    metX -= p4.px();
+    metY -= p4.py();
+    sumEt += pt;
+    etByType[pfType] += pt;
+  }
+
+  // PF MET
+  SpecificPFMETData pfMETData;
+  if(sumEt > 0.){
+
+    pfMETData.NeutralEMFraction = etByType[reco::PFCandidate::gamma] / sumEt;
+    pfMETData.NeutralHadFraction = etByType[reco::PFCandidate::h0] / sumEt;
+    pfMETData.ChargedEMFraction = etByType[reco::PFCandidate::e] / sumEt;
+    pfMETData.ChargedHadFraction = etByType[reco::PFCandidate::h] / sumEt;
+    pfMETData.MuonFraction = etByType[reco::PFCandidate::mu] / sumEt;
+    pfMETData.Type6Fraction = etByType[reco::PFCandidate::h_HF] / sumEt;
+    pfMETData.Type7Fraction = etByType[reco::PFCandidate::egamma_HF] / sumEt;
+  }
+
+  auto pfMETs = std::make_unique<reco::PFMETCollection>();
+  pfMETs->emplace_back(pfMETData, sumEt, reco::Candidate::LorentzVector(metX, metY, 0., std::sqrt(metX*metX + metY*metY)), vertices->front().position());
+
+  // PF jets (not clustered from the PF candidates)
+  const size_t nPFJets(std::poisson_distribution<int>(meanNumberOfPFJets_)(rng));
+
+  auto pfJets = std::make_unique<reco::PFJetCollection>();
+  pfJets->reserve(nPFJets);
+
+  std::exponential_distribution<double> pfJetPt(1. / meanPtPFJets_);
+
+  for(size_t idx=0; idx<nPFJets; ++idx){
+
+    const reco::Candidate::PolarLorentzVector p4(5. + pfJetPt(rng), 10. * (uniform(rng) - 0.5), M_PI * (2. * uniform(rng) - 1.), 5. * uniform(rng));
+    pfJets->emplace_back(reco::Candidate::LorentzVector(p4), vertices->front().position(), reco::PFJet::Specific());
+  }
+
+  iEvent.put(std::move(pfCandidates));
+  iEvent.put(std::move(pfJets));
+  iEvent.put(std::move(pfMETs));
+  iEvent.put(std::move(vertices));
+}
+
+void SyntheticCollectionsProducer::fillDescriptions(edm::ConfigurationDescriptions& descriptions){
+
+  edm::ParameterSetDescription desc;
+
+  desc.add<unsigned int>("seed", 12345)->setComment("seed of the random numbers (combined with run and event numbers)");
+  desc.add<double>("meanNumberOfPFCandidates", 1500.)->setComment("mean number of PF candidates per event");
+  desc.add<double>("meanNumberOfPFJets", 25.)->setComment("mean number of PF jets per event");
+  desc.add<double>("meanNumberOfVertices", 35.)->setComment("mean number of vertices per event");
+  desc.add<double>("meanPtPFCandidates", 1.5)->setComment("mean pT of PF candidates [GeV]");
+  desc.add<double>("meanPtPFJets", 20.)->setComment("mean pT of PF jets [GeV]");
+
+  descriptions.add("SyntheticCollectionsProducer", desc);
+}
+
+DEFINE_FWK_MODULE(SyntheticCollectionsProducer);
@@ -0,0 +1,112 @@
+#include <JMETriggerAnalysis/Common/interface/TriggerPathIndex.h>
+#include <FWCore/MessageLogger/interface/MessageLogger.h>
+#include <FWCore/Common/interface/TriggerNames.h>
+
+unsigned int TriggerPathIndex::add(const std::string& name){
+
+  const auto it = keys_.find(name);
+
+  if(it != keys_.end()){
+
+    return it->second;
+  }
+
+  const unsigned int key(names_.size());
+
+  names_.emplace_back(name);
+  keys_.insert({name, key});
+  positions_.emplace_back();
+
+  // force rebuild of the index at the next update
+  parameterSetID_ = edm::ParameterSetID();
+  valid_ = false;
+
+  return key;
+}
+
+bool TriggerPathIndex::update(const edm::TriggerResults& triggerResults, const edm::Event& iEvent){
+
+  if(parameterSetID_.isValid() and (triggerResults.parameterSetID() == parameterSetID_)){
+
+    ++nHits_;
+
+    return valid_;
+  }
+
+  ++nRebuilds_;
+
+  for(auto& positions_i : positions_){
+
+    positions_i.clear();
+  }
+
+  parameterSetID_ = edm::ParameterSetID();
+  valid_ = false;
+
+  const auto& triggerNames = iEvent.triggerNames(triggerResults).triggerNames();
+
+  if(triggerResults.size() != triggerNames.size()){
+
+    edm::LogWarning("TriggerPathIndex::update") << "input error: size of TriggerResults ("
+      << triggerResults.size() << ") and TriggerNames (" << triggerNames.size() << ") differ, index will not be used";
+
+    return false;
+  }
+
+  for(unsigned int idx=0; idx<triggerNames.size(); ++idx){
+
+    const auto& triggerName = triggerNames[idx];
+    const auto triggerName_unv = triggerName.substr(0, triggerName.rfind("_v"));
+
+    // match either full name (e.g. "HLT_IsoMu24_v10") or name without version (e.g. "HLT_IsoMu24")
+    const auto it_full = keys_.find(triggerName);
+
+    if(it_full != keys_.end()){
+
+      positions_[it_full->second].emplace_back(idx);
+    }
+
+    if(triggerName_unv != triggerName){
+
+      const auto it_unv = keys_.find(triggerName_unv);
+
+      if(it_unv != keys_.end()){
+
+        positions_[it_unv->second].emplace_back(idx);
+      }
+    }
+
+    LogDebug("TriggerPathIndex::update") << "path = " << triggerName << ", path (un-versioned) = " << triggerName_unv << ", position = " << idx;
+  }
+
+  parameterSetID_ = triggerResults.parameterSetID();
+  valid_ = true;
+
+  return valid_;
+}
+
+bool TriggerPathIndex::accept(const edm::TriggerResults& triggerResults, const unsigned int key) const {
+
+  for(const auto idx : positions_[key]){
+
+    if(triggerResults.accept(idx)){
+
+      return true;
+    }
+  }
+
+  return false;
+}
+
+bool TriggerPathIndex::acceptAll(const edm::TriggerResults& triggerResults, const unsigned int key) const {
+
+  for(const auto idx : positions_[key]){
+
+    if(not triggerResults.accept(idx)){
+
+      return false;
+    }
+  }
+
+  return true;
+}
@@ -0,0 +1,54 @@
+#ifndef JMETriggerAnalysis_DeltaRMatcher_h
+#define JMETriggerAnalysis_DeltaRMatcher_h
+
+#include <vector>
+#include <utility>
+
+// matching in (eta, phi) of the objects of one collection to the objects of another collection, within a maximum delta-R:
+// the objects of the second collection are indexed in a grid of cells in (eta, phi), with cells not smaller than the maximum delta-R,
+// so that the candidates for every object of the first collection are in the 3x3 cells around it
+// (the cells in phi are periodic, and delta-phi is computed in [-pi, pi], so matches across phi = +/-pi are found);
+// the result is, for every object of the first collection, the index of the matched object of the second collection (-1: no match):
+//  - unique=false : closest object within the maximum delta-R (an object of the second collection can be matched more than once)
+//  - unique=true  : one-to-one matching, pairs are assigned in order of increasing delta-R
+// ties are resolved by the position of the objects in the collections, so the result does not depend on the grid
+class DeltaRMatcher {
+
+ public:
+  explicit DeltaRMatcher(const double maxDeltaR, const bool unique=false);
+  virtual ~DeltaRMatcher() {}
+
+  void match(const std::vector<float>& eta1, const std::vector<float>& phi1,
+             const std::vector<float>& eta2, const std::vector<float>& phi2, std::vector<int>& result);
+
+  double maxDeltaR() const { return maxDeltaR_; }
+  bool unique() const { return unique_; }
+
+ protected:
+  void buildGrid(const std::vector<float>& eta, const std::vector<float>& phi);
+
+  int etaCell(const float eta) const;
+  int phiCell(const float phi) const;
+
+  const double maxDeltaR_;
+  const double maxDeltaR2_;
+  const bool unique_;
+
+  // grid of the objects of the second collection: indices of the objects of cell k are
+  // cellObjects_[cellStart_[k]] ... cellObjects_[cellStart_[k+1]-1], with k = etaCell * nPhiCells_ + phiCell
+  // (buffers are reused across events)
+  double etaMin_;
+  double etaCellSize_;
+  int nEtaCells_;
+  double phiCellSize_;
+  int nPhiCells_;
+  std::vector<unsigned int> cellStart_;
+  std::vector<unsigned int> cellObjects_;
+  std::vector<int> objectCells_;
+
+  // candidate pairs (delta-R^2, (index in first collection, index in second collection)) for the one-to-one matching
+  std::vector<std::pair<float, std::pair<unsigned int, unsigned int> > > pairs_;
+  std::vector<bool> matched_;
+};
+
+#endif
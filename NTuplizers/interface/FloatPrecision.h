@@ -0,0 +1,35 @@
+#ifndef JMETriggerAnalysis_FloatPrecision_h
+#define JMETriggerAnalysis_FloatPrecision_h
+
+#include <cstdint>
+#include <cstring>
+
+// round the mantissa of a float to the given number of bits (0-23, round-to-nearest);
+// infinities and NaNs are not modified
+inline float reduceFloatPrecision(const float value, const unsigned int mantissaBits){
+
+  if(mantissaBits >= 23){
+
+    return value;
+  }
+
+  uint32_t bits;
+  std::memcpy(&bits, &value, sizeof(bits));
+
+  if((bits & 0x7f800000u) == 0x7f800000u){
+
+    return value;
+  }
+
+  const uint32_t shift(23 - mantissaBits);
+
+  bits += (uint32_t(1) << (shift - 1));
+  bits &= ~((uint32_t(1) << shift) - 1);
+
+  float ret;
+  std::memcpy(&ret, &bits, sizeof(ret));
+
+  return ret;
+}
+
+#endif
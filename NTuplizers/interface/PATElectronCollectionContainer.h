@@ -13,6 +13,7 @@ class PATElectronCollectionContainer : public VRecoCandidateCollectionContainer<
   void clear();
   void reserve(const size_t);
   void emplace_back(const pat::Electron&);
+  void swap(PATElectronCollectionContainer&);
 
   std::vector<int>& vec_pdgId(){ return pdgId_; }
   std::vector<float>& vec_pt(){ return pt_; }
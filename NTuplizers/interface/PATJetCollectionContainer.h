@@ -13,6 +13,7 @@ class PATJetCollectionContainer : public VRecoCandidateCollectionContainer<pat::
   void clear();
   void reserve(const size_t);
   void emplace_back(const pat::Jet&);
+  void swap(PATJetCollectionContainer&);
 
   std::vector<float>& vec_pt(){ return pt_; }
   std::vector<float>& vec_eta(){ return eta_; }
@@ -13,6 +13,7 @@ class PATMETCollectionContainer : public VRecoCandidateCollectionContainer<pat::
   void clear();
   void reserve(const size_t);
   void emplace_back(const pat::MET&);
+  void swap(PATMETCollectionContainer&);
 
   std::vector<float>& vec_Raw_pt(){ return Raw_pt_; }
   std::vector<float>& vec_Raw_phi(){ return Raw_phi_; }
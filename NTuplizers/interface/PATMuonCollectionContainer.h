@@ -15,6 +15,7 @@ class PATMuonCollectionContainer : public VRecoCandidateCollectionContainer<pat:
   void clear();
   void reserve(const size_t);
   void emplace_back(const pat::Muon&);
+  void swap(PATMuonCollectionContainer&);
 
   std::vector<int>& vec_pdgId(){ return pdgId_; }
   std::vector<float>& vec_pt(){ return pt_; }
@@ -13,6 +13,7 @@ class PATPackedCandidateCollectionContainer : public VRecoCandidateCollectionCon
   void clear();
   void reserve(const size_t);
   void emplace_back(const pat::PackedCandidate&);
+  void swap(PATPackedCandidateCollectionContainer&);
 
   std::vector<int>& vec_pdgId(){ return pdgId_; }
   std::vector<float>& vec_pt(){ return pt_; }
@@ -13,6 +13,7 @@ class RecoCaloJetCollectionContainer : public VRecoCandidateCollectionContainer<
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::CaloJet&);
+  void swap(RecoCaloJetCollectionContainer&);
 
   std::vector<float>& vec_pt(){ return pt_; }
   std::vector<float>& vec_eta(){ return eta_; }
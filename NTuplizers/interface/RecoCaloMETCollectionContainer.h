@@ -13,6 +13,7 @@ class RecoCaloMETCollectionContainer : public VRecoCandidateCollectionContainer<
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::CaloMET&);
+  void swap(RecoCaloMETCollectionContainer&);
 
   std::vector<float>& vec_pt(){ return pt_; }
   std::vector<float>& vec_phi(){ return phi_; }
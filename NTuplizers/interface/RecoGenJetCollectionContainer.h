@@ -13,6 +13,7 @@ class RecoGenJetCollectionContainer : public VRecoCandidateCollectionContainer<r
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::GenJet&);
+  void swap(RecoGenJetCollectionContainer&);
 
   std::vector<float>& vec_pt(){ return pt_; }
   std::vector<float>& vec_eta(){ return eta_; }
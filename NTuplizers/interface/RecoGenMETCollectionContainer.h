@@ -13,6 +13,7 @@ class RecoGenMETCollectionContainer : public VRecoCandidateCollectionContainer<r
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::GenMET&);
+  void swap(RecoGenMETCollectionContainer&);
 
   std::vector<float>& vec_pt(){ return pt_; }
   std::vector<float>& vec_phi(){ return phi_; }
@@ -13,6 +13,7 @@ class RecoPFCandidateCollectionContainer : public VRecoCandidateCollectionContai
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::PFCandidate&);
+  void swap(RecoPFCandidateCollectionContainer&);
 
   std::vector<int>& vec_pdgId(){ return pdgId_; }
   std::vector<float>& vec_pt(){ return pt_; }
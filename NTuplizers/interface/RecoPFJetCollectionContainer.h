@@ -13,6 +13,7 @@ class RecoPFJetCollectionContainer : public VRecoCandidateCollectionContainer<re
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::PFJet&);
+  void swap(RecoPFJetCollectionContainer&);
 
   std::vector<float>& vec_pt(){ return pt_; }
   std::vector<float>& vec_eta(){ return eta_; }
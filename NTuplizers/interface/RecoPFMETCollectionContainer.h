@@ -13,6 +13,7 @@ class RecoPFMETCollectionContainer : public VRecoCandidateCollectionContainer<re
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::PFMET&);
+  void swap(RecoPFMETCollectionContainer&);
 
   std::vector<float>& vec_pt(){ return pt_; }
   std::vector<float>& vec_phi(){ return phi_; }
@@ -13,6 +13,7 @@ class RecoVertexCollectionContainer : public VCollectionContainer<reco::Vertex>
   void clear();
   void reserve(const size_t);
   void emplace_back(const reco::Vertex&);
+  void swap(RecoVertexCollectionContainer&);
 
   std::vector<uint>& vec_tracksSize(){ return tracksSize_; }
   std::vector<bool>& vec_isFake(){ return isFake_; }
@@ -0,0 +1,49 @@
+#ifndef JMETriggerAnalysis_SkimIndexWriter_h
+#define JMETriggerAnalysis_SkimIndexWriter_h
+
+#include <string>
+#include <vector>
+#include <cstdint>
+
+// per-file index of the entries of an output TTree (read by JMETriggerAnalysis/NTuplizers/python/skimIndex.py):
+//  - bits : one bitset per name (e.g. trigger path, fill-collection condition), bit i of word i/64 is entry i
+//  - keys : one float per entry and name (e.g. number of objects, value of the leading object),
+//           stored as values sorted in ascending order (NaN last) followed by the corresponding entry numbers
+// file format:
+//   "JMETIDX1" | uint64 size of header | header (JSON, padded with spaces to a multiple of 8 bytes)
+//   | for every bit: [uint64] x number of words | for every key: [float32] x entries, [uint32] x entries
+class SkimIndexWriter {
+
+ public:
+  explicit SkimIndexWriter() {}
+  virtual ~SkimIndexWriter() {}
+
+  // register a name and return its key
+  unsigned int addBit(const std::string&);
+  unsigned int addKey(const std::string&);
+
+  // appends an entry (all bits false, all keys NaN)
+  void addEntry();
+
+  // set bit (key) of the last entry
+  void setBit(const unsigned int bit){ bitWords_[bit].back() |= (uint64_t(1) << ((nEntries_-1) % 64)); }
+  void setKey(const unsigned int key, const float value){ keyValues_[key].back() = value; }
+
+  const std::vector<std::string>& bitNames() const { return bitNames_; }
+  const std::vector<std::string>& keyNames() const { return keyNames_; }
+  unsigned long long numberOfEntries() const { return nEntries_; }
+
+  // returns false if the output file could not be written
+  bool write(const std::string& fileName, const std::string& treePath) const;
+
+ protected:
+  std::vector<std::string> bitNames_;
+  std::vector<std::string> keyNames_;
+
+  std::vector<std::vector<uint64_t> > bitWords_;
+  std::vector<std::vector<float> > keyValues_;
+
+  unsigned long long nEntries_ = 0;
+};
+
+#endif
@@ -4,6 +4,7 @@
 #include <FWCore/Utilities/interface/EDGetToken.h>
 #include <FWCore/Framework/interface/Event.h>
 #include <DataFormats/Common/interface/TriggerResults.h>
+#include <JMETriggerAnalysis/Common/interface/TriggerPathIndex.h>
 
 #include <string>
 #include <vector>
@@ -15,7 +16,9 @@ class TriggerResultsContainer {
   virtual ~TriggerResultsContainer() {}
 
   void clear();
-  void fill(const edm::TriggerResults&, const edm::Event&);
+  void initPathIndex(TriggerPathIndex&);
+  void fill(const edm::TriggerResults&, const TriggerPathIndex&);
+  void swap(TriggerResultsContainer&);
 
   const std::string& inputTagLabel() const { return inputTagLabel_; }
   const edm::EDGetToken& token() const { return token_; }
@@ -34,6 +37,7 @@ class TriggerResultsContainer {
 
  protected:
   std::vector<Entry> entries_;
+  std::vector<unsigned int> pathIndexKeys_;
   const std::string inputTagLabel_;
   const edm::EDGetToken token_;
 };
@@ -2,16 +2,21 @@
 #define JMETriggerAnalysis_VCollectionContainer_h
 
 #include <FWCore/Utilities/interface/EDGetToken.h>
-#include <CommonTools/Utils/interface/StringCutObjectSelector.h>
+#include <JMETriggerAnalysis/Common/interface/FastCutObjectSelector.h>
 
 #include <string>
 #include <vector>
+#include <utility>
+#include <algorithm>
+#include <chrono>
 
 template <class T>
 class VCollectionContainer {
 
  public:
   explicit VCollectionContainer(const std::string&, const std::string&, const edm::EDGetToken&, const std::string& strCut="");
+  // copies do not inherit the capacity of the buffers (std::vector copies only their content) nor the counters
+  VCollectionContainer(const VCollectionContainer<T>&);
   virtual ~VCollectionContainer() {}
 
   virtual void fill(const std::vector<T>&, const bool clear_before_filling=true);
@@ -21,6 +26,7 @@ class VCollectionContainer {
   virtual void emplace_back(const T&) = 0;
 
   void setStringCutObjectSelector(const std::string&);
+  void setStringCutObjectSelectorValidation(const unsigned int num){ stringCutObjectSelector_.setValidationEvents(num); }
 
   void setName(const std::string& str) { name_ = str; }
 
@@ -28,40 +34,122 @@ class VCollectionContainer {
   const std::string& inputTagLabel() const { return inputTagLabel_; }
   const edm::EDGetToken& token() const { return token_; }
 
+  // buffers are only (re)allocated when an event needs more space than the current capacity,
+  // and they grow geometrically up to the largest number of objects seen so far (high-water mark);
+  // clear() does not release memory, so events below the high-water mark do not allocate
+  void reserveBuffers(const size_t);
+
+  size_t bufferCapacity() const { return bufferCapacity_; }
+  size_t highWaterMark() const { return highWaterMark_; }
+  unsigned long long numberOfAllocations() const { return numberOfAllocations_; }
+  unsigned long long numberOfFills() const { return numberOfFills_; }
+
+  // time spent in fill [s] (measured only if enabled)
+  void setFillTimeMeasurement(const bool foo){ measureFillTime_ = foo; }
+  double fillTime() const { return fillTime_; }
+
  protected:
+  // to be called in the swap method of the derived classes
+  // (the capacity follows the buffers, the counters stay with the instance)
+  void swapBuffers(VCollectionContainer<T>& other){ std::swap(bufferCapacity_, other.bufferCapacity_); }
+
+  // adds the time elapsed between its construction and its destruction to the fill time of the container (if enabled)
+  class FillTimer {
+
+   public:
+    explicit FillTimer(VCollectionContainer<T>& container) : container_(container) {
+
+      if(container_.measureFillTime_){
+
+        start_ = std::chrono::steady_clock::now();
+      }
+    }
+
+    ~FillTimer(){
+
+      if(container_.measureFillTime_){
+
+        container_.fillTime_ += std::chrono::duration<double>(std::chrono::steady_clock::now() - start_).count();
+      }
+    }
+
+   private:
+    VCollectionContainer<T>& container_;
+    std::chrono::steady_clock::time_point start_;
+  };
+
   std::string name_;
   const std::string inputTagLabel_;
   const edm::EDGetToken token_;
 
-  StringCutObjectSelector<T, true> stringCutObjectSelector_;
+  FastCutObjectSelector<T> stringCutObjectSelector_;
+
+  size_t bufferCapacity_;
+  size_t highWaterMark_;
+  unsigned long long numberOfAllocations_;
+  unsigned long long numberOfFills_;
+
+  bool measureFillTime_;
+  double fillTime_;
 };
 
 template<class T>
 VCollectionContainer<T>::VCollectionContainer(const std::string& name, const std::string& inputTagLabel, const edm::EDGetToken& token, const std::string& strCut)
-  : name_(name), inputTagLabel_(inputTagLabel), token_(token), stringCutObjectSelector_(strCut) {
+  : name_(name), inputTagLabel_(inputTagLabel), token_(token), stringCutObjectSelector_(strCut),
+    bufferCapacity_(0), highWaterMark_(0), numberOfAllocations_(0), numberOfFills_(0), measureFillTime_(false), fillTime_(0.) {
+}
+
+template<class T>
+VCollectionContainer<T>::VCollectionContainer(const VCollectionContainer<T>& other)
+  : name_(other.name_), inputTagLabel_(other.inputTagLabel_), token_(other.token_), stringCutObjectSelector_(other.stringCutObjectSelector_),
+    bufferCapacity_(0), highWaterMark_(0), numberOfAllocations_(0), numberOfFills_(0), measureFillTime_(other.measureFillTime_), fillTime_(0.) {
 }
 
 template<class T>
 void VCollectionContainer<T>::setStringCutObjectSelector(const std::string& strCut){
 
-  stringCutObjectSelector_ = StringCutObjectSelector<T, true>(strCut);
+  stringCutObjectSelector_ = FastCutObjectSelector<T>(strCut);
+}
+
+template<class T>
+void VCollectionContainer<T>::reserveBuffers(const size_t vec_size){
+
+  ++numberOfFills_;
+
+  if(vec_size > highWaterMark_){
+
+    highWaterMark_ = vec_size;
+  }
+
+  if(vec_size <= bufferCapacity_){
+
+    return;
+  }
+
+  bufferCapacity_ = std::max(highWaterMark_, bufferCapacity_ + bufferCapacity_ / 2);
+  this->reserve(bufferCapacity_);
+  ++numberOfAllocations_;
 }
 
 template<class T>
 void VCollectionContainer<T>::fill(const std::vector<T>& coll, const bool clear_before_filling){
 
+  const FillTimer fillTimer(*this);
+
   if(clear_before_filling){
 
     this->clear();
   }
 
-  this->reserve(coll.size());
+  this->reserveBuffers(coll.size());
+
+  const bool validateSelector(stringCutObjectSelector_.beginEvent());
 
   for(uint idx=0; idx<coll.size(); ++idx){
 
     const auto& i_obj = coll.at(idx);
 
-    if(not stringCutObjectSelector_(i_obj)){
+    if(not (validateSelector ? stringCutObjectSelector_.validate(i_obj) : stringCutObjectSelector_(i_obj))){
 
       continue;
     }
@@ -5,6 +5,7 @@
 
 #include <numeric>
 #include <algorithm>
+#include <utility>
 
 template <class T>
 class VRecoCandidateCollectionContainer : public VCollectionContainer<T> {
@@ -21,56 +22,99 @@ class VRecoCandidateCollectionContainer : public VCollectionContainer<T> {
 
   void orderByHighestPt(const bool foo){ orderByHighestPt_ = foo; }
 
+  // maximum number of objects stored per event (0: no limit)
+  void setMaxObjects(const size_t foo){ maxObjects_ = foo; }
+
  protected:
 
   // ordering
-  std::vector<size_t> idxs_; // vector of indeces (used for ordering)
+  std::vector<std::pair<double, size_t> > sortKeys_; // pairs of (pT, index) of the selected objects (used for ordering)
   bool orderByHighestPt_; // order objects by decreasing pT values
+  size_t maxObjects_; // maximum number of objects (0: no limit)
 };
 
 template<class T>
 VRecoCandidateCollectionContainer<T>::VRecoCandidateCollectionContainer(
   const std::string& name, const std::string& inputTagLabel, const edm::EDGetToken& token, const std::string& strCut, const bool orderByHighestPt
-) : VCollectionContainer<T>(name, inputTagLabel, token, strCut), orderByHighestPt_(orderByHighestPt) {
+) : VCollectionContainer<T>(name, inputTagLabel, token, strCut), orderByHighestPt_(orderByHighestPt), maxObjects_(0) {
 
-  idxs_.clear();
+  sortKeys_.clear();
 }
 
 template<class T>
 void VRecoCandidateCollectionContainer<T>::fill(const std::vector<T>& coll, const bool clear_before_filling){
 
+  const typename VCollectionContainer<T>::FillTimer fillTimer(*this);
+
   if(clear_before_filling){
 
     this->clear();
   }
 
-  this->reserve(coll.size());
+  if(not orderByHighestPt_){
+
+    this->reserveBuffers((maxObjects_ > 0) ? std::min(maxObjects_, coll.size()) : coll.size());
+
+    const bool validateSelector(this->stringCutObjectSelector_.beginEvent());
+
+    size_t nObjects(0);
 
-  if(orderByHighestPt_){
+    for(size_t idx=0; idx<coll.size(); ++idx){
 
-    idxs_.clear();
-    idxs_.reserve(coll.size());
+      if((maxObjects_ > 0) and (nObjects >= maxObjects_)){
 
-    // initialize indeces
-    for(uint idx=0; idx<coll.size(); ++idx){
+        break;
+      }
 
-      idxs_.emplace_back(idx);
+      const auto& i_obj = coll[idx];
+
+      if(not (validateSelector ? this->stringCutObjectSelector_.validate(i_obj) : this->stringCutObjectSelector_(i_obj))){
+
+        continue;
+      }
+
+      this->emplace_back(i_obj);
+      ++nObjects;
     }
 
-    // sort indeces based on pt-ordering
-    std::sort(idxs_.begin(), idxs_.end(), [&coll](const size_t& i1, const size_t& i2){ return coll.at(i1).pt() > coll.at(i2).pt(); });
+    return;
   }
 
-  for(uint idx=0; idx<coll.size(); ++idx){
+  // selection is applied before the ordering
+  sortKeys_.clear();
+  sortKeys_.reserve(coll.size());
 
-    const auto& i_obj = coll.at(orderByHighestPt_ ? idxs_.at(idx) : idx);
+  const bool validateSelector(this->stringCutObjectSelector_.beginEvent());
 
-    if(not this->stringCutObjectSelector_(i_obj)){
+  for(size_t idx=0; idx<coll.size(); ++idx){
 
-      continue;
+    if(validateSelector ? this->stringCutObjectSelector_.validate(coll[idx]) : this->stringCutObjectSelector_(coll[idx])){
+
+      sortKeys_.emplace_back(coll[idx].pt(), idx);
     }
+  }
+
+  // pt-ordering (ties resolved by position in the input collection)
+  const auto comparator = [](const std::pair<double, size_t>& k1, const std::pair<double, size_t>& k2){
+
+    return (k1.first > k2.first) or ((k1.first == k2.first) and (k1.second < k2.second));
+  };
+
+  if((maxObjects_ > 0) and (maxObjects_ < sortKeys_.size())){
+
+    std::partial_sort(sortKeys_.begin(), sortKeys_.begin() + maxObjects_, sortKeys_.end(), comparator);
+    sortKeys_.resize(maxObjects_);
+  }
+  else {
+
+    std::sort(sortKeys_.begin(), sortKeys_.end(), comparator);
+  }
+
+  this->reserveBuffers(sortKeys_.size());
+
+  for(const auto& key_i : sortKeys_){
 
-    this->emplace_back(i_obj);
+    this->emplace_back(coll[key_i.second]);
   }
 }
 
@@ -1,14 +1,21 @@
 #include <FWCore/Framework/interface/Frameworkfwd.h>
-#include <FWCore/Framework/interface/EDAnalyzer.h>
+#include <FWCore/Framework/interface/global/EDAnalyzer.h>
 #include <FWCore/Framework/interface/Event.h>
+#include <FWCore/Framework/interface/LuminosityBlock.h>
 #include <FWCore/Framework/interface/MakerMacros.h>
+#include <FWCore/Framework/interface/ConsumesCollector.h>
 #include <FWCore/ParameterSet/interface/ParameterSet.h>
 #include <FWCore/MessageLogger/interface/MessageLogger.h>
 #include <FWCore/Utilities/interface/Exception.h>
+#include <FWCore/Utilities/interface/RegexMatch.h>
 #include <FWCore/ServiceRegistry/interface/Service.h>
 #include <CommonTools/UtilAlgos/interface/TFileService.h>
 #include <DataFormats/Common/interface/TriggerResults.h>
 #include <FWCore/Common/interface/TriggerNames.h>
+#include <JMETriggerAnalysis/Common/interface/TriggerPathIndex.h>
+#include <JMETriggerAnalysis/NTuplizers/interface/FloatPrecision.h>
+#include <JMETriggerAnalysis/NTuplizers/interface/SkimIndexWriter.h>
+#include <JMETriggerAnalysis/NTuplizers/interface/DeltaRMatcher.h>
 #include <JMETriggerAnalysis/NTuplizers/interface/TriggerResultsContainer.h>
 #include <JMETriggerAnalysis/NTuplizers/interface/RecoVertexCollectionContainer.h>
 #include <JMETriggerAnalysis/NTuplizers/interface/RecoPFCandidateCollectionContainer.h>
@@ -28,12 +35,154 @@
 #include <vector>
 #include <memory>
 #include <algorithm>
+#include <map>
+#include <set>
+#include <fstream>
 #include <unordered_map>
+#include <mutex>
+#include <atomic>
+#include <regex>
+#include <limits>
+#include <functional>
 
 #include <Compression.h>
+#include <RVersion.h>
 #include <TTree.h>
+#include <TKey.h>
 
-class JMETriggerNTuple : public edm::EDAnalyzer {
+// condition to fill a collection: either a path (string, accept of the path in TriggerResults)
+// or a bool event product (InputTag, e.g. decision of a rule of METComparisonFilter)
+class FillCollectionConditionsMap {
+
+ public:
+  FillCollectionConditionsMap();
+  FillCollectionConditionsMap(const edm::ParameterSet&, TriggerPathIndex&, edm::ConsumesCollector&&);
+
+  void clear();
+  int init(const edm::ParameterSet&, TriggerPathIndex&, edm::ConsumesCollector&&);
+
+  struct condition {
+
+    condition(const std::string& a_path, const unsigned int a_pathIndexKey, const bool a_accept=false)
+      : path(a_path), pathIndexKey(a_pathIndexKey), isProduct(false), accept(a_accept) {}
+
+    condition(const edm::InputTag& a_inputTag, const edm::EDGetTokenT<bool>& a_token, const bool a_accept=false)
+      : path(a_inputTag.encode()), pathIndexKey(0), isProduct(true), token(a_token), accept(a_accept) {}
+
+    const std::string path;
+    const unsigned int pathIndexKey;
+    const bool isProduct;
+    const edm::EDGetTokenT<bool> token;
+    bool accept;
+  };
+
+  bool has(const std::string&) const;
+  const condition& at(const std::string&) const;
+  bool accept(const std::string&) const;
+
+  // updates the conditions from paths
+  int update(const edm::TriggerResults&, const TriggerPathIndex&);
+
+  // updates the conditions from bool event products (false if the product is not available)
+  int update(const edm::Event&);
+
+  // names of the collections with a fill condition
+  std::vector<std::string> names() const;
+
+ protected:
+
+  std::map<std::string, condition> condMap_;
+};
+
+// content of one entry of the output TTree:
+// one instance per stream is filled in JMETriggerNTuple::analyze,
+// and it is then swapped with the instance whose data members are used as TBranch addresses
+struct JMETriggerNTupleContent {
+
+  explicit JMETriggerNTupleContent(const TriggerResultsContainer&);
+
+  void swap(JMETriggerNTupleContent&);
+
+  // calls a function on every collection container
+  template <class F>
+  void forEachCollectionContainer(F&&);
+
+  unsigned int run = 0;
+  unsigned int luminosityBlock = 0;
+  unsigned long long event = 0;
+
+  TriggerResultsContainer triggerResultsContainer;
+  std::vector<RecoVertexCollectionContainer> v_recoVertexCollectionContainer;
+  std::vector<RecoPFCandidateCollectionContainer> v_recoPFCandidateCollectionContainer;
+  std::vector<PATPackedCandidateCollectionContainer> v_patPackedCandidateCollectionContainer;
+  std::vector<RecoGenJetCollectionContainer> v_recoGenJetCollectionContainer;
+  std::vector<RecoCaloJetCollectionContainer> v_recoCaloJetCollectionContainer;
+  std::vector<RecoPFJetCollectionContainer> v_recoPFJetCollectionContainer;
+  std::vector<PATJetCollectionContainer> v_patJetCollectionContainer;
+  std::vector<RecoGenMETCollectionContainer> v_recoGenMETCollectionContainer;
+  std::vector<RecoCaloMETCollectionContainer> v_recoCaloMETCollectionContainer;
+  std::vector<RecoPFMETCollectionContainer> v_recoPFMETCollectionContainer;
+  std::vector<PATMETCollectionContainer> v_patMETCollectionContainer;
+  std::vector<PATMuonCollectionContainer> v_patMuonCollectionContainer;
+  std::vector<PATElectronCollectionContainer> v_patElectronCollectionContainer;
+
+  FillCollectionConditionsMap fillCollectionConditionMap;
+
+  // delta-R matching between two collections (parameter "collectionMatches"): for every object of collection "src",
+  // index of the matched object of collection "matched" (-1: no match), output branch "<src>_matchIdx_<matched>"
+  struct CollectionMatch {
+
+    CollectionMatch(const std::string& a_src, const std::string& a_matched, const double a_maxDeltaR, const bool a_unique)
+      : name(a_src+"_matchIdx_"+a_matched), src(a_src), matched(a_matched), matcher(a_maxDeltaR, a_unique) {}
+
+    const std::string name;
+    const std::string src;
+    const std::string matched;
+    DeltaRMatcher matcher;
+    std::vector<int> matchIdx;
+  };
+
+  std::vector<CollectionMatch> v_collectionMatch;
+
+  // (eta, phi) of the objects of the collection with the given name (null pointers if not found, or if the collection has no eta and phi)
+  std::pair<const std::vector<float>*, const std::vector<float>*> etaPhi(const std::string&);
+
+  // computes the matches of v_collectionMatch (to be called after filling the collection containers)
+  void fillCollectionMatches();
+
+  // index of the paths used in the TriggerResultsContainer, event selection and fill conditions
+  // (not swapped: each stream keeps its own index)
+  TriggerPathIndex triggerPathIndex;
+
+  // output branches with reduced precision and their number of mantissa bits
+  // (not swapped: addresses of the vectors of this instance, set in JMETriggerNTuple::beginStream)
+  std::vector<std::pair<std::vector<float>*, unsigned int> > reducedPrecisionBranches;
+
+  // rounds the values of the output branches with reduced precision
+  void reducePrecision();
+
+ protected:
+  template <class C>
+  static void swapContainers(std::vector<C>&, std::vector<C>&);
+
+  template <class C>
+  static void findEtaPhi(std::vector<C>&, const std::string&, std::pair<const std::vector<float>*, const std::vector<float>*>&);
+};
+
+// number of events of a luminosity block (incremented by all streams, the cache of a luminosity block is const)
+struct JMETriggerNTupleLumiCounts {
+
+  mutable std::atomic<unsigned long long> eventsSeen{0};
+  mutable std::atomic<unsigned long long> eventsPassingFilter{0};
+  mutable std::atomic<unsigned long long> eventsWritten{0};
+};
+
+// global module: the output TTrees are filled while holding mutex_, but a global module cannot declare
+// the shared resource of TFileService (TFileService::kSharedResource, only edm::one modules can),
+// so JMETriggerNTuple must be the only module of the process writing to the output file of TFileService
+// (checked before the first event and at endJob, see checkTFileServiceConsumers);
+// with more than one thread, the order of the entries of the output TTree is not the order of the input events
+class JMETriggerNTuple : public edm::global::EDAnalyzer<edm::StreamCache<JMETriggerNTupleContent>, edm::LuminosityBlockCache<JMETriggerNTupleLumiCounts> > {
 
  public:
   explicit JMETriggerNTuple(const edm::ParameterSet&);
@@ -41,92 +190,373 @@ class JMETriggerNTuple : public edm::EDAnalyzer {
   static void fillDescriptions(edm::ConfigurationDescriptions&);
 
  protected:
-  virtual void beginJob();
-  virtual void analyze(const edm::Event&, const edm::EventSetup&);
+  void beginJob() override;
+  void endJob() override;
+  std::unique_ptr<JMETriggerNTupleContent> beginStream(edm::StreamID) const override;
+  void endStream(edm::StreamID) const override;
+  std::shared_ptr<JMETriggerNTupleLumiCounts> globalBeginLuminosityBlock(const edm::LuminosityBlock&, const edm::EventSetup&) const override;
+  void globalEndLuminosityBlock(const edm::LuminosityBlock&, const edm::EventSetup&) const override;
+  void analyze(edm::StreamID, const edm::Event&, const edm::EventSetup&) const override;
 
   template <typename... Args>
   void addBranch(const std::string&, Args...);
 
-  bool passesTriggerResults_OR(const edm::TriggerResults&, const edm::Event&, const std::vector<std::string>&);
-  bool passesTriggerResults_AND(const edm::TriggerResults&, const edm::Event&, const std::vector<std::string>&);
+  // calls func(branch_name, address) for every output branch of the given content
+  // (used to create the TBranches of content_, and to find the vectors with reduced precision in the per-stream caches)
+  template <class F>
+  static void forEachBranch(JMETriggerNTupleContent&, F&&);
+
+  // creation of the TBranch (std::vector<T> branches of collections depend on the output layout)
+  template <typename... Args>
+  void createBranch(const std::string& branch_name, Args... args){ ttree_->Branch(branch_name.c_str(), args...); }
+  template <typename T>
+  void createBranch(const std::string&, std::vector<T>*);
+  void createBranch(const std::string&, std::vector<bool>*);
+
+  static const char* leafType(const std::vector<float>*){ return "F"; }
+  static const char* leafType(const std::vector<int>*){ return "I"; }
+  static const char* leafType(const std::vector<uint>*){ return "i"; }
+  static const char* leafType(const std::vector<bool>*){ return "O"; }
+
+  // reduced precision of output branches (only std::vector<float>)
+  template <typename... Args>
+  void registerReducedPrecision(const std::string&, Args...) {}
+  void registerReducedPrecision(const std::string&, std::vector<float>*);
+
+  // output branches of type std::vector<float> (used by the skim index)
+  template <typename... Args>
+  void registerFloatVectorBranch(const std::string&, Args...) {}
+  void registerFloatVectorBranch(const std::string& branch_name, std::vector<float>* vec){ floatVectorBranches_[branch_name] = vec; }
+
+  bool passesTriggerResults_OR(const edm::TriggerResults&, const TriggerPathIndex&, const std::vector<unsigned int>&) const;
+  bool passesTriggerResults_AND(const edm::TriggerResults&, const TriggerPathIndex&, const std::vector<unsigned int>&) const;
 
   const std::string TTreeName_;
 
   const std::vector<std::string> TriggerResultsFilterOR_;
   const std::vector<std::string> TriggerResultsFilterAND_;
 
+  std::vector<unsigned int> TriggerResultsFilterOR_pathIndexKeys_;
+  std::vector<unsigned int> TriggerResultsFilterAND_pathIndexKeys_;
+
   const std::vector<std::string> outputBranchesToBeDropped_;
 
   std::unordered_map<std::string, std::string>  stringCutObjectSelectors_map_;
+  std::unordered_map<std::string, unsigned int> stringCutObjectSelectorsValidation_map_;
+  std::unordered_map<std::string, unsigned int> maxObjects_map_;
+
+  // number of mantissa bits of float branches (key: name of branch, or of collection)
+  std::unordered_map<std::string, unsigned int> outputBranchesMantissaBits_map_;
+
+  // number of mantissa bits of the output branches with reduced precision (key: name of branch), filled when the TBranches are created;
+  // the values are rounded in the cache of every stream, before the swap (see setReducedPrecisionBranches)
+  std::unordered_map<std::string, unsigned int> reducedPrecisionBranches_;
+
+  // addresses of the vectors with reduced precision of a per-stream cache
+  void setReducedPrecisionBranches(JMETriggerNTupleContent&) const;
+
+  static std::vector<float>* floatVector(std::vector<float>* vec){ return vec; }
+  template <typename T>
+  static std::vector<float>* floatVector(T*){ return nullptr; }
+
+  const bool outputBranchesSizeReport_;
+
+  // compression settings and basket size of groups of output branches
+  // (the first rule matching the name of a branch is used)
+  struct BranchCompressionRule {
+
+    std::vector<std::regex> regexes;
+    int compressionSettings;
+    int basketSize;
+  };
+
+  std::vector<BranchCompressionRule> outputBranchesCompression_;
 
-  std::unique_ptr<TriggerResultsContainer> triggerResultsContainer_ptr_;
-  std::vector<RecoVertexCollectionContainer> v_recoVertexCollectionContainer_;
-  std::vector<RecoPFCandidateCollectionContainer> v_recoPFCandidateCollectionContainer_;
-  std::vector<PATPackedCandidateCollectionContainer> v_patPackedCandidateCollectionContainer_;
-  std::vector<RecoGenJetCollectionContainer> v_recoGenJetCollectionContainer_;
-  std::vector<RecoCaloJetCollectionContainer> v_recoCaloJetCollectionContainer_;
-  std::vector<RecoPFJetCollectionContainer> v_recoPFJetCollectionContainer_;
-  std::vector<PATJetCollectionContainer> v_patJetCollectionContainer_;
-  std::vector<RecoGenMETCollectionContainer> v_recoGenMETCollectionContainer_;
-  std::vector<RecoCaloMETCollectionContainer> v_recoCaloMETCollectionContainer_;
-  std::vector<RecoPFMETCollectionContainer> v_recoPFMETCollectionContainer_;
-  std::vector<PATMETCollectionContainer> v_patMETCollectionContainer_;
-  std::vector<PATMuonCollectionContainer> v_patMuonCollectionContainer_;
-  std::vector<PATElectronCollectionContainer> v_patElectronCollectionContainer_;
+  static int compressionSettings(const std::string&, const unsigned int);
+
+  // data members of content_ are the addresses of the output TBranches,
+  // and content_ is also the template for the per-stream caches;
+  // content_ and ttree_ are only modified in analyze while holding mutex_
+  mutable JMETriggerNTupleContent content_;
+  mutable std::mutex mutex_;
 
   TTree* ttree_ = nullptr;
 
-  unsigned int run_ = 0;
-  unsigned int luminosityBlock_ = 0;
-  unsigned long long event_ = 0;
+  // objects in the output file of TFileService not booked by this module (names of the top-level objects);
+  // every module booking objects via TFileService gets a top-level directory named after its label,
+  // and all modules book their objects before the first event (constructor, beginJob, beginRun),
+  // so the check is done at the first luminosity block (exception) and at endJob (error message)
+  std::set<std::string> otherTFileServiceObjects() const;
+  void checkTFileServiceConsumers() const;
+  mutable std::once_flag tfileServiceCheck_;
+
+  // summary of every luminosity block (optional): TTree "LuminosityBlocks" with the number of events
+  // seen by the module, passing TriggerResultsFilterOR/AND, and written to the output TTree
+  // (filled at the end of every luminosity block while holding mutex_, also for luminosity blocks without events)
+  bool luminosityBlockSummary_ = false;
+  TTree* lumiTree_ = nullptr;
+
+  struct LumiTreeContent {
+
+    unsigned int run = 0;
+    unsigned int luminosityBlock = 0;
+    unsigned long long eventsSeen = 0;
+    unsigned long long eventsPassingFilter = 0;
+    unsigned long long eventsWritten = 0;
+  };
+
+  mutable LumiTreeContent lumiTreeContent_;
+
+  // usage of the per-stream TriggerPathIndex (summed at endStream)
+  mutable std::atomic<unsigned long long> triggerPathIndexRebuilds_{0};
+  mutable std::atomic<unsigned long long> triggerPathIndexHits_{0};
 
-  class FillCollectionConditionsMap {
+  // usage of the buffers and fill time of the collection containers (key: name of collection, summed over streams at endStream)
+  struct CollectionStats {
 
-   public:
-    FillCollectionConditionsMap();
-    FillCollectionConditionsMap(const edm::ParameterSet&);
+    size_t highWaterMark = 0;
+    unsigned long long allocations = 0;
+    unsigned long long fills = 0;
+    double fillTime = 0.; // [s]
+  };
 
-    void clear();
-    int init(const edm::ParameterSet&);
+  mutable std::map<std::string, CollectionStats> collectionStats_;
 
-    struct condition {
+  // path to output .json file with the profile of the output collections (empty: no profile)
+  const std::string profileJSON_;
 
-      condition(const std::string& a_path, const bool a_accept=false) : path(a_path), accept(a_accept) {}
+  void writeProfileJSON() const;
 
-      const std::string path;
-      bool accept;
-    };
+  std::map<std::string, const std::vector<float>*> floatVectorBranches_;
 
-    bool has(const std::string&) const;
-    const condition& at(const std::string&) const;
-    bool accept(const std::string&) const;
-    int update(const edm::TriggerResults&, const edm::Event&);
+  // layout of the output branches of the collections:
+  //  - "vector" : one std::vector<T> branch per variable
+  //  - "flat"   : one count branch "<collection>_n" per collection, and one variable-size C-array per variable
+  //               (leaf "<collection>_<variable>[<collection>_n]/F"), without the std::vector header of every entry;
+  //               the addresses of the arrays are set before every TTree::Fill (the vectors of content_ are swapped every event)
+  bool flatLayout_ = false;
 
-   protected:
+  struct FlatBranch {
 
-    std::map<std::string, condition> condMap_;
+    TBranch* branch;
+    UInt_t* count;
+    bool setsCount;
+    // address and size of the array of the current entry
+    std::function<std::pair<void*, size_t>()> array;
   };
 
-  FillCollectionConditionsMap fillCollectionConditionMap_;
+  // keys: names of the collections (nodes of std::map are not moved, values are the addresses of the count branches)
+  std::map<std::string, UInt_t> flatCollectionCounts_;
+  std::vector<FlatBranch> flatBranches_;
+  // address of the arrays of empty vectors
+  mutable double flatEmptyArray_ = 0.;
+
+  void addFlatBranch(const std::string&, const char*, std::function<std::pair<void*, size_t>()>);
+  void setFlatBranchAddresses() const;
+
+  // skim index (optional): sidecar file of the output file, with one bitset per HLT path of TriggerResultsCollections
+  // and per fill-collection condition ("<collection>_filled"), and sorted keys for the number of objects of some collections
+  // ("<collection>_size") and the value of the first (leading) element of some std::vector<float> branches
+  bool skimIndex_ = false;
+  std::string skimIndexFileName_;
+  std::vector<std::string> skimIndexMultiplicities_;
+  std::vector<std::string> skimIndexLeadingValues_;
+
+  std::vector<unsigned int> skimIndexTriggerBits_;
+  std::vector<std::pair<std::string, unsigned int> > skimIndexConditionBits_;
+  std::vector<std::pair<const std::vector<float>*, unsigned int> > skimIndexMultiplicityKeys_;
+  std::vector<std::pair<const std::vector<float>*, unsigned int> > skimIndexLeadingValueKeys_;
+
+  // modified only in analyze while holding mutex_ (entries in the same order as the entries of the TTree)
+  mutable SkimIndexWriter skimIndexWriter_;
+
+  void initSkimIndex();
 };
 
+JMETriggerNTupleContent::JMETriggerNTupleContent(const TriggerResultsContainer& trc) : triggerResultsContainer(trc) {
+}
+
+template <class C>
+void JMETriggerNTupleContent::swapContainers(std::vector<C>& v1, std::vector<C>& v2){
+
+  if(v1.size() != v2.size()){
+
+    throw cms::Exception("LogicError") << "attempt to swap vectors of containers with different sizes ("
+      << v1.size() << " and " << v2.size() << ")";
+  }
+
+  for(unsigned int idx=0; idx<v1.size(); ++idx){
+
+    v1[idx].swap(v2[idx]);
+  }
+}
+
+void JMETriggerNTupleContent::swap(JMETriggerNTupleContent& other){
+
+  std::swap(run, other.run);
+  std::swap(luminosityBlock, other.luminosityBlock);
+  std::swap(event, other.event);
+
+  triggerResultsContainer.swap(other.triggerResultsContainer);
+
+  swapContainers(v_recoVertexCollectionContainer, other.v_recoVertexCollectionContainer);
+  swapContainers(v_recoPFCandidateCollectionContainer, other.v_recoPFCandidateCollectionContainer);
+  swapContainers(v_patPackedCandidateCollectionContainer, other.v_patPackedCandidateCollectionContainer);
+  swapContainers(v_recoGenJetCollectionContainer, other.v_recoGenJetCollectionContainer);
+  swapContainers(v_recoCaloJetCollectionContainer, other.v_recoCaloJetCollectionContainer);
+  swapContainers(v_recoPFJetCollectionContainer, other.v_recoPFJetCollectionContainer);
+  swapContainers(v_patJetCollectionContainer, other.v_patJetCollectionContainer);
+  swapContainers(v_recoGenMETCollectionContainer, other.v_recoGenMETCollectionContainer);
+  swapContainers(v_recoCaloMETCollectionContainer, other.v_recoCaloMETCollectionContainer);
+  swapContainers(v_recoPFMETCollectionContainer, other.v_recoPFMETCollectionContainer);
+  swapContainers(v_patMETCollectionContainer, other.v_patMETCollectionContainer);
+  swapContainers(v_patMuonCollectionContainer, other.v_patMuonCollectionContainer);
+  swapContainers(v_patElectronCollectionContainer, other.v_patElectronCollectionContainer);
+
+  if(v_collectionMatch.size() != other.v_collectionMatch.size()){
+
+    throw cms::Exception("LogicError") << "attempt to swap vectors of collection matches with different sizes ("
+      << v_collectionMatch.size() << " and " << other.v_collectionMatch.size() << ")";
+  }
+
+  for(unsigned int idx=0; idx<v_collectionMatch.size(); ++idx){
+
+    v_collectionMatch[idx].matchIdx.swap(other.v_collectionMatch[idx].matchIdx);
+  }
+}
+
+template <class C>
+void JMETriggerNTupleContent::findEtaPhi(std::vector<C>& containers, const std::string& name, std::pair<const std::vector<float>*, const std::vector<float>*>& etaPhi){
+
+  for(auto& container_i : containers){
+
+    if(container_i.name() == name){
+
+      etaPhi = std::make_pair(&container_i.vec_eta(), &container_i.vec_phi());
+    }
+  }
+}
+
+std::pair<const std::vector<float>*, const std::vector<float>*> JMETriggerNTupleContent::etaPhi(const std::string& name){
+
+  std::pair<const std::vector<float>*, const std::vector<float>*> ret(nullptr, nullptr);
+
+  findEtaPhi(v_recoPFCandidateCollectionContainer, name, ret);
+  findEtaPhi(v_patPackedCandidateCollectionContainer, name, ret);
+  findEtaPhi(v_recoGenJetCollectionContainer, name, ret);
+  findEtaPhi(v_recoCaloJetCollectionContainer, name, ret);
+  findEtaPhi(v_recoPFJetCollectionContainer, name, ret);
+  findEtaPhi(v_patJetCollectionContainer, name, ret);
+  findEtaPhi(v_patMuonCollectionContainer, name, ret);
+  findEtaPhi(v_patElectronCollectionContainer, name, ret);
+
+  return ret;
+}
+
+void JMETriggerNTupleContent::fillCollectionMatches(){
+
+  for(auto& collectionMatch_i : v_collectionMatch){
+
+    const auto src(this->etaPhi(collectionMatch_i.src));
+    const auto matched(this->etaPhi(collectionMatch_i.matched));
+
+    collectionMatch_i.matcher.match(*src.first, *src.second, *matched.first, *matched.second, collectionMatch_i.matchIdx);
+  }
+}
+
+void JMETriggerNTupleContent::reducePrecision(){
+
+  for(const auto& reducedPrecisionBranch_i : reducedPrecisionBranches){
+
+    for(auto& val : *reducedPrecisionBranch_i.first){
+
+      val = reduceFloatPrecision(val, reducedPrecisionBranch_i.second);
+    }
+  }
+}
+
+template <class F>
+void JMETriggerNTupleContent::forEachCollectionContainer(F&& func){
+
+  for(auto& container_i : v_recoVertexCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_recoPFCandidateCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_patPackedCandidateCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_recoGenJetCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_recoCaloJetCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_recoPFJetCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_patJetCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_recoGenMETCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_recoCaloMETCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_recoPFMETCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_patMETCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_patMuonCollectionContainer){ func(container_i); }
+  for(auto& container_i : v_patElectronCollectionContainer){ func(container_i); }
+}
+
 JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
   : TTreeName_(iConfig.getParameter<std::string>("TTreeName"))
   , TriggerResultsFilterOR_(iConfig.getParameter<std::vector<std::string> >("TriggerResultsFilterOR"))
   , TriggerResultsFilterAND_(iConfig.getParameter<std::vector<std::string> >("TriggerResultsFilterAND"))
-  , outputBranchesToBeDropped_(iConfig.getParameter<std::vector<std::string> >("outputBranchesToBeDropped")) {
+  , outputBranchesToBeDropped_(iConfig.getParameter<std::vector<std::string> >("outputBranchesToBeDropped"))
+  , outputBranchesSizeReport_(iConfig.exists("outputBranchesSizeReport") ? iConfig.getParameter<bool>("outputBranchesSizeReport") : false)
+  , content_(TriggerResultsContainer(
+      iConfig.getParameter<std::vector<std::string> >("TriggerResultsCollections"),
+      iConfig.getParameter<edm::InputTag>("TriggerResults").label(),
+      this->consumes<edm::TriggerResults>(iConfig.getParameter<edm::InputTag>("TriggerResults"))
+    ))
+  , profileJSON_(iConfig.exists("profileJSON") ? iConfig.getParameter<std::string>("profileJSON") : "") {
+
+  // index of trigger paths
+  content_.triggerResultsContainer.initPathIndex(content_.triggerPathIndex);
+
+  TriggerResultsFilterOR_pathIndexKeys_.clear();
+  TriggerResultsFilterOR_pathIndexKeys_.reserve(TriggerResultsFilterOR_.size());
+
+  for(const auto& path_i : TriggerResultsFilterOR_){
+
+    TriggerResultsFilterOR_pathIndexKeys_.emplace_back(content_.triggerPathIndex.add(path_i));
+  }
+
+  TriggerResultsFilterAND_pathIndexKeys_.clear();
+  TriggerResultsFilterAND_pathIndexKeys_.reserve(TriggerResultsFilterAND_.size());
 
-  const auto& TriggerResultsInputTag = iConfig.getParameter<edm::InputTag>("TriggerResults");
-  const auto& TriggerResultsCollections = iConfig.getParameter<std::vector<std::string> >("TriggerResultsCollections");
+  for(const auto& path_i : TriggerResultsFilterAND_){
 
-  triggerResultsContainer_ptr_.reset(new TriggerResultsContainer(TriggerResultsCollections, TriggerResultsInputTag.label(), this->consumes<edm::TriggerResults>(TriggerResultsInputTag)));
+    TriggerResultsFilterAND_pathIndexKeys_.emplace_back(content_.triggerPathIndex.add(path_i));
+  }
 
   // fillCollectionConditions
-  fillCollectionConditionMap_.clear();
+  content_.fillCollectionConditionMap.clear();
 
   if(iConfig.exists("fillCollectionConditions")){
 
-    fillCollectionConditionMap_.init(iConfig.getParameter<edm::ParameterSet>("fillCollectionConditions"));
+    content_.fillCollectionConditionMap.init(iConfig.getParameter<edm::ParameterSet>("fillCollectionConditions"), content_.triggerPathIndex, this->consumesCollector());
+  }
+
+  // luminosityBlockSummary
+  luminosityBlockSummary_ = iConfig.exists("luminosityBlockSummary") ? iConfig.getParameter<bool>("luminosityBlockSummary") : false;
+
+  // outputLayout
+  const std::string outputLayout(iConfig.exists("outputLayout") ? iConfig.getParameter<std::string>("outputLayout") : "vector");
+
+  if(outputLayout == "flat"){
+
+    flatLayout_ = true;
+  }
+  else if(outputLayout != "vector"){
+
+    throw cms::Exception("Configuration") << "invalid value for parameter \"outputLayout\" (expected \"vector\" or \"flat\"): " << outputLayout;
+  }
+
+  // skimIndex
+  if(iConfig.exists("skimIndex")){
+
+    const edm::ParameterSet& pset_skimIndex = iConfig.getParameter<edm::ParameterSet>("skimIndex");
+
+    skimIndex_ = true;
+    skimIndexFileName_ = pset_skimIndex.exists("fileName") ? pset_skimIndex.getParameter<std::string>("fileName") : "";
+    skimIndexMultiplicities_ = pset_skimIndex.exists("multiplicities") ? pset_skimIndex.getParameter<std::vector<std::string> >("multiplicities") : std::vector<std::string>();
+    skimIndexLeadingValues_ = pset_skimIndex.exists("leadingValues") ? pset_skimIndex.getParameter<std::vector<std::string> >("leadingValues") : std::vector<std::string>();
   }
 
   // stringCutObjectSelectors
@@ -144,8 +574,86 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
     }
   }
 
+  // stringCutObjectSelectorsValidation:
+  // number of events in which the native predicates of the selector are cross-checked against StringCutObjectSelector
+  stringCutObjectSelectorsValidation_map_.clear();
+
+  if(iConfig.exists("stringCutObjectSelectorsValidation")){
+
+    const edm::ParameterSet& pset_stringCutObjectSelectorsValidation = iConfig.getParameter<edm::ParameterSet>("stringCutObjectSelectorsValidation");
+
+    const auto& stringCutObjectSelectorsValidation_labels = pset_stringCutObjectSelectorsValidation.getParameterNamesForType<unsigned int>();
+
+    for(const auto& label : stringCutObjectSelectorsValidation_labels){
+
+      stringCutObjectSelectorsValidation_map_[label] = pset_stringCutObjectSelectorsValidation.getParameter<unsigned int>(label);
+    }
+  }
+
+  // maxObjects
+  maxObjects_map_.clear();
+
+  if(iConfig.exists("maxObjects")){
+
+    const edm::ParameterSet& pset_maxObjects = iConfig.getParameter<edm::ParameterSet>("maxObjects");
+
+    const auto& maxObjects_labels = pset_maxObjects.getParameterNamesForType<unsigned int>();
+
+    for(const auto& label : maxObjects_labels){
+
+      maxObjects_map_[label] = pset_maxObjects.getParameter<unsigned int>(label);
+    }
+  }
+
+  // outputBranchesMantissaBits
+  outputBranchesMantissaBits_map_.clear();
+
+  if(iConfig.exists("outputBranchesMantissaBits")){
+
+    const edm::ParameterSet& pset_outputBranchesMantissaBits = iConfig.getParameter<edm::ParameterSet>("outputBranchesMantissaBits");
+
+    const auto& outputBranchesMantissaBits_labels = pset_outputBranchesMantissaBits.getParameterNamesForType<unsigned int>();
+
+    for(const auto& label : outputBranchesMantissaBits_labels){
+
+      const auto nbits = pset_outputBranchesMantissaBits.getParameter<unsigned int>(label);
+
+      if(nbits > 23){
+
+        throw cms::Exception("Configuration") << "invalid number of mantissa bits for \"" << label << "\" (must be in [0, 23]): " << nbits;
+      }
+
+      outputBranchesMantissaBits_map_[label] = nbits;
+    }
+  }
+
+  // outputBranchesCompression
+  outputBranchesCompression_.clear();
+
+  if(iConfig.exists("outputBranchesCompression")){
+
+    const auto& vpset_outputBranchesCompression = iConfig.getParameter<std::vector<edm::ParameterSet> >("outputBranchesCompression");
+
+    outputBranchesCompression_.reserve(vpset_outputBranchesCompression.size());
+
+    for(const auto& pset_i : vpset_outputBranchesCompression){
+
+      BranchCompressionRule rule;
+
+      for(const auto& pattern : pset_i.getParameter<std::vector<std::string> >("branches")){
+
+        rule.regexes.emplace_back(edm::glob2reg(pattern));
+      }
+
+      rule.compressionSettings = compressionSettings(pset_i.getParameter<std::string>("algorithm"), pset_i.getParameter<unsigned int>("level"));
+      rule.basketSize = pset_i.exists("basketSize") ? pset_i.getParameter<unsigned int>("basketSize") : 0;
+
+      outputBranchesCompression_.emplace_back(rule);
+    }
+  }
+
   // reco::VertexCollection
-  v_recoVertexCollectionContainer_.clear();
+  content_.v_recoVertexCollectionContainer.clear();
 
   if(iConfig.exists("recoVertexCollections")){
 
@@ -153,7 +661,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoVertexCollections = pset_recoVertexCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoVertexCollectionContainer_.reserve(inputTagLabels_recoVertexCollections.size());
+    content_.v_recoVertexCollectionContainer.reserve(inputTagLabels_recoVertexCollections.size());
 
     for(const auto& label : inputTagLabels_recoVertexCollections){
 
@@ -161,17 +669,22 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::VertexCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoVertexCollectionContainer_.emplace_back(RecoVertexCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::Vertex> >(inputTag)));
+      content_.v_recoVertexCollectionContainer.emplace_back(RecoVertexCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::Vertex> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoVertexCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoVertexCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoVertexCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
       }
     }
   }
 
   // reco::PFCandidateCollection
-  v_recoPFCandidateCollectionContainer_.clear();
+  content_.v_recoPFCandidateCollectionContainer.clear();
 
   if(iConfig.exists("recoPFCandidateCollections")){
 
@@ -179,7 +692,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoPFCandidateCollections = pset_recoPFCandidateCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoPFCandidateCollectionContainer_.reserve(inputTagLabels_recoPFCandidateCollections.size());
+    content_.v_recoPFCandidateCollectionContainer.reserve(inputTagLabels_recoPFCandidateCollections.size());
 
     for(const auto& label : inputTagLabels_recoPFCandidateCollections){
 
@@ -187,18 +700,28 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::PFCandidateCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoPFCandidateCollectionContainer_.emplace_back(RecoPFCandidateCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::PFCandidate> >(inputTag)));
-      v_recoPFCandidateCollectionContainer_.back().orderByHighestPt(true);
+      content_.v_recoPFCandidateCollectionContainer.emplace_back(RecoPFCandidateCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::PFCandidate> >(inputTag)));
+      content_.v_recoPFCandidateCollectionContainer.back().orderByHighestPt(true);
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoPFCandidateCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoPFCandidateCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoPFCandidateCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_recoPFCandidateCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // pat::PackedCandidateCollection
-  v_patPackedCandidateCollectionContainer_.clear();
+  content_.v_patPackedCandidateCollectionContainer.clear();
 
   if(iConfig.exists("patPackedCandidateCollections")){
 
@@ -206,7 +729,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_patPackedCandidateCollections = pset_patPackedCandidateCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_patPackedCandidateCollectionContainer_.reserve(inputTagLabels_patPackedCandidateCollections.size());
+    content_.v_patPackedCandidateCollectionContainer.reserve(inputTagLabels_patPackedCandidateCollections.size());
 
     for(const auto& label : inputTagLabels_patPackedCandidateCollections){
 
@@ -214,18 +737,28 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding pat::PackedCandidateCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_patPackedCandidateCollectionContainer_.emplace_back(PATPackedCandidateCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::PackedCandidate> >(inputTag)));
-      v_patPackedCandidateCollectionContainer_.back().orderByHighestPt(true);
+      content_.v_patPackedCandidateCollectionContainer.emplace_back(PATPackedCandidateCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::PackedCandidate> >(inputTag)));
+      content_.v_patPackedCandidateCollectionContainer.back().orderByHighestPt(true);
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_patPackedCandidateCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_patPackedCandidateCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_patPackedCandidateCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_patPackedCandidateCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // reco::GenJetCollection
-  v_recoGenJetCollectionContainer_.clear();
+  content_.v_recoGenJetCollectionContainer.clear();
 
   if(iConfig.exists("recoGenJetCollections")){
 
@@ -233,7 +766,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoGenJetCollections = pset_recoGenJetCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoGenJetCollectionContainer_.reserve(inputTagLabels_recoGenJetCollections.size());
+    content_.v_recoGenJetCollectionContainer.reserve(inputTagLabels_recoGenJetCollections.size());
 
     for(const auto& label : inputTagLabels_recoGenJetCollections){
 
@@ -241,17 +774,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::GenJetCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoGenJetCollectionContainer_.emplace_back(RecoGenJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::GenJet> >(inputTag)));
+      content_.v_recoGenJetCollectionContainer.emplace_back(RecoGenJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::GenJet> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoGenJetCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoGenJetCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoGenJetCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_recoGenJetCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // reco::CaloJetCollection
-  v_recoCaloJetCollectionContainer_.clear();
+  content_.v_recoCaloJetCollectionContainer.clear();
 
   if(iConfig.exists("recoCaloJetCollections")){
 
@@ -259,7 +802,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoCaloJetCollections = pset_recoCaloJetCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoCaloJetCollectionContainer_.reserve(inputTagLabels_recoCaloJetCollections.size());
+    content_.v_recoCaloJetCollectionContainer.reserve(inputTagLabels_recoCaloJetCollections.size());
 
     for(const auto& label : inputTagLabels_recoCaloJetCollections){
 
@@ -267,17 +810,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::CaloJetCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoCaloJetCollectionContainer_.emplace_back(RecoCaloJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::CaloJet> >(inputTag)));
+      content_.v_recoCaloJetCollectionContainer.emplace_back(RecoCaloJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::CaloJet> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoCaloJetCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoCaloJetCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoCaloJetCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_recoCaloJetCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // reco::PFJetCollection
-  v_recoPFJetCollectionContainer_.clear();
+  content_.v_recoPFJetCollectionContainer.clear();
 
   if(iConfig.exists("recoPFJetCollections")){
 
@@ -285,7 +838,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoPFJetCollections = pset_recoPFJetCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoPFJetCollectionContainer_.reserve(inputTagLabels_recoPFJetCollections.size());
+    content_.v_recoPFJetCollectionContainer.reserve(inputTagLabels_recoPFJetCollections.size());
 
     for(const auto& label : inputTagLabels_recoPFJetCollections){
 
@@ -293,17 +846,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::PFJetCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoPFJetCollectionContainer_.emplace_back(RecoPFJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::PFJet> >(inputTag)));
+      content_.v_recoPFJetCollectionContainer.emplace_back(RecoPFJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::PFJet> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoPFJetCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoPFJetCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoPFJetCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_recoPFJetCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // pat::JetCollection
-  v_patJetCollectionContainer_.clear();
+  content_.v_patJetCollectionContainer.clear();
 
   if(iConfig.exists("patJetCollections")){
 
@@ -311,7 +874,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_patJetCollections = pset_patJetCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_patJetCollectionContainer_.reserve(inputTagLabels_patJetCollections.size());
+    content_.v_patJetCollectionContainer.reserve(inputTagLabels_patJetCollections.size());
 
     for(const auto& label : inputTagLabels_patJetCollections){
 
@@ -319,17 +882,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding pat::JetCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_patJetCollectionContainer_.emplace_back(PATJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::Jet> >(inputTag)));
+      content_.v_patJetCollectionContainer.emplace_back(PATJetCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::Jet> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_patJetCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_patJetCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_patJetCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_patJetCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // reco::GenMETCollection
-  v_recoGenMETCollectionContainer_.clear();
+  content_.v_recoGenMETCollectionContainer.clear();
 
   if(iConfig.exists("recoGenMETCollections")){
 
@@ -337,7 +910,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoGenMETCollections = pset_recoGenMETCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoGenMETCollectionContainer_.reserve(inputTagLabels_recoGenMETCollections.size());
+    content_.v_recoGenMETCollectionContainer.reserve(inputTagLabels_recoGenMETCollections.size());
 
     for(const auto& label : inputTagLabels_recoGenMETCollections){
 
@@ -345,17 +918,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::GenMETCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoGenMETCollectionContainer_.emplace_back(RecoGenMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::GenMET> >(inputTag)));
+      content_.v_recoGenMETCollectionContainer.emplace_back(RecoGenMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::GenMET> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoGenMETCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoGenMETCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoGenMETCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_recoGenMETCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // reco::CaloMETCollection
-  v_recoCaloMETCollectionContainer_.clear();
+  content_.v_recoCaloMETCollectionContainer.clear();
 
   if(iConfig.exists("recoCaloMETCollections")){
 
@@ -363,7 +946,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoCaloMETCollections = pset_recoCaloMETCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoCaloMETCollectionContainer_.reserve(inputTagLabels_recoCaloMETCollections.size());
+    content_.v_recoCaloMETCollectionContainer.reserve(inputTagLabels_recoCaloMETCollections.size());
 
     for(const auto& label : inputTagLabels_recoCaloMETCollections){
 
@@ -371,17 +954,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::CaloMETCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoCaloMETCollectionContainer_.emplace_back(RecoCaloMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::CaloMET> >(inputTag)));
+      content_.v_recoCaloMETCollectionContainer.emplace_back(RecoCaloMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::CaloMET> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoCaloMETCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoCaloMETCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoCaloMETCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_recoCaloMETCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // reco::PFMETCollection
-  v_recoPFMETCollectionContainer_.clear();
+  content_.v_recoPFMETCollectionContainer.clear();
 
   if(iConfig.exists("recoPFMETCollections")){
 
@@ -389,7 +982,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_recoPFMETCollections = pset_recoPFMETCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_recoPFMETCollectionContainer_.reserve(inputTagLabels_recoPFMETCollections.size());
+    content_.v_recoPFMETCollectionContainer.reserve(inputTagLabels_recoPFMETCollections.size());
 
     for(const auto& label : inputTagLabels_recoPFMETCollections){
 
@@ -397,17 +990,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding reco::PFMETCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_recoPFMETCollectionContainer_.emplace_back(RecoPFMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::PFMET> >(inputTag)));
+      content_.v_recoPFMETCollectionContainer.emplace_back(RecoPFMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<reco::PFMET> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_recoPFMETCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_recoPFMETCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_recoPFMETCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_recoPFMETCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // pat::METCollection
-  v_patMETCollectionContainer_.clear();
+  content_.v_patMETCollectionContainer.clear();
 
   if(iConfig.exists("patMETCollections")){
 
@@ -415,7 +1018,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_patMETCollections = pset_patMETCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_patMETCollectionContainer_.reserve(inputTagLabels_patMETCollections.size());
+    content_.v_patMETCollectionContainer.reserve(inputTagLabels_patMETCollections.size());
 
     for(const auto& label : inputTagLabels_patMETCollections){
 
@@ -423,17 +1026,27 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding pat::METCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_patMETCollectionContainer_.emplace_back(PATMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::MET> >(inputTag)));
+      content_.v_patMETCollectionContainer.emplace_back(PATMETCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::MET> >(inputTag)));
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_patMETCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_patMETCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_patMETCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_patMETCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // pat::MuonCollection
-  v_patMuonCollectionContainer_.clear();
+  content_.v_patMuonCollectionContainer.clear();
 
   if(iConfig.exists("patMuonCollections")){
 
@@ -441,7 +1054,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_patMuonCollections = pset_patMuonCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_patMuonCollectionContainer_.reserve(inputTagLabels_patMuonCollections.size());
+    content_.v_patMuonCollectionContainer.reserve(inputTagLabels_patMuonCollections.size());
 
     for(const auto& label : inputTagLabels_patMuonCollections){
 
@@ -449,18 +1062,28 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding pat::MuonCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_patMuonCollectionContainer_.emplace_back(PATMuonCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::Muon> >(inputTag)));
-      v_patMuonCollectionContainer_.back().orderByHighestPt(true);
+      content_.v_patMuonCollectionContainer.emplace_back(PATMuonCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::Muon> >(inputTag)));
+      content_.v_patMuonCollectionContainer.back().orderByHighestPt(true);
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_patMuonCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_patMuonCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_patMuonCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_patMuonCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
 
   // pat::ElectronCollection
-  v_patElectronCollectionContainer_.clear();
+  content_.v_patElectronCollectionContainer.clear();
 
   if(iConfig.exists("patElectronCollections")){
 
@@ -468,7 +1091,7 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
     const auto& inputTagLabels_patElectronCollections = pset_patElectronCollections.getParameterNamesForType<edm::InputTag>();
 
-    v_patElectronCollectionContainer_.reserve(inputTagLabels_patElectronCollections.size());
+    content_.v_patElectronCollectionContainer.reserve(inputTagLabels_patElectronCollections.size());
 
     for(const auto& label : inputTagLabels_patElectronCollections){
 
@@ -476,49 +1099,110 @@ JMETriggerNTuple::JMETriggerNTuple(const edm::ParameterSet& iConfig)
 
       LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding pat::ElectronCollection \"" << inputTag.label() << "\" (NTuple branches: \"" << label << "_*\")";
 
-      v_patElectronCollectionContainer_.emplace_back(PATElectronCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::Electron> >(inputTag)));
-      v_patElectronCollectionContainer_.back().orderByHighestPt(true);
+      content_.v_patElectronCollectionContainer.emplace_back(PATElectronCollectionContainer(label, inputTag.label(), this->consumes<std::vector<pat::Electron> >(inputTag)));
+      content_.v_patElectronCollectionContainer.back().orderByHighestPt(true);
 
       if(stringCutObjectSelectors_map_.find(label) != stringCutObjectSelectors_map_.end()){
 
-        v_patElectronCollectionContainer_.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+        content_.v_patElectronCollectionContainer.back().setStringCutObjectSelector(stringCutObjectSelectors_map_.at(label));
+      }
+
+      if(stringCutObjectSelectorsValidation_map_.find(label) != stringCutObjectSelectorsValidation_map_.end()){
+
+        content_.v_patElectronCollectionContainer.back().setStringCutObjectSelectorValidation(stringCutObjectSelectorsValidation_map_.at(label));
+      }
+
+      if(maxObjects_map_.find(label) != maxObjects_map_.end()){
+
+        content_.v_patElectronCollectionContainer.back().setMaxObjects(maxObjects_map_.at(label));
       }
     }
   }
-}
 
-void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup& iSetup){
+  // collectionMatches
+  content_.v_collectionMatch.clear();
 
-  run_ = iEvent.id().run();
-  luminosityBlock_ = iEvent.id().luminosityBlock();
-  event_ = iEvent.id().event();
+  if(iConfig.exists("collectionMatches")){
 
-  // fill TriggerResultsContainer
-  edm::Handle<edm::TriggerResults> triggerResults_handle;
-  iEvent.getByToken(triggerResultsContainer_ptr_->token(), triggerResults_handle);
+    const auto& vpset_collectionMatches = iConfig.getParameter<std::vector<edm::ParameterSet> >("collectionMatches");
 
-  if(not triggerResults_handle.isValid()){
+    content_.v_collectionMatch.reserve(vpset_collectionMatches.size());
 
-    edm::LogWarning("JMETriggerNTuple::analyze")
-      << "invalid handle for input collection: \"" << triggerResultsContainer_ptr_->inputTagLabel() << "\" (NTuple branches for HLT paths)";
+    for(const auto& pset_i : vpset_collectionMatches){
 
-    triggerResultsContainer_ptr_->clear();
-  }
-  else {
+      const auto src(pset_i.getParameter<std::string>("src"));
+      const auto matched(pset_i.getParameter<std::string>("matched"));
 
-    // exit method for events that do not pass the logical OR of the specified HLT paths (if any)
-    if(TriggerResultsFilterOR_.size() > 0){
+      for(const auto& name : {src, matched}){
 
-      if(not this->passesTriggerResults_OR(*triggerResults_handle, iEvent, TriggerResultsFilterOR_)){
+        if(not content_.etaPhi(name).first){
 
-        return;
+          throw cms::Exception("Configuration") << "invalid collection for parameter \"collectionMatches\" (not found, or without eta and phi): " << name;
+        }
       }
-    }
 
-    // exit method for events that do not pass the logical AND of the specified HLT paths (if any)
-    if(TriggerResultsFilterAND_.size() > 0){
+      content_.v_collectionMatch.emplace_back(src, matched, pset_i.getParameter<double>("maxDeltaR"), pset_i.exists("unique") ? pset_i.getParameter<bool>("unique") : false);
 
-      if(not this->passesTriggerResults_AND(*triggerResults_handle, iEvent, TriggerResultsFilterAND_)){
+      for(unsigned int idx=0; idx<content_.v_collectionMatch.size()-1; ++idx){
+
+        if(content_.v_collectionMatch[idx].name == content_.v_collectionMatch.back().name){
+
+          throw cms::Exception("Configuration") << "duplicate entry in parameter \"collectionMatches\": " << content_.v_collectionMatch.back().name;
+        }
+      }
+
+      LogDebug("JMETriggerNTuple::JMETriggerNTuple") << "adding delta-R matching of \"" << src << "\" to \"" << matched
+        << "\" (maxDeltaR = " << content_.v_collectionMatch.back().matcher.maxDeltaR() << ", NTuple branch: \"" << content_.v_collectionMatch.back().name << "\")";
+    }
+  }
+
+  // fill time of the output collections (copied to the per-stream caches)
+  if(not profileJSON_.empty()){
+
+    content_.forEachCollectionContainer([](auto& container_i){ container_i.setFillTimeMeasurement(true); });
+  }
+}
+
+void JMETriggerNTuple::analyze(edm::StreamID streamID, const edm::Event& iEvent, const edm::EventSetup& iSetup) const {
+
+  auto& content = *(this->streamCache(streamID));
+
+  auto* lumiCounts = this->luminosityBlockCache(iEvent.getLuminosityBlock().index());
+  ++lumiCounts->eventsSeen;
+
+  content.run = iEvent.id().run();
+  content.luminosityBlock = iEvent.id().luminosityBlock();
+  content.event = iEvent.id().event();
+
+  // fill TriggerResultsContainer
+  edm::Handle<edm::TriggerResults> triggerResults_handle;
+  iEvent.getByToken(content.triggerResultsContainer.token(), triggerResults_handle);
+
+  if(not triggerResults_handle.isValid()){
+
+    edm::LogWarning("JMETriggerNTuple::analyze")
+      << "invalid handle for input collection: \"" << content.triggerResultsContainer.inputTagLabel() << "\" (NTuple branches for HLT paths)";
+
+    content.triggerResultsContainer.clear();
+  }
+  else {
+
+    // update index of trigger paths (rebuilt only if the trigger menu changed)
+    content.triggerPathIndex.update(*triggerResults_handle, iEvent);
+
+    // exit method for events that do not pass the logical OR of the specified HLT paths (if any)
+    if(TriggerResultsFilterOR_.size() > 0){
+
+      if(not this->passesTriggerResults_OR(*triggerResults_handle, content.triggerPathIndex, TriggerResultsFilterOR_pathIndexKeys_)){
+
+        return;
+      }
+    }
+
+    // exit method for events that do not pass the logical AND of the specified HLT paths (if any)
+    if(TriggerResultsFilterAND_.size() > 0){
+
+      if(not this->passesTriggerResults_AND(*triggerResults_handle, content.triggerPathIndex, TriggerResultsFilterAND_pathIndexKeys_)){
 
         return;
       }
@@ -527,18 +1211,24 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
     LogDebug("JMETriggerNTuple::analyze") << "output collections will be saved to TTree";
 
     // fill TriggerResultsContainer
-    triggerResultsContainer_ptr_->fill(*triggerResults_handle, iEvent);
+    content.triggerResultsContainer.fill(*triggerResults_handle, content.triggerPathIndex);
 
     // update fill-collection conditions
-    fillCollectionConditionMap_.update(*triggerResults_handle, iEvent);
+    content.fillCollectionConditionMap.update(*triggerResults_handle, content.triggerPathIndex);
   }
 
+  // events not rejected by TriggerResultsFilterOR/AND (no filter is applied if TriggerResults is not available)
+  ++lumiCounts->eventsPassingFilter;
+
+  // update fill-collection conditions from event products
+  content.fillCollectionConditionMap.update(iEvent);
+
   // fill recoVertexCollectionContainers
-  for(auto& recoVertexCollectionContainer_i : v_recoVertexCollectionContainer_){
+  for(auto& recoVertexCollectionContainer_i : content.v_recoVertexCollectionContainer){
 
     recoVertexCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(recoVertexCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoVertexCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(recoVertexCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoVertexCollectionContainer_i.name()))){
 
       continue;
     }
@@ -559,11 +1249,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill recoPFCandidateCollectionContainers
-  for(auto& recoPFCandidateCollectionContainer_i : v_recoPFCandidateCollectionContainer_){
+  for(auto& recoPFCandidateCollectionContainer_i : content.v_recoPFCandidateCollectionContainer){
 
     recoPFCandidateCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(recoPFCandidateCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoPFCandidateCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(recoPFCandidateCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoPFCandidateCollectionContainer_i.name()))){
 
       continue;
     }
@@ -584,11 +1274,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill patPackedCandidateCollectionContainers
-  for(auto& patPackedCandidateCollectionContainer_i : v_patPackedCandidateCollectionContainer_){
+  for(auto& patPackedCandidateCollectionContainer_i : content.v_patPackedCandidateCollectionContainer){
 
     patPackedCandidateCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(patPackedCandidateCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(patPackedCandidateCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(patPackedCandidateCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(patPackedCandidateCollectionContainer_i.name()))){
 
       continue;
     }
@@ -611,11 +1301,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   // fill recoGenJetCollectionContainers
   if(not iEvent.isRealData()){
 
-    for(auto& recoGenJetCollectionContainer_i : v_recoGenJetCollectionContainer_){
+    for(auto& recoGenJetCollectionContainer_i : content.v_recoGenJetCollectionContainer){
 
       recoGenJetCollectionContainer_i.clear();
 
-      if(fillCollectionConditionMap_.has(recoGenJetCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoGenJetCollectionContainer_i.name()))){
+      if(content.fillCollectionConditionMap.has(recoGenJetCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoGenJetCollectionContainer_i.name()))){
 
         continue;
       }
@@ -637,11 +1327,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill recoCaloJetCollectionContainers
-  for(auto& recoCaloJetCollectionContainer_i : v_recoCaloJetCollectionContainer_){
+  for(auto& recoCaloJetCollectionContainer_i : content.v_recoCaloJetCollectionContainer){
 
     recoCaloJetCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(recoCaloJetCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoCaloJetCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(recoCaloJetCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoCaloJetCollectionContainer_i.name()))){
 
       continue;
     }
@@ -662,11 +1352,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill recoPFJetCollectionContainers
-  for(auto& recoPFJetCollectionContainer_i : v_recoPFJetCollectionContainer_){
+  for(auto& recoPFJetCollectionContainer_i : content.v_recoPFJetCollectionContainer){
 
     recoPFJetCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(recoPFJetCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoPFJetCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(recoPFJetCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoPFJetCollectionContainer_i.name()))){
 
       continue;
     }
@@ -687,11 +1377,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill patJetCollectionContainers
-  for(auto& patJetCollectionContainer_i : v_patJetCollectionContainer_){
+  for(auto& patJetCollectionContainer_i : content.v_patJetCollectionContainer){
 
     patJetCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(patJetCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(patJetCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(patJetCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(patJetCollectionContainer_i.name()))){
 
       continue;
     }
@@ -714,11 +1404,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   // fill recoGenMETCollectionContainers
   if(not iEvent.isRealData()){
 
-    for(auto& recoGenMETCollectionContainer_i : v_recoGenMETCollectionContainer_){
+    for(auto& recoGenMETCollectionContainer_i : content.v_recoGenMETCollectionContainer){
 
       recoGenMETCollectionContainer_i.clear();
 
-      if(fillCollectionConditionMap_.has(recoGenMETCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoGenMETCollectionContainer_i.name()))){
+      if(content.fillCollectionConditionMap.has(recoGenMETCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoGenMETCollectionContainer_i.name()))){
 
         continue;
       }
@@ -740,11 +1430,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill recoCaloMETCollectionContainers
-  for(auto& recoCaloMETCollectionContainer_i : v_recoCaloMETCollectionContainer_){
+  for(auto& recoCaloMETCollectionContainer_i : content.v_recoCaloMETCollectionContainer){
 
     recoCaloMETCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(recoCaloMETCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoCaloMETCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(recoCaloMETCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoCaloMETCollectionContainer_i.name()))){
 
       continue;
     }
@@ -765,11 +1455,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill recoPFMETCollectionContainers
-  for(auto& recoPFMETCollectionContainer_i : v_recoPFMETCollectionContainer_){
+  for(auto& recoPFMETCollectionContainer_i : content.v_recoPFMETCollectionContainer){
 
     recoPFMETCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(recoPFMETCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(recoPFMETCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(recoPFMETCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(recoPFMETCollectionContainer_i.name()))){
 
       continue;
     }
@@ -790,11 +1480,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill patMETCollectionContainers
-  for(auto& patMETCollectionContainer_i : v_patMETCollectionContainer_){
+  for(auto& patMETCollectionContainer_i : content.v_patMETCollectionContainer){
 
     patMETCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(patMETCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(patMETCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(patMETCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(patMETCollectionContainer_i.name()))){
 
       continue;
     }
@@ -815,11 +1505,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill patMuonCollectionContainers
-  for(auto& patMuonCollectionContainer_i : v_patMuonCollectionContainer_){
+  for(auto& patMuonCollectionContainer_i : content.v_patMuonCollectionContainer){
 
     patMuonCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(patMuonCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(patMuonCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(patMuonCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(patMuonCollectionContainer_i.name()))){
 
       continue;
     }
@@ -840,11 +1530,11 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
   }
 
   // fill patElectronCollectionContainers
-  for(auto& patElectronCollectionContainer_i : v_patElectronCollectionContainer_){
+  for(auto& patElectronCollectionContainer_i : content.v_patElectronCollectionContainer){
 
     patElectronCollectionContainer_i.clear();
 
-    if(fillCollectionConditionMap_.has(patElectronCollectionContainer_i.name()) and (not fillCollectionConditionMap_.accept(patElectronCollectionContainer_i.name()))){
+    if(content.fillCollectionConditionMap.has(patElectronCollectionContainer_i.name()) and (not content.fillCollectionConditionMap.accept(patElectronCollectionContainer_i.name()))){
 
       continue;
     }
@@ -864,8 +1554,364 @@ void JMETriggerNTuple::analyze(const edm::Event& iEvent, const edm::EventSetup&
     }
   }
 
-  // fill TTree
+  // delta-R matching between collections (computed per stream, before the TTree is locked)
+  content.fillCollectionMatches();
+
+  // reduced precision of float branches (per stream, before the TTree is locked)
+  content.reducePrecision();
+
+  // fill TTree (one stream at a time)
+  std::lock_guard<std::mutex> lock(mutex_);
+
+  content_.swap(content);
+
+  if(flatLayout_){
+
+    this->setFlatBranchAddresses();
+  }
+
   ttree_->Fill();
+
+  ++lumiCounts->eventsWritten;
+
+  if(skimIndex_){
+
+    skimIndexWriter_.addEntry();
+
+    const auto& triggerEntries = content_.triggerResultsContainer.entries();
+
+    for(unsigned int idx=0; idx<skimIndexTriggerBits_.size(); ++idx){
+
+      if(triggerEntries[idx].accept){ skimIndexWriter_.setBit(skimIndexTriggerBits_[idx]); }
+    }
+
+    // fill-collection conditions are not swapped (stream cache)
+    for(const auto& conditionBit_i : skimIndexConditionBits_){
+
+      if(content.fillCollectionConditionMap.accept(conditionBit_i.first)){ skimIndexWriter_.setBit(conditionBit_i.second); }
+    }
+
+    for(const auto& key_i : skimIndexMultiplicityKeys_){
+
+      skimIndexWriter_.setKey(key_i.second, key_i.first->size());
+    }
+
+    for(const auto& key_i : skimIndexLeadingValueKeys_){
+
+      skimIndexWriter_.setKey(key_i.second, key_i.first->empty() ? std::numeric_limits<float>::quiet_NaN() : key_i.first->front());
+    }
+  }
+}
+
+std::shared_ptr<JMETriggerNTupleLumiCounts> JMETriggerNTuple::globalBeginLuminosityBlock(const edm::LuminosityBlock&, const edm::EventSetup&) const {
+
+  std::call_once(tfileServiceCheck_, [this](){ this->checkTFileServiceConsumers(); });
+
+  return std::make_shared<JMETriggerNTupleLumiCounts>();
+}
+
+void JMETriggerNTuple::globalEndLuminosityBlock(const edm::LuminosityBlock& iLumi, const edm::EventSetup&) const {
+
+  if(not lumiTree_){
+
+    return;
+  }
+
+  const auto* lumiCounts = this->luminosityBlockCache(iLumi.index());
+
+  std::lock_guard<std::mutex> lock(mutex_);
+
+  lumiTreeContent_.run = iLumi.id().run();
+  lumiTreeContent_.luminosityBlock = iLumi.id().luminosityBlock();
+  lumiTreeContent_.eventsSeen = lumiCounts->eventsSeen;
+  lumiTreeContent_.eventsPassingFilter = lumiCounts->eventsPassingFilter;
+  lumiTreeContent_.eventsWritten = lumiCounts->eventsWritten;
+
+  lumiTree_->Fill();
+}
+
+std::unique_ptr<JMETriggerNTupleContent> JMETriggerNTuple::beginStream(edm::StreamID) const {
+
+  auto content = std::make_unique<JMETriggerNTupleContent>(content_);
+
+  this->setReducedPrecisionBranches(*content);
+
+  return content;
+}
+
+void JMETriggerNTuple::endStream(edm::StreamID streamID) const {
+
+  auto& content = *(this->streamCache(streamID));
+
+  triggerPathIndexRebuilds_ += content.triggerPathIndex.numberOfRebuilds();
+  triggerPathIndexHits_ += content.triggerPathIndex.numberOfHits();
+
+  std::lock_guard<std::mutex> lock(mutex_);
+
+  content.forEachCollectionContainer([this](const auto& container_i){
+
+    auto& stats = collectionStats_[container_i.name()];
+    stats.highWaterMark = std::max(stats.highWaterMark, container_i.highWaterMark());
+    stats.allocations += container_i.numberOfAllocations();
+    stats.fills += container_i.numberOfFills();
+    stats.fillTime += container_i.fillTime();
+  });
+}
+
+std::set<std::string> JMETriggerNTuple::otherTFileServiceObjects() const {
+
+  std::set<std::string> ret;
+
+  edm::Service<TFileService> fileService;
+
+  const std::string& moduleLabel(this->moduleDescription().moduleLabel());
+
+  TIter next_obj(fileService->file().GetList());
+
+  while(const TObject* obj = next_obj()){
+
+    if(moduleLabel != obj->GetName()){
+
+      ret.emplace(obj->GetName());
+    }
+  }
+
+  TIter next_key(fileService->file().GetListOfKeys());
+
+  while(const TKey* key = static_cast<const TKey*>(next_key())){
+
+    if(moduleLabel != key->GetName()){
+
+      ret.emplace(key->GetName());
+    }
+  }
+
+  return ret;
+}
+
+void JMETriggerNTuple::checkTFileServiceConsumers() const {
+
+  std::lock_guard<std::mutex> lock(mutex_);
+
+  const auto others(this->otherTFileServiceObjects());
+
+  if(not others.empty()){
+
+    std::string names;
+    for(const auto& name_i : others){ names += " \""+name_i+"\""; }
+
+    throw edm::Exception(edm::errors::Configuration)
+      << "JMETriggerNTuple (global module, no TFileService shared resource) must be the only module writing to the output file of TFileService,"
+      << " found other top-level objects:" << names;
+  }
+}
+
+void JMETriggerNTuple::endJob(){
+
+  {
+    const auto others(this->otherTFileServiceObjects());
+
+    if(not others.empty()){
+
+      edm::LogError log("JMETriggerNTuple::endJob");
+      log << "JMETriggerNTuple (global module, no TFileService shared resource) must be the only module writing to the output file of TFileService,"
+          << " found other top-level objects (written concurrently with the output TTree):";
+      for(const auto& name_i : others){ log << " \"" << name_i << "\""; }
+    }
+  }
+
+  edm::LogInfo("JMETriggerNTuple::endJob") << "TriggerPathIndex: "
+    << triggerPathIndexRebuilds_.load() << " rebuilds, " << triggerPathIndexHits_.load() << " hits";
+
+  // after the first events, the number of allocations should only increase when a new high-water mark is reached
+  // (at most one set of buffers per stream, plus the one of the TBranch addresses, grows to the high-water mark)
+  unsigned long long allocations_sum(0), fills_sum(0);
+
+  edm::LogInfo log_buffers("JMETriggerNTuple::endJob");
+  log_buffers << "buffers of output collections\n"
+              << "  [collection] [high-water mark] [allocations] [fills]";
+
+  for(const auto& stats_i : collectionStats_){
+
+    allocations_sum += stats_i.second.allocations;
+    fills_sum += stats_i.second.fills;
+
+    log_buffers << "\n  " << stats_i.first << " " << stats_i.second.highWaterMark << " " << stats_i.second.allocations << " " << stats_i.second.fills;
+  }
+
+  log_buffers << "\n  [total] - " << allocations_sum << " " << fills_sum;
+
+  if(outputBranchesSizeReport_ and ttree_){
+
+    // write the baskets still in memory, so that they are included in the report
+    ttree_->FlushBaskets();
+
+    long long totBytes_sum(0), zipBytes_sum(0);
+
+    edm::LogPrint log("JMETriggerNTuple::endJob");
+    log << "output TTree \"" << TTreeName_ << "\" (" << ttree_->GetEntries() << " entries)\n"
+        << "  [branch] [uncompressed size (bytes)] [compressed size (bytes)] [compression factor]";
+
+    for(int idx=0; idx<ttree_->GetListOfBranches()->GetEntries(); ++idx){
+
+      TBranch* br = dynamic_cast<TBranch*>(ttree_->GetListOfBranches()->At(idx));
+
+      if(not br){ continue; }
+
+      const long long totBytes(br->GetTotBytes("*"));
+      const long long zipBytes(br->GetZipBytes("*"));
+
+      totBytes_sum += totBytes;
+      zipBytes_sum += zipBytes;
+
+      log << "\n  " << br->GetName() << " " << totBytes << " " << zipBytes << " " << (zipBytes > 0 ? double(totBytes) / zipBytes : 0.);
+    }
+
+    log << "\n  [total] " << totBytes_sum << " " << zipBytes_sum << " " << (zipBytes_sum > 0 ? double(totBytes_sum) / zipBytes_sum : 0.);
+  }
+
+  if(not profileJSON_.empty()){
+
+    this->writeProfileJSON();
+  }
+
+  if(skimIndex_){
+
+    const std::string treePath(this->moduleDescription().moduleLabel()+"/"+TTreeName_);
+
+    if(skimIndexWriter_.write(skimIndexFileName_, treePath)){
+
+      edm::LogInfo("JMETriggerNTuple::endJob") << "skim index of TTree \"" << treePath << "\" (" << skimIndexWriter_.numberOfEntries() << " entries, "
+        << skimIndexWriter_.bitNames().size() << " bits, " << skimIndexWriter_.keyNames().size() << " keys) written to " << skimIndexFileName_;
+    }
+    else {
+
+      edm::LogWarning("JMETriggerNTuple::endJob") << "failed to write skim index to output file: " << skimIndexFileName_;
+    }
+  }
+}
+
+void JMETriggerNTuple::initSkimIndex(){
+
+  // default: sidecar of the output file of TFileService
+  if(skimIndexFileName_.empty()){
+
+    edm::Service<TFileService> fileService;
+    skimIndexFileName_ = std::string(fileService->file().GetName())+".idx";
+  }
+
+  for(const auto& triggerEntry_i : content_.triggerResultsContainer.entries()){
+
+    skimIndexTriggerBits_.emplace_back(skimIndexWriter_.addBit(triggerEntry_i.name));
+  }
+
+  for(const auto& name : content_.fillCollectionConditionMap.names()){
+
+    skimIndexConditionBits_.emplace_back(name, skimIndexWriter_.addBit(name+"_filled"));
+  }
+
+  // number of objects: size of the first std::vector<float> branch of the collection
+  for(const auto& coll : skimIndexMultiplicities_){
+
+    const auto it = std::find_if(floatVectorBranches_.begin(), floatVectorBranches_.end(), [&coll](const auto& branch_i){
+
+      return branch_i.first.compare(0, coll.size()+1, coll+"_") == 0;
+    });
+
+    if(it == floatVectorBranches_.end()){
+
+      throw cms::Exception("Configuration") << "skimIndex: no output branch of type std::vector<float> for collection \"" << coll << "\" (parameter \"multiplicities\")";
+    }
+
+    skimIndexMultiplicityKeys_.emplace_back(it->second, skimIndexWriter_.addKey(coll+"_size"));
+  }
+
+  for(const auto& branch_name : skimIndexLeadingValues_){
+
+    const auto it = floatVectorBranches_.find(branch_name);
+
+    if(it == floatVectorBranches_.end()){
+
+      throw cms::Exception("Configuration") << "skimIndex: no output branch of type std::vector<float> named \"" << branch_name << "\" (parameter \"leadingValues\")";
+    }
+
+    skimIndexLeadingValueKeys_.emplace_back(it->second, skimIndexWriter_.addKey(branch_name));
+  }
+}
+
+void JMETriggerNTuple::writeProfileJSON() const {
+
+  struct BranchBytes {
+
+    long long totBytes = 0;
+    long long zipBytes = 0;
+  };
+
+  // output branches are assigned to the collection with the longest matching prefix ("<collection>_")
+  std::map<std::string, BranchBytes> collectionBytes;
+  BranchBytes otherBytes;
+
+  long long entries(0);
+
+  if(ttree_){
+
+    ttree_->FlushBaskets();
+
+    entries = ttree_->GetEntries();
+
+    for(int idx=0; idx<ttree_->GetListOfBranches()->GetEntries(); ++idx){
+
+      TBranch* br = dynamic_cast<TBranch*>(ttree_->GetListOfBranches()->At(idx));
+
+      if(not br){ continue; }
+
+      const std::string brName(br->GetName());
+
+      std::string collName;
+      for(const auto& stats_i : collectionStats_){
+
+        if((stats_i.first.size() > collName.size()) and (brName.compare(0, stats_i.first.size()+1, stats_i.first+"_") == 0)){
+
+          collName = stats_i.first;
+        }
+      }
+
+      auto& bytes = collName.empty() ? otherBytes : collectionBytes[collName];
+      bytes.totBytes += br->GetTotBytes("*");
+      bytes.zipBytes += br->GetZipBytes("*");
+    }
+  }
+
+  std::ofstream ofile(profileJSON_);
+
+  if(not ofile.is_open()){
+
+    edm::LogWarning("JMETriggerNTuple::writeProfileJSON") << "failed to open output file: " << profileJSON_;
+
+    return;
+  }
+
+  // names of collections and branches are C++ identifiers (no characters to be escaped)
+  ofile << "{\n  \"tree\": \"" << TTreeName_ << "\",\n  \"entries\": " << entries << ",\n  \"collections\": {";
+
+  bool first(true);
+  for(const auto& stats_i : collectionStats_){
+
+    const auto& bytes = collectionBytes[stats_i.first];
+
+    ofile << (first ? "" : ",") << "\n    \"" << stats_i.first << "\": {"
+          << "\"fills\": " << stats_i.second.fills
+          << ", \"fillTime\": " << stats_i.second.fillTime
+          << ", \"highWaterMark\": " << stats_i.second.highWaterMark
+          << ", \"allocations\": " << stats_i.second.allocations
+          << ", \"totBytes\": " << bytes.totBytes
+          << ", \"zipBytes\": " << bytes.zipBytes
+          << "}";
+
+    first = false;
+  }
+
+  ofile << "\n  },\n  \"otherBranches\": {\"totBytes\": " << otherBytes.totBytes << ", \"zipBytes\": " << otherBytes.zipBytes << "}\n}\n";
 }
 
 void JMETriggerNTuple::beginJob(){
@@ -884,183 +1930,264 @@ void JMETriggerNTuple::beginJob(){
     throw edm::Exception(edm::errors::Configuration, "failed to create TTree via TFileService::make<TTree>");
   }
 
-  this->addBranch("run", &run_);
-  this->addBranch("luminosityBlock", &luminosityBlock_);
-  this->addBranch("event", &event_);
+  if(luminosityBlockSummary_){
+
+    lumiTree_ = fileService->make<TTree>("LuminosityBlocks", "LuminosityBlocks");
+
+    if(not lumiTree_){
 
-  for(const auto& triggerEntry_i : triggerResultsContainer_ptr_->entries()){
+      throw edm::Exception(edm::errors::Configuration, "failed to create TTree \"LuminosityBlocks\" via TFileService::make<TTree>");
+    }
 
-    this->addBranch(triggerEntry_i.name, const_cast<bool*>(&triggerEntry_i.accept));
+    lumiTree_->Branch("run", &lumiTreeContent_.run);
+    lumiTree_->Branch("luminosityBlock", &lumiTreeContent_.luminosityBlock);
+    lumiTree_->Branch("eventsSeen", &lumiTreeContent_.eventsSeen);
+    lumiTree_->Branch("eventsPassingFilter", &lumiTreeContent_.eventsPassingFilter);
+    lumiTree_->Branch("eventsWritten", &lumiTreeContent_.eventsWritten);
   }
 
-  for(auto& recoVertexCollectionContainer_i : v_recoVertexCollectionContainer_){
+  if(flatLayout_){
 
-    this->addBranch(recoVertexCollectionContainer_i.name()+"_tracksSize", &recoVertexCollectionContainer_i.vec_tracksSize());
-    this->addBranch(recoVertexCollectionContainer_i.name()+"_isFake", &recoVertexCollectionContainer_i.vec_isFake());
-    this->addBranch(recoVertexCollectionContainer_i.name()+"_chi2", &recoVertexCollectionContainer_i.vec_chi2());
-    this->addBranch(recoVertexCollectionContainer_i.name()+"_ndof", &recoVertexCollectionContainer_i.vec_ndof());
-    this->addBranch(recoVertexCollectionContainer_i.name()+"_x", &recoVertexCollectionContainer_i.vec_x());
-    this->addBranch(recoVertexCollectionContainer_i.name()+"_y", &recoVertexCollectionContainer_i.vec_y());
-    this->addBranch(recoVertexCollectionContainer_i.name()+"_z", &recoVertexCollectionContainer_i.vec_z());
+    content_.forEachCollectionContainer([this](const auto& container_i){ flatCollectionCounts_[container_i.name()] = 0; });
   }
 
-  for(auto& recoPFCandidateCollectionContainer_i : v_recoPFCandidateCollectionContainer_){
+  // output branches of content_
+  forEachBranch(content_, [this](const std::string& branch_name, auto* address){ this->addBranch(branch_name, address); });
+
+  // settings for output TFile and TTree
+  fileService->file().SetCompressionAlgorithm(ROOT::ECompressionAlgorithm::kLZ4);
+  fileService->file().SetCompressionLevel(4);
+
+  long long autoFlushBytes(0);
+
+  for(int idx=0; idx<ttree_->GetListOfBranches()->GetEntries(); ++idx){
+
+    TBranch* br = dynamic_cast<TBranch*>(ttree_->GetListOfBranches()->At(idx));
+
+    if(not br){ continue; }
+
+    int basketSize(1024 * 1024);
+
+    for(const auto& rule : outputBranchesCompression_){
+
+      const std::string br_name(br->GetName());
 
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_pdgId", &recoPFCandidateCollectionContainer_i.vec_pdgId());
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_pt", &recoPFCandidateCollectionContainer_i.vec_pt());
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_eta", &recoPFCandidateCollectionContainer_i.vec_eta());
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_phi", &recoPFCandidateCollectionContainer_i.vec_phi());
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_mass", &recoPFCandidateCollectionContainer_i.vec_mass());
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_vx", &recoPFCandidateCollectionContainer_i.vec_vx());
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_vy", &recoPFCandidateCollectionContainer_i.vec_vy());
-    this->addBranch(recoPFCandidateCollectionContainer_i.name()+"_vz", &recoPFCandidateCollectionContainer_i.vec_vz());
+      if(std::any_of(rule.regexes.begin(), rule.regexes.end(), [&br_name](const std::regex& re){ return std::regex_match(br_name, re); })){
+
+        br->SetCompressionSettings(rule.compressionSettings);
+
+        if(rule.basketSize > 0){ basketSize = rule.basketSize; }
+
+        LogDebug("JMETriggerNTuple::beginJob") << "output branch \"" << br_name << "\": compression settings = "
+          << rule.compressionSettings << ", basket size = " << basketSize;
+
+        break;
+      }
+    }
+
+    br->SetBasketSize(basketSize);
+    autoFlushBytes += basketSize;
   }
 
-  for(auto& patPackedCandidateCollectionContainer_i : v_patPackedCandidateCollectionContainer_){
+  if(autoFlushBytes > 0){
 
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_pdgId", &patPackedCandidateCollectionContainer_i.vec_pdgId());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_pt", &patPackedCandidateCollectionContainer_i.vec_pt());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_eta", &patPackedCandidateCollectionContainer_i.vec_eta());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_phi", &patPackedCandidateCollectionContainer_i.vec_phi());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_mass", &patPackedCandidateCollectionContainer_i.vec_mass());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_vx", &patPackedCandidateCollectionContainer_i.vec_vx());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_vy", &patPackedCandidateCollectionContainer_i.vec_vy());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_vz", &patPackedCandidateCollectionContainer_i.vec_vz());
-    this->addBranch(patPackedCandidateCollectionContainer_i.name()+"_fromPV", &patPackedCandidateCollectionContainer_i.vec_fromPV());
+    ttree_->SetAutoFlush(-autoFlushBytes);
   }
 
-  for(auto& recoGenJetCollectionContainer_i : v_recoGenJetCollectionContainer_){
+  if(skimIndex_){
 
-    this->addBranch(recoGenJetCollectionContainer_i.name()+"_pt", &recoGenJetCollectionContainer_i.vec_pt());
-    this->addBranch(recoGenJetCollectionContainer_i.name()+"_eta", &recoGenJetCollectionContainer_i.vec_eta());
-    this->addBranch(recoGenJetCollectionContainer_i.name()+"_phi", &recoGenJetCollectionContainer_i.vec_phi());
-    this->addBranch(recoGenJetCollectionContainer_i.name()+"_mass", &recoGenJetCollectionContainer_i.vec_mass());
+    this->initSkimIndex();
   }
+}
+
+int JMETriggerNTuple::compressionSettings(const std::string& algorithm, const unsigned int level){
 
-  for(auto& recoCaloJetCollectionContainer_i : v_recoCaloJetCollectionContainer_){
+  if(level > 9){
 
-    this->addBranch(recoCaloJetCollectionContainer_i.name()+"_pt", &recoCaloJetCollectionContainer_i.vec_pt());
-    this->addBranch(recoCaloJetCollectionContainer_i.name()+"_eta", &recoCaloJetCollectionContainer_i.vec_eta());
-    this->addBranch(recoCaloJetCollectionContainer_i.name()+"_phi", &recoCaloJetCollectionContainer_i.vec_phi());
-    this->addBranch(recoCaloJetCollectionContainer_i.name()+"_mass", &recoCaloJetCollectionContainer_i.vec_mass());
+    throw cms::Exception("Configuration") << "invalid compression level (must be in [0, 9]): " << level;
   }
 
-  for(auto& recoPFJetCollectionContainer_i : v_recoPFJetCollectionContainer_){
+  if(algorithm == "none"){ return 0; }
+  else if(algorithm == "ZLIB"){ return ROOT::CompressionSettings(ROOT::ECompressionAlgorithm::kZLIB, level); }
+  else if(algorithm == "LZMA"){ return ROOT::CompressionSettings(ROOT::ECompressionAlgorithm::kLZMA, level); }
+  else if(algorithm == "LZ4"){ return ROOT::CompressionSettings(ROOT::ECompressionAlgorithm::kLZ4, level); }
+#if ROOT_VERSION_CODE >= ROOT_VERSION(6,20,0)
+  else if(algorithm == "ZSTD"){ return ROOT::CompressionSettings(ROOT::RCompressionSetting::EAlgorithm::kZSTD, level); }
+#endif
+
+  throw cms::Exception("Configuration") << "invalid (or unavailable) compression algorithm: \"" << algorithm << "\"";
+}
+
+template <class F>
+void JMETriggerNTuple::forEachBranch(JMETriggerNTupleContent& content, F&& func){
 
-    this->addBranch(recoPFJetCollectionContainer_i.name()+"_pt", &recoPFJetCollectionContainer_i.vec_pt());
-    this->addBranch(recoPFJetCollectionContainer_i.name()+"_eta", &recoPFJetCollectionContainer_i.vec_eta());
-    this->addBranch(recoPFJetCollectionContainer_i.name()+"_phi", &recoPFJetCollectionContainer_i.vec_phi());
-    this->addBranch(recoPFJetCollectionContainer_i.name()+"_mass", &recoPFJetCollectionContainer_i.vec_mass());
+  func("run", &content.run);
+  func("luminosityBlock", &content.luminosityBlock);
+  func("event", &content.event);
+
+  for(const auto& triggerEntry_i : content.triggerResultsContainer.entries()){
+
+    func(triggerEntry_i.name, const_cast<bool*>(&triggerEntry_i.accept));
   }
 
-  for(auto& patJetCollectionContainer_i : v_patJetCollectionContainer_){
+  for(auto& recoVertexCollectionContainer_i : content.v_recoVertexCollectionContainer){
 
-    this->addBranch(patJetCollectionContainer_i.name()+"_pt", &patJetCollectionContainer_i.vec_pt());
-    this->addBranch(patJetCollectionContainer_i.name()+"_eta", &patJetCollectionContainer_i.vec_eta());
-    this->addBranch(patJetCollectionContainer_i.name()+"_phi", &patJetCollectionContainer_i.vec_phi());
-    this->addBranch(patJetCollectionContainer_i.name()+"_mass", &patJetCollectionContainer_i.vec_mass());
+    func(recoVertexCollectionContainer_i.name()+"_tracksSize", &recoVertexCollectionContainer_i.vec_tracksSize());
+    func(recoVertexCollectionContainer_i.name()+"_isFake", &recoVertexCollectionContainer_i.vec_isFake());
+    func(recoVertexCollectionContainer_i.name()+"_chi2", &recoVertexCollectionContainer_i.vec_chi2());
+    func(recoVertexCollectionContainer_i.name()+"_ndof", &recoVertexCollectionContainer_i.vec_ndof());
+    func(recoVertexCollectionContainer_i.name()+"_x", &recoVertexCollectionContainer_i.vec_x());
+    func(recoVertexCollectionContainer_i.name()+"_y", &recoVertexCollectionContainer_i.vec_y());
+    func(recoVertexCollectionContainer_i.name()+"_z", &recoVertexCollectionContainer_i.vec_z());
   }
 
-  for(auto& recoGenMETCollectionContainer_i : v_recoGenMETCollectionContainer_){
+  for(auto& recoPFCandidateCollectionContainer_i : content.v_recoPFCandidateCollectionContainer){
+
+    func(recoPFCandidateCollectionContainer_i.name()+"_pdgId", &recoPFCandidateCollectionContainer_i.vec_pdgId());
+    func(recoPFCandidateCollectionContainer_i.name()+"_pt", &recoPFCandidateCollectionContainer_i.vec_pt());
+    func(recoPFCandidateCollectionContainer_i.name()+"_eta", &recoPFCandidateCollectionContainer_i.vec_eta());
+    func(recoPFCandidateCollectionContainer_i.name()+"_phi", &recoPFCandidateCollectionContainer_i.vec_phi());
+    func(recoPFCandidateCollectionContainer_i.name()+"_mass", &recoPFCandidateCollectionContainer_i.vec_mass());
+    func(recoPFCandidateCollectionContainer_i.name()+"_vx", &recoPFCandidateCollectionContainer_i.vec_vx());
+    func(recoPFCandidateCollectionContainer_i.name()+"_vy", &recoPFCandidateCollectionContainer_i.vec_vy());
+    func(recoPFCandidateCollectionContainer_i.name()+"_vz", &recoPFCandidateCollectionContainer_i.vec_vz());
+  }
 
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_pt", &recoGenMETCollectionContainer_i.vec_pt());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_phi", &recoGenMETCollectionContainer_i.vec_phi());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_sumEt", &recoGenMETCollectionContainer_i.vec_sumEt());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_NeutralEMEtFraction", &recoGenMETCollectionContainer_i.vec_NeutralEMEtFraction());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_NeutralHadEtFraction", &recoGenMETCollectionContainer_i.vec_NeutralHadEtFraction());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_ChargedEMEtFraction", &recoGenMETCollectionContainer_i.vec_ChargedEMEtFraction());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_ChargedHadEtFraction", &recoGenMETCollectionContainer_i.vec_ChargedHadEtFraction());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_MuonEtFraction", &recoGenMETCollectionContainer_i.vec_MuonEtFraction());
-    this->addBranch(recoGenMETCollectionContainer_i.name()+"_InvisibleEtFraction", &recoGenMETCollectionContainer_i.vec_InvisibleEtFraction());
+  for(auto& patPackedCandidateCollectionContainer_i : content.v_patPackedCandidateCollectionContainer){
+
+    func(patPackedCandidateCollectionContainer_i.name()+"_pdgId", &patPackedCandidateCollectionContainer_i.vec_pdgId());
+    func(patPackedCandidateCollectionContainer_i.name()+"_pt", &patPackedCandidateCollectionContainer_i.vec_pt());
+    func(patPackedCandidateCollectionContainer_i.name()+"_eta", &patPackedCandidateCollectionContainer_i.vec_eta());
+    func(patPackedCandidateCollectionContainer_i.name()+"_phi", &patPackedCandidateCollectionContainer_i.vec_phi());
+    func(patPackedCandidateCollectionContainer_i.name()+"_mass", &patPackedCandidateCollectionContainer_i.vec_mass());
+    func(patPackedCandidateCollectionContainer_i.name()+"_vx", &patPackedCandidateCollectionContainer_i.vec_vx());
+    func(patPackedCandidateCollectionContainer_i.name()+"_vy", &patPackedCandidateCollectionContainer_i.vec_vy());
+    func(patPackedCandidateCollectionContainer_i.name()+"_vz", &patPackedCandidateCollectionContainer_i.vec_vz());
+    func(patPackedCandidateCollectionContainer_i.name()+"_fromPV", &patPackedCandidateCollectionContainer_i.vec_fromPV());
   }
 
-  for(auto& recoCaloMETCollectionContainer_i : v_recoCaloMETCollectionContainer_){
+  for(auto& recoGenJetCollectionContainer_i : content.v_recoGenJetCollectionContainer){
 
-    this->addBranch(recoCaloMETCollectionContainer_i.name()+"_pt", &recoCaloMETCollectionContainer_i.vec_pt());
-    this->addBranch(recoCaloMETCollectionContainer_i.name()+"_phi", &recoCaloMETCollectionContainer_i.vec_phi());
-    this->addBranch(recoCaloMETCollectionContainer_i.name()+"_sumEt", &recoCaloMETCollectionContainer_i.vec_sumEt());
+    func(recoGenJetCollectionContainer_i.name()+"_pt", &recoGenJetCollectionContainer_i.vec_pt());
+    func(recoGenJetCollectionContainer_i.name()+"_eta", &recoGenJetCollectionContainer_i.vec_eta());
+    func(recoGenJetCollectionContainer_i.name()+"_phi", &recoGenJetCollectionContainer_i.vec_phi());
+    func(recoGenJetCollectionContainer_i.name()+"_mass", &recoGenJetCollectionContainer_i.vec_mass());
   }
 
-  for(auto& recoPFMETCollectionContainer_i : v_recoPFMETCollectionContainer_){
+  for(auto& recoCaloJetCollectionContainer_i : content.v_recoCaloJetCollectionContainer){
 
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_pt", &recoPFMETCollectionContainer_i.vec_pt());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_phi", &recoPFMETCollectionContainer_i.vec_phi());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_sumEt", &recoPFMETCollectionContainer_i.vec_sumEt());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_NeutralEMFraction", &recoPFMETCollectionContainer_i.vec_NeutralEMFraction());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_NeutralHadEtFraction", &recoPFMETCollectionContainer_i.vec_NeutralHadEtFraction());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_ChargedEMEtFraction", &recoPFMETCollectionContainer_i.vec_ChargedEMEtFraction());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_ChargedHadEtFraction", &recoPFMETCollectionContainer_i.vec_ChargedHadEtFraction());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_MuonEtFraction", &recoPFMETCollectionContainer_i.vec_MuonEtFraction());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_Type6EtFraction", &recoPFMETCollectionContainer_i.vec_Type6EtFraction());
-    this->addBranch(recoPFMETCollectionContainer_i.name()+"_Type7EtFraction", &recoPFMETCollectionContainer_i.vec_Type7EtFraction());
+    func(recoCaloJetCollectionContainer_i.name()+"_pt", &recoCaloJetCollectionContainer_i.vec_pt());
+    func(recoCaloJetCollectionContainer_i.name()+"_eta", &recoCaloJetCollectionContainer_i.vec_eta());
+    func(recoCaloJetCollectionContainer_i.name()+"_phi", &recoCaloJetCollectionContainer_i.vec_phi());
+    func(recoCaloJetCollectionContainer_i.name()+"_mass", &recoCaloJetCollectionContainer_i.vec_mass());
   }
 
-  for(auto& patMETCollectionContainer_i : v_patMETCollectionContainer_){
+  for(auto& recoPFJetCollectionContainer_i : content.v_recoPFJetCollectionContainer){
 
-    this->addBranch(patMETCollectionContainer_i.name()+"_Raw_pt", &patMETCollectionContainer_i.vec_Raw_pt());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Raw_phi", &patMETCollectionContainer_i.vec_Raw_phi());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Raw_sumEt", &patMETCollectionContainer_i.vec_Raw_sumEt());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type1_pt", &patMETCollectionContainer_i.vec_Type1_pt());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type1_phi", &patMETCollectionContainer_i.vec_Type1_phi());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type1_sumEt", &patMETCollectionContainer_i.vec_Type1_sumEt());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type1XY_pt", &patMETCollectionContainer_i.vec_Type1XY_pt());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type1XY_phi", &patMETCollectionContainer_i.vec_Type1XY_phi());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type1XY_sumEt", &patMETCollectionContainer_i.vec_Type1XY_sumEt());
-    this->addBranch(patMETCollectionContainer_i.name()+"_NeutralEMFraction", &patMETCollectionContainer_i.vec_NeutralEMFraction());
-    this->addBranch(patMETCollectionContainer_i.name()+"_NeutralHadEtFraction", &patMETCollectionContainer_i.vec_NeutralHadEtFraction());
-    this->addBranch(patMETCollectionContainer_i.name()+"_ChargedEMEtFraction", &patMETCollectionContainer_i.vec_ChargedEMEtFraction());
-    this->addBranch(patMETCollectionContainer_i.name()+"_ChargedHadEtFraction", &patMETCollectionContainer_i.vec_ChargedHadEtFraction());
-    this->addBranch(patMETCollectionContainer_i.name()+"_MuonEtFraction", &patMETCollectionContainer_i.vec_MuonEtFraction());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type6EtFraction", &patMETCollectionContainer_i.vec_Type6EtFraction());
-    this->addBranch(patMETCollectionContainer_i.name()+"_Type7EtFraction", &patMETCollectionContainer_i.vec_Type7EtFraction());
+    func(recoPFJetCollectionContainer_i.name()+"_pt", &recoPFJetCollectionContainer_i.vec_pt());
+    func(recoPFJetCollectionContainer_i.name()+"_eta", &recoPFJetCollectionContainer_i.vec_eta());
+    func(recoPFJetCollectionContainer_i.name()+"_phi", &recoPFJetCollectionContainer_i.vec_phi());
+    func(recoPFJetCollectionContainer_i.name()+"_mass", &recoPFJetCollectionContainer_i.vec_mass());
   }
 
-  for(auto& patMuonCollectionContainer_i : v_patMuonCollectionContainer_){
+  for(auto& patJetCollectionContainer_i : content.v_patJetCollectionContainer){
+
+    func(patJetCollectionContainer_i.name()+"_pt", &patJetCollectionContainer_i.vec_pt());
+    func(patJetCollectionContainer_i.name()+"_eta", &patJetCollectionContainer_i.vec_eta());
+    func(patJetCollectionContainer_i.name()+"_phi", &patJetCollectionContainer_i.vec_phi());
+    func(patJetCollectionContainer_i.name()+"_mass", &patJetCollectionContainer_i.vec_mass());
+  }
 
-    this->addBranch(patMuonCollectionContainer_i.name()+"_pdgId", &patMuonCollectionContainer_i.vec_pdgId());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_pt", &patMuonCollectionContainer_i.vec_pt());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_eta", &patMuonCollectionContainer_i.vec_eta());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_phi", &patMuonCollectionContainer_i.vec_phi());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_mass", &patMuonCollectionContainer_i.vec_mass());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_vx", &patMuonCollectionContainer_i.vec_vx());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_vy", &patMuonCollectionContainer_i.vec_vy());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_vz", &patMuonCollectionContainer_i.vec_vz());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_dxyPV", &patMuonCollectionContainer_i.vec_dxyPV());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_dzPV", &patMuonCollectionContainer_i.vec_dzPV());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_id", &patMuonCollectionContainer_i.vec_id());
-    this->addBranch(patMuonCollectionContainer_i.name()+"_pfIso", &patMuonCollectionContainer_i.vec_pfIso());
+  for(auto& recoGenMETCollectionContainer_i : content.v_recoGenMETCollectionContainer){
+
+    func(recoGenMETCollectionContainer_i.name()+"_pt", &recoGenMETCollectionContainer_i.vec_pt());
+    func(recoGenMETCollectionContainer_i.name()+"_phi", &recoGenMETCollectionContainer_i.vec_phi());
+    func(recoGenMETCollectionContainer_i.name()+"_sumEt", &recoGenMETCollectionContainer_i.vec_sumEt());
+    func(recoGenMETCollectionContainer_i.name()+"_NeutralEMEtFraction", &recoGenMETCollectionContainer_i.vec_NeutralEMEtFraction());
+    func(recoGenMETCollectionContainer_i.name()+"_NeutralHadEtFraction", &recoGenMETCollectionContainer_i.vec_NeutralHadEtFraction());
+    func(recoGenMETCollectionContainer_i.name()+"_ChargedEMEtFraction", &recoGenMETCollectionContainer_i.vec_ChargedEMEtFraction());
+    func(recoGenMETCollectionContainer_i.name()+"_ChargedHadEtFraction", &recoGenMETCollectionContainer_i.vec_ChargedHadEtFraction());
+    func(recoGenMETCollectionContainer_i.name()+"_MuonEtFraction", &recoGenMETCollectionContainer_i.vec_MuonEtFraction());
+    func(recoGenMETCollectionContainer_i.name()+"_InvisibleEtFraction", &recoGenMETCollectionContainer_i.vec_InvisibleEtFraction());
   }
 
-  for(auto& patElectronCollectionContainer_i : v_patElectronCollectionContainer_){
+  for(auto& recoCaloMETCollectionContainer_i : content.v_recoCaloMETCollectionContainer){
 
-    this->addBranch(patElectronCollectionContainer_i.name()+"_pdgId", &patElectronCollectionContainer_i.vec_pdgId());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_pt", &patElectronCollectionContainer_i.vec_pt());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_eta", &patElectronCollectionContainer_i.vec_eta());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_phi", &patElectronCollectionContainer_i.vec_phi());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_mass", &patElectronCollectionContainer_i.vec_mass());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_vx", &patElectronCollectionContainer_i.vec_vx());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_vy", &patElectronCollectionContainer_i.vec_vy());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_vz", &patElectronCollectionContainer_i.vec_vz());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_dxyPV", &patElectronCollectionContainer_i.vec_dxyPV());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_dzPV", &patElectronCollectionContainer_i.vec_dzPV());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_id", &patElectronCollectionContainer_i.vec_id());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_pfIso", &patElectronCollectionContainer_i.vec_pfIso());
-    this->addBranch(patElectronCollectionContainer_i.name()+"_etaSC", &patElectronCollectionContainer_i.vec_etaSC());
+    func(recoCaloMETCollectionContainer_i.name()+"_pt", &recoCaloMETCollectionContainer_i.vec_pt());
+    func(recoCaloMETCollectionContainer_i.name()+"_phi", &recoCaloMETCollectionContainer_i.vec_phi());
+    func(recoCaloMETCollectionContainer_i.name()+"_sumEt", &recoCaloMETCollectionContainer_i.vec_sumEt());
   }
 
-  // settings for output TFile and TTree
-  fileService->file().SetCompressionAlgorithm(ROOT::ECompressionAlgorithm::kLZ4);
-  fileService->file().SetCompressionLevel(4);
+  for(auto& recoPFMETCollectionContainer_i : content.v_recoPFMETCollectionContainer){
+
+    func(recoPFMETCollectionContainer_i.name()+"_pt", &recoPFMETCollectionContainer_i.vec_pt());
+    func(recoPFMETCollectionContainer_i.name()+"_phi", &recoPFMETCollectionContainer_i.vec_phi());
+    func(recoPFMETCollectionContainer_i.name()+"_sumEt", &recoPFMETCollectionContainer_i.vec_sumEt());
+    func(recoPFMETCollectionContainer_i.name()+"_NeutralEMFraction", &recoPFMETCollectionContainer_i.vec_NeutralEMFraction());
+    func(recoPFMETCollectionContainer_i.name()+"_NeutralHadEtFraction", &recoPFMETCollectionContainer_i.vec_NeutralHadEtFraction());
+    func(recoPFMETCollectionContainer_i.name()+"_ChargedEMEtFraction", &recoPFMETCollectionContainer_i.vec_ChargedEMEtFraction());
+    func(recoPFMETCollectionContainer_i.name()+"_ChargedHadEtFraction", &recoPFMETCollectionContainer_i.vec_ChargedHadEtFraction());
+    func(recoPFMETCollectionContainer_i.name()+"_MuonEtFraction", &recoPFMETCollectionContainer_i.vec_MuonEtFraction());
+    func(recoPFMETCollectionContainer_i.name()+"_Type6EtFraction", &recoPFMETCollectionContainer_i.vec_Type6EtFraction());
+    func(recoPFMETCollectionContainer_i.name()+"_Type7EtFraction", &recoPFMETCollectionContainer_i.vec_Type7EtFraction());
+  }
 
-  for(int idx=0; idx<ttree_->GetListOfBranches()->GetEntries(); ++idx){
+  for(auto& patMETCollectionContainer_i : content.v_patMETCollectionContainer){
+
+    func(patMETCollectionContainer_i.name()+"_Raw_pt", &patMETCollectionContainer_i.vec_Raw_pt());
+    func(patMETCollectionContainer_i.name()+"_Raw_phi", &patMETCollectionContainer_i.vec_Raw_phi());
+    func(patMETCollectionContainer_i.name()+"_Raw_sumEt", &patMETCollectionContainer_i.vec_Raw_sumEt());
+    func(patMETCollectionContainer_i.name()+"_Type1_pt", &patMETCollectionContainer_i.vec_Type1_pt());
+    func(patMETCollectionContainer_i.name()+"_Type1_phi", &patMETCollectionContainer_i.vec_Type1_phi());
+    func(patMETCollectionContainer_i.name()+"_Type1_sumEt", &patMETCollectionContainer_i.vec_Type1_sumEt());
+    func(patMETCollectionContainer_i.name()+"_Type1XY_pt", &patMETCollectionContainer_i.vec_Type1XY_pt());
+    func(patMETCollectionContainer_i.name()+"_Type1XY_phi", &patMETCollectionContainer_i.vec_Type1XY_phi());
+    func(patMETCollectionContainer_i.name()+"_Type1XY_sumEt", &patMETCollectionContainer_i.vec_Type1XY_sumEt());
+    func(patMETCollectionContainer_i.name()+"_NeutralEMFraction", &patMETCollectionContainer_i.vec_NeutralEMFraction());
+    func(patMETCollectionContainer_i.name()+"_NeutralHadEtFraction", &patMETCollectionContainer_i.vec_NeutralHadEtFraction());
+    func(patMETCollectionContainer_i.name()+"_ChargedEMEtFraction", &patMETCollectionContainer_i.vec_ChargedEMEtFraction());
+    func(patMETCollectionContainer_i.name()+"_ChargedHadEtFraction", &patMETCollectionContainer_i.vec_ChargedHadEtFraction());
+    func(patMETCollectionContainer_i.name()+"_MuonEtFraction", &patMETCollectionContainer_i.vec_MuonEtFraction());
+    func(patMETCollectionContainer_i.name()+"_Type6EtFraction", &patMETCollectionContainer_i.vec_Type6EtFraction());
+    func(patMETCollectionContainer_i.name()+"_Type7EtFraction", &patMETCollectionContainer_i.vec_Type7EtFraction());
+  }
 
-    TBranch* br = dynamic_cast<TBranch*>(ttree_->GetListOfBranches()->At(idx));
-    if(br){ br->SetBasketSize(1024 * 1024); }
+  for(auto& patMuonCollectionContainer_i : content.v_patMuonCollectionContainer){
+
+    func(patMuonCollectionContainer_i.name()+"_pdgId", &patMuonCollectionContainer_i.vec_pdgId());
+    func(patMuonCollectionContainer_i.name()+"_pt", &patMuonCollectionContainer_i.vec_pt());
+    func(patMuonCollectionContainer_i.name()+"_eta", &patMuonCollectionContainer_i.vec_eta());
+    func(patMuonCollectionContainer_i.name()+"_phi", &patMuonCollectionContainer_i.vec_phi());
+    func(patMuonCollectionContainer_i.name()+"_mass", &patMuonCollectionContainer_i.vec_mass());
+    func(patMuonCollectionContainer_i.name()+"_vx", &patMuonCollectionContainer_i.vec_vx());
+    func(patMuonCollectionContainer_i.name()+"_vy", &patMuonCollectionContainer_i.vec_vy());
+    func(patMuonCollectionContainer_i.name()+"_vz", &patMuonCollectionContainer_i.vec_vz());
+    func(patMuonCollectionContainer_i.name()+"_dxyPV", &patMuonCollectionContainer_i.vec_dxyPV());
+    func(patMuonCollectionContainer_i.name()+"_dzPV", &patMuonCollectionContainer_i.vec_dzPV());
+    func(patMuonCollectionContainer_i.name()+"_id", &patMuonCollectionContainer_i.vec_id());
+    func(patMuonCollectionContainer_i.name()+"_pfIso", &patMuonCollectionContainer_i.vec_pfIso());
+  }
+
+  for(auto& patElectronCollectionContainer_i : content.v_patElectronCollectionContainer){
+
+    func(patElectronCollectionContainer_i.name()+"_pdgId", &patElectronCollectionContainer_i.vec_pdgId());
+    func(patElectronCollectionContainer_i.name()+"_pt", &patElectronCollectionContainer_i.vec_pt());
+    func(patElectronCollectionContainer_i.name()+"_eta", &patElectronCollectionContainer_i.vec_eta());
+    func(patElectronCollectionContainer_i.name()+"_phi", &patElectronCollectionContainer_i.vec_phi());
+    func(patElectronCollectionContainer_i.name()+"_mass", &patElectronCollectionContainer_i.vec_mass());
+    func(patElectronCollectionContainer_i.name()+"_vx", &patElectronCollectionContainer_i.vec_vx());
+    func(patElectronCollectionContainer_i.name()+"_vy", &patElectronCollectionContainer_i.vec_vy());
+    func(patElectronCollectionContainer_i.name()+"_vz", &patElectronCollectionContainer_i.vec_vz());
+    func(patElectronCollectionContainer_i.name()+"_dxyPV", &patElectronCollectionContainer_i.vec_dxyPV());
+    func(patElectronCollectionContainer_i.name()+"_dzPV", &patElectronCollectionContainer_i.vec_dzPV());
+    func(patElectronCollectionContainer_i.name()+"_id", &patElectronCollectionContainer_i.vec_id());
+    func(patElectronCollectionContainer_i.name()+"_pfIso", &patElectronCollectionContainer_i.vec_pfIso());
+    func(patElectronCollectionContainer_i.name()+"_etaSC", &patElectronCollectionContainer_i.vec_etaSC());
   }
 
-  if(ttree_->GetListOfBranches()->GetEntries() > 0){
+  for(auto& collectionMatch_i : content.v_collectionMatch){
 
-    ttree_->SetAutoFlush(-1024 * 1024 * ttree_->GetListOfBranches()->GetEntries());
+    func(collectionMatch_i.name, &collectionMatch_i.matchIdx);
   }
 }
 
@@ -1078,7 +2205,10 @@ void JMETriggerNTuple::addBranch(const std::string& branch_name, Args... args){
       }
       else {
 
-        ttree_->Branch(branch_name.c_str(), args...);
+        this->createBranch(branch_name, args...);
+
+        this->registerReducedPrecision(branch_name, args...);
+        this->registerFloatVectorBranch(branch_name, args...);
       }
     }
     else {
@@ -1093,114 +2223,201 @@ void JMETriggerNTuple::addBranch(const std::string& branch_name, Args... args){
   }
 }
 
+template <typename T>
+void JMETriggerNTuple::createBranch(const std::string& branch_name, std::vector<T>* vec){
+
+  if(flatLayout_){
 
-bool JMETriggerNTuple::passesTriggerResults_OR(const edm::TriggerResults& triggerResults, const edm::Event& iEvent, const std::vector<std::string>& paths){
+    this->addFlatBranch(branch_name, leafType(vec), [vec](){ return std::make_pair(static_cast<void*>(vec->data()), vec->size()); });
+  }
+  else {
 
-  if(paths.size() == 0){
+    ttree_->Branch(branch_name.c_str(), vec);
+  }
+}
 
-    edm::LogWarning("JMETriggerNTuple::passesTriggerResults_OR") << "input error: empty list of paths for event selection, will return True";
+void JMETriggerNTuple::createBranch(const std::string& branch_name, std::vector<bool>* vec){
 
-    return true;
+  if(flatLayout_){
+
+    // std::vector<bool> has no contiguous array of bool: values are copied to a buffer before every TTree::Fill
+    auto buffer = std::make_shared<std::vector<char> >();
+
+    static_assert(sizeof(bool) == sizeof(char), "JMETriggerNTuple::createBranch -- sizeof(bool) != sizeof(char)");
+
+    this->addFlatBranch(branch_name, leafType(vec), [vec, buffer](){
+
+      buffer->assign(vec->begin(), vec->end());
+
+      return std::make_pair(static_cast<void*>(buffer->data()), buffer->size());
+    });
   }
+  else {
 
-  const auto& triggerNames = iEvent.triggerNames(triggerResults).triggerNames();
+    ttree_->Branch(branch_name.c_str(), vec);
+  }
+}
 
-  if(triggerResults.size() != triggerNames.size()){
+void JMETriggerNTuple::addFlatBranch(const std::string& branch_name, const char* leaf_type, std::function<std::pair<void*, size_t>()> array){
 
-    edm::LogWarning("JMETriggerNTuple::passesTriggerResults_OR") << "input error: size of TriggerResults ("
-      << triggerResults.size() << ") and TriggerNames (" << triggerNames.size() << ") differ, exiting function";
+  // collection with the longest matching prefix ("<collection>_")
+  auto coll_it = flatCollectionCounts_.end();
+  for(auto it = flatCollectionCounts_.begin(); it != flatCollectionCounts_.end(); ++it){
 
-    return false;
+    if(((coll_it == flatCollectionCounts_.end()) or (it->first.size() > coll_it->first.size())) and (branch_name.compare(0, it->first.size()+1, it->first+"_") == 0)){
+
+      coll_it = it;
+    }
   }
 
-  for(unsigned int idx=0; idx<triggerResults.size(); ++idx){
+  if(coll_it == flatCollectionCounts_.end()){
 
-    if(triggerResults.at(idx).accept() == true){
+    throw cms::Exception("JMETriggerNTuple::addFlatBranch") << "output branch \"" << branch_name
+      << "\" does not belong to any collection (expected name \"<collection>_<variable>\")";
+  }
 
-      const auto& triggerName = triggerNames.at(idx);
+  const std::string count_name(coll_it->first+"_n");
 
-      if(std::find(paths.begin(), paths.end(), triggerName) != paths.end()){
+  // count branch of the collection, created with its first variable
+  const bool setsCount(not ttree_->GetBranch(count_name.c_str()));
 
-        LogDebug("JMETriggerNTuple::passesTriggerResults_OR") << "event accepted by path \"" << triggerName << "\"";
+  if(setsCount){
 
-        return true;
-      }
-      else {
+    ttree_->Branch(count_name.c_str(), &coll_it->second, (count_name+"/i").c_str());
+  }
 
-        const auto triggerName_unv = triggerName.substr(0, triggerName.rfind("_v"));
+  TBranch* branch = ttree_->Branch(branch_name.c_str(), &flatEmptyArray_, (branch_name+"["+count_name+"]/"+leaf_type).c_str());
 
-        if(std::find(paths.begin(), paths.end(), triggerName_unv) != paths.end()){
+  flatBranches_.emplace_back(FlatBranch{branch, &coll_it->second, setsCount, array});
+}
 
-          LogDebug("JMETriggerNTuple::passesTriggerResults_OR") << "event accepted by path \"" << triggerName_unv << "\"";
+void JMETriggerNTuple::setFlatBranchAddresses() const {
 
-          return true;
-        }
-      }
+  for(const auto& flatBranch_i : flatBranches_){
+
+    const auto array(flatBranch_i.array());
+
+    if(flatBranch_i.setsCount){
+
+      *flatBranch_i.count = array.second;
+    }
+    else if(*flatBranch_i.count != array.second){
+
+      throw cms::Exception("JMETriggerNTuple::setFlatBranchAddresses") << "size of output branch \"" << flatBranch_i.branch->GetName()
+        << "\" (" << array.second << ") differs from the size of its collection (" << *flatBranch_i.count << ")";
+    }
+
+    void* address(array.second ? array.first : &flatEmptyArray_);
+
+    if(flatBranch_i.branch->GetAddress() != static_cast<char*>(address)){
+
+      flatBranch_i.branch->SetAddress(address);
     }
   }
+}
 
-  return false;
+
+void JMETriggerNTuple::registerReducedPrecision(const std::string& branch_name, std::vector<float>*){
+
+  // match name of branch, or name of collection (e.g. "hltParticleFlow" for "hltParticleFlow_pt")
+  auto it = outputBranchesMantissaBits_map_.find(branch_name);
+
+  for(auto pos = branch_name.rfind('_'); (it == outputBranchesMantissaBits_map_.end()) and (pos != std::string::npos) and (pos > 0); pos = branch_name.rfind('_', pos-1)){
+
+    it = outputBranchesMantissaBits_map_.find(branch_name.substr(0, pos));
+  }
+
+  if(it != outputBranchesMantissaBits_map_.end()){
+
+    LogDebug("JMETriggerNTuple::registerReducedPrecision") << "output branch \"" << branch_name << "\" will be stored with " << it->second << " mantissa bits";
+
+    reducedPrecisionBranches_[branch_name] = it->second;
+  }
 }
 
-bool JMETriggerNTuple::passesTriggerResults_AND(const edm::TriggerResults& triggerResults, const edm::Event& iEvent, const std::vector<std::string>& paths){
+void JMETriggerNTuple::setReducedPrecisionBranches(JMETriggerNTupleContent& content) const {
 
-  if(paths.size() == 0){
+  content.reducedPrecisionBranches.clear();
 
-    edm::LogWarning("JMETriggerNTuple::passesTriggerResults_AND") << "input error: empty list of paths for event selection, will return True";
+  forEachBranch(content, [this, &content](const std::string& branch_name, auto* address){
+
+    const auto it = reducedPrecisionBranches_.find(branch_name);
+
+    auto* const vec = floatVector(address);
+
+    if(vec and (it != reducedPrecisionBranches_.end())){
+
+      content.reducedPrecisionBranches.emplace_back(vec, it->second);
+    }
+  });
+}
+
+bool JMETriggerNTuple::passesTriggerResults_OR(const edm::TriggerResults& triggerResults, const TriggerPathIndex& pathIndex, const std::vector<unsigned int>& pathIndexKeys) const {
+
+  if(pathIndexKeys.size() == 0){
+
+    edm::LogWarning("JMETriggerNTuple::passesTriggerResults_OR") << "input error: empty list of paths for event selection, will return True";
 
     return true;
   }
 
-  const auto& triggerNames = iEvent.triggerNames(triggerResults).triggerNames();
+  if(not pathIndex.isValid()){
 
-  if(triggerResults.size() != triggerNames.size()){
+    return false;
+  }
 
-    edm::LogWarning("JMETriggerNTuple::passesTriggerResults_AND") << "input error: size of TriggerResults ("
-      << triggerResults.size() << ") and TriggerNames (" << triggerNames.size() << ") differ, exiting function";
+  for(const auto key : pathIndexKeys){
 
-    return false;
+    if(pathIndex.accept(triggerResults, key)){
+
+      LogDebug("JMETriggerNTuple::passesTriggerResults_OR") << "event accepted by path \"" << pathIndex.names().at(key) << "\"";
+
+      return true;
+    }
   }
 
-  for(unsigned int idx=0; idx<triggerResults.size(); ++idx){
+  return false;
+}
+
+bool JMETriggerNTuple::passesTriggerResults_AND(const edm::TriggerResults& triggerResults, const TriggerPathIndex& pathIndex, const std::vector<unsigned int>& pathIndexKeys) const {
 
-    if(triggerResults.at(idx).accept() == false){
+  if(pathIndexKeys.size() == 0){
 
-      const auto& triggerName = triggerNames.at(idx);
+    edm::LogWarning("JMETriggerNTuple::passesTriggerResults_AND") << "input error: empty list of paths for event selection, will return True";
 
-      if(std::find(paths.begin(), paths.end(), triggerName) != paths.end()){
+    return true;
+  }
 
-        LogDebug("JMETriggerNTuple::passesTriggerResults_AND") << "event not accepted by path \"" << triggerName << "\"";
+  if(not pathIndex.isValid()){
 
-        return false;
-      }
-      else {
+    return false;
+  }
 
-        const auto triggerName_unv = triggerName.substr(0, triggerName.rfind("_v"));
+  // paths not present in the trigger menu do not reject the event
+  for(const auto key : pathIndexKeys){
 
-        if(std::find(paths.begin(), paths.end(), triggerName_unv) != paths.end()){
+    if(not pathIndex.acceptAll(triggerResults, key)){
 
-          LogDebug("JMETriggerNTuple::passesTriggerResults_AND") << "event not accepted by path \"" << triggerName_unv << "\"";
+      LogDebug("JMETriggerNTuple::passesTriggerResults_AND") << "event not accepted by path \"" << pathIndex.names().at(key) << "\"";
 
-          return false;
-        }
-      }
+      return false;
     }
   }
 
   return true;
 }
 
-JMETriggerNTuple::FillCollectionConditionsMap::FillCollectionConditionsMap(){
+FillCollectionConditionsMap::FillCollectionConditionsMap(){
 
   this->clear();
 }
 
-JMETriggerNTuple::FillCollectionConditionsMap::FillCollectionConditionsMap(const edm::ParameterSet& pset){
+FillCollectionConditionsMap::FillCollectionConditionsMap(const edm::ParameterSet& pset, TriggerPathIndex& pathIndex, edm::ConsumesCollector&& iC){
 
-  this->init(pset);
+  this->init(pset, pathIndex, std::move(iC));
 }
 
-int JMETriggerNTuple::FillCollectionConditionsMap::init(const edm::ParameterSet& pset){
+int FillCollectionConditionsMap::init(const edm::ParameterSet& pset, TriggerPathIndex& pathIndex, edm::ConsumesCollector&& iC){
 
   this->clear();
 
@@ -1210,24 +2427,38 @@ int JMETriggerNTuple::FillCollectionConditionsMap::init(const edm::ParameterSet&
 
     if(not this->has(name)){
 
-      condMap_.insert({name, condition(pset.getParameter<std::string>(name))});
+      const auto& path = pset.getParameter<std::string>(name);
+
+      condMap_.insert({name, condition(path, pathIndex.add(path))});
+    }
+  }
+
+  const auto& pset_inputTags = pset.getParameterNamesForType<edm::InputTag>();
+
+  for(const auto& name : pset_inputTags){
+
+    if(not this->has(name)){
+
+      const auto& inputTag = pset.getParameter<edm::InputTag>(name);
+
+      condMap_.insert({name, condition(inputTag, iC.consumes<bool>(inputTag))});
     }
   }
 
   return 0;
 }
 
-void JMETriggerNTuple::FillCollectionConditionsMap::clear(){
+void FillCollectionConditionsMap::clear(){
 
   condMap_.clear();
 }
 
-bool JMETriggerNTuple::FillCollectionConditionsMap::has(const std::string& name) const {
+bool FillCollectionConditionsMap::has(const std::string& name) const {
 
   return (condMap_.find(name) != condMap_.end());
 }
 
-const JMETriggerNTuple::FillCollectionConditionsMap::condition& JMETriggerNTuple::FillCollectionConditionsMap::at(const std::string& name) const {
+const FillCollectionConditionsMap::condition& FillCollectionConditionsMap::at(const std::string& name) const {
 
   if(not this->has(name)){
 
@@ -1237,7 +2468,7 @@ const JMETriggerNTuple::FillCollectionConditionsMap::condition& JMETriggerNTuple
   return condMap_.at(name);
 }
 
-bool JMETriggerNTuple::FillCollectionConditionsMap::accept(const std::string& name) const {
+bool FillCollectionConditionsMap::accept(const std::string& name) const {
 
   if(not this->has(name)){
 
@@ -1247,47 +2478,73 @@ bool JMETriggerNTuple::FillCollectionConditionsMap::accept(const std::string& na
   return this->at(name).accept;
 }
 
-int JMETriggerNTuple::FillCollectionConditionsMap::update(const edm::TriggerResults& triggerResults, const edm::Event& iEvent){
+std::vector<std::string> FillCollectionConditionsMap::names() const {
 
-  for(auto& map_entry : condMap_){
+  std::vector<std::string> ret;
+  ret.reserve(condMap_.size());
+
+  for(const auto& map_entry : condMap_){
 
-    map_entry.second.accept = false;
+    ret.emplace_back(map_entry.first);
   }
 
-  const auto& triggerNames = iEvent.triggerNames(triggerResults).triggerNames();
+  return ret;
+}
+
+int FillCollectionConditionsMap::update(const edm::TriggerResults& triggerResults, const TriggerPathIndex& pathIndex){
 
-  if(triggerResults.size() != triggerNames.size()){
+  for(auto& map_entry : condMap_){
+
+    if(not map_entry.second.isProduct){
+
+      map_entry.second.accept = false;
+    }
+  }
 
-    edm::LogWarning("InputError") << "size of TriggerResults (" << triggerResults.size()
-      << ") and TriggerNames (" << triggerNames.size() << ") differ, exiting function";
+  if(not pathIndex.isValid()){
 
     return 1;
   }
 
-  for(unsigned int idx=0; idx<triggerResults.size(); ++idx){
+  // condition::path matches either full name or name without version
+  for(auto& map_entry : condMap_){
 
-    LogDebug("FillCollectionConditionsMap::update") << "path = " << triggerNames.at(idx) << ", accept = " << triggerResults.at(idx).accept();
+    if(map_entry.second.isProduct){
 
-    // since default value of condition::accept is false,
-    // the value needs to be changed only for accepted paths
-    if(triggerResults.at(idx).accept()){
+      continue;
+    }
 
-      const auto& triggerName = triggerNames.at(idx);
-      const auto triggerName_unv = triggerName.substr(0, triggerName.rfind("_v"));
+    map_entry.second.accept = pathIndex.accept(triggerResults, map_entry.second.pathIndexKey);
 
-      for(auto& map_entry : condMap_){
+    LogDebug("FillCollectionConditionsMap::update") << "condition \"" << map_entry.second.path
+      << "\" for collection \"" << map_entry.first << "\" (accept=" << map_entry.second.accept << ")";
+  }
 
-        // require match either full name or name without version
-        if((map_entry.second.path == triggerName_unv) || (map_entry.second.path == triggerName)){
+  return 0;
+}
 
-          map_entry.second.accept = triggerResults.at(idx).accept();
+int FillCollectionConditionsMap::update(const edm::Event& iEvent){
 
-	  LogDebug("FillCollectionConditionsMap::update") << "triggerResults entry \"" << triggerNames.at(idx)
-            << "\" matches condition \"" << map_entry.second.path << "\" for collection \"" << map_entry.first
-            << "\" (accept=" << map_entry.second.accept << ")";
-        }
-      }
+  for(auto& map_entry : condMap_){
+
+    if(not map_entry.second.isProduct){
+
+      continue;
     }
+
+    edm::Handle<bool> handle;
+    iEvent.getByToken(map_entry.second.token, handle);
+
+    if(not handle.isValid()){
+
+      edm::LogWarning("FillCollectionConditionsMap::update")
+        << "invalid handle for condition \"" << map_entry.second.path << "\" of collection \"" << map_entry.first << "\" (collection not filled)";
+    }
+
+    map_entry.second.accept = (handle.isValid() and *handle);
+
+    LogDebug("FillCollectionConditionsMap::update") << "condition \"" << map_entry.second.path
+      << "\" for collection \"" << map_entry.first << "\" (accept=" << map_entry.second.accept << ")";
   }
 
   return 0;
@@ -0,0 +1,202 @@
+"""
+mergeable histogram accumulators based on numpy (do not require ROOT)
+
+every accumulator supports:
+ - fill(...)     : whole-array filling
+ - += / merge    : sum of accumulators with the same binning (e.g. from different chunks or processes)
+ - toDict/fromDict : conversion to/from JSON-serializable dicts
+
+the arrays of bin contents include underflow (index 0) and overflow (index -1) bins
+"""
+import numpy as np
+
+def _binIndex(edges, values):
+    """bin index of every value (0: underflow, len(edges): overflow); NaNs go to the overflow bin"""
+    idx = np.searchsorted(edges, values, side='right')
+    idx[np.isnan(values)] = len(edges)
+    return idx
+
+def _weights(weights, size):
+    return np.ones(size, dtype=np.float64) if weights is None else np.asarray(weights, dtype=np.float64)
+
+class Hist1D(object):
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.sumw = np.zeros(len(self.edges)+1, dtype=np.float64)
+        self.sumw2 = np.zeros(len(self.edges)+1, dtype=np.float64)
+
+    def fill(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        w = _weights(weights, len(values))
+        idx = _binIndex(self.edges, values)
+        self.sumw += np.bincount(idx, weights=w, minlength=len(self.sumw))
+        self.sumw2 += np.bincount(idx, weights=w*w, minlength=len(self.sumw2))
+        return self
+
+    def _check(self, other):
+        if (type(self) != type(other)) or (not np.array_equal(self.edges, other.edges)):
+           raise ValueError('attempt to merge histograms with different binning')
+
+    def __iadd__(self, other):
+        self._check(other)
+        self.sumw += other.sumw
+        self.sumw2 += other.sumw2
+        return self
+
+    def merge(self, other):
+        return self.__iadd__(other)
+
+    def values(self):
+        """bin contents without underflow/overflow"""
+        return self.sumw[1:-1]
+
+    def errors(self):
+        return np.sqrt(self.sumw2[1:-1])
+
+    def toDict(self):
+        return {'type': 'Hist1D', 'edges': self.edges.tolist(), 'sumw': self.sumw.tolist(), 'sumw2': self.sumw2.tolist()}
+
+    @classmethod
+    def fromDict(cls, d):
+        ret = cls(d['edges'])
+        ret.sumw = np.asarray(d['sumw'], dtype=np.float64)
+        ret.sumw2 = np.asarray(d['sumw2'], dtype=np.float64)
+        return ret
+
+class Profile1D(object):
+    """mean and RMS of y in bins of x"""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.sumw = np.zeros(len(self.edges)+1, dtype=np.float64)
+        self.sumwy = np.zeros(len(self.edges)+1, dtype=np.float64)
+        self.sumwy2 = np.zeros(len(self.edges)+1, dtype=np.float64)
+
+    def fill(self, x, y, weights=None):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        w = _weights(weights, len(x))
+        idx = _binIndex(self.edges, x)
+        self.sumw += np.bincount(idx, weights=w, minlength=len(self.sumw))
+        self.sumwy += np.bincount(idx, weights=w*y, minlength=len(self.sumwy))
+        self.sumwy2 += np.bincount(idx, weights=w*y*y, minlength=len(self.sumwy2))
+        return self
+
+    def __iadd__(self, other):
+        if (type(self) != type(other)) or (not np.array_equal(self.edges, other.edges)):
+           raise ValueError('attempt to merge profiles with different binning')
+        self.sumw += other.sumw
+        self.sumwy += other.sumwy
+        self.sumwy2 += other.sumwy2
+        return self
+
+    def merge(self, other):
+        return self.__iadd__(other)
+
+    def entries(self):
+        return self.sumw[1:-1]
+
+    def mean(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.sumw > 0, self.sumwy / self.sumw, np.nan)[1:-1]
+
+    def rms(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(self.sumw > 0, self.sumwy / self.sumw, np.nan)
+            var = np.where(self.sumw > 0, self.sumwy2 / self.sumw - mean*mean, np.nan)
+        return np.sqrt(np.maximum(var, 0.))[1:-1]
+
+    def meanError(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.rms() / np.sqrt(self.entries())
+
+    def toDict(self):
+        return {'type': 'Profile1D', 'edges': self.edges.tolist(), 'sumw': self.sumw.tolist(), 'sumwy': self.sumwy.tolist(), 'sumwy2': self.sumwy2.tolist()}
+
+    @classmethod
+    def fromDict(cls, d):
+        ret = cls(d['edges'])
+        ret.sumw = np.asarray(d['sumw'], dtype=np.float64)
+        ret.sumwy = np.asarray(d['sumwy'], dtype=np.float64)
+        ret.sumwy2 = np.asarray(d['sumwy2'], dtype=np.float64)
+        return ret
+
+class Hist2D(object):
+
+    def __init__(self, xedges, yedges):
+        self.xedges = np.asarray(xedges, dtype=np.float64)
+        self.yedges = np.asarray(yedges, dtype=np.float64)
+        self.sumw = np.zeros((len(self.xedges)+1, len(self.yedges)+1), dtype=np.float64)
+
+    def fill(self, x, y, weights=None):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        w = _weights(weights, len(x))
+        idx = _binIndex(self.xedges, x) * (len(self.yedges)+1) + _binIndex(self.yedges, y)
+        self.sumw += np.bincount(idx, weights=w, minlength=self.sumw.size).reshape(self.sumw.shape)
+        return self
+
+    def __iadd__(self, other):
+        if (type(self) != type(other)) or (not np.array_equal(self.xedges, other.xedges)) or (not np.array_equal(self.yedges, other.yedges)):
+           raise ValueError('attempt to merge histograms with different binning')
+        self.sumw += other.sumw
+        return self
+
+    def merge(self, other):
+        return self.__iadd__(other)
+
+    def quantiles(self, probs):
+        """quantiles of y in every x bin (linear interpolation inside y bins, under/overflow of y included in the normalization);
+           returns an array of shape (number of x bins, len(probs))"""
+        probs = np.asarray(probs, dtype=np.float64)
+        ret = np.full((len(self.xedges)-1, len(probs)), np.nan)
+        for ix in range(1, len(self.xedges)):
+            row = self.sumw[ix]
+            tot = row.sum()
+            if tot <= 0:
+               continue
+            cdf = np.cumsum(row) / tot
+            for ip, prob in enumerate(probs):
+                iy = np.searchsorted(cdf, prob, side='left')
+                if (iy == 0) or (iy >= len(row)-1):
+                   continue
+                lo = cdf[iy-1]
+                frac = (prob - lo) / row[iy] * tot if row[iy] > 0 else 0.
+                ret[ix-1, ip] = self.yedges[iy-1] + frac * (self.yedges[iy] - self.yedges[iy-1])
+        return ret
+
+    def toDict(self):
+        return {'type': 'Hist2D', 'xedges': self.xedges.tolist(), 'yedges': self.yedges.tolist(), 'sumw': self.sumw.tolist()}
+
+    @classmethod
+    def fromDict(cls, d):
+        ret = cls(d['xedges'], d['yedges'])
+        ret.sumw = np.asarray(d['sumw'], dtype=np.float64)
+        return ret
+
+_types = {'Hist1D': Hist1D, 'Profile1D': Profile1D, 'Hist2D': Hist2D}
+
+class HistogramCollection(dict):
+    """dict of accumulators (key: name) that can be merged with another collection"""
+
+    def __iadd__(self, other):
+        for key in other:
+            if key in self:
+               self[key] += other[key]
+            else:
+               self[key] = other[key]
+        return self
+
+    def merge(self, other):
+        return self.__iadd__(other)
+
+    def toDict(self):
+        return dict((key, self[key].toDict()) for key in self)
+
+    @classmethod
+    def fromDict(cls, d):
+        ret = cls()
+        for key in d:
+            ret[key] = _types[d[key]['type']].fromDict(d[key])
+        return ret
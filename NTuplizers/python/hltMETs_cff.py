@@ -4,9 +4,33 @@ from CommonTools.PileupAlgos.Puppi_cff import *
 from CommonTools.PileupAlgos.PhotonPuppi_cff import puppiPhoton
 from RecoJets.JetProducers.ak4PFJets_cfi import ak4PFJetsPuppi
 
-def hltMETsSeq(proc, particleFlow, primaryVertices):
+# default list of MET variants (name of the MET producer)
+hltMETsVariantsDefault = [
+  'hltPuppiMET',
+  'hltPuppiMETWithPuppiForJets',
+# 'hltPuppiMETTypeOne', --> HLT JECs for PuppiJets not available
+  'hltSoftKillerMET',
+]
 
-    ### Puppi MET
+def addModule(proc, label, module):
+    """adds module to the process, unless an identical module (same type and parameters) is already there;
+       returns the label of the module in the process"""
+    _modDump = module.dumpPython()
+    for _label, _mod in list(proc.producers_().items()) + list(proc.filters_().items()):
+        if (_mod.type_() == module.type_()) and (_mod.dumpPython() == _modDump):
+           return _label
+    setattr(proc, label, module)
+    return label
+
+def hltPuppiProducer(proc, label, candName, vertexName):
+    """Puppi producer for a given collection of candidates and vertices
+       (created only once per input, and shared by all the variants using it)"""
+    return addModule(proc, label, puppi.clone(
+        candName = candName,
+        vertexName = vertexName,
+    ))
+
+def _hltPuppiMETModules(proc, particleFlow, primaryVertices, built):
 
     # Puppi candidates for MET
     proc.pfNoLepPUPPI = cms.EDFilter('PdgIdCandViewSelector',
@@ -17,19 +41,25 @@ def hltMETsSeq(proc, particleFlow, primaryVertices):
         src = cms.InputTag( particleFlow ),
         pdgId = cms.vint32( -11, 11, -13, 13 ),
     )
-    proc.puppiNoLep = puppi.clone(
-        candName = 'pfNoLepPUPPI',
-        vertexName = primaryVertices,
-    )
+    # Puppi runs twice on the same PF collection when hltPuppiMETWithPuppiForJets (or hltPuppiMETTypeOne) is also built,
+    # and this can not be avoided without changing hltPuppiMET:
+    #  - the Puppi weights of the lepton-less candidates can not be taken from the Puppi producer running on all PF candidates,
+    #    because leptons enter the computation of the weights of the neighbouring candidates;
+    #  - the CandViewMerger and the delta-R matching of hltPuppiForMET can not be replaced by a collection aligned to the indices
+    #    of the PF candidates (useRefs = True): the photons of puppiPhoton (photonName, runOnMiniAOD) point to the offline
+    #    packedPFCandidates, whose keys are unrelated to the HLT PF candidates, and a different order of the candidates
+    #    changes the sum of PFMETProducer (the output MET would not be bit-identical)
+    _puppiNoLep = hltPuppiProducer(proc, 'puppiNoLep', 'pfNoLepPUPPI', primaryVertices)
     proc.puppiMerged = cms.EDProducer('CandViewMerger',
-        src = cms.VInputTag('puppiNoLep', 'pfLeptonsPUPPET'),
+        src = cms.VInputTag(_puppiNoLep, 'pfLeptonsPUPPET'),
     )
     proc.hltPuppiForMET = puppiPhoton.clone(
         candName = particleFlow,
         # Line below points puppi-MET to puppi-no-lepton, which increases the response
         puppiCandName = 'puppiMerged',
         # Line below replaces reference linking with delta-R matching
-        # because the puppi references after merging are not consistent with those of the original PF collection
+        # because the puppi references after merging are not consistent with those of the original PF collection,
+        # and the photons are matched to candidates of a different (offline) collection
         useRefs = False,
     )
     proc.hltPuppiMET = cms.EDProducer( 'PFMETProducer',
@@ -37,24 +67,21 @@ def hltMETsSeq(proc, particleFlow, primaryVertices):
         globalThreshold = cms.double( 0.0 ),
         calculateSignificance = cms.bool( False ),
     )
-    proc.hltPuppiMETsRawSeq = cms.Sequence(
-       (proc.pfNoLepPUPPI
-      * proc.puppiNoLep
-      + proc.pfLeptonsPUPPET)
-      * proc.puppiMerged
-      * proc.hltPuppiForMET
-      * proc.hltPuppiMET
-    )
+    return [
+      'pfNoLepPUPPI',
+      _puppiNoLep,
+      'pfLeptonsPUPPET',
+      'puppiMerged',
+      'hltPuppiForMET',
+      'hltPuppiMET',
+    ]
 
-    ### Puppi MET Type-1
+def _hltPuppiMETTypeOneModules(proc, particleFlow, primaryVertices, built):
 
     # Puppi candidates for Jets
-    proc.hltPuppi = puppi.clone(
-        candName = particleFlow,
-        vertexName = primaryVertices,
-    )
+    _hltPuppi = hltPuppiProducer(proc, 'hltPuppi', particleFlow, primaryVertices)
     proc.ak4PuppiJetsForPuppiMETTypeOne = ak4PFJetsPuppi.clone(
-        src = 'hltPuppi',
+        src = _hltPuppi,
     )
     proc.hltAK4PuppiFastJetCorrector = cms.EDProducer( 'L1FastjetCorrectorProducer',
         srcRho = cms.InputTag( 'fixedGridRhoFastjetAll'+'::'+proc.name_() ),
@@ -92,30 +119,33 @@ def hltMETsSeq(proc, particleFlow, primaryVertices):
         src = cms.InputTag( 'hltPuppiMET' ),
         srcCorrections = cms.VInputTag( 'hltcorrPuppiMETTypeOne:type1' )
     )
-    proc.hltPuppiMETsTypeOneSeq = cms.Sequence(
-        proc.hltPuppi
-      * proc.ak4PuppiJetsForPuppiMETTypeOne
-      * proc.hltAK4PuppiFastJetCorrector
-      * proc.hltAK4PuppiRelativeCorrector
-      * proc.hltAK4PuppiAbsoluteCorrector
-      * proc.hltAK4PuppiResidualCorrector
-      * proc.hltAK4PuppiCorrector
-      * proc.hltcorrPuppiMETTypeOne
-      * proc.hltPuppiMETTypeOne
-    )
+    return _hltMETsVariantModules(proc, 'hltPuppiMET', particleFlow, primaryVertices, built) + [
+      _hltPuppi,
+      'ak4PuppiJetsForPuppiMETTypeOne',
+      'hltAK4PuppiFastJetCorrector',
+      'hltAK4PuppiRelativeCorrector',
+      'hltAK4PuppiAbsoluteCorrector',
+      'hltAK4PuppiResidualCorrector',
+      'hltAK4PuppiCorrector',
+      'hltcorrPuppiMETTypeOne',
+      'hltPuppiMETTypeOne',
+    ]
+
+def _hltPuppiMETWithPuppiForJetsModules(proc, particleFlow, primaryVertices, built):
 
     # [testing] Puppi MET with Puppi-For-Jets inputs
+    _hltPuppi = hltPuppiProducer(proc, 'hltPuppi', particleFlow, primaryVertices)
     proc.hltPuppiMETWithPuppiForJets = cms.EDProducer( 'PFMETProducer',
-        src = cms.InputTag( 'hltPuppi' ),
+        src = cms.InputTag( _hltPuppi ),
         globalThreshold = cms.double( 0.0 ),
         calculateSignificance = cms.bool( False ),
     )
-    proc.hltPuppiMETsRawSeq += cms.Sequence(
-        proc.hltPuppi
-      * proc.hltPuppiMETWithPuppiForJets
-    )
+    return [
+      _hltPuppi,
+      'hltPuppiMETWithPuppiForJets',
+    ]
 
-    ### SoftKiller MET
+def _hltSoftKillerMETModules(proc, particleFlow, primaryVertices, built):
 
     proc.hltSoftKiller = cms.EDProducer('SoftKillerProducer',
         PFCandidates = cms.InputTag(particleFlow),
@@ -127,15 +157,50 @@ def hltMETsSeq(proc, particleFlow, primaryVertices):
         globalThreshold = cms.double( 0.0 ),
         calculateSignificance = cms.bool( False ),
     )
-    proc.hltSoftKillerMETsSeq = cms.Sequence(
-        proc.hltSoftKiller
-      * proc.hltSoftKillerMET
-    )
+    return [
+      'hltSoftKiller',
+      'hltSoftKillerMET',
+    ]
 
-    ### METs Sequence
+_hltMETsVariantsBuilders = {
+  'hltPuppiMET': _hltPuppiMETModules,
+  'hltPuppiMETTypeOne': _hltPuppiMETTypeOneModules,
+  'hltPuppiMETWithPuppiForJets': _hltPuppiMETWithPuppiForJetsModules,
+  'hltSoftKillerMET': _hltSoftKillerMETModules,
+}
 
-    proc.hltMETsSeq = cms.Sequence(
-        proc.hltPuppiMETsRawSeq
-#      * proc.hltPuppiMETsTypeOneSeq --> HLT JECs for PuppiJets not available
-      + proc.hltSoftKillerMETsSeq
-    )
+def _hltMETsVariantModules(proc, variant, particleFlow, primaryVertices, built):
+    """ordered list of the labels of the modules of one variant (every variant is built only once)"""
+    if variant not in _hltMETsVariantsBuilders:
+       raise KeyError('invalid MET variant "'+variant+'" (available variants: '+str(sorted(_hltMETsVariantsBuilders.keys()))+')')
+    if variant not in built:
+       built[variant] = _hltMETsVariantsBuilders[variant](proc, particleFlow, primaryVertices, built)
+    return built[variant]
+
+def _sequence(proc, labels):
+    ret = cms.Sequence()
+    for _label in labels:
+        ret += getattr(proc, _label)
+    return ret
+
+def hltMETsSeq(proc, particleFlow, primaryVertices, variants=None, paths=False):
+    """adds to the process the MET variants in the list "variants" (default: hltMETsVariantsDefault),
+       one sequence per variant ("<variant>Seq") and the sequence hltMETsSeq running all of them;
+       modules shared by different variants (e.g. Puppi producers with the same inputs) are created only once;
+       if paths is True, one cms.Path per variant ("<variant>Path") is also created, and the list of Paths is returned
+       (the timing of every variant is then reported separately in the job summary,
+       and the time of a shared module is assigned to the first Path in which it runs)"""
+    variants = hltMETsVariantsDefault if variants is None else variants
+
+    built, allLabels, ret = {}, [], []
+    for _variant in variants:
+        _labels = _hltMETsVariantModules(proc, _variant, particleFlow, primaryVertices, built)
+        allLabels += [_label for _label in _labels if _label not in allLabels]
+        setattr(proc, _variant+'Seq', _sequence(proc, _labels))
+        if paths:
+           setattr(proc, _variant+'Path', cms.Path(getattr(proc, _variant+'Seq')))
+           ret.append(getattr(proc, _variant+'Path'))
+
+    proc.hltMETsSeq = _sequence(proc, allLabels)
+
+    return ret
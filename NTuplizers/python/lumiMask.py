@@ -0,0 +1,103 @@
+"""
+lumi mask (e.g. golden JSON) indexed by run, with sorted and merged intervals of luminosity sections:
+ - contains(run, lumi)        : binary search (bisect) in the intervals of the run
+ - containsArray(runs, lumis) : same, for numpy arrays (one np.searchsorted per run)
+ - vLuminosityBlockRange()    : minimal list of ranges for the "lumisToProcess" parameter of the source
+
+does not require CMSSW (numpy is only required by containsArray and lumis)
+"""
+import json
+import bisect
+
+class LumiMask(object):
+
+    def __init__(self, ranges=None):
+        """ranges: dict {run: [[first, last], ...]} (keys can be strings, as in the .json files)"""
+        self._first = {}
+        self._last = {}
+        for _run, _ranges in (ranges or {}).items():
+            self.add(int(_run), _ranges)
+
+    @classmethod
+    def fromJSON(cls, path):
+        with open(path) as _jfile:
+             return cls(json.load(_jfile))
+
+    def add(self, run, ranges):
+        """add intervals of luminosity sections to a run (overlapping and adjacent intervals are merged)"""
+        _intervals = sorted(list(zip(self._first.get(run, []), self._last.get(run, []))) + [(int(_first), int(_last)) for _first, _last in ranges])
+        _first, _last = [], []
+        for _lo, _hi in _intervals:
+            if _hi < _lo:
+               raise ValueError('invalid range of luminosity sections of run '+str(run)+': ['+str(_lo)+', '+str(_hi)+']')
+            if _last and (_lo <= _last[-1]+1):
+               _last[-1] = max(_last[-1], _hi)
+            else:
+               _first.append(_lo)
+               _last.append(_hi)
+        if _first:
+           self._first[run] = _first
+           self._last[run] = _last
+
+    def runs(self):
+        return sorted(self._first.keys())
+
+    def ranges(self, run):
+        return [[_first, _last] for _first, _last in zip(self._first.get(run, []), self._last.get(run, []))]
+
+    def numberOfLumis(self, run=None):
+        _runs = self.runs() if run is None else [run]
+        return sum(_last-_first+1 for _run in _runs for _first, _last in zip(self._first.get(_run, []), self._last.get(_run, [])))
+
+    def contains(self, run, lumi):
+        _first = self._first.get(run, None)
+        if _first is None:
+           return False
+        _pos = bisect.bisect_right(_first, lumi) - 1
+        return (_pos >= 0) and (lumi <= self._last[run][_pos])
+
+    def __contains__(self, runLumi):
+        return self.contains(*runLumi)
+
+    def containsArray(self, runs, lumis):
+        """boolean numpy array of the (run, lumi) pairs in the mask"""
+        import numpy as np
+        runs, lumis = np.asarray(runs), np.asarray(lumis, dtype=np.int64)
+        ret = np.zeros(len(runs), dtype=bool)
+        for _run in np.unique(runs):
+            _first = self._first.get(int(_run), None)
+            if _first is None:
+               continue
+            _sel = (runs == _run)
+            _pos = np.searchsorted(np.array(_first, dtype=np.int64), lumis[_sel], side='right') - 1
+            ret[_sel] = (_pos >= 0) & (lumis[_sel] <= np.array(self._last[int(_run)], dtype=np.int64)[np.maximum(_pos, 0)])
+        return ret
+
+    def lumis(self, run):
+        """numpy array of all the luminosity sections of a run"""
+        import numpy as np
+        _ranges = [np.arange(_first, _last+1, dtype=np.int64) for _first, _last in zip(self._first.get(run, []), self._last.get(run, []))]
+        return np.concatenate(_ranges) if _ranges else np.zeros(0, dtype=np.int64)
+
+    def restrict(self, runMin=None, runMax=None):
+        """lumi mask with the runs in [runMin, runMax]"""
+        ret = LumiMask()
+        for _run in self.runs():
+            if ((runMin is None) or (_run >= runMin)) and ((runMax is None) or (_run <= runMax)):
+               ret._first[_run] = list(self._first[_run])
+               ret._last[_run] = list(self._last[_run])
+        return ret
+
+    def vLuminosityBlockRange(self):
+        """list of strings "run:first-run:last" (format of cms.untracked.VLuminosityBlockRange)"""
+        return ['{0:d}:{1:d}-{0:d}:{2:d}'.format(_run, _first, _last) for _run in self.runs() for _first, _last in zip(self._first[_run], self._last[_run])]
+
+    def toDict(self):
+        return dict((str(_run), self.ranges(_run)) for _run in self.runs())
+
+def parseRunRange(spec):
+    """"min:max" (either can be empty) to (runMin, runMax)"""
+    _tmp = spec.split(':')
+    if len(_tmp) != 2:
+       raise ValueError('invalid range of runs (expected "min:max"): '+spec)
+    return (int(_tmp[0]) if _tmp[0] else None), (int(_tmp[1]) if _tmp[1] else None)
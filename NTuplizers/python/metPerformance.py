@@ -0,0 +1,184 @@
+"""
+HLT-vs-offline MET performance from the output of JMETriggerNTuple (numpy-only, does not require CMSSW)
+
+for every pair (online MET, offline MET), the online MET is projected on the direction of the offline MET:
+ - parallel component      : u_par  = MET_online . n(MET_offline)
+ - perpendicular component : u_perp = MET_online x n(MET_offline)
+ - response                : u_par / |MET_offline|
+and the following quantities are accumulated in bins of offline MET, offline sumEt and number of offline vertices:
+ - profiles (mean, RMS) of response, (u_par - |MET_offline|) and u_perp
+ - 2D histograms of (u_par - |MET_offline|) and u_perp, used for quantile-based resolutions
+"""
+import multiprocessing
+
+import numpy as np
+
+try:
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR
+    from JMETriggerAnalysis.NTuplizers.histograms import HistogramCollection, Profile1D, Hist2D
+except ImportError:
+    from ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR
+    from histograms import HistogramCollection, Profile1D, Hist2D
+
+# MET objects: name -> (collection, prefix of variables)
+ONLINE_METS = {
+  'hltPFMET': ('hltPFMET', ''),
+  'hltPFMETTypeOne': ('hltPFMETTypeOne', ''),
+  'hltPuppiMET': ('hltPuppiMET', ''),
+  'hltSoftKillerMET': ('hltSoftKillerMET', ''),
+}
+
+OFFLINE_METS = {
+  'offlineMETs_Raw': ('offlineMETs', 'Raw_'),
+  'offlineMETs_Type1': ('offlineMETs', 'Type1_'),
+  'offlineMETsPuppi_Type1': ('offlineMETsPuppi', 'Type1_'),
+}
+
+VERTICES = 'offlinePrimaryVertices'
+
+BINNINGS = {
+  'offlineMET': np.array([0., 20., 40., 60., 80., 100., 120., 150., 200., 250., 300., 400., 600., 1000.]),
+  'offlineSumEt': np.array([0., 250., 500., 750., 1000., 1250., 1500., 2000., 2500., 3000., 4000., 6000.]),
+  'nPV': np.array([0., 10., 15., 20., 25., 30., 35., 40., 45., 50., 60., 80.]),
+}
+
+# binning of the 2D histograms of u_par - |MET_offline| and u_perp
+RESOLUTION_EDGES = np.linspace(-400., 400., 801)
+
+def leading(collection, var):
+    """value of the first element of every event (NaN for empty events)"""
+    idx = collection.firstIndex()
+    ret = np.full(len(idx), np.nan)
+    ret[idx >= 0] = collection[var][idx[idx >= 0]]
+    return ret
+
+def projections(online_pt, online_phi, offline_pt, offline_phi):
+    """components of the online MET parallel and perpendicular to the offline MET, and response"""
+    dphi = online_phi - offline_phi
+    u_par = online_pt * np.cos(dphi)
+    u_perp = online_pt * np.sin(dphi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        response = np.where(offline_pt > 0, u_par / offline_pt, np.nan)
+    return u_par, u_perp, response
+
+class METPerformance(object):
+
+    def __init__(self, onlineMETs=None, offlineMETs=None, binnings=None, resolutionEdges=RESOLUTION_EDGES):
+        self.onlineMETs = dict(ONLINE_METS if onlineMETs is None else onlineMETs)
+        self.offlineMETs = dict(OFFLINE_METS if offlineMETs is None else offlineMETs)
+        self.binnings = dict(BINNINGS if binnings is None else binnings)
+        self.resolutionEdges = np.asarray(resolutionEdges, dtype=np.float64)
+        self.histograms = HistogramCollection()
+
+    def collections(self):
+        return sorted(set([_tmp[0] for _tmp in self.onlineMETs.values()] + [_tmp[0] for _tmp in self.offlineMETs.values()]))
+
+    def variables(self):
+        ret = {}
+        for _coll, _prefix in list(self.onlineMETs.values()) + list(self.offlineMETs.values()):
+            ret.setdefault(_coll, set()).update([_prefix+'pt', _prefix+'phi', _prefix+'sumEt'])
+        ret[VERTICES] = set(['z'])
+        return dict((_coll, sorted(ret[_coll])) for _coll in ret)
+
+    def _book(self, key, edges, factory):
+        if key not in self.histograms:
+           self.histograms[key] = factory(edges)
+        return self.histograms[key]
+
+    def process(self, chunk):
+        """fill histograms with the events of one Chunk of ntupleReader"""
+        nPV = chunk[VERTICES].counts.astype(np.float64) if VERTICES in chunk else None
+
+        offline = {}
+        for _name, (_coll, _prefix) in self.offlineMETs.items():
+            if _coll in chunk:
+               offline[_name] = (leading(chunk[_coll], _prefix+'pt'), leading(chunk[_coll], _prefix+'phi'), leading(chunk[_coll], _prefix+'sumEt'))
+
+        for _onName, (_onColl, _onPrefix) in self.onlineMETs.items():
+            if _onColl not in chunk:
+               continue
+            on_pt = leading(chunk[_onColl], _onPrefix+'pt')
+            on_phi = leading(chunk[_onColl], _onPrefix+'phi')
+
+            for _offName in offline:
+                off_pt, off_phi, off_sumEt = offline[_offName]
+                mask = np.isfinite(on_pt) & np.isfinite(off_pt)
+                u_par, u_perp, response = projections(on_pt[mask], on_phi[mask], off_pt[mask], off_phi[mask])
+                delta_par = u_par - off_pt[mask]
+
+                binVars = {'offlineMET': off_pt[mask], 'offlineSumEt': off_sumEt[mask]}
+                if nPV is not None:
+                   binVars['nPV'] = nPV[mask]
+
+                for _binName in binVars:
+                    if _binName not in self.binnings:
+                       continue
+                    _x, _edges = binVars[_binName], self.binnings[_binName]
+                    _key = _onName+'_vs_'+_offName+'__'+_binName
+                    self._book(_key+'__response', _edges, Profile1D).fill(_x, response)
+                    self._book(_key+'__deltaPar', _edges, Profile1D).fill(_x, delta_par)
+                    self._book(_key+'__uPerp', _edges, Profile1D).fill(_x, u_perp)
+                    self._book(_key+'__deltaPar2D', _edges, lambda _e: Hist2D(_e, self.resolutionEdges)).fill(_x, delta_par)
+                    self._book(_key+'__uPerp2D', _edges, lambda _e: Hist2D(_e, self.resolutionEdges)).fill(_x, u_perp)
+
+        return self
+
+    def merge(self, other):
+        self.histograms += other.histograms
+        return self
+
+def summary(histograms):
+    """dict of results per (online, offline, binning): bin edges, entries, mean response,
+       resolutions (RMS, and half-width of the 16%-84% quantile range) of u_par and u_perp"""
+    ret = {}
+    for _key in sorted(histograms):
+        if not _key.endswith('__response'):
+           continue
+        _base = _key[:-len('__response')]
+        _resp = histograms[_key]
+        _qPar = histograms[_base+'__deltaPar2D'].quantiles([0.16, 0.84])
+        _qPerp = histograms[_base+'__uPerp2D'].quantiles([0.16, 0.84])
+        ret[_base] = {
+          'edges': _resp.edges.tolist(),
+          'entries': _resp.entries().tolist(),
+          'response': _resp.mean().tolist(),
+          'responseError': _resp.meanError().tolist(),
+          'resolutionPar_RMS': histograms[_base+'__deltaPar'].rms().tolist(),
+          'resolutionPerp_RMS': histograms[_base+'__uPerp'].rms().tolist(),
+          'resolutionPar_Q68': (0.5 * (_qPar[:,1] - _qPar[:,0])).tolist(),
+          'resolutionPerp_Q68': (0.5 * (_qPerp[:,1] - _qPerp[:,0])).tolist(),
+        }
+    return ret
+
+def _processFile(args):
+    fileName, treeName, cacheDir, chunkSize, config = args
+    perf = METPerformance(**config)
+    reader = NTupleReader([fileName], treeName=treeName, cacheDir=cacheDir)
+    available = set(reader.collections())
+    collections = [_coll for _coll in perf.collections() + [VERTICES] if _coll in available]
+    variables = perf.variables()
+    for _coll in collections:
+        variables[_coll] = [_var for _var in variables[_coll] if _var in reader.variables(_coll)]
+    for chunk in reader.iterate(collections=collections, variables=variables, chunkSize=chunkSize):
+        perf.process(chunk)
+    return perf.histograms.toDict()
+
+def run(files, treeName=DEFAULT_TREE, cacheDir=DEFAULT_CACHE_DIR, chunkSize=200000, nProcesses=1, config=None):
+    """process a list of files (one file per task of a process pool), returns the merged HistogramCollection"""
+    config = {} if config is None else config
+    tasks = [(_f, treeName, cacheDir, chunkSize, config) for _f in files]
+
+    ret = HistogramCollection()
+    if nProcesses > 1:
+       pool = multiprocessing.Pool(nProcesses)
+       try:
+          for _hists in pool.imap_unordered(_processFile, tasks):
+              ret += HistogramCollection.fromDict(_hists)
+       finally:
+          pool.close()
+          pool.join()
+    else:
+       for _task in tasks:
+           ret += HistogramCollection.fromDict(_processFile(_task))
+
+    return ret
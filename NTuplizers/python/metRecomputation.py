@@ -0,0 +1,330 @@
+"""
+re-computation of PF-MET variants from the candidates stored by JMETriggerNTuple (numpy-only, does not require CMSSW)
+
+a variant is a selection of the candidates of one collection (e.g. hltParticleFlow, hltPuppiForMET, offlinePFCandidates):
+ - globalThreshold : minimum Et of the candidates (as in PFMETProducer, Et > globalThreshold)
+ - maxAbsEta       : maximum |eta| of the candidates
+ - pdgIds          : |pdgId| of the candidates used (None: all), excludePdgIds: |pdgId| of the candidates not used
+ - minFromPV       : charged candidates only if fromPV >= minFromPV (requires the variable "fromPV", e.g. offlinePFCandidates)
+ - maxDz           : charged candidates only if |vz - z(leading vertex of "vertices")| < maxDz (neutral candidates are always used)
+and, for every event, the following quantities are computed as in PFSpecificAlgo:
+ - MET (pt, phi) and sumEt
+ - fractions of sumEt by type of candidate (same names as the branches of reco::PFMET, e.g. "ChargedHadEtFraction")
+
+the per-candidate inputs (px, py, Et, Et by type) of a collection are computed once per chunk, and every variant is one
+masked segmented sum over the events (np.add.reduceat), so that all variants are evaluated in a single pass over the data;
+the recomputed METs are cross-checked against stored METs (e.g. hltPFMET from hltParticleFlow),
+in bins of the stored MET: profiles of the differences of pt, sumEt and fractions, and histograms of the relative differences of pt
+
+notes:
+ - collections with a fill condition (JMETriggerNTuple parameter "fillCollectionConditions") are empty in the events
+   where the condition is false: the recomputed values are NaN for events without candidates
+ - the candidates must be stored without selection and without a maximum number of objects to reproduce the stored MET
+"""
+import multiprocessing
+
+import numpy as np
+
+try:
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR
+    from JMETriggerAnalysis.NTuplizers.histograms import HistogramCollection, Hist1D, Profile1D
+    from JMETriggerAnalysis.NTuplizers.metPerformance import leading
+except ImportError:
+    from ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR
+    from histograms import HistogramCollection, Hist1D, Profile1D
+    from metPerformance import leading
+
+# fractions of sumEt of reco::PFMET: name -> |pdgId| of the candidates (reco::PFCandidate::ParticleType)
+FRACTIONS = [
+  ('ChargedHadEtFraction', 211),
+  ('ChargedEMEtFraction', 11),
+  ('MuonEtFraction', 13),
+  ('NeutralEMFraction', 22),
+  ('NeutralHadEtFraction', 130),
+  ('Type6EtFraction', 1),
+  ('Type7EtFraction', 2),
+]
+
+CHARGED_PDGIDS = [211, 11, 13]
+
+# variants: name -> parameters (see METVariant)
+VARIANTS = {
+  'hltPFMET_recomputed': {'collection': 'hltParticleFlow'},
+  'hltPFMET_globalThreshold1': {'collection': 'hltParticleFlow', 'globalThreshold': 1.},
+  'hltPFMET_maxAbsEta3': {'collection': 'hltParticleFlow', 'maxAbsEta': 3.},
+  'hltPFMET_noHF': {'collection': 'hltParticleFlow', 'excludePdgIds': [1, 2]},
+  'hltPFMET_chargedDz': {'collection': 'hltParticleFlow', 'maxDz': 0.2, 'vertices': 'hltPixelVertices'},
+  'hltPuppiMET_recomputed': {'collection': 'hltPuppiForMET'},
+  'hltPuppiMET_maxAbsEta3': {'collection': 'hltPuppiForMET', 'maxAbsEta': 3.},
+  'offlinePFMET_recomputed': {'collection': 'offlinePFCandidates'},
+  'offlinePFMET_chargedFromPV': {'collection': 'offlinePFCandidates', 'minFromPV': 1},
+}
+
+# cross-checks: variant -> list of stored METs (collection, prefix of variables)
+REFERENCES = {
+  'hltPFMET_recomputed': [('hltPFMET', '')],
+  'hltPuppiMET_recomputed': [('hltPuppiMET', '')],
+  'offlinePFMET_recomputed': [('offlineMETs', 'Raw_')],
+}
+
+MET_EDGES = np.array([0., 20., 40., 60., 80., 100., 120., 150., 200., 250., 300., 400., 600., 1000.])
+SUMET_EDGES = np.array([0., 250., 500., 750., 1000., 1250., 1500., 2000., 2500., 3000., 4000., 6000.])
+
+# binning of the histograms of (recomputed - stored) / stored MET pt
+RELDIFF_EDGES = np.linspace(-0.1, 0.1, 401)
+
+def segmentedSum(values, offsets):
+    """sum of values[..., offsets[i]:offsets[i+1]] for every event i (last axis), zero for empty events"""
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.diff(offsets)
+    ret = np.zeros(values.shape[:-1]+(len(counts),), dtype=np.float64)
+    nonEmpty = (counts > 0)
+    if np.any(nonEmpty):
+       # np.add.reduceat returns values[start] for empty segments: only the starts of non-empty events are used
+       ret[..., nonEmpty] = np.add.reduceat(values, offsets[:-1][nonEmpty], axis=-1)
+    return ret
+
+class METVariant(object):
+
+    def __init__(self, name, collection, globalThreshold=None, maxAbsEta=None, pdgIds=None, excludePdgIds=None, minFromPV=None, maxDz=None, vertices=None):
+        self.name = name
+        self.collection = collection
+        self.globalThreshold = globalThreshold
+        self.maxAbsEta = maxAbsEta
+        self.pdgIds = None if pdgIds is None else sorted(set(abs(int(_id)) for _id in pdgIds))
+        self.excludePdgIds = None if excludePdgIds is None else sorted(set(abs(int(_id)) for _id in excludePdgIds))
+        self.minFromPV = minFromPV
+        self.maxDz = maxDz
+        self.vertices = vertices
+        if (self.maxDz is not None) and (self.vertices is None):
+           raise ValueError('METVariant "'+name+'": parameter "maxDz" requires a collection of vertices (parameter "vertices")')
+
+    def variables(self):
+        """variables of the candidates used by the selection (in addition to the inputs of the MET)"""
+        ret = []
+        if self.minFromPV is not None:
+           ret += ['fromPV']
+        if self.maxDz is not None:
+           ret += ['vz']
+        return ret
+
+    def mask(self, inputs, chunk):
+        """boolean mask of the candidates of the collection used by the variant"""
+        ret = np.ones(len(inputs.et), dtype=bool)
+        if self.globalThreshold is not None:
+           ret &= (inputs.et > self.globalThreshold)
+        if self.maxAbsEta is not None:
+           ret &= (inputs.absEta < self.maxAbsEta)
+        if self.pdgIds is not None:
+           ret &= np.isin(inputs.absPdgId, self.pdgIds)
+        if self.excludePdgIds is not None:
+           ret &= ~np.isin(inputs.absPdgId, self.excludePdgIds)
+        if self.minFromPV is not None:
+           ret &= ~inputs.charged | (np.asarray(inputs.collection['fromPV']) >= self.minFromPV)
+        if self.maxDz is not None:
+           _pvz = inputs.vertexZ(chunk, self.vertices)
+           with np.errstate(invalid='ignore'):
+               ret &= ~inputs.charged | (np.abs(np.asarray(inputs.collection['vz'], dtype=np.float64) - _pvz) < self.maxDz)
+        return ret
+
+class CandidateInputs(object):
+    """per-candidate inputs of the MET of one collection in one chunk (computed once, shared by all variants):
+       rows of self.values are px, py, Et, and Et of every type of candidate (see FRACTIONS)"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.offsets = collection.offsets
+
+        _pt = np.asarray(collection['pt'], dtype=np.float64)
+        _eta = np.asarray(collection['eta'], dtype=np.float64)
+        _phi = np.asarray(collection['phi'], dtype=np.float64)
+
+        # Et = E * pt / p = sqrt(pt^2 + m^2 / cosh(eta)^2)
+        if 'mass' in collection:
+           _mass = np.asarray(collection['mass'], dtype=np.float64)
+           self.et = np.sqrt(_pt*_pt + np.square(_mass / np.cosh(_eta)))
+        else:
+           self.et = _pt
+
+        self.absEta = np.abs(_eta)
+        self.absPdgId = np.abs(np.asarray(collection['pdgId'], dtype=np.int64))
+        self.charged = np.isin(self.absPdgId, CHARGED_PDGIDS)
+
+        self.values = np.empty((3+len(FRACTIONS), len(_pt)), dtype=np.float64)
+        self.values[0] = _pt * np.cos(_phi)
+        self.values[1] = _pt * np.sin(_phi)
+        self.values[2] = self.et
+        for _idx, (_frac, _pdgId) in enumerate(FRACTIONS):
+            self.values[3+_idx] = np.where(self.absPdgId == _pdgId, self.et, 0.)
+
+        self._vertexZ = {}
+
+    def vertexZ(self, chunk, vertices):
+        """z of the leading vertex of the event of every candidate (NaN for events without vertices)"""
+        if vertices not in self._vertexZ:
+           self._vertexZ[vertices] = np.repeat(leading(chunk[vertices], 'z'), np.diff(self.offsets))
+        return self._vertexZ[vertices]
+
+    def met(self, mask=None):
+        """dict of per-event arrays (pt, phi, sumEt, fractions) of the MET of the selected candidates
+           (NaN for events without candidates)"""
+        _sums = segmentedSum(self.values if mask is None else self.values * mask, self.offsets)
+        _mex, _mey, _sumEt = -_sums[0], -_sums[1], _sums[2]
+        _empty = (np.diff(self.offsets) == 0)
+
+        ret = {'pt': np.hypot(_mex, _mey), 'phi': np.arctan2(_mey, _mex), 'sumEt': _sumEt}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _idx, (_frac, _pdgId) in enumerate(FRACTIONS):
+                ret[_frac] = np.where(_sumEt > 0, _sums[3+_idx] / _sumEt, 0.)
+        for _key in ret:
+            ret[_key][_empty] = np.nan
+        return ret
+
+class METRecomputation(object):
+
+    def __init__(self, variants=None, references=None, metEdges=MET_EDGES, sumEtEdges=SUMET_EDGES, relDiffEdges=RELDIFF_EDGES):
+        _variants = VARIANTS if variants is None else variants
+        self.variants = [METVariant(_name, **_variants[_name]) for _name in sorted(_variants)]
+        self.references = dict(REFERENCES if references is None else references)
+        for _name in self.references:
+            if _name not in _variants:
+               raise KeyError('cross-check of unknown variant "'+_name+'"')
+        self.metEdges = np.asarray(metEdges, dtype=np.float64)
+        self.sumEtEdges = np.asarray(sumEtEdges, dtype=np.float64)
+        self.relDiffEdges = np.asarray(relDiffEdges, dtype=np.float64)
+        self.histograms = HistogramCollection()
+
+    def collections(self):
+        ret = set()
+        for _var in self.variants:
+            ret.add(_var.collection)
+            if _var.vertices is not None:
+               ret.add(_var.vertices)
+        for _refs in self.references.values():
+            ret.update([_ref[0] for _ref in _refs])
+        return sorted(ret)
+
+    def variables(self):
+        ret = {}
+        for _var in self.variants:
+            ret.setdefault(_var.collection, set()).update(['pt', 'eta', 'phi', 'mass', 'pdgId'] + _var.variables())
+            if _var.vertices is not None:
+               ret.setdefault(_var.vertices, set()).add('z')
+        for _refs in self.references.values():
+            for _coll, _prefix in _refs:
+                ret.setdefault(_coll, set()).update([_prefix+'pt', _prefix+'phi', _prefix+'sumEt'] + [_prefix+_frac for _frac, _pdgId in FRACTIONS])
+        return dict((_coll, sorted(ret[_coll])) for _coll in ret)
+
+    def _book(self, key, edges, factory):
+        if key not in self.histograms:
+           self.histograms[key] = factory(edges)
+        return self.histograms[key]
+
+    def compute(self, chunk):
+        """dict {variant: dict of per-event arrays} for the events of one Chunk of ntupleReader
+           (variants whose collection is not available in the chunk are skipped)"""
+        inputs = {}
+        ret = {}
+        for _var in self.variants:
+            if (_var.collection not in chunk) or ((_var.vertices is not None) and (_var.vertices not in chunk)):
+               continue
+            if _var.collection not in inputs:
+               inputs[_var.collection] = CandidateInputs(chunk[_var.collection])
+            _inputs = inputs[_var.collection]
+            ret[_var.name] = _inputs.met(_var.mask(_inputs, chunk))
+        return ret
+
+    def process(self, chunk):
+        """fill histograms with the events of one Chunk of ntupleReader"""
+        mets = self.compute(chunk)
+
+        for _name in sorted(mets):
+            _met = mets[_name]
+            _filled = np.isfinite(_met['pt'])
+            self._book(_name+'__pt', self.metEdges, Hist1D).fill(_met['pt'][_filled])
+            self._book(_name+'__sumEt', self.sumEtEdges, Hist1D).fill(_met['sumEt'][_filled])
+
+            for _coll, _prefix in self.references.get(_name, []):
+                if _coll not in chunk:
+                   continue
+                _ref = chunk[_coll]
+                _refPt = leading(_ref, _prefix+'pt')
+                _mask = _filled & np.isfinite(_refPt)
+                _x = _refPt[_mask]
+
+                _key = _name+'_vs_'+_coll+('_'+_prefix[:-1] if _prefix else '')
+                self._book(_key+'__deltaPt', self.metEdges, Profile1D).fill(_x, _met['pt'][_mask] - _x)
+                _dphi = np.angle(np.exp(1j * (_met['phi'][_mask] - leading(_ref, _prefix+'phi')[_mask])))
+                self._book(_key+'__deltaPhi', self.metEdges, Profile1D).fill(_x, _dphi)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    self._book(_key+'__relDeltaPt', self.relDiffEdges, Hist1D).fill(np.where(_x > 0, _met['pt'][_mask] / _x - 1., 0.))
+
+                for _var in ['sumEt'] + [_frac for _frac, _pdgId in FRACTIONS]:
+                    if (_prefix+_var) in _ref:
+                       self._book(_key+'__delta'+_var[:1].upper()+_var[1:], self.metEdges, Profile1D).fill(_x, _met[_var][_mask] - leading(_ref, _prefix+_var)[_mask])
+
+        return self
+
+    def merge(self, other):
+        self.histograms += other.histograms
+        return self
+
+def summary(histograms, tolerance=0.01):
+    """dict of results per cross-check (variant vs stored MET): number of events, mean and RMS of the differences
+       (over all bins of stored MET), and fraction of events with |relative difference of pt| < tolerance"""
+    ret = {}
+    for _key in sorted(histograms):
+        if not _key.endswith('__deltaPt'):
+           continue
+        _base = _key[:-len('__deltaPt')]
+        _res = {}
+        for _hkey in sorted(histograms):
+            if (not _hkey.startswith(_base+'__delta')) or (not isinstance(histograms[_hkey], Profile1D)):
+               continue
+            _prof = histograms[_hkey]
+            _n = np.sum(_prof.sumw)
+            _mean = np.sum(_prof.sumwy) / _n if _n > 0 else np.nan
+            _rms = np.sqrt(max(np.sum(_prof.sumwy2) / _n - _mean*_mean, 0.)) if _n > 0 else np.nan
+            _res[_hkey[len(_base)+2:]] = {'mean': float(_mean), 'rms': float(_rms)}
+        _rel = histograms[_base+'__relDeltaPt']
+        _n = np.sum(_rel.sumw)
+        _centers = 0.5 * (_rel.edges[1:] + _rel.edges[:-1])
+        _inTol = np.sum(_rel.sumw[1:-1][np.abs(_centers) < tolerance])
+        _res['events'] = float(_n)
+        _res['fractionWithinTolerance'] = float(_inTol / _n) if _n > 0 else np.nan
+        _res['tolerance'] = tolerance
+        ret[_base] = _res
+    return ret
+
+def _processFile(args):
+    fileName, treeName, cacheDir, chunkSize, config = args
+    recomp = METRecomputation(**config)
+    reader = NTupleReader([fileName], treeName=treeName, cacheDir=cacheDir)
+    available = set(reader.collections())
+    collections = [_coll for _coll in recomp.collections() if _coll in available]
+    variables = recomp.variables()
+    for _coll in collections:
+        variables[_coll] = [_var for _var in variables[_coll] if _var in reader.variables(_coll)]
+    for chunk in reader.iterate(collections=collections, variables=variables, chunkSize=chunkSize):
+        recomp.process(chunk)
+    return recomp.histograms.toDict()
+
+def run(files, treeName=DEFAULT_TREE, cacheDir=DEFAULT_CACHE_DIR, chunkSize=100000, nProcesses=1, config=None):
+    """process a list of files (one file per task of a process pool), returns the merged HistogramCollection"""
+    config = {} if config is None else config
+    tasks = [(_f, treeName, cacheDir, chunkSize, config) for _f in files]
+
+    ret = HistogramCollection()
+    if nProcesses > 1:
+       pool = multiprocessing.Pool(nProcesses)
+       try:
+          for _hists in pool.imap_unordered(_processFile, tasks):
+              ret += HistogramCollection.fromDict(_hists)
+       finally:
+          pool.close()
+          pool.join()
+    else:
+       for _task in tasks:
+           ret += HistogramCollection.fromDict(_processFile(_task))
+
+    return ret
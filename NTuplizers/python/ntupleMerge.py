@@ -0,0 +1,298 @@
+"""
+resumable merge of the outputs of JMETriggerNTuple (e.g. the output files of the crab3 tasks of NTuplizers/test/crab3cfg_*.py),
+and validation of the merged output
+
+merge (requires PyROOT):
+ - the input files are merged with a tree reduction: groups of at most fanIn files are merged into intermediate files
+   by the processes of a pool, then the intermediate files are merged in the same way, until one file is left
+ - every merge uses TFileMerger; baskets are copied without recompression (fast method) if the compression settings
+   of all the inputs of the merge are the same as the ones of the output (as in hadd), otherwise they are recompressed
+ - the completed merges are recorded in a checkpoint (.json file in the work directory) after every merge,
+   so an interrupted merge resumes from the completed ones (outputs are written to temporary files and renamed when complete)
+
+validation (requires uproot):
+ - duplicates : events ("run", "luminosityBlock", "event") found more than once
+ - coverage   : luminosity sections of the output outside the lumi mask,
+                and luminosity sections of the lumi mask not found in the output (gaps);
+                the luminosity sections of the output are the ones of the TTree "LuminosityBlocks" if available
+                (luminosity sections processed, also without events written), otherwise the ones of the events
+"""
+from __future__ import print_function
+import os
+import json
+import hashlib
+import multiprocessing
+
+import numpy as np
+
+try:
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import DEFAULT_TREE, fileFingerprint, luminosityBlockSummary
+    from JMETriggerAnalysis.NTuplizers.lumiMask import LumiMask
+except ImportError:
+    from ntupleReader import DEFAULT_TREE, fileFingerprint, luminosityBlockSummary
+    from lumiMask import LumiMask
+
+CHECKPOINT_NAME = 'mergeCheckpoint.json'
+
+def findInputFiles(paths, pattern='.root'):
+    """list of input files: files, and files ending with pattern in directories (recursive; "failed" directories of crab are skipped)"""
+    ret = []
+    for _path in paths:
+        if os.path.isdir(_path):
+           for _dirpath, _dirnames, _filenames in os.walk(_path):
+               _dirnames[:] = sorted(_dir for _dir in _dirnames if _dir != 'failed')
+               ret += [os.path.join(_dirpath, _f) for _f in sorted(_filenames) if _f.endswith(pattern)]
+        else:
+           ret += [_path]
+    return ret
+
+def planMerge(files, output, workDir, fanIn):
+    """list of levels of the tree reduction, every level is a list of tasks {'name', 'inputs', 'output'}"""
+    if fanIn < 2:
+       raise ValueError('invalid fan-in of the merge (must be >= 2): '+str(fanIn))
+
+    levels = []
+    current = list(files)
+    while True:
+        _last = (len(current) <= fanIn)
+        _tasks = []
+        for _idx in range(0, len(current), fanIn):
+            _name = 'level{:d}_{:05d}'.format(len(levels), _idx // fanIn)
+            _tasks.append({
+              'name': _name,
+              'inputs': current[_idx:_idx+fanIn],
+              'output': output if _last else os.path.join(workDir, _name+'.root'),
+            })
+        levels.append(_tasks)
+        if _last:
+           break
+        current = [_task['output'] for _task in _tasks]
+
+    return levels
+
+def compressionSettings(fileName):
+    import ROOT
+    _file = ROOT.TFile.Open(fileName)
+    if (not _file) or _file.IsZombie():
+       raise RuntimeError('failed to open file: '+fileName)
+    ret = _file.GetCompressionSettings()
+    _file.Close()
+    return ret
+
+def _mergeTask(args):
+    """merge the inputs of one task (function of the process pool); returns dict with the result of the merge"""
+    task, compression = args
+    ret = {'name': task['name'], 'output': task['output'], 'error': None}
+    try:
+       import ROOT
+       ROOT.gROOT.SetBatch(True)
+
+       # baskets are copied without recompression only if all inputs have the compression settings of the output
+       _inputCompression = [compressionSettings(_f) for _f in task['inputs']]
+       ret['fast'] = all(_comp == compression for _comp in _inputCompression)
+
+       merger = ROOT.TFileMerger(False, False)
+       merger.SetPrintLevel(0)
+       merger.SetFastMethod(ret['fast'])
+       for _f in task['inputs']:
+           if not merger.AddFile(_f, False):
+              raise RuntimeError('failed to add input file: '+_f)
+
+       _tmpFile = task['output']+'.tmp'+str(os.getpid())+'.root'
+       if not merger.OutputFile(_tmpFile, 'RECREATE', compression):
+          raise RuntimeError('failed to create output file: '+_tmpFile)
+       if not merger.Merge():
+          raise RuntimeError('TFileMerger::Merge failed')
+
+       os.rename(_tmpFile, task['output'])
+       ret['size'] = os.path.getsize(task['output'])
+    except Exception as ex:
+       ret['error'] = str(ex)
+    return ret
+
+class MergeCheckpoint(object):
+    """completed merges of a tree reduction (.json file, rewritten after every merge)"""
+
+    def __init__(self, path, config):
+        self.path = path
+        self.config = config
+        self.tasks = {}
+        if os.path.isfile(path):
+           with open(path) as _jfile:
+                _tmp = json.load(_jfile)
+           if _tmp['config'] != config:
+              raise RuntimeError('checkpoint of a different merge (inputs, output, fan-in or compression differ), use a new work directory or remove: '+path)
+           self.tasks = _tmp['tasks']
+
+    def isDone(self, task):
+        """task completed, and its output unchanged (or already merged and removed)"""
+        _done = self.tasks.get(task['name'], None)
+        if _done is None:
+           return False
+        return _done.get('consumed', False) or (os.path.isfile(task['output']) and (os.path.getsize(task['output']) == _done['size']))
+
+    def setDone(self, result):
+        self.tasks[result['name']] = {'size': result['size'], 'fast': result['fast']}
+        self.write()
+
+    def setConsumed(self, names):
+        """outputs of the tasks were merged, and removed"""
+        for _name in names:
+            self.tasks[_name]['consumed'] = True
+        self.write()
+
+    def write(self):
+        _tmpFile = self.path+'.tmp'
+        with open(_tmpFile, 'w') as _jfile:
+             json.dump({'config': self.config, 'tasks': self.tasks}, _jfile, indent=1, sort_keys=True)
+        os.rename(_tmpFile, self.path)
+
+def merge(files, output, workDir, fanIn=20, nProcesses=1, compression=None, keepIntermediate=False, verbosity=0):
+    """tree reduction of the input files into the output file (resumed from the checkpoint in workDir, if any);
+       returns the list of results of the merges done in this call"""
+    if len(files) == 0:
+       raise ValueError('empty list of input files')
+
+    if not os.path.isdir(workDir):
+       os.makedirs(workDir)
+
+    # default compression settings of the output: the ones of the first input (as "hadd -ff")
+    if compression is None:
+       compression = compressionSettings(files[0])
+
+    output = os.path.abspath(output)
+    levels = planMerge([os.path.abspath(_f) for _f in files], output, os.path.abspath(workDir), fanIn)
+
+    # the tasks depend on the order of the input files
+    _sha = hashlib.sha1()
+    for _tmp in (fileFingerprint(_f) for _f in files):
+        _sha.update(repr(_tmp).encode('utf-8'))
+    checkpoint = MergeCheckpoint(os.path.join(workDir, CHECKPOINT_NAME), {
+      'inputs': _sha.hexdigest(),
+      'output': output,
+      'fanIn': fanIn,
+      'compression': compression,
+    })
+
+    results = []
+    pool = multiprocessing.Pool(nProcesses, maxtasksperchild=1) if nProcesses > 1 else None
+    try:
+       for _level, _tasks in enumerate(levels):
+           _todo = [_task for _task in _tasks if not checkpoint.isDone(_task)]
+           if verbosity > 0:
+              print('level {:d}: {:d} merges ({:d} completed in previous runs)'.format(_level, len(_tasks), len(_tasks)-len(_todo)))
+
+           _args = [(_task, compression) for _task in _todo]
+           _errors = []
+           for _res in (pool.imap_unordered(_mergeTask, _args) if pool else map(_mergeTask, _args)):
+               if _res['error'] is not None:
+                  _errors.append(_res)
+                  continue
+               checkpoint.setDone(_res)
+               results.append(_res)
+               if verbosity > 1:
+                  print('  {:s} -> {:s} ({:d} bytes, {:s})'.format(_res['name'], _res['output'], _res['size'], 'fast' if _res['fast'] else 'recompressed'))
+
+           if _errors:
+              raise RuntimeError('{:d} merge(s) failed at level {:d} (completed merges are kept, rerun to resume):\n'.format(len(_errors), _level)
+                + '\n'.join('  '+_err['name']+': '+_err['error'] for _err in _errors))
+
+           # inputs of the level are not needed anymore, if intermediate
+           if (_level > 0) and (not keepIntermediate):
+              checkpoint.setConsumed([_task['name'] for _task in levels[_level-1]])
+              for _task in _tasks:
+                  for _f in _task['inputs']:
+                      if os.path.isfile(_f):
+                         os.remove(_f)
+    finally:
+       if pool:
+          pool.close()
+          pool.join()
+
+    return results
+
+#### validation
+def lumiKeys(runs, lumis):
+    return (np.asarray(runs, dtype=np.uint64) << np.uint64(32)) | np.asarray(lumis, dtype=np.uint64)
+
+def readEventIDs(fileName, treeName=DEFAULT_TREE, chunkSize=1000000):
+    """arrays of "run", "luminosityBlock" and "event" of a TTree"""
+    import uproot
+    runs, lumis, events = [], [], []
+    with uproot.open(fileName) as _file:
+        for _arrays in _file[treeName].iterate(['run', 'luminosityBlock', 'event'], step_size=chunkSize, library='np'):
+            runs.append(_arrays['run'])
+            lumis.append(_arrays['luminosityBlock'])
+            events.append(_arrays['event'])
+    if not runs:
+       return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint64)
+    return np.concatenate(runs), np.concatenate(lumis), np.concatenate(events)
+
+def compressRanges(values):
+    """list of [first, last] ranges of a sorted array of integers"""
+    if len(values) == 0:
+       return []
+    _breaks = np.flatnonzero(np.diff(values) != 1)
+    _first = np.concatenate(([0], _breaks+1))
+    _last = np.concatenate((_breaks, [len(values)-1]))
+    return [[int(values[_i]), int(values[_j])] for _i, _j in zip(_first, _last)]
+
+def validate(fileName, lumiMask=None, treeName=DEFAULT_TREE, allRuns=False, maxReported=20):
+    """dict with the results of the checks of duplicates and coverage of one (merged) file (lumiMask: LumiMask object):
+       gaps are the luminosity sections of the lumi mask not found in the file (only for the runs found in the file, unless allRuns)"""
+    runs, lumis, events = readEventIDs(fileName, treeName)
+
+    ret = {'file': fileName, 'entries': len(events)}
+
+    # duplicate events
+    _order = np.lexsort((events, lumis, runs))
+    _sorted = [runs[_order], lumis[_order], events[_order]]
+    _dup = np.ones(max(len(events)-1, 0), dtype=bool)
+    for _arr in _sorted:
+        _dup &= (_arr[1:] == _arr[:-1])
+    _dupIdx = _order[1:][_dup]
+    ret['duplicates'] = int(np.count_nonzero(_dup))
+    ret['duplicateEvents'] = [[int(runs[_i]), int(lumis[_i]), int(events[_i])] for _i in _dupIdx[:maxReported]]
+
+    # luminosity sections of the output: processed (TTree "LuminosityBlocks"), or with entries
+    try:
+       _summary = luminosityBlockSummary([fileName], treeName=treeName)
+    except KeyError:
+       _summary = None
+
+    if _summary is not None:
+       ret['eventsSeen'] = int(np.sum(_summary['eventsSeen']))
+       ret['eventsWritten'] = int(np.sum(_summary['eventsWritten']))
+       # events of the TTree "Events" not counted in "LuminosityBlocks" (e.g. inputs of the merge without the luminosity block summary)
+       ret['eventsNotInSummary'] = len(events) - ret['eventsWritten']
+       _keys = lumiKeys(_summary['run'], _summary['luminosityBlock'])
+    else:
+       _keys = np.unique(lumiKeys(runs, lumis))
+
+    _runs = (_keys >> np.uint64(32)).astype(np.int64)
+    _lumis = (_keys & np.uint64(0xFFFFFFFF)).astype(np.int64)
+    ret['runs'] = sorted(set(int(_r) for _r in np.unique(_runs)))
+    ret['lumis'] = len(_keys)
+
+    if lumiMask is None:
+       return ret
+
+    # luminosity sections outside the lumi mask
+    _inMask = lumiMask.containsArray(_runs, _lumis)
+
+    ret['lumisOutsideMask'] = int(np.count_nonzero(~_inMask))
+    ret['lumisOutsideMaskList'] = dict((str(_run), compressRanges(_lumis[(~_inMask) & (_runs == _run)])) for _run in np.unique(_runs[~_inMask])[:maxReported])
+
+    # gaps: luminosity sections of the lumi mask without entries
+    ret['gaps'] = 0
+    ret['gapsList'] = {}
+    _maskRuns = set(lumiMask.runs())
+    for _run in (lumiMask.runs() if allRuns else [_r for _r in ret['runs'] if _r in _maskRuns]):
+        _expected = lumiMask.lumis(_run)
+        _missing = np.setdiff1d(_expected, _lumis[_runs == _run], assume_unique=True)
+        if len(_missing) > 0:
+           ret['gaps'] += len(_missing)
+           if len(ret['gapsList']) < maxReported:
+              ret['gapsList'][str(_run)] = compressRanges(_missing)
+
+    return ret
@@ -0,0 +1,368 @@
+"""
+columnar reader of the output of JMETriggerNTuple (does not require CMSSW, only uproot and numpy)
+
+branches of the output TTree are grouped as follows:
+ - scalars     : one value per event (e.g. "run", "event", HLT paths)
+ - collections : variable-size arrays, named "<collection>_<variable>" (e.g. "hltAK4PFJetsCorrected_pt");
+                 every collection is returned as one array of counts (and offsets) per event,
+                 and one flat array per variable
+ - counts      : with the "flat" output layout of JMETriggerNTuple (parameter "outputLayout"), the number of objects
+                 of every collection is stored in the branch "<collection>_n" (variables are C-arrays instead of std::vector)
+
+example:
+  reader = NTupleReader(['ntuple1.root', 'ntuple2.root'])
+  for chunk in reader.iterate(collections=['hltPFMET', 'offlineMETs'], scalars=['run', 'event'], chunkSize=50000):
+      met = chunk['hltPFMET']
+      leadingPt = met['pt'][met.offsets[:-1][met.counts > 0]]
+
+the delta-R matches computed by JMETriggerNTuple (parameter "collectionMatches", branches "<collection>_matchIdx_<other>")
+are used to gather the variables of the matched objects, aligned with the objects of the collection (NaN: no match):
+  hltJets = chunk['hltAK4PFJetsCorrected']
+  offlinePt = hltJets.gatherMatched(chunk['offlineAK4PFCHSJetsCorrected'], 'pt')
+  response = hltJets['pt'] / offlinePt
+
+the TTree "LuminosityBlocks" (JMETriggerNTuple parameter "luminosityBlockSummary") gives the number of events
+seen, passing the TriggerResults filter and written for every luminosity block, without reading the TTree of events:
+  summary = luminosityBlockSummary(['ntuple1.root', 'ntuple2.root'], lumiMask=LumiMask.fromJSON('golden.json'))
+
+with a skim index (see skimIndex.py), only the clusters of the TTree containing selected entries are read:
+  for chunk in reader.iterate(collections=['offlineMETs'], selection='HLT_IsoMu24 && offlineIsolatedMuons_size >= 1'):
+      ...
+"""
+import os
+import json
+import hashlib
+
+import numpy as np
+
+try:
+    from JMETriggerAnalysis.NTuplizers.skimIndex import SkimIndex, indexFileName, clusterRanges
+except ImportError:
+    from skimIndex import SkimIndex, indexFileName, clusterRanges
+
+DEFAULT_TREE = 'JMETriggerNTuple/Events'
+DEFAULT_LUMI_TREE_NAME = 'LuminosityBlocks'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'jmeTriggerNTupleReader')
+
+class JaggedCollection(object):
+    """variables of one collection: counts/offsets per event, flat content per variable"""
+
+    def __init__(self, name, counts, content):
+        self.name = name
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.offsets = np.zeros(len(self.counts)+1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.offsets[1:])
+        self.content = content
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getitem__(self, var):
+        return self.content[var]
+
+    def __contains__(self, var):
+        return var in self.content
+
+    def variables(self):
+        return sorted(self.content.keys())
+
+    def eventIndex(self):
+        """index of the event of every element of the flat arrays"""
+        return np.repeat(np.arange(len(self.counts)), self.counts)
+
+    def firstIndex(self):
+        """positions of the first (e.g. leading) element of every event, -1 for empty events"""
+        return np.where(self.counts > 0, self.offsets[:-1], -1)
+
+    def gatherMatched(self, other, variable, default=np.nan):
+        """values of a variable of the objects of the collection "other" matched to the objects of this collection
+           (flat array aligned with the variables of this collection, default value for objects without match),
+           from the indices of the branch "<collection>_matchIdx_<other>" (JMETriggerNTuple parameter "collectionMatches")"""
+        _idx = np.asarray(self.content['matchIdx_'+other.name], dtype=np.int64)
+        _pos = other.offsets[:-1][self.eventIndex()] + _idx
+        _values = np.asarray(other[variable])
+        ret = np.full(len(_idx), default, dtype=np.result_type(_values.dtype, np.asarray(default).dtype))
+        _matched = (_idx >= 0)
+        ret[_matched] = _values[_pos[_matched]]
+        return ret
+
+    def event(self, idx):
+        """dict of the variables of one event (for debugging)"""
+        return dict((var, self.content[var][self.offsets[idx]:self.offsets[idx+1]]) for var in self.content)
+
+    def toAwkward(self):
+        """awkward array of records (requires awkward)"""
+        import awkward as ak
+        return ak.zip(dict((var, ak.unflatten(self.content[var], self.counts)) for var in self.content))
+
+class Chunk(object):
+    """entries [start, stop) of one input file
+       (with a selection, only the selected entries of the range, whose entry numbers are given by the attribute "entries")"""
+
+    def __init__(self, fileName, start, stop, scalars, collections, entries=None):
+        self.fileName = fileName
+        self.start = start
+        self.stop = stop
+        self.scalars = scalars
+        self.collections = collections
+        self.entries = entries
+
+    def __len__(self):
+        return (self.stop - self.start) if self.entries is None else len(self.entries)
+
+    def __getitem__(self, key):
+        if key in self.collections:
+           return self.collections[key]
+        return self.scalars[key]
+
+    def __contains__(self, key):
+        return (key in self.collections) or (key in self.scalars)
+
+def fileFingerprint(path):
+    """(path, size, mtime) of a local file, (path, None, None) for remote files"""
+    if os.path.isfile(path):
+       stat = os.stat(path)
+       return (os.path.abspath(path), stat.st_size, int(stat.st_mtime))
+    return (path, None, None)
+
+def fingerprint(files, treeName):
+    sha = hashlib.sha1()
+    sha.update(treeName.encode('utf-8'))
+    for _tmp in sorted(fileFingerprint(_f) for _f in files):
+        sha.update(repr(_tmp).encode('utf-8'))
+    return sha.hexdigest()
+
+def splitBranchName(branchName):
+    """collection and variable of a branch (separated by the first underscore)"""
+    pos = branchName.find('_')
+    if pos <= 0:
+       return None, branchName
+    return branchName[:pos], branchName[pos+1:]
+
+def inferSchema(fileName, treeName=DEFAULT_TREE):
+    """dict with scalars ({branch: dtype}), collections ({collection: {variable: dtype}})
+       and count branches of the collections ({collection: branch}) of a TTree"""
+    import uproot
+
+    schema = {'scalars': {}, 'collections': {}, 'counts': {}}
+    with uproot.open(fileName) as _file:
+        _tree = _file[treeName]
+        for _brName, _br in _tree.items(filter_typename=None, recursive=False):
+            _interp = _br.interpretation
+            _isJagged = isinstance(_interp, uproot.interpretation.jagged.AsJagged)
+            _dtype = str(getattr(_interp.content if _isJagged else _interp, 'to_dtype', ''))
+            if _isJagged:
+               _coll, _var = splitBranchName(_brName)
+               if _coll is None:
+                  raise RuntimeError('invalid name of branch with variable-size arrays (expected "<collection>_<variable>"): '+_brName)
+               schema['collections'].setdefault(_coll, {})[_var] = _dtype
+            else:
+               schema['scalars'][_brName] = _dtype
+
+    # count branches of the collections (flat output layout)
+    for _coll in schema['collections']:
+        if _coll+'_n' in schema['scalars']:
+           schema['counts'][_coll] = _coll+'_n'
+           del schema['scalars'][_coll+'_n']
+
+    return schema
+
+def loadSchema(files, treeName=DEFAULT_TREE, cacheDir=DEFAULT_CACHE_DIR):
+    """schema of a set of files (inferred from the first file), cached in a .json file
+       keyed by the (path, size, mtime) of every file of the set"""
+    if len(files) == 0:
+       raise ValueError('empty list of input files')
+
+    cacheFile = None
+    if cacheDir is not None:
+       cacheFile = os.path.join(cacheDir, 'schema_'+fingerprint(files, treeName)+'.json')
+       if os.path.isfile(cacheFile):
+          try:
+             with open(cacheFile) as _jfile:
+                  return json.load(_jfile)
+          except ValueError:
+             pass
+
+    schema = inferSchema(files[0], treeName)
+
+    if cacheFile is not None:
+       if not os.path.isdir(cacheDir):
+          os.makedirs(cacheDir)
+       _tmpFile = cacheFile+'.tmp'+str(os.getpid())
+       with open(_tmpFile, 'w') as _jfile:
+            json.dump(schema, _jfile, indent=1, sort_keys=True)
+       os.rename(_tmpFile, cacheFile)
+
+    return schema
+
+def lumiTreeName(treeName=DEFAULT_TREE):
+    """path of the TTree "LuminosityBlocks" (same directory as the TTree of events)"""
+    _dir = treeName.rpartition('/')[0]
+    return (_dir+'/' if _dir else '')+DEFAULT_LUMI_TREE_NAME
+
+def luminosityBlockSummary(files, treeName=DEFAULT_TREE, lumiMask=None):
+    """dict of numpy arrays "run", "luminosityBlock", "eventsSeen", "eventsPassingFilter", "eventsWritten"
+       from the TTree "LuminosityBlocks" of the input files, one entry per luminosity block sorted by (run, luminosityBlock)
+       (the counts of a luminosity block found more than once, e.g. split across jobs, are summed);
+       lumiMask: LumiMask object to select luminosity blocks (None: all)"""
+    import uproot
+
+    _counts = ['eventsSeen', 'eventsPassingFilter', 'eventsWritten']
+    _arrays = dict((_key, []) for _key in ['run', 'luminosityBlock']+_counts)
+    for _fileName in ([files] if isinstance(files, str) else files):
+        with uproot.open(_fileName) as _file:
+            if lumiTreeName(treeName) not in _file:
+               raise KeyError('TTree "'+lumiTreeName(treeName)+'" not found (JMETriggerNTuple parameter "luminosityBlockSummary"): '+_fileName)
+            _tmp = _file[lumiTreeName(treeName)].arrays(list(_arrays.keys()), library='np')
+            for _key in _arrays:
+                _arrays[_key].append(_tmp[_key])
+
+    _arrays = dict((_key, np.concatenate(_arrays[_key])) for _key in _arrays)
+
+    _keys = (_arrays['run'].astype(np.uint64) << np.uint64(32)) | _arrays['luminosityBlock'].astype(np.uint64)
+    _unique, _inverse = np.unique(_keys, return_inverse=True)
+
+    ret = {
+      'run': (_unique >> np.uint64(32)).astype(np.uint32),
+      'luminosityBlock': (_unique & np.uint64(0xFFFFFFFF)).astype(np.uint32),
+    }
+    for _key in _counts:
+        ret[_key] = np.bincount(_inverse, weights=_arrays[_key], minlength=len(_unique)).astype(np.uint64)
+
+    if lumiMask is not None:
+       _sel = lumiMask.containsArray(ret['run'], ret['luminosityBlock'])
+       ret = dict((_key, ret[_key][_sel]) for _key in ret)
+
+    return ret
+
+class NTupleReader(object):
+
+    def __init__(self, files, treeName=DEFAULT_TREE, cacheDir=DEFAULT_CACHE_DIR):
+        self.files = [files] if isinstance(files, str) else list(files)
+        self.treeName = treeName
+        self.schema = loadSchema(self.files, treeName=self.treeName, cacheDir=cacheDir)
+
+    def scalars(self):
+        return sorted(self.schema['scalars'].keys())
+
+    def collections(self):
+        return sorted(self.schema['collections'].keys())
+
+    def variables(self, collection):
+        return sorted(self.schema['collections'][collection].keys())
+
+    def branches(self, collections=None, scalars=None, variables=None):
+        """names of the branches to be read:
+           collections : list of collections (None: all collections)
+           scalars     : list of scalar branches (None: none)
+           variables   : dict {collection: [variables]} to read a subset of the variables of a collection"""
+        colls = self.collections() if collections is None else collections
+        ret = []
+        for _coll in colls:
+            if _coll not in self.schema['collections']:
+               raise KeyError('collection "'+_coll+'" not found in input files (available collections: '+str(self.collections())+')')
+            _vars = self.variables(_coll)
+            if (variables is not None) and (_coll in variables):
+               _vars = [_var for _var in _vars if _var in variables[_coll]]
+            ret += [_coll+'_'+_var for _var in _vars]
+            if _vars and (_coll in self.schema.get('counts', {})):
+               ret += [self.schema['counts'][_coll]]
+        for _scalar in ([] if scalars is None else scalars):
+            if _scalar not in self.schema['scalars']:
+               raise KeyError('scalar branch "'+_scalar+'" not found in input files')
+            ret += [_scalar]
+        return ret
+
+    def iterate(self, collections=None, scalars=None, variables=None, chunkSize=100000, maxEntries=-1, selection=None):
+        """generator of Chunk objects of at most chunkSize entries (chunks do not span multiple files);
+           selection: selection of the skim index of every input file (see skimIndex.py), or None (all entries)"""
+        import uproot
+        import awkward as ak
+
+        branches = self.branches(collections=collections, scalars=scalars, variables=variables)
+
+        if selection is not None:
+           for _chunk in self._iterateSelection(branches, selection, chunkSize, maxEntries, uproot, ak):
+               yield _chunk
+           return
+
+        nEntries = 0
+        for _fileName in self.files:
+            with uproot.open(_fileName) as _file:
+                _tree = _file[self.treeName]
+                _fileEntries = _tree.num_entries
+                for _start in range(0, _fileEntries, chunkSize):
+                    _stop = min(_start+chunkSize, _fileEntries)
+                    if maxEntries >= 0:
+                       _stop = min(_stop, _start+maxEntries-nEntries)
+                    if _stop <= _start:
+                       return
+
+                    _arrays = _tree.arrays(branches, entry_start=_start, entry_stop=_stop, library='ak', how=dict)
+                    yield self._makeChunk(_fileName, _start, _stop, _arrays, ak)
+
+                    nEntries += _stop-_start
+                    if (maxEntries >= 0) and (nEntries >= maxEntries):
+                       return
+
+    def skimIndex(self, fileName):
+        """skim index of an input file (see skimIndex.py)"""
+        _indexFile = indexFileName(fileName)
+        if not os.path.isfile(_indexFile):
+           raise RuntimeError('skim index not found (JMETriggerNTuple parameter "skimIndex"): '+_indexFile)
+        index = SkimIndex(_indexFile)
+        if index.treePath != self.treeName:
+           raise RuntimeError('skim index of TTree "'+index.treePath+'" (expected "'+self.treeName+'"): '+_indexFile)
+        return index
+
+    def selectedClusters(self, fileName, tree, selection):
+        """boolean array of the selected entries of an input file, and ranges [start, stop) of the clusters containing them"""
+        _index = self.skimIndex(fileName)
+        if _index.entries != tree.num_entries:
+           raise RuntimeError('skim index does not match TTree ('+str(_index.entries)+' != '+str(tree.num_entries)+' entries): '+_index.path)
+        mask = _index.select(selection)
+        return mask, clusterRanges(mask, tree.common_entry_offsets())
+
+    def _iterateSelection(self, branches, selection, chunkSize, maxEntries, uproot, ak):
+        """chunks of the clusters with selected entries (the other clusters are not read)"""
+        nEntries = 0
+        for _fileName in self.files:
+            with uproot.open(_fileName) as _file:
+                _tree = _file[self.treeName]
+                _mask, _ranges = self.selectedClusters(_fileName, _tree, selection)
+                for _rangeStart, _rangeStop in _ranges:
+                    for _start in range(_rangeStart, _rangeStop, chunkSize):
+                        _stop = min(_start+chunkSize, _rangeStop)
+                        _entries = np.flatnonzero(_mask[_start:_stop]) + _start
+                        if maxEntries >= 0:
+                           _entries = _entries[:maxEntries-nEntries]
+                        if len(_entries) == 0:
+                           continue
+
+                        _stop = int(_entries[-1]) + 1
+                        _arrays = _tree.arrays(branches, entry_start=_start, entry_stop=_stop, library='ak', how=dict)
+                        _arrays = dict((_brName, _arrays[_brName][_entries-_start]) for _brName in _arrays)
+                        yield self._makeChunk(_fileName, _start, _stop, _arrays, ak, entries=_entries)
+
+                        nEntries += len(_entries)
+                        if (maxEntries >= 0) and (nEntries >= maxEntries):
+                           return
+
+    def _makeChunk(self, fileName, start, stop, arrays, ak, entries=None):
+        scalars, counts, contents = {}, {}, {}
+        countBranches = dict((_brName, _coll) for _coll, _brName in self.schema.get('counts', {}).items())
+        for _brName in arrays:
+            if _brName in self.schema['scalars']:
+               scalars[_brName] = ak.to_numpy(arrays[_brName])
+               continue
+            if _brName in countBranches:
+               counts[countBranches[_brName]] = ak.to_numpy(arrays[_brName])
+               continue
+            _coll, _var = splitBranchName(_brName)
+            if _coll not in counts:
+               counts[_coll] = ak.to_numpy(ak.num(arrays[_brName], axis=1))
+            contents.setdefault(_coll, {})[_var] = ak.to_numpy(ak.flatten(arrays[_brName], axis=1))
+
+        collections = dict((_coll, JaggedCollection(_coll, counts[_coll], contents[_coll])) for _coll in counts)
+
+        return Chunk(fileName, start, stop, scalars, collections, entries=entries)
@@ -0,0 +1,57 @@
+### compression profiles for the output TTree of JMETriggerNTuple
+###
+### each profile is a list of rules (the first rule matching the name of a branch is used):
+###  - branches   : list of glob patterns of branch names
+###  - algorithm  : 'none', 'ZLIB', 'LZMA', 'LZ4' (or 'ZSTD', if available in ROOT)
+###  - level      : compression level [0-9]
+###  - basketSize : basket size in bytes (optional, default: 1 MB)
+### branches not matching any rule use the settings of the output file (LZ4, level 4)
+
+_triggerAndEventBranches = ['run', 'luminosityBlock', 'event', 'HLT_*']
+
+_candidateBranches = ['hltParticleFlow_*', 'hltPuppiForMET_*', 'offlinePFCandidates_*']
+
+profiles = {
+
+  # file-wide LZ4 (level 4) with 1 MB baskets
+  'default': [],
+
+  # fast writing and reading
+  'fast': [
+    dict(branches = _triggerAndEventBranches, algorithm = 'none', level = 0, basketSize = 32*1024),
+    dict(branches = ['*'], algorithm = 'LZ4', level = 1),
+  ],
+
+  # small scalar branches with fast compression (LZ4, level 1) in small baskets,
+  # candidate branches with ZLIB (level 6) in large baskets, default settings for the rest
+  'balanced': [
+    dict(branches = _triggerAndEventBranches, algorithm = 'LZ4', level = 1, basketSize = 32*1024),
+    dict(branches = _candidateBranches, algorithm = 'ZLIB', level = 6, basketSize = 4*1024*1024),
+  ],
+
+  # smallest file size (for long-term storage)
+  'archival': [
+    dict(branches = _triggerAndEventBranches, algorithm = 'LZMA', level = 4, basketSize = 64*1024),
+    dict(branches = ['*'], algorithm = 'LZMA', level = 9, basketSize = 4*1024*1024),
+  ],
+}
+
+def outputBranchesCompression(profile):
+    """returns the cms.VPSet for the parameter 'outputBranchesCompression' of JMETriggerNTuple"""
+    import FWCore.ParameterSet.Config as cms
+
+    if profile not in profiles:
+       raise KeyError('invalid compression profile "'+profile+'" (available profiles: '+str(sorted(profiles.keys()))+')')
+
+    ret = cms.VPSet()
+    for rule in profiles[profile]:
+        pset = cms.PSet(
+          branches = cms.vstring(rule['branches']),
+          algorithm = cms.string(rule['algorithm']),
+          level = cms.uint32(rule['level']),
+        )
+        if 'basketSize' in rule:
+           pset.basketSize = cms.uint32(rule['basketSize'])
+        ret.append(pset)
+
+    return ret
@@ -0,0 +1,151 @@
+"""
+cache of a fully built cms.Process (e.g. jmeTriggerNTuple_cfg.py, option "processCache"):
+the process is serialized with pickle once, and reloaded by later evaluations of the same configuration,
+skipping the evaluation of the modules of the HLT menu and of the analysis sequences
+
+the key of the cache is a hash of
+ - the values of the command-line options (except the ones not affecting the process, e.g. dumpPython,
+   and the ones of a single job, e.g. max number of events, input files and names of the output files,
+   which are set on the process after it is built or loaded),
+ - the content of the configuration file, and of other input files (e.g. the lumi mask),
+ - the release (CMSSW_VERSION, CMSSW_BASE, SCRAM_ARCH) and the version of python;
+in addition, the python modules of the developer area (CMSSW_BASE) and of JMETriggerAnalysis loaded while building the process
+are recorded with the hash of their content, and the cache entry is not used if any of them changed (e.g. a new HLT menu)
+
+example:
+  processCache = ProcessCache('.processCache', options, files=[configFileName()])
+  process = processCache.load()
+  if process is None:
+     process = buildProcess(opts)
+     processCache.save(process)
+  setJobOptions(process, opts)
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+VERSION = 1
+
+def fileHash(path):
+    """sha1 of the content of a file"""
+    _hash = hashlib.sha1()
+    with open(path, 'rb') as _file:
+        for _chunk in iter(lambda: _file.read(1 << 20), b''):
+            _hash.update(_chunk)
+    return _hash.hexdigest()
+
+def configFileName():
+    """path of the configuration file being evaluated (first .py file among the command-line arguments, with python or cmsRun)"""
+    for _arg in sys.argv:
+        if _arg.endswith('.py') and os.path.isfile(_arg):
+           return os.path.abspath(_arg)
+    return None
+
+def varParsingValues(opts, exclude=[]):
+    """dict of the values of the options of a VarParsing object"""
+    return dict((_key, getattr(opts, _key)) for _key in sorted(opts._register) if _key not in exclude)
+
+def loadedModuleFiles(packages=['JMETriggerAnalysis']):
+    """paths of the source files of the loaded python modules of the developer area ($CMSSW_BASE) and of the given packages"""
+    _base = os.path.realpath(os.environ['CMSSW_BASE'])+os.sep if os.environ.get('CMSSW_BASE') else None
+    ret = set()
+    for _name, _module in list(sys.modules.items()):
+        _file = getattr(_module, '__file__', None)
+        if not _file:
+           continue
+        if _file.endswith('.pyc') or _file.endswith('.pyo'):
+           _file = _file[:-1]
+        if not (_file.endswith('.py') and os.path.isfile(_file)):
+           continue
+        _file = os.path.realpath(_file)
+        if ((_base is not None) and _file.startswith(_base)) or (_name.split('.')[0] in packages):
+           ret.add(_file)
+    return sorted(ret)
+
+class ProcessCache(object):
+
+    def __init__(self, cacheDir, options, files=[], verbosity=0):
+        """cacheDir: directory of the cache; options: dict of the options of the configuration;
+           files: input files of the configuration (content included in the key)"""
+        self.cacheDir = cacheDir
+        self.verbosity = verbosity
+
+        _keyContent = {
+          'version': VERSION,
+          'options': options,
+          'files': dict((os.path.abspath(_f), fileHash(_f)) for _f in files if _f),
+          'release': dict((_var, os.environ.get(_var, '')) for _var in ['CMSSW_VERSION', 'CMSSW_BASE', 'SCRAM_ARCH']),
+          'python': sys.version,
+        }
+        self.key = hashlib.sha1(json.dumps(_keyContent, sort_keys=True).encode('utf-8')).hexdigest()
+
+        self._t0 = time.time()
+
+    def pickleFileName(self):
+        return os.path.join(self.cacheDir, self.key+'.pkl')
+
+    def metadataFileName(self):
+        return os.path.join(self.cacheDir, self.key+'.json')
+
+    def load(self):
+        """cached cms.Process, or None (no entry for this key, or dependencies changed since it was written)"""
+        t0 = time.time()
+        if not (os.path.isfile(self.metadataFileName()) and os.path.isfile(self.pickleFileName())):
+           self._log('no entry for key '+self.key)
+           return None
+
+        try:
+           with open(self.metadataFileName()) as _jfile:
+                _metadata = json.load(_jfile)
+        except ValueError:
+           self._log('invalid metadata, entry ignored: '+self.metadataFileName())
+           return None
+
+        for _path, _hash in sorted(_metadata['dependencies'].items()):
+            if (not os.path.isfile(_path)) or (fileHash(_path) != _hash):
+               self._log('dependency changed, entry ignored: '+_path)
+               return None
+
+        with open(self.pickleFileName(), 'rb') as _file:
+             process = pickle.load(_file)
+
+        self._log('loaded in {:.2f} s (built in {:.2f} s): {:s}'.format(time.time()-t0, _metadata['buildTime'], self.pickleFileName()))
+        return process
+
+    def save(self, process):
+        """writes the process to the cache (buildTime: time since the creation of the ProcessCache object)"""
+        if not os.path.isdir(self.cacheDir):
+           try:
+              os.makedirs(self.cacheDir)
+           except OSError:
+              if not os.path.isdir(self.cacheDir):
+                 raise
+
+        _metadata = {
+          'key': self.key,
+          'buildTime': time.time()-self._t0,
+          'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+          'dependencies': dict((_f, fileHash(_f)) for _f in loadedModuleFiles()),
+        }
+
+        # write to temporary files, then rename (concurrent jobs using the same cache directory)
+        _tmpSuffix = '.tmp'+str(os.getpid())
+        with open(self.pickleFileName()+_tmpSuffix, 'wb') as _file:
+             pickle.dump(process, _file, pickle.HIGHEST_PROTOCOL)
+        with open(self.metadataFileName()+_tmpSuffix, 'w') as _jfile:
+             json.dump(_metadata, _jfile, indent=1, sort_keys=True)
+        os.rename(self.pickleFileName()+_tmpSuffix, self.pickleFileName())
+        os.rename(self.metadataFileName()+_tmpSuffix, self.metadataFileName())
+
+        self._log('saved (built in {:.2f} s, {:d} dependencies): {:s}'.format(_metadata['buildTime'], len(_metadata['dependencies']), self.pickleFileName()))
+
+    def _log(self, message):
+        if self.verbosity > 0:
+           sys.stderr.write('ProcessCache: '+message+'\n')
@@ -0,0 +1,165 @@
+"""
+reader of the skim index of the output of JMETriggerNTuple (parameter "skimIndex", see NTuplizers/interface/SkimIndexWriter.h):
+a sidecar file (default: "<output file>.idx") with, for every entry of the TTree,
+ - bits : HLT paths of TriggerResultsCollections, and fill-collection conditions ("<collection>_filled")
+ - keys : number of objects of some collections ("<collection>_size"), value of the leading element of some branches (NaN if empty)
+
+a selection is a list of terms (or a string of terms separated by "&&") combined with a logical AND:
+  "name"            : bit is set
+  "!name"           : bit is not set
+  "name OP value"   : key compared to value, with OP in <, <=, >, >=, == (false for NaN)
+
+example:
+  index = SkimIndex('ntuple.root.idx')
+  mask = index.select('HLT_IsoMu24 && offlineIsolatedMuons_size >= 1 && offlineMETs_Type1_pt > 100')
+  for _start, _stop in clusterRanges(mask, clusterOffsets):
+      ...
+"""
+import re
+import json
+
+import numpy as np
+
+MAGIC = b'JMETIDX1'
+
+_TERM_REGEX = re.compile(r'^\s*([A-Za-z_][\w:]*)\s*(<=|>=|==|<|>)\s*(\S+)\s*$')
+
+def indexFileName(fileName):
+    """default path of the skim index of an output file of JMETriggerNTuple"""
+    return fileName+'.idx'
+
+class SkimIndex(object):
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as _file:
+            data = _file.read()
+
+        if data[:8] != MAGIC:
+           raise RuntimeError('invalid skim index (wrong magic number): '+path)
+
+        # the size of the header is written with the byte order of the writer (given in the header)
+        _bo = '<'
+        if int(np.frombuffer(data[8:16], dtype='<u8')[0]) > len(data):
+           _bo = '>'
+        _headerSize = int(np.frombuffer(data[8:16], dtype=_bo+'u8')[0])
+
+        self.header = json.loads(data[16:16+_headerSize].decode('utf-8'))
+        if self.header['version'] != 1:
+           raise RuntimeError('unsupported version of skim index ('+str(self.header['version'])+'): '+path)
+
+        self.treePath = self.header['tree']
+        self.entries = self.header['entries']
+
+        _bo = '<' if self.header['byteOrder'] == 'little' else '>'
+        _pos = 16 + _headerSize
+
+        self._bitWords = {}
+        for _name in self.header['bits']:
+            _size = 8 * self.header['bitWords']
+            self._bitWords[_name] = np.frombuffer(data[_pos:_pos+_size], dtype=_bo+'u8')
+            _pos += _size
+
+        self._keys = {}
+        for _name in self.header['keys']:
+            _values = np.frombuffer(data[_pos:_pos+4*self.entries], dtype=_bo+'f4')
+            _pos += 4*self.entries
+            _entries = np.frombuffer(data[_pos:_pos+4*self.entries], dtype=_bo+'u4')
+            _pos += 4*self.entries
+            # values are sorted in ascending order, NaN last
+            self._keys[_name] = (_values, _entries, int(np.count_nonzero(~np.isnan(_values))))
+
+        if _pos != len(data):
+           raise RuntimeError('invalid skim index (size of file is '+str(len(data))+' bytes, expected '+str(_pos)+'): '+path)
+
+    def bits(self):
+        return list(self.header['bits'])
+
+    def keys(self):
+        return list(self.header['keys'])
+
+    def bit(self, name):
+        """boolean array (one value per entry)"""
+        if name not in self._bitWords:
+           raise KeyError('bit "'+name+'" not found in skim index (available bits: '+str(self.bits())+'): '+self.path)
+        _bytes = self._bitWords[name].astype('<u8').view(np.uint8)
+        return np.unpackbits(_bytes, bitorder='little')[:self.entries].astype(bool)
+
+    def key(self, name):
+        """float array (one value per entry)"""
+        _values, _entries, _ = self._sortedKey(name)
+        ret = np.empty(self.entries, dtype=np.float32)
+        ret[_entries] = _values
+        return ret
+
+    def keyRange(self, name, op, value):
+        """boolean array (one value per entry) of the comparison of a key with a value"""
+        _values, _entries, _nValid = self._sortedKey(name)
+        _value = np.float32(value)
+        if op == '<':
+           _lo, _hi = 0, np.searchsorted(_values[:_nValid], _value, side='left')
+        elif op == '<=':
+           _lo, _hi = 0, np.searchsorted(_values[:_nValid], _value, side='right')
+        elif op == '>':
+           _lo, _hi = np.searchsorted(_values[:_nValid], _value, side='right'), _nValid
+        elif op == '>=':
+           _lo, _hi = np.searchsorted(_values[:_nValid], _value, side='left'), _nValid
+        elif op == '==':
+           _lo, _hi = np.searchsorted(_values[:_nValid], _value, side='left'), np.searchsorted(_values[:_nValid], _value, side='right')
+        else:
+           raise ValueError('invalid comparison operator: '+op)
+        ret = np.zeros(self.entries, dtype=bool)
+        ret[_entries[_lo:_hi]] = True
+        return ret
+
+    def select(self, selection):
+        """boolean array (one value per entry) of the entries passing the selection"""
+        ret = np.ones(self.entries, dtype=bool)
+        for _term in parseSelection(selection):
+            if _term[0] == 'bit':
+               _mask = self.bit(_term[1])
+               ret &= (~_mask if _term[2] else _mask)
+            else:
+               ret &= self.keyRange(_term[1], _term[2], _term[3])
+        return ret
+
+    def _sortedKey(self, name):
+        if name not in self._keys:
+           raise KeyError('key "'+name+'" not found in skim index (available keys: '+str(self.keys())+'): '+self.path)
+        return self._keys[name]
+
+def parseSelection(selection):
+    """list of terms: ('bit', name, negated) or ('key', name, op, value)"""
+    terms = selection.split('&&') if isinstance(selection, str) else list(selection)
+    ret = []
+    for _term in terms:
+        _term = _term.strip()
+        if not _term:
+           continue
+        _match = _TERM_REGEX.match(_term)
+        if _match:
+           try:
+              ret.append(('key', _match.group(1), _match.group(2), float(_match.group(3))))
+           except ValueError:
+              raise ValueError('invalid value in term of selection: '+_term)
+        elif re.match(r'^!?\s*[A-Za-z_][\w:]*$', _term):
+           _negated = _term.startswith('!')
+           ret.append(('bit', _term.lstrip('!').strip(), _negated))
+        else:
+           raise ValueError('invalid term of selection (expected "name", "!name" or "name OP value"): '+_term)
+    return ret
+
+def entryRanges(mask):
+    """list of ranges [start, stop) of consecutive selected entries"""
+    _padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    _edges = np.flatnonzero(_padded[1:] != _padded[:-1])
+    return [(int(_edges[_idx]), int(_edges[_idx+1])) for _idx in range(0, len(_edges), 2)]
+
+def clusterRanges(mask, clusterOffsets):
+    """list of ranges [start, stop) of consecutive clusters with at least one selected entry
+       (clusterOffsets: first entry of every cluster, plus number of entries, e.g. uproot.TTree.common_entry_offsets())"""
+    _offsets = np.asarray(clusterOffsets, dtype=np.int64)
+    _cumsum = np.concatenate(([0], np.cumsum(np.asarray(mask, dtype=np.int64))))
+    _selected = (_cumsum[_offsets[1:]] - _cumsum[_offsets[:-1]]) > 0
+    return [(int(_offsets[_start]), int(_offsets[_stop])) for _start, _stop in entryRanges(_selected)]
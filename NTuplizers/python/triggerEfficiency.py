@@ -0,0 +1,225 @@
+"""
+trigger efficiencies (turn-on curves) from the output of JMETriggerNTuple (numpy-only, does not require CMSSW)
+
+in one pass over the input files, for every (path, observable) pair two histograms are filled:
+ - total : events passing the selection
+ - pass  : events passing the selection and the path
+observables are either scalar branches, or variables of the first (leading) element of a collection
+(e.g. "offlineMETs_Type1_pt", "offlineAK4PFCHSJetsCorrected_pt");
+the histograms of every input file are cached in a .json file keyed by the (path, size, mtime) of the file,
+the name of the TTree, the list of paths, the observables (with their binning) and the selection
+"""
+import os
+import json
+import math
+import hashlib
+import multiprocessing
+
+import numpy as np
+
+try:
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR, fileFingerprint, splitBranchName
+    from JMETriggerAnalysis.NTuplizers.histograms import HistogramCollection, Hist1D
+except ImportError:
+    from ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR, fileFingerprint, splitBranchName
+    from histograms import HistogramCollection, Hist1D
+
+#### Clopper-Pearson intervals
+def _betacf(a, b, x):
+    """continued fraction of the incomplete beta function (modified Lentz's method)"""
+    tiny, eps = 1e-300, 3e-16
+    qab, qap, qam = a+b, a+1., a-1.
+    c, d = 1., 1.-qab*x/qap
+    d = 1./(tiny if abs(d) < tiny else d)
+    h = d
+    for m in range(1, 1000):
+        m2 = 2*m
+        aa = m*(b-m)*x/((qam+m2)*(a+m2))
+        d = 1.+aa*d
+        d = 1./(tiny if abs(d) < tiny else d)
+        c = 1.+aa/c
+        c = tiny if abs(c) < tiny else c
+        h *= d*c
+        aa = -(a+m)*(qab+m)*x/((a+m2)*(qap+m2))
+        d = 1.+aa*d
+        d = 1./(tiny if abs(d) < tiny else d)
+        c = 1.+aa/c
+        c = tiny if abs(c) < tiny else c
+        delta = d*c
+        h *= delta
+        if abs(delta-1.) < eps:
+           break
+    return h
+
+def betaincReg(a, b, x):
+    """regularized incomplete beta function I_x(a, b)"""
+    if x <= 0.:
+       return 0.
+    if x >= 1.:
+       return 1.
+    lbeta = math.lgamma(a+b) - math.lgamma(a) - math.lgamma(b) + a*math.log(x) + b*math.log(1.-x)
+    if x < (a+1.)/(a+b+2.):
+       return math.exp(lbeta) * _betacf(a, b, x) / a
+    return 1. - math.exp(lbeta) * _betacf(b, a, 1.-x) / b
+
+def betaQuantile(p, a, b):
+    """quantile of the beta distribution (bisection)"""
+    lo, hi = 0., 1.
+    for _ in range(100):
+        mid = 0.5*(lo+hi)
+        if betaincReg(a, b, mid) < p:
+           lo = mid
+        else:
+           hi = mid
+    return 0.5*(lo+hi)
+
+try:
+    from scipy.stats import beta as _scipyBeta
+    def _betaQuantile(p, a, b):
+        return float(_scipyBeta.ppf(p, a, b))
+except ImportError:
+    _betaQuantile = betaQuantile
+
+def clopperPearson(k, n, cl=0.682689492137):
+    """efficiency and Clopper-Pearson interval (arrays of lower and upper bounds) for k passing events out of n"""
+    k = np.asarray(k, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    alpha = 1.-cl
+    eff = np.full(k.shape, np.nan)
+    low = np.full(k.shape, np.nan)
+    upp = np.full(k.shape, np.nan)
+    for idx in range(len(k)):
+        if n[idx] <= 0:
+           continue
+        eff[idx] = k[idx] / n[idx]
+        low[idx] = 0. if k[idx] <= 0 else _betaQuantile(0.5*alpha, k[idx], n[idx]-k[idx]+1.)
+        upp[idx] = 1. if k[idx] >= n[idx] else _betaQuantile(1.-0.5*alpha, k[idx]+1., n[idx]-k[idx])
+    return eff, low, upp
+
+#### accumulation
+def observableValues(chunk, observable):
+    """values of an observable: scalar branch, or variable of the leading element of a collection (NaN if empty)"""
+    if observable in chunk.scalars:
+       return chunk.scalars[observable].astype(np.float64)
+    _coll, _var = splitBranchName(observable)
+    collection = chunk[_coll]
+    idx = collection.firstIndex()
+    ret = np.full(len(idx), np.nan)
+    ret[idx >= 0] = collection[_var][idx[idx >= 0]]
+    return ret
+
+class TriggerEfficiency(object):
+
+    def __init__(self, paths, observables, selection=None):
+        """paths: list of bool branches; observables: dict {name: bin edges}; selection: list of bool branches required in AND"""
+        self.paths = list(paths)
+        self.observables = dict((_obs, np.asarray(observables[_obs], dtype=np.float64)) for _obs in observables)
+        self.selection = [] if selection is None else list(selection)
+        self.histograms = HistogramCollection()
+        for _path in self.paths:
+            for _obs in self.observables:
+                self.histograms[_path+'__'+_obs+'__total'] = Hist1D(self.observables[_obs])
+                self.histograms[_path+'__'+_obs+'__pass'] = Hist1D(self.observables[_obs])
+
+    def readerArguments(self):
+        """arguments of NTupleReader.iterate"""
+        scalars = set(self.paths + self.selection)
+        variables = {}
+        for _obs in self.observables:
+            _coll, _var = splitBranchName(_obs)
+            if _coll is None:
+               scalars.add(_obs)
+            else:
+               variables.setdefault(_coll, []).append(_var)
+        return {'collections': sorted(variables.keys()), 'scalars': sorted(scalars), 'variables': variables}
+
+    def process(self, chunk):
+        mask = np.ones(len(chunk), dtype=bool)
+        for _sel in self.selection:
+            mask &= chunk.scalars[_sel].astype(bool)
+
+        for _obs in self.observables:
+            _vals = observableValues(chunk, _obs)
+            _mask = mask & np.isfinite(_vals)
+            _vals = _vals[_mask]
+            for _path in self.paths:
+                self.histograms[_path+'__'+_obs+'__total'].fill(_vals)
+                self.histograms[_path+'__'+_obs+'__pass'].fill(_vals[chunk.scalars[_path][_mask].astype(bool)])
+        return self
+
+    def efficiencies(self, cl=0.682689492137):
+        """dict {path: {observable: {edges, total, pass, efficiency, low, high}}} (without under/overflow bins)"""
+        ret = {}
+        for _path in self.paths:
+            for _obs in self.observables:
+                _tot = self.histograms[_path+'__'+_obs+'__total'].values()
+                _pas = self.histograms[_path+'__'+_obs+'__pass'].values()
+                _eff, _low, _upp = clopperPearson(_pas, _tot, cl)
+                ret.setdefault(_path, {})[_obs] = {
+                  'edges': self.observables[_obs].tolist(),
+                  'total': _tot.tolist(),
+                  'pass': _pas.tolist(),
+                  'efficiency': _eff.tolist(),
+                  'low': _low.tolist(),
+                  'high': _upp.tolist(),
+                }
+        return ret
+
+#### cache and multi-file driver
+def cacheKey(fileName, treeName, paths, observables, selection):
+    sha = hashlib.sha1()
+    sha.update(repr((fileFingerprint(fileName), treeName, sorted(paths), sorted((_obs, list(map(float, observables[_obs]))) for _obs in observables), sorted(selection or []))).encode('utf-8'))
+    return sha.hexdigest()
+
+def _processFile(args):
+    fileName, treeName, cacheDir, chunkSize, paths, observables, selection = args
+
+    cacheFile = None
+    if cacheDir is not None:
+       cacheFile = os.path.join(cacheDir, 'triggerEfficiency_'+cacheKey(fileName, treeName, paths, observables, selection)+'.json')
+       if os.path.isfile(cacheFile):
+          try:
+             with open(cacheFile) as _jfile:
+                  return json.load(_jfile), True
+          except ValueError:
+             pass
+
+    eff = TriggerEfficiency(paths, observables, selection)
+    reader = NTupleReader([fileName], treeName=treeName, cacheDir=cacheDir)
+    for chunk in reader.iterate(chunkSize=chunkSize, **eff.readerArguments()):
+        eff.process(chunk)
+
+    ret = eff.histograms.toDict()
+
+    if cacheFile is not None:
+       if not os.path.isdir(cacheDir):
+          os.makedirs(cacheDir)
+       _tmpFile = cacheFile+'.tmp'+str(os.getpid())
+       with open(_tmpFile, 'w') as _jfile:
+            json.dump(ret, _jfile)
+       os.rename(_tmpFile, cacheFile)
+
+    return ret, False
+
+def run(files, paths, observables, selection=None, treeName=DEFAULT_TREE, cacheDir=DEFAULT_CACHE_DIR, chunkSize=200000, nProcesses=1):
+    """fill the histograms of all files (one file per task of a process pool, cached results are not re-computed);
+       returns the TriggerEfficiency object with the merged histograms, and the number of files read from the cache"""
+    eff = TriggerEfficiency(paths, observables, selection)
+    tasks = [(_f, treeName, cacheDir, chunkSize, eff.paths, dict((_o, eff.observables[_o].tolist()) for _o in eff.observables), eff.selection) for _f in files]
+
+    nCached = 0
+    if nProcesses > 1:
+       pool = multiprocessing.Pool(nProcesses)
+       try:
+          results = list(pool.imap_unordered(_processFile, tasks))
+       finally:
+          pool.close()
+          pool.join()
+    else:
+       results = [_processFile(_task) for _task in tasks]
+
+    for _hists, _cached in results:
+        eff.histograms += HistogramCollection.fromDict(_hists)
+        nCached += int(_cached)
+
+    return eff, nCached
@@ -14,6 +14,9 @@ userElectronsWithUserData = cms.EDProducer('ElectronPATUserData',
 
   src = cms.InputTag('userPreselectedElectrons'),
 
+  # ValueMaps resolved once per event, user data attached in blocks (see Common/plugins/PATUserDataBatch.h)
+  batchMode = cms.bool(False),
+
   primaryVertices = cms.InputTag('offlineSlimmedPrimaryVertices'),
 
   effAreas_file = cms.FileInPath('RecoEgamma/ElectronIdentification/data/Fall17/effAreaElectrons_cone03_pfNeuHadronsAndPhotons_94X.txt'),
@@ -38,9 +41,9 @@ userElectronsWithUserData = cms.EDProducer('ElectronPATUserData',
   ),
 )
 
-userIsolatedElectrons = selectedPatElectrons.clone(
-  src = 'userElectronsWithUserData',
-  cut = 'userInt("IDCutBasedLoose") > 0',
+userIsolatedElectrons = cms.EDProducer('PATElectronFastSelector',
+  src = cms.InputTag('userElectronsWithUserData'),
+  cut = cms.string('userInt("IDCutBasedLoose") > 0'),
 )
 
 userElectronsSequence = cms.Sequence(
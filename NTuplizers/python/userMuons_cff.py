@@ -1,16 +1,17 @@
 import FWCore.ParameterSet.Config as cms
 
-from PhysicsTools.PatAlgos.selectionLayer1.muonSelector_cfi import selectedPatMuons
-
-userPreselectedMuons = selectedPatMuons.clone(
-  src = 'slimmedMuons',
-  cut = '(pt > 10.) && (abs(eta) < 2.4)',
+userPreselectedMuons = cms.EDProducer('PATMuonFastSelector',
+  src = cms.InputTag('slimmedMuons'),
+  cut = cms.string('(pt > 10.) && (abs(eta) < 2.4)'),
 )
 
 userMuonsWithUserData = cms.EDProducer('MuonPATUserData',
 
   src = cms.InputTag('userPreselectedMuons'),
 
+  # ValueMaps resolved once per event, user data attached in blocks (see Common/plugins/PATUserDataBatch.h)
+  batchMode = cms.bool(False),
+
   primaryVertices = cms.InputTag('offlineSlimmedPrimaryVertices'),
 
   valueMaps_float = cms.vstring(),
@@ -20,9 +21,9 @@ userMuonsWithUserData = cms.EDProducer('MuonPATUserData',
   userInt_stringSelectors = cms.PSet(),
 )
 
-userIsolatedMuons = selectedPatMuons.clone(
-  src = 'userMuonsWithUserData',
-  cut = '(userInt("IDLoose") > 0) && userFloat("pfIsoR04") < 0.40',
+userIsolatedMuons = cms.EDProducer('PATMuonFastSelector',
+  src = cms.InputTag('userMuonsWithUserData'),
+  cut = cms.string('(userInt("IDLoose") > 0) && userFloat("pfIsoR04") < 0.40'),
 )
 
 userMuonsSequence = cms.Sequence(
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+aggregate the profiles of many jobs of jmeTriggerNTuple_cfg.py (option "profile=<prefix>")
+into ranked tables of the most expensive modules and output collections:
+ - <prefix>*_timing.json : time (real and CPU) and allocated memory of every module (FastTimerService)
+ - <prefix>*_ntuple.json : fill time, buffers and bytes written of every collection (JMETriggerNTuple)
+inputs can be files, directories (searched recursively) or glob patterns (e.g. the outputs of crab jobs)
+"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import glob
+import json
+
+def inputFiles(inputs):
+    ret = []
+    for _input in inputs:
+        if os.path.isdir(_input):
+           for _dirpath, _dirnames, _filenames in os.walk(_input):
+               ret += [os.path.join(_dirpath, _f) for _f in _filenames if _f.endswith('.json')]
+        else:
+           ret += glob.glob(_input)
+    return sorted(set(ret))
+
+def addTiming(summary, data):
+    """sum of the entries of the "modules" list of a FastTimerService .json file (key: module label)"""
+    for _mod in data['modules']:
+        _key = _mod['label'] if _mod.get('type', '') != 'job' else '[job]'
+        _entry = summary.setdefault(_key, {'type': _mod.get('type', ''), 'jobs': 0, 'events': 0, 'time_real': 0., 'time_thread': 0., 'mem_alloc': 0., 'mem_free': 0.})
+        _entry['jobs'] += 1
+        for _var in ['events', 'time_real', 'time_thread', 'mem_alloc', 'mem_free']:
+            _entry[_var] += _mod.get(_var, 0)
+
+def addNTuple(summary, data):
+    """sum of the per-collection entries of a JMETriggerNTuple .json file (key: collection)"""
+    summary['[entries]'] = summary.get('[entries]', 0) + data['entries']
+    collections = dict(data['collections'])
+    collections['[other branches]'] = data['otherBranches']
+    for _coll in collections:
+        _entry = summary.setdefault(_coll, {'jobs': 0, 'fills': 0, 'fillTime': 0., 'highWaterMark': 0, 'allocations': 0, 'totBytes': 0, 'zipBytes': 0})
+        _entry['jobs'] += 1
+        for _var in ['fills', 'fillTime', 'allocations', 'totBytes', 'zipBytes']:
+            _entry[_var] += collections[_coll].get(_var, 0)
+        _entry['highWaterMark'] = max(_entry['highWaterMark'], collections[_coll].get('highWaterMark', 0))
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+   parser.add_argument('-i', '--inputs', dest='inputs', required=True, nargs='+', default=None,
+                       help='list of input .json files, directories or glob patterns')
+
+   parser.add_argument('-n', '--max-rows', dest='max_rows', action='store', type=int, default=30,
+                       help='max number of rows of the table of modules (-1: all modules)')
+
+   parser.add_argument('-s', '--sort', dest='sort', action='store', default='time_thread', choices=['time_thread', 'time_real', 'mem_alloc'],
+                       help='variable used to rank the modules')
+
+   parser.add_argument('-o', '--output', dest='output', action='store', default=None,
+                       help='path to output .json file with the aggregated profile')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   timing, ntuple = {}, {}
+   nTiming, nNTuple = 0, 0
+
+   for _fpath in inputFiles(opts.inputs):
+       try:
+          with open(_fpath) as _jfile:
+               _data = json.load(_jfile)
+       except ValueError:
+          print('>> warning -- invalid .json file (skipped):', _fpath, file=sys.stderr)
+          continue
+
+       if isinstance(_data, dict) and isinstance(_data.get('modules', None), list):
+          addTiming(timing, _data)
+          nTiming += 1
+       elif isinstance(_data, dict) and ('otherBranches' in _data):
+          addNTuple(ntuple, _data)
+          nNTuple += 1
+       elif opts.verbosity > 0:
+          print('>> unrecognized .json file (skipped):', _fpath)
+
+   print('input files: {:d} (FastTimerService), {:d} (JMETriggerNTuple)'.format(nTiming, nNTuple))
+
+   ### modules
+   if timing:
+      job = timing.pop('[job]', None)
+      totTime = job[opts.sort] if (job is not None) and (job[opts.sort] > 0) else sum(timing[_mod][opts.sort] for _mod in timing)
+      nEvents = job['events'] if job is not None else max(timing[_mod]['events'] for _mod in timing)
+
+      ranked = sorted(timing, key=lambda _mod: timing[_mod][opts.sort], reverse=True)
+      if opts.max_rows >= 0:
+         ranked = ranked[:opts.max_rows]
+
+      print('\nmodules (ranked by {:s}, {:d} events)'.format(opts.sort, nEvents))
+      print('{:>4} {:<50} {:<30} {:>14} {:>14} {:>8} {:>8} {:>14}'.format('', 'label', 'type', 'CPU [ms/ev]', 'real [ms/ev]', '%', 'cum. %', 'alloc [kB/ev]'))
+      cumFrac = 0.
+      for _idx, _mod in enumerate(ranked):
+          _entry = timing[_mod]
+          _frac = 100. * _entry[opts.sort] / totTime if totTime > 0 else 0.
+          cumFrac += _frac
+          print('{:>4d} {:<50} {:<30} {:>14.3f} {:>14.3f} {:>8.2f} {:>8.2f} {:>14.1f}'.format(_idx+1, _mod[:50], _entry['type'][:30],
+            _entry['time_thread'] / max(nEvents, 1), _entry['time_real'] / max(nEvents, 1), _frac, cumFrac, _entry['mem_alloc'] / max(nEvents, 1)))
+
+      if job is not None:
+         timing['[job]'] = job
+
+   ### output collections of JMETriggerNTuple
+   if ntuple:
+      nEntries = ntuple.pop('[entries]')
+      totZipBytes = sum(ntuple[_coll]['zipBytes'] for _coll in ntuple)
+
+      print('\nJMETriggerNTuple collections (ranked by fill time, {:d} entries)'.format(nEntries))
+      print('{:>4} {:<40} {:>14} {:>14} {:>10} {:>14} {:>12}'.format('', 'collection', 'fill [us/ev]', 'size [B/ev]', 'size %', 'high-water m.', 'allocations'))
+      for _idx, _coll in enumerate(sorted(ntuple, key=lambda _coll: (ntuple[_coll]['fillTime'], ntuple[_coll]['zipBytes']), reverse=True)):
+          _entry = ntuple[_coll]
+          print('{:>4d} {:<40} {:>14.2f} {:>14.1f} {:>10.2f} {:>14d} {:>12d}'.format(_idx+1, _coll[:40],
+            1e6 * _entry['fillTime'] / max(_entry['fills'], 1), float(_entry['zipBytes']) / max(nEntries, 1),
+            100. * _entry['zipBytes'] / totZipBytes if totZipBytes > 0 else 0., _entry['highWaterMark'], _entry['allocations']))
+
+      ntuple['[entries]'] = nEntries
+
+   if opts.output is not None:
+      with open(opts.output, 'w') as _jfile:
+           json.dump({'modules': timing, 'collections': ntuple}, _jfile, indent=1, sort_keys=True)
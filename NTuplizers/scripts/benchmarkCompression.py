@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+benchmark of the compression profiles of the output TTree of JMETriggerNTuple:
+the events of an input NTuple are re-written with every profile,
+and the write time, file size and time to read all branches of all entries are reported
+"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import fnmatch
+import json
+import time
+
+try:
+    from JMETriggerAnalysis.NTuplizers.outputCompressionProfiles import profiles
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+    from outputCompressionProfiles import profiles
+
+import ROOT
+ROOT.gROOT.SetBatch()
+
+_algorithms = {
+  'ZLIB': ROOT.ROOT.kZLIB,
+  'LZMA': ROOT.ROOT.kLZMA,
+  'LZ4': ROOT.ROOT.kLZ4,
+}
+if hasattr(ROOT.ROOT, 'kZSTD'):
+   _algorithms['ZSTD'] = ROOT.ROOT.kZSTD
+
+def compressionSettings(algorithm, level):
+    if algorithm == 'none':
+       return 0
+    if algorithm not in _algorithms:
+       raise ValueError('invalid (or unavailable) compression algorithm: "'+algorithm+'"')
+    return ROOT.ROOT.CompressionSettings(_algorithms[algorithm], level)
+
+def applyProfile(tree, rules):
+    """same logic as JMETriggerNTuple::beginJob"""
+    autoFlushBytes = 0
+    for br in tree.GetListOfBranches():
+        basketSize = 1024*1024
+        for rule in rules:
+            if any(fnmatch.fnmatchcase(br.GetName(), pattern) for pattern in rule['branches']):
+               br.SetCompressionSettings(compressionSettings(rule['algorithm'], rule['level']))
+               if rule.get('basketSize', 0) > 0:
+                  basketSize = rule['basketSize']
+               break
+        br.SetBasketSize(basketSize)
+        autoFlushBytes += basketSize
+    if autoFlushBytes > 0:
+       tree.SetAutoFlush(-autoFlushBytes)
+
+def writeTree(inputTree, outputFile, rules, maxEntries):
+    ofile = ROOT.TFile(outputFile, 'recreate')
+    ofile.SetCompressionSettings(compressionSettings('LZ4', 4))
+    otree = inputTree.CloneTree(0)
+    otree.SetDirectory(ofile)
+    applyProfile(otree, rules)
+
+    t0 = time.time()
+    # slow copy: entries are unpacked and re-compressed with the new settings
+    otree.CopyEntries(inputTree, maxEntries)
+    otree.Write()
+    ofile.Close()
+    return time.time() - t0
+
+def readTree(inputFile, treeName):
+    t0 = time.time()
+    ifile = ROOT.TFile.Open(inputFile)
+    itree = ifile.Get(treeName)
+    nBytes = 0
+    for idx in range(itree.GetEntries()):
+        nBytes += itree.GetEntry(idx)
+    ifile.Close()
+    return time.time() - t0, nBytes
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+   parser.add_argument('-i', '--input', dest='input', required=True, action='store', default=None,
+                       help='path to input NTuple')
+
+   parser.add_argument('-o', '--output', dest='output', required=True, action='store', default=None,
+                       help='path to output directory')
+
+   parser.add_argument('-t', '--tree', dest='tree', action='store', default='JMETriggerNTuple/Events',
+                       help='path to TTree inside the input file')
+
+   parser.add_argument('-p', '--profiles', dest='profiles', nargs='+', default=sorted(profiles.keys()),
+                       help='list of compression profiles')
+
+   parser.add_argument('-n', '--entries', dest='entries', action='store', type=int, default=-1,
+                       help='max number of entries (-1: all entries)')
+
+   parser.add_argument('-r', '--repetitions', dest='repetitions', action='store', type=int, default=1,
+                       help='number of repetitions of every measurement (the minimum time is reported)')
+
+   parser.add_argument('-j', '--json', dest='json', action='store', default=None,
+                       help='path to output .json file with the results')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   for _prof in opts.profiles:
+       if _prof not in profiles:
+          raise KeyError('invalid compression profile "'+_prof+'" (available profiles: '+str(sorted(profiles.keys()))+')')
+
+   if not os.path.isdir(opts.output):
+      os.makedirs(opts.output)
+
+   ifile = ROOT.TFile.Open(opts.input)
+   if (not ifile) or ifile.IsZombie():
+      raise RuntimeError('failed to open input file: '+opts.input)
+
+   itree = ifile.Get(opts.tree)
+   if not itree:
+      raise RuntimeError('TTree "'+opts.tree+'" not found in input file: '+opts.input)
+
+   treeDir, treeName = os.path.split(opts.tree)
+
+   results = []
+   for _prof in opts.profiles:
+       _ofile = os.path.join(opts.output, 'benchmarkCompression_'+_prof+'.root')
+
+       _writeTime, _readTime, _readBytes = None, None, None
+       for _rep in range(max(1, opts.repetitions)):
+           _wt = writeTree(itree, _ofile, profiles[_prof], opts.entries)
+           _rt, _readBytes = readTree(_ofile, treeName)
+           _writeTime = _wt if _writeTime is None else min(_writeTime, _wt)
+           _readTime = _rt if _readTime is None else min(_readTime, _rt)
+
+       results.append({
+         'profile': _prof,
+         'writeTime': _writeTime,
+         'readTime': _readTime,
+         'fileSize': os.path.getsize(_ofile),
+         'readBytes': _readBytes,
+       })
+
+       if opts.verbosity > 0:
+          print('profile "'+_prof+'" written to:', _ofile)
+
+   ifile.Close()
+
+   print('{:<12} {:>14} {:>14} {:>14} {:>12}'.format('profile', 'write time [s]', 'file size [MB]', 'read time [s]', 'size ratio'))
+   _refSize = float(results[0]['fileSize']) if results else 1.
+   for _res in results:
+       print('{:<12} {:>14.2f} {:>14.2f} {:>14.2f} {:>12.3f}'.format(_res['profile'], _res['writeTime'], _res['fileSize'] / 1024.**2, _res['readTime'], _res['fileSize'] / _refSize))
+
+   if opts.json is not None:
+      with open(opts.json, 'w') as _jfile:
+           json.dump(results, _jfile, indent=2, sort_keys=True)
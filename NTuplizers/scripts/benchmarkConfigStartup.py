@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+startup time of a configuration file (default: NTuplizers/test/jmeTriggerNTuple_cfg.py) with and without the cache of the cms.Process
+(option "processCache", see NTuplizers/python/processCache.py):
+ - no cache : cms.Process built from scratch
+ - cold     : cms.Process built from scratch, and written to an empty cache
+ - warm     : cms.Process loaded from the cache
+the time is the wall time of the evaluation of the configuration (python, default) or of a cmsRun job (e.g. with n=0);
+every measurement is repeated, and the min, mean and max are reported;
+the content of the cms.Process (option "dumpPython") built from scratch is compared to the one loaded from the cache
+"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+
+def runConfig(executable, cfg, cfgArgs, logFileName, verbosity=0):
+    """wall time [s] of the evaluation of the configuration"""
+    cmd = [executable, cfg] + cfgArgs
+
+    if verbosity > 0:
+       print('>', ' '.join(cmd))
+
+    with open(logFileName, 'w') as _logFile:
+         t0 = time.time()
+         _status = subprocess.call(cmd, stdout=_logFile, stderr=subprocess.STDOUT)
+         wallTime = time.time() - t0
+
+    if _status != 0:
+       raise RuntimeError(executable+' failed (exit status '+str(_status)+'), see log file: '+logFileName)
+
+    return wallTime
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+   parser.add_argument('-c', '--cfg', dest='cfg', action='store',
+                       default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test', 'jmeTriggerNTuple_cfg.py'),
+                       help='path to configuration file (must support the options "processCache" and "dumpPython")')
+
+   parser.add_argument('-a', '--args', dest='args', nargs='+', default=[],
+                       help='command-line arguments of the configuration file (e.g. "numThreads=4 lumis=lumiMask.json")')
+
+   parser.add_argument('-e', '--executable', dest='executable', action='store', default='python', choices=['python', 'cmsRun'],
+                       help='executable evaluating the configuration file')
+
+   parser.add_argument('-r', '--repetitions', dest='repetitions', action='store', type=int, default=3,
+                       help='number of repetitions of every measurement')
+
+   parser.add_argument('-d', '--cache-dir', dest='cache_dir', action='store', default=None,
+                       help='path to directory for the caches and the log files (default: temporary directory, removed at the end)')
+
+   parser.add_argument('--no-check', dest='no_check', action='store_true', default=False,
+                       help='do not compare the content of the cms.Process (dumpPython) with and without cache')
+
+   parser.add_argument('-o', '--output', dest='output', action='store', default=None,
+                       help='path to output .json file with the results')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   if not os.path.isfile(opts.cfg):
+      raise RuntimeError('configuration file not found: '+opts.cfg)
+
+   workDir = opts.cache_dir if opts.cache_dir else tempfile.mkdtemp(prefix='benchmarkConfigStartup_')
+   if not os.path.isdir(workDir):
+      os.makedirs(workDir)
+
+   cfg = os.path.abspath(opts.cfg)
+   warmCache = os.path.join(workDir, 'cache_warm')
+   if os.path.isdir(warmCache):
+      shutil.rmtree(warmCache)
+
+   times = {'nocache': [], 'cold': [], 'warm': []}
+   for _rep in range(max(1, opts.repetitions)):
+       times['nocache'].append(runConfig(opts.executable, cfg, opts.args,
+         os.path.join(workDir, 'nocache_'+str(_rep)+'.log'), opts.verbosity))
+
+       # cold: empty cache at every repetition (the cache of the first repetition is used by the warm runs)
+       _coldCache = warmCache if (_rep == 0) else os.path.join(workDir, 'cache_cold')
+       if os.path.isdir(_coldCache) and (_coldCache != warmCache):
+          shutil.rmtree(_coldCache)
+       times['cold'].append(runConfig(opts.executable, cfg, opts.args+['processCache='+_coldCache],
+         os.path.join(workDir, 'cold_'+str(_rep)+'.log'), opts.verbosity))
+
+   for _rep in range(max(1, opts.repetitions)):
+       times['warm'].append(runConfig(opts.executable, cfg, opts.args+['processCache='+warmCache],
+         os.path.join(workDir, 'warm_'+str(_rep)+'.log'), opts.verbosity))
+
+   results = {}
+   for _mode in ['nocache', 'cold', 'warm']:
+       results[_mode] = {
+         'min': min(times[_mode]),
+         'mean': sum(times[_mode]) / len(times[_mode]),
+         'max': max(times[_mode]),
+         'times': times[_mode],
+       }
+   results['speedup'] = results['nocache']['min'] / results['warm']['min'] if results['warm']['min'] > 0 else 0.
+
+   # content of the cms.Process: built from scratch vs loaded from the cache
+   if not opts.no_check:
+      _dumps = {}
+      for _mode, _cacheArgs in [('nocache', []), ('warm', ['processCache='+warmCache])]:
+          _dumps[_mode] = os.path.join(workDir, 'dump_'+_mode+'.py')
+          runConfig(opts.executable, cfg, opts.args+_cacheArgs+['dumpPython='+_dumps[_mode]],
+            os.path.join(workDir, 'dump_'+_mode+'.log'), opts.verbosity)
+      with open(_dumps['nocache']) as _f1, open(_dumps['warm']) as _f2:
+           results['identical'] = (_f1.read() == _f2.read())
+
+   print('{:<12} {:>10} {:>10} {:>10}'.format('startup [s]', 'min', 'mean', 'max'))
+   for _mode in ['nocache', 'cold', 'warm']:
+       print('{:<12} {:>10.2f} {:>10.2f} {:>10.2f}'.format(_mode, results[_mode]['min'], results[_mode]['mean'], results[_mode]['max']))
+   print('speed-up (warm vs no cache): {:.1f}x'.format(results['speedup']))
+
+   if 'identical' in results:
+      if results['identical']:
+         print('content of cms.Process (dumpPython): identical with and without cache')
+      else:
+         print('>> warning -- content of cms.Process (dumpPython) differs with and without cache, see: '+workDir, file=sys.stderr)
+
+   if opts.output:
+      with open(opts.output, 'w') as _jfile:
+           json.dump({'config': {'cfg': cfg, 'args': opts.args, 'executable': opts.executable}, 'results': results}, _jfile, indent=1, sort_keys=True)
+
+   if (not opts.cache_dir) and results.get('identical', True):
+      shutil.rmtree(workDir)
+
+   if not results.get('identical', True):
+      sys.exit(1)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+reproducible benchmark of the NTuple step (JMETriggerNTuple) with NTuplizers/test/jmeTriggerNTupleBenchmark_cfg.py,
+on synthetic collections (default, no input files) or on local input files (no network access):
+ - throughput [events/s] : (N - N0) / (T(N) - T(N0)), where T(N) is the wall time of a cmsRun job with N events
+                           and N0 is the number of events of a short job used to subtract the start-up time
+ - peak RSS [MB]         : max resident set size of the cmsRun job (from os.wait4)
+ - output [B/event]      : size of the output file divided by the number of entries of the TTree
+ - fill [us/event]       : fill time of every collection of JMETriggerNTuple (option "profileJSON")
+every job is repeated, and the best value of every metric is kept;
+the results are compared to a baseline .json file, and the exit code is 1 if any metric
+is worse than the baseline by more than the given threshold
+"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import json
+import time
+import subprocess
+
+def runJob(cfg, n, outputDir, tag, cmsRunArgs, verbosity=0):
+    """run cmsRun, returns dict with wall time [s], peak RSS [MB], output file size [B] and content of the ntuple profile"""
+    prefix = os.path.join(outputDir, tag)
+    cmd = ['cmsRun', cfg, 'n='+str(n), 'output='+prefix+'.root', 'profile='+prefix] + cmsRunArgs
+
+    if verbosity > 0:
+       print('>', ' '.join(cmd))
+
+    with open(prefix+'.log', 'w') as _logFile:
+         t0 = time.time()
+         proc = subprocess.Popen(cmd, stdout=_logFile, stderr=subprocess.STDOUT)
+         _pid, _status, _rusage = os.wait4(proc.pid, 0)
+         wallTime = time.time() - t0
+         proc.returncode = _status
+
+    if _status != 0:
+       raise RuntimeError('cmsRun failed (exit status '+str(_status)+'), see log file: '+prefix+'.log')
+
+    with open(prefix+'_ntuple.json') as _jfile:
+         ntuple = json.load(_jfile)
+
+    return {
+      'wallTime': wallTime,
+      # ru_maxrss is in kB on Linux
+      'peakRSS': _rusage.ru_maxrss / 1024.,
+      'fileSize': os.path.getsize(prefix+'.root'),
+      'ntuple': ntuple,
+    }
+
+def benchmark(cfg, n, n0, repetitions, outputDir, cmsRunArgs, verbosity=0):
+    best = None
+    for _rep in range(max(1, repetitions)):
+        _job = runJob(cfg, n, outputDir, 'benchmark_n'+str(n), cmsRunArgs, verbosity)
+        _startupTime = runJob(cfg, n0, outputDir, 'benchmark_n'+str(n0), cmsRunArgs, verbosity)['wallTime'] if n0 > 0 else 0.
+
+        _entries = _job['ntuple']['entries']
+        _res = {
+          'eventsPerSecond': (n - n0) / (_job['wallTime'] - _startupTime) if _job['wallTime'] > _startupTime else 0.,
+          'peakRSS': _job['peakRSS'],
+          'bytesPerEvent': float(_job['fileSize']) / max(_entries, 1),
+          'fillTime': dict((_coll, 1e6 * _val['fillTime'] / max(_val['fills'], 1)) for _coll, _val in _job['ntuple']['collections'].items()),
+        }
+
+        if verbosity > 0:
+           print('repetition {:d}: {:.1f} events/s, {:.1f} MB, {:.1f} B/event'.format(_rep, _res['eventsPerSecond'], _res['peakRSS'], _res['bytesPerEvent']))
+
+        if best is None:
+           best = _res
+        else:
+           best['eventsPerSecond'] = max(best['eventsPerSecond'], _res['eventsPerSecond'])
+           best['peakRSS'] = min(best['peakRSS'], _res['peakRSS'])
+           best['bytesPerEvent'] = min(best['bytesPerEvent'], _res['bytesPerEvent'])
+           for _coll in _res['fillTime']:
+               best['fillTime'][_coll] = min(best['fillTime'].get(_coll, _res['fillTime'][_coll]), _res['fillTime'][_coll])
+
+    return best
+
+def compare(results, baseline, threshold, collectionThreshold):
+    """list of (metric, value, baseline value, relative change [%], regression)"""
+    ret = []
+    def _add(metric, value, ref, higherIsBetter, thr):
+        if ref is None or ref == 0:
+           return
+        change = 100. * (value - ref) / ref
+        ret.append((metric, value, ref, change, (-change if higherIsBetter else change) > thr))
+
+    _add('eventsPerSecond', results['eventsPerSecond'], baseline.get('eventsPerSecond', None), True, threshold)
+    _add('peakRSS', results['peakRSS'], baseline.get('peakRSS', None), False, threshold)
+    _add('bytesPerEvent', results['bytesPerEvent'], baseline.get('bytesPerEvent', None), False, threshold)
+    for _coll in sorted(results['fillTime']):
+        _add('fillTime:'+_coll, results['fillTime'][_coll], baseline.get('fillTime', {}).get(_coll, None), False, collectionThreshold)
+
+    return ret
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+   parser.add_argument('-c', '--cfg', dest='cfg', action='store',
+                       default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test', 'jmeTriggerNTupleBenchmark_cfg.py'),
+                       help='path to cmsRun configuration file')
+
+   parser.add_argument('-o', '--output', dest='output', action='store', default='benchmarkNTuple',
+                       help='path to output directory (outputs and logs of cmsRun)')
+
+   parser.add_argument('-m', '--mode', dest='mode', action='store', default='synthetic', choices=['synthetic', 'input'],
+                       help='source of the input collections')
+
+   parser.add_argument('-i', '--inputFiles', dest='inputFiles', nargs='+', default=[],
+                       help='list of local input files (mode "input")')
+
+   parser.add_argument('-n', '--events', dest='events', action='store', type=int, default=5000,
+                       help='number of events')
+
+   parser.add_argument('--startup-events', dest='startup_events', action='store', type=int, default=100,
+                       help='number of events of the job used to subtract the start-up time from the throughput (0: no subtraction)')
+
+   parser.add_argument('-l', '--layout', dest='layout', action='store', default='vector', choices=['vector', 'flat'],
+                       help='layout of the branches of the collections in the output TTree (JMETriggerNTuple parameter "outputLayout")')
+
+   parser.add_argument('-t', '--threads', dest='threads', action='store', type=int, default=1,
+                       help='number of threads')
+
+   parser.add_argument('-r', '--repetitions', dest='repetitions', action='store', type=int, default=3,
+                       help='number of repetitions of every job (the best value of every metric is reported)')
+
+   parser.add_argument('-b', '--baseline', dest='baseline', action='store', default='benchmarkNTuple_baseline.json',
+                       help='path to .json file with the baseline results')
+
+   parser.add_argument('-u', '--update-baseline', dest='update_baseline', action='store_true', default=False,
+                       help='write the results to the baseline .json file (no comparison)')
+
+   parser.add_argument('--threshold', dest='threshold', action='store', type=float, default=5.,
+                       help='max relative change [%%] of throughput, peak RSS and output size before a regression is reported')
+
+   parser.add_argument('--collection-threshold', dest='collection_threshold', action='store', type=float, default=20.,
+                       help='max relative change [%%] of the fill time of a collection before a regression is reported')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   if opts.mode == 'input':
+      if not opts.inputFiles:
+         raise RuntimeError('mode "input" requires a list of local input files (option -i)')
+      for _f in opts.inputFiles:
+          if not os.path.isfile(_f):
+             raise RuntimeError('input file not found (only local files are supported): '+_f)
+
+   if opts.startup_events >= opts.events:
+      raise RuntimeError('number of start-up events must be smaller than the number of events: '+str(opts.startup_events)+' >= '+str(opts.events))
+
+   if not os.path.isdir(opts.output):
+      os.makedirs(opts.output)
+
+   config = {
+     'mode': opts.mode,
+     'inputFiles': [os.path.abspath(_f) for _f in opts.inputFiles],
+     'events': opts.events,
+     'startupEvents': opts.startup_events,
+     'threads': opts.threads,
+     'layout': opts.layout,
+   }
+
+   cmsRunArgs = ['mode='+opts.mode, 'numThreads='+str(opts.threads), 'outputLayout='+opts.layout]
+   if opts.inputFiles:
+      cmsRunArgs += ['inputFiles='+','.join(config['inputFiles'])]
+
+   results = benchmark(opts.cfg, opts.events, opts.startup_events, opts.repetitions, opts.output, cmsRunArgs, opts.verbosity)
+
+   print('throughput   : {:.1f} events/s'.format(results['eventsPerSecond']))
+   print('peak RSS     : {:.1f} MB'.format(results['peakRSS']))
+   print('output size  : {:.1f} B/event'.format(results['bytesPerEvent']))
+   print('fill time of collections [us/event]:')
+   for _coll in sorted(results['fillTime'], key=lambda _coll: results['fillTime'][_coll], reverse=True):
+       print('  {:<40} {:>10.2f}'.format(_coll, results['fillTime'][_coll]))
+
+   if opts.update_baseline:
+      with open(opts.baseline, 'w') as _jfile:
+           json.dump({'config': config, 'results': results}, _jfile, indent=1, sort_keys=True)
+      print('baseline written to:', opts.baseline)
+      sys.exit(0)
+
+   if not os.path.isfile(opts.baseline):
+      print('>> warning -- baseline file not found (no comparison, use option -u to create it):', opts.baseline, file=sys.stderr)
+      sys.exit(0)
+
+   with open(opts.baseline) as _jfile:
+        baseline = json.load(_jfile)
+
+   if baseline.get('config', {}) != config:
+      print('>> warning -- configuration of the baseline differs from the current one:', baseline.get('config', {}), file=sys.stderr)
+
+   comparison = compare(results, baseline['results'], opts.threshold, opts.collection_threshold)
+
+   print('\ncomparison to baseline ({:s})'.format(opts.baseline))
+   print('{:<50} {:>14} {:>14} {:>10}'.format('metric', 'value', 'baseline', 'change %'))
+   for _metric, _val, _ref, _change, _regression in comparison:
+       print('{:<50} {:>14.2f} {:>14.2f} {:>10.2f}{}'.format(_metric[:50], _val, _ref, _change, '  <-- REGRESSION' if _regression else ''))
+
+   nRegressions = sum(int(_cmp[-1]) for _cmp in comparison)
+   if nRegressions > 0:
+      print('\n{:d} regression(s) above threshold'.format(nRegressions))
+      sys.exit(1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+CPU time saved by the prefilter of jmeTriggerNTuple_cfg.py (option "prefilter"):
+comparison of the FastTimerService profiles (option "profile=<prefix>", files <prefix>*_timing.json)
+of jobs with and without prefilter running on the same input events;
+the CPU time (time_thread) is summed over the modules of the HLT re-emulation (option -m, glob patterns of module labels),
+and normalized to the number of events processed by the jobs (the prefilter does not change the number of input events);
+the times in the .json files of FastTimerService are in ms
+"""
+from __future__ import print_function
+import argparse
+import sys
+import json
+import fnmatch
+
+from aggregateProfiles import inputFiles, addTiming
+
+def loadTiming(inputs):
+    """sum of the FastTimerService .json files in the list of inputs (files, directories or glob patterns)"""
+    timing, nFiles = {}, 0
+    for _fpath in inputFiles(inputs):
+        try:
+           with open(_fpath) as _jfile:
+                _data = json.load(_jfile)
+        except ValueError:
+           print('>> warning -- invalid .json file (skipped):', _fpath, file=sys.stderr)
+           continue
+
+        if isinstance(_data, dict) and isinstance(_data.get('modules', None), list):
+           addTiming(timing, _data)
+           nFiles += 1
+
+    if '[job]' not in timing:
+       raise RuntimeError('no FastTimerService .json files found in inputs: '+str(inputs))
+
+    return timing, nFiles
+
+def selectModules(timing, patterns):
+    """labels of the modules matching at least one of the glob patterns"""
+    return set([_mod for _mod in timing if _mod != '[job]' and any(fnmatch.fnmatch(_mod, _pat) for _pat in patterns)])
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+   parser.add_argument('-p', '--prefilter', dest='prefilter', required=True, nargs='+', default=None,
+                       help='FastTimerService .json files (or directories, glob patterns) of the jobs with prefilter')
+
+   parser.add_argument('-r', '--reference', dest='reference', required=True, nargs='+', default=None,
+                       help='FastTimerService .json files (or directories, glob patterns) of the jobs without prefilter')
+
+   parser.add_argument('-m', '--modules', dest='modules', nargs='+', default=['*'],
+                       help='glob patterns of the labels of the modules of the HLT re-emulation (default: all modules)')
+
+   parser.add_argument('-n', '--max-rows', dest='max_rows', action='store', type=int, default=20,
+                       help='max number of rows of the table of modules (-1: all modules)')
+
+   parser.add_argument('-o', '--output', dest='output', action='store', default=None,
+                       help='path to output .json file with the summary')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   timingPre, nFilesPre = loadTiming(opts.prefilter)
+   timingRef, nFilesRef = loadTiming(opts.reference)
+
+   nEventsPre = timingPre['[job]']['events']
+   nEventsRef = timingRef['[job]']['events']
+
+   print('input files: {:d} (with prefilter, {:d} events), {:d} (without prefilter, {:d} events)'.format(nFilesPre, nEventsPre, nFilesRef, nEventsRef))
+
+   if nEventsPre != nEventsRef:
+      print('>> warning -- different number of events with and without prefilter (per-event values are not comparable)', file=sys.stderr)
+
+   modules = selectModules(timingPre, opts.modules) | selectModules(timingRef, opts.modules)
+
+   if not modules:
+      raise RuntimeError('no modules matching the patterns: '+str(opts.modules))
+
+   # CPU time per event [ms/ev] of every selected module (0 if the module did not run in one of the two configurations)
+   perModule = {}
+   for _mod in modules:
+       _pre = timingPre[_mod]['time_thread'] / max(nEventsPre, 1) if _mod in timingPre else 0.
+       _ref = timingRef[_mod]['time_thread'] / max(nEventsRef, 1) if _mod in timingRef else 0.
+       perModule[_mod] = {'prefilter': _pre, 'reference': _ref, 'saved': _ref - _pre}
+
+   cpuPre = sum(perModule[_mod]['prefilter'] for _mod in perModule)
+   cpuRef = sum(perModule[_mod]['reference'] for _mod in perModule)
+   jobPre = timingPre['[job]']['time_thread'] / max(nEventsPre, 1)
+   jobRef = timingRef['[job]']['time_thread'] / max(nEventsRef, 1)
+
+   print('\nCPU time [ms/ev]      {:>14} {:>14} {:>14} {:>8}'.format('w/ prefilter', 'w/o prefilter', 'saved', '%'))
+   print('  selected modules    {:>14.3f} {:>14.3f} {:>14.3f} {:>8.2f}'.format(cpuPre, cpuRef, cpuRef - cpuPre, 100. * (cpuRef - cpuPre) / cpuRef if cpuRef > 0 else 0.))
+   print('  job                 {:>14.3f} {:>14.3f} {:>14.3f} {:>8.2f}'.format(jobPre, jobRef, jobRef - jobPre, 100. * (jobRef - jobPre) / jobRef if jobRef > 0 else 0.))
+
+   ranked = sorted(perModule, key=lambda _mod: perModule[_mod]['saved'], reverse=True)
+   if opts.max_rows >= 0:
+      ranked = ranked[:opts.max_rows]
+
+   print('\nmodules (ranked by CPU time saved, {:d} selected modules)'.format(len(perModule)))
+   print('{:>4} {:<50} {:>14} {:>14} {:>14}'.format('', 'label', 'w/ [ms/ev]', 'w/o [ms/ev]', 'saved [ms/ev]'))
+   for _idx, _mod in enumerate(ranked):
+       print('{:>4d} {:<50} {:>14.3f} {:>14.3f} {:>14.3f}'.format(_idx+1, _mod[:50], perModule[_mod]['prefilter'], perModule[_mod]['reference'], perModule[_mod]['saved']))
+
+   if opts.output is not None:
+      with open(opts.output, 'w') as _jfile:
+           json.dump({
+             'events': {'prefilter': nEventsPre, 'reference': nEventsRef},
+             'modulePatterns': opts.modules,
+             'cpuTimePerEvent': {'prefilter': cpuPre, 'reference': cpuRef, 'saved': cpuRef - cpuPre},
+             'jobCpuTimePerEvent': {'prefilter': jobPre, 'reference': jobRef, 'saved': jobRef - jobPre},
+             'modules': perModule,
+           }, _jfile, indent=1, sort_keys=True)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+resumable merge of the outputs of JMETriggerNTuple (e.g. the output directory of a crab3 task),
+with a tree reduction over a pool of processes (see NTuplizers/python/ntupleMerge.py),
+and validation of the merged output: duplicate events, and coverage of the luminosity sections of the lumi mask;
+the exit code is 1 if the merged output contains duplicate events or luminosity sections outside the lumi mask
+"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import json
+import time
+
+try:
+    from JMETriggerAnalysis.NTuplizers.ntupleMerge import findInputFiles, merge, validate
+    from JMETriggerAnalysis.NTuplizers.lumiMask import LumiMask
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import DEFAULT_TREE
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+    from ntupleMerge import findInputFiles, merge, validate
+    from lumiMask import LumiMask
+    from ntupleReader import DEFAULT_TREE
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+   parser.add_argument('-i', '--inputs', dest='inputs', required=True, nargs='+', default=None,
+                       help='list of input files, or directories (.root files are searched recursively, "failed" directories are skipped)')
+
+   parser.add_argument('-o', '--output', dest='output', required=True, action='store', default=None,
+                       help='path to merged output file')
+
+   parser.add_argument('-w', '--work-dir', dest='work_dir', action='store', default=None,
+                       help='path to directory for the intermediate files and the checkpoint of the merge (default: "<output>.merge")')
+
+   parser.add_argument('-f', '--fan-in', dest='fan_in', action='store', type=int, default=20,
+                       help='max number of input files of every merge')
+
+   parser.add_argument('-j', '--jobs', dest='jobs', action='store', type=int, default=1,
+                       help='number of processes')
+
+   parser.add_argument('-c', '--compression', dest='compression', action='store', type=int, default=None,
+                       help='compression settings of the output (e.g. 404: LZ4, level 4) (default: same as the first input file)')
+
+   parser.add_argument('--keep-intermediate', dest='keep_intermediate', action='store_true', default=False,
+                       help='do not remove the intermediate files of the merge')
+
+   parser.add_argument('-l', '--lumi-mask', dest='lumi_mask', action='store', default=None,
+                       help='path to .json file with the lumi mask (e.g. Data.lumiMask of the crab3 configuration)')
+
+   parser.add_argument('--all-runs', dest='all_runs', action='store_true', default=False,
+                       help='report gaps for all runs of the lumi mask (default: only runs found in the merged output)')
+
+   parser.add_argument('--validate-only', dest='validate_only', action='store_true', default=False,
+                       help='no merge, only validation of the output file')
+
+   parser.add_argument('--no-validation', dest='no_validation', action='store_true', default=False,
+                       help='no validation of the output file')
+
+   parser.add_argument('-r', '--report', dest='report', action='store', default=None,
+                       help='path to output .json file with the results of the validation')
+
+   parser.add_argument('-t', '--tree', dest='tree', action='store', default=DEFAULT_TREE,
+                       help='path to TTree inside the input files')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   if opts.validate_only and opts.no_validation:
+      raise RuntimeError('options --validate-only and --no-validation are mutually exclusive')
+
+   if not opts.validate_only:
+      inputFiles = findInputFiles(opts.inputs)
+      if len(inputFiles) == 0:
+         raise RuntimeError('no input files found: '+str(opts.inputs))
+
+      if os.path.abspath(opts.output) in [os.path.abspath(_f) for _f in inputFiles]:
+         raise RuntimeError('output file is also an input file: '+opts.output)
+
+      t0 = time.time()
+      results = merge(inputFiles, opts.output, opts.work_dir if opts.work_dir else opts.output+'.merge',
+        fanIn=opts.fan_in, nProcesses=opts.jobs, compression=opts.compression, keepIntermediate=opts.keep_intermediate, verbosity=opts.verbosity)
+
+      nRecompressed = sum(int(not _res['fast']) for _res in results)
+      print('merged {:d} input files into {:s} ({:d} merges in {:.1f} s, {:d} with recompression)'.format(
+        len(inputFiles), opts.output, len(results), time.time()-t0, nRecompressed))
+
+   if opts.no_validation:
+      sys.exit(0)
+
+   if not os.path.isfile(opts.output):
+      raise RuntimeError('output file not found: '+opts.output)
+
+   report = validate(opts.output, LumiMask.fromJSON(opts.lumi_mask) if opts.lumi_mask else None, treeName=opts.tree, allRuns=opts.all_runs)
+
+   print('entries                           : {:d}'.format(report['entries']))
+   print('runs                              : {:d}'.format(len(report['runs'])))
+   print('luminosity sections               : {:d}'.format(report['lumis']))
+   if 'eventsSeen' in report:
+      print('events seen (LuminosityBlocks)    : {:d}'.format(report['eventsSeen']))
+      print('events written (LuminosityBlocks) : {:d}'.format(report['eventsWritten']))
+      if report['eventsNotInSummary'] != 0:
+         print('>> warning -- number of entries differs from the events written of the luminosity block summary (some inputs without summary?)', file=sys.stderr)
+   print('duplicate events                  : {:d}'.format(report['duplicates']))
+   for _run, _lumi, _event in report['duplicateEvents']:
+       print('  {:d}:{:d}:{:d}'.format(_run, _lumi, _event))
+
+   if opts.lumi_mask:
+      print('luminosity sections outside mask  : {:d}'.format(report['lumisOutsideMask']))
+      for _run in sorted(report['lumisOutsideMaskList']):
+          print('  {:s}: {}'.format(_run, report['lumisOutsideMaskList'][_run]))
+      print('gaps (lumi mask not in output)    : {:d}'.format(report['gaps']))
+      if opts.verbosity > 0:
+         for _run in sorted(report['gapsList']):
+             print('  {:s}: {}'.format(_run, report['gapsList'][_run]))
+
+   if opts.report:
+      with open(opts.report, 'w') as _jfile:
+           json.dump(report, _jfile, indent=1, sort_keys=True)
+
+   if (report['duplicates'] > 0) or (report.get('lumisOutsideMask', 0) > 0):
+      sys.exit(1)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""print the scalars and collections (with their variables) of the output of JMETriggerNTuple"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+
+try:
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+    from ntupleReader import NTupleReader, DEFAULT_TREE, DEFAULT_CACHE_DIR
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__)
+
+   parser.add_argument('-i', '--inputs', dest='inputs', required=True, nargs='+', default=None,
+                       help='list of input files')
+
+   parser.add_argument('-t', '--tree', dest='tree', action='store', default=DEFAULT_TREE,
+                       help='path to TTree inside the input files')
+
+   parser.add_argument('--cache-dir', dest='cache_dir', action='store', default=DEFAULT_CACHE_DIR,
+                       help='path to directory for the cache of the schema (empty string: no cache)')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   reader = NTupleReader(opts.inputs, treeName=opts.tree, cacheDir=(opts.cache_dir if opts.cache_dir else None))
+
+   print('scalars:')
+   for _scalar in reader.scalars():
+       print('  {:<60} {}'.format(_scalar, reader.schema['scalars'][_scalar]))
+
+   print('collections:')
+   for _coll in reader.collections():
+       _countBranch = reader.schema.get('counts', {}).get(_coll, None)
+       print('  '+_coll+(' (count branch: '+_countBranch+')' if _countBranch else ''))
+       for _var in reader.variables(_coll):
+           print('    {:<58} {}'.format(_var, reader.schema['collections'][_coll][_var]))
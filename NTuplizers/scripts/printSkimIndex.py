@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""print the content of the skim index of outputs of JMETriggerNTuple (parameter "skimIndex"),
+and the number of entries and clusters of the TTree to be read for a given selection"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+
+import numpy as np
+
+try:
+    from JMETriggerAnalysis.NTuplizers.skimIndex import SkimIndex, indexFileName, entryRanges, clusterRanges
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+    from skimIndex import SkimIndex, indexFileName, entryRanges, clusterRanges
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__)
+
+   parser.add_argument('-i', '--inputs', dest='inputs', required=True, nargs='+', default=None,
+                       help='list of output files of JMETriggerNTuple (or of their skim indices, ".idx")')
+
+   parser.add_argument('-s', '--selection', dest='selection', action='store', default=None,
+                       help='selection (e.g. "HLT_IsoMu24 && offlineIsolatedMuons_size >= 1 && offlineMETs_Type1_pt > 100")')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   totEntries, totSelected, totClusters, totClustersRead, totEntriesRead = 0, 0, 0, 0, 0
+
+   for _input in opts.inputs:
+       _rootFile = _input[:-len('.idx')] if _input.endswith('.idx') else _input
+       index = SkimIndex(indexFileName(_rootFile))
+       totEntries += index.entries
+
+       if (opts.selection is None) or (opts.verbosity > 0):
+          print(index.path, '(TTree: '+index.treePath+', entries: '+str(index.entries)+')')
+          print('  bits:')
+          for _bit in index.bits():
+              print('    {:<60} {:>10d}'.format(_bit, np.count_nonzero(index.bit(_bit))))
+          print('  keys:')
+          for _key in index.keys():
+              _values = index.key(_key)
+              _valid = _values[~np.isnan(_values)]
+              if len(_valid) > 0:
+                 print('    {:<60} min = {:<12.4g} max = {:<12.4g} NaN = {:d}'.format(_key, np.min(_valid), np.max(_valid), len(_values)-len(_valid)))
+              else:
+                 print('    {:<60} NaN = {:d}'.format(_key, len(_values)))
+
+       if opts.selection is None:
+          continue
+
+       mask = index.select(opts.selection)
+       nSelected = int(np.count_nonzero(mask))
+       totSelected += nSelected
+
+       if not os.path.isfile(_rootFile):
+          print('{}: {:d}/{:d} entries selected ({:d} ranges)'.format(index.path, nSelected, index.entries, len(entryRanges(mask))))
+          continue
+
+       import uproot
+       with uproot.open(_rootFile) as _file:
+           clusterOffsets = _file[index.treePath].common_entry_offsets()
+
+       ranges = clusterRanges(mask, clusterOffsets)
+       nClusters = len(clusterOffsets)-1
+       nClustersRead = sum(int(np.count_nonzero((np.asarray(clusterOffsets[:-1]) >= _start) & (np.asarray(clusterOffsets[:-1]) < _stop))) for _start, _stop in ranges)
+       nEntriesRead = sum(_stop-_start for _start, _stop in ranges)
+
+       totClusters += nClusters
+       totClustersRead += nClustersRead
+       totEntriesRead += nEntriesRead
+
+       print('{}: {:d}/{:d} entries selected, {:d}/{:d} clusters ({:d} entries) to be read'.format(
+         _rootFile, nSelected, index.entries, nClustersRead, nClusters, nEntriesRead))
+
+   if opts.selection is not None:
+      print('\ntotal: {:d}/{:d} entries selected ({:.2f}%)'.format(totSelected, totEntries, 100. * totSelected / max(totEntries, 1)))
+      if totClusters > 0:
+         print('       {:d}/{:d} clusters to be read ({:.2f}% of the clusters, {:.2f}% of the entries)'.format(
+           totClustersRead, totClusters, 100. * totClustersRead / totClusters, 100. * totEntriesRead / max(totEntries, 1)))
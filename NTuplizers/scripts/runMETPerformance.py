@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""HLT-vs-offline MET response and resolution from the output of JMETriggerNTuple"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import json
+import time
+
+try:
+    from JMETriggerAnalysis.NTuplizers.metPerformance import run, summary
+    from JMETriggerAnalysis.NTuplizers.histograms import HistogramCollection
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import DEFAULT_TREE, DEFAULT_CACHE_DIR
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+    from metPerformance import run, summary
+    from histograms import HistogramCollection
+    from ntupleReader import DEFAULT_TREE, DEFAULT_CACHE_DIR
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__)
+
+   parser.add_argument('-i', '--inputs', dest='inputs', required=True, nargs='+', default=None,
+                       help='list of input files (.root: NTuples, .json: histograms produced by previous runs of this script, to be merged)')
+
+   parser.add_argument('-o', '--output', dest='output', required=True, action='store', default=None,
+                       help='path to output .json file (histograms and summary)')
+
+   parser.add_argument('-t', '--tree', dest='tree', action='store', default=DEFAULT_TREE,
+                       help='path to TTree inside the input files')
+
+   parser.add_argument('-j', '--jobs', dest='jobs', action='store', type=int, default=1,
+                       help='number of processes')
+
+   parser.add_argument('-c', '--chunk-size', dest='chunk_size', action='store', type=int, default=200000,
+                       help='max number of entries read at once')
+
+   parser.add_argument('--cache-dir', dest='cache_dir', action='store', default=DEFAULT_CACHE_DIR,
+                       help='path to directory for the cache of the schema of the input files (empty string: no cache)')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   t0 = time.time()
+
+   rootFiles = [_f for _f in opts.inputs if not _f.endswith('.json')]
+   jsonFiles = [_f for _f in opts.inputs if _f.endswith('.json')]
+
+   hists = run(rootFiles, treeName=opts.tree, cacheDir=(opts.cache_dir if opts.cache_dir else None), chunkSize=opts.chunk_size, nProcesses=opts.jobs)
+
+   for _jf in jsonFiles:
+       with open(_jf) as _jfile:
+            hists += HistogramCollection.fromDict(json.load(_jfile)['histograms'])
+
+   results = summary(hists)
+
+   with open(opts.output, 'w') as _ofile:
+        json.dump({'histograms': hists.toDict(), 'summary': results}, _ofile, sort_keys=True)
+
+   if opts.verbosity > 0:
+      for _key in sorted(results):
+          print(_key)
+          _res = results[_key]
+          print('  {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}'.format('bin low', 'entries', 'response', 'RMS(par)', 'RMS(perp)', 'Q68(perp)'))
+          for _idx in range(len(_res['entries'])):
+              print('  {:>10.1f} {:>10.0f} {:>10.3f} {:>10.2f} {:>10.2f} {:>10.2f}'.format(_res['edges'][_idx], _res['entries'][_idx],
+                _res['response'][_idx], _res['resolutionPar_RMS'][_idx], _res['resolutionPerp_RMS'][_idx], _res['resolutionPerp_Q68'][_idx]))
+
+   print('output:', opts.output, '({:.1f} s)'.format(time.time() - t0))
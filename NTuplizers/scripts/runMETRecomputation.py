@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+re-computation of PF-MET variants from the candidates stored in the output of JMETriggerNTuple,
+and cross-check with the stored METs (see NTuplizers/python/metRecomputation.py)
+
+the variants and cross-checks can be given in a .json file:
+  {"variants": {"hltPFMET_maxAbsEta2p5": {"collection": "hltParticleFlow", "maxAbsEta": 2.5}, ...},
+   "references": {"hltPFMET_maxAbsEta2p5": [["hltPFMET", ""]], ...}}
+"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import json
+import time
+
+try:
+    from JMETriggerAnalysis.NTuplizers.metRecomputation import run, summary
+    from JMETriggerAnalysis.NTuplizers.histograms import HistogramCollection
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import DEFAULT_TREE, DEFAULT_CACHE_DIR
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+    from metRecomputation import run, summary
+    from histograms import HistogramCollection
+    from ntupleReader import DEFAULT_TREE, DEFAULT_CACHE_DIR
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+   parser.add_argument('-i', '--inputs', dest='inputs', required=True, nargs='+', default=None,
+                       help='list of input files (.root: NTuples, .json: histograms produced by previous runs of this script, to be merged)')
+
+   parser.add_argument('-o', '--output', dest='output', required=True, action='store', default=None,
+                       help='path to output .json file (histograms and summary of the cross-checks)')
+
+   parser.add_argument('-c', '--config', dest='config', action='store', default=None,
+                       help='path to .json file with the variants ("variants") and the cross-checks ("references") (default: see metRecomputation.py)')
+
+   parser.add_argument('-t', '--tree', dest='tree', action='store', default=DEFAULT_TREE,
+                       help='path to TTree inside the input files')
+
+   parser.add_argument('-j', '--jobs', dest='jobs', action='store', type=int, default=1,
+                       help='number of processes')
+
+   parser.add_argument('--chunk-size', dest='chunk_size', action='store', type=int, default=100000,
+                       help='max number of entries read at once')
+
+   parser.add_argument('--tolerance', dest='tolerance', action='store', type=float, default=0.01,
+                       help='tolerance on the relative difference of MET pt in the summary of the cross-checks')
+
+   parser.add_argument('--cache-dir', dest='cache_dir', action='store', default=DEFAULT_CACHE_DIR,
+                       help='path to directory for the cache of the schema of the input files (empty string: no cache)')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   t0 = time.time()
+
+   config = {}
+   if opts.config is not None:
+      with open(opts.config) as _cfile:
+           _cfg = json.load(_cfile)
+      for _key in ['variants', 'references']:
+          if _key in _cfg:
+             config[_key] = _cfg[_key]
+      if 'references' in config:
+         config['references'] = dict((_name, [tuple(_ref) for _ref in config['references'][_name]]) for _name in config['references'])
+
+   rootFiles = [_f for _f in opts.inputs if not _f.endswith('.json')]
+   jsonFiles = [_f for _f in opts.inputs if _f.endswith('.json')]
+
+   hists = run(rootFiles, treeName=opts.tree, cacheDir=(opts.cache_dir if opts.cache_dir else None), chunkSize=opts.chunk_size, nProcesses=opts.jobs, config=config)
+
+   for _jf in jsonFiles:
+       with open(_jf) as _jfile:
+            hists += HistogramCollection.fromDict(json.load(_jfile)['histograms'])
+
+   results = summary(hists, tolerance=opts.tolerance)
+
+   with open(opts.output, 'w') as _ofile:
+        json.dump({'histograms': hists.toDict(), 'summary': results}, _ofile, sort_keys=True)
+
+   if opts.verbosity > 0:
+      print('{:<50} {:>10} {:>12} {:>12} {:>12} {:>10}'.format('cross-check', 'events', 'mean(dPt)', 'RMS(dPt)', 'RMS(dSumEt)', 'in tol.'))
+      for _key in sorted(results):
+          _res = results[_key]
+          print('{:<50} {:>10.0f} {:>12.4g} {:>12.4g} {:>12.4g} {:>10.4f}'.format(_key, _res['events'],
+            _res['deltaPt']['mean'], _res['deltaPt']['rms'], _res.get('deltaSumEt', {}).get('rms', float('nan')), _res['fractionWithinTolerance']))
+
+   print('output:', opts.output, '({:.1f} s)'.format(time.time() - t0))
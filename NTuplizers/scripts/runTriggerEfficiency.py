@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""trigger efficiencies (turn-on curves with Clopper-Pearson intervals) from the output of JMETriggerNTuple"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import json
+import time
+
+import numpy as np
+
+try:
+    from JMETriggerAnalysis.NTuplizers.triggerEfficiency import run
+    from JMETriggerAnalysis.NTuplizers.ntupleReader import DEFAULT_TREE, DEFAULT_CACHE_DIR
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+    from triggerEfficiency import run
+    from ntupleReader import DEFAULT_TREE, DEFAULT_CACHE_DIR
+
+def parseObservable(spec):
+    """"name:nbins:min:max" (uniform binning) or "name:e0,e1,...,eN" (bin edges)"""
+    _tmp = spec.split(':')
+    if len(_tmp) == 4:
+       return _tmp[0], np.linspace(float(_tmp[2]), float(_tmp[3]), int(_tmp[1])+1)
+    elif len(_tmp) == 2:
+       return _tmp[0], np.array([float(_e) for _e in _tmp[1].split(',')])
+    raise ValueError('invalid observable (expected "name:nbins:min:max" or "name:e0,e1,...,eN"): '+spec)
+
+#### main
+if __name__ == '__main__':
+   ### args
+   parser = argparse.ArgumentParser(description=__doc__)
+
+   parser.add_argument('-i', '--inputs', dest='inputs', required=True, nargs='+', default=None,
+                       help='list of input files')
+
+   parser.add_argument('-o', '--output', dest='output', required=True, action='store', default=None,
+                       help='path to output .json file')
+
+   parser.add_argument('-p', '--paths', dest='paths', required=True, nargs='+', default=None,
+                       help='list of trigger paths (names of branches)')
+
+   parser.add_argument('-x', '--observables', dest='observables', required=True, nargs='+', default=None,
+                       help='list of offline observables ("name:nbins:min:max" or "name:e0,e1,...,eN")')
+
+   parser.add_argument('-s', '--selection', dest='selection', nargs='+', default=[],
+                       help='list of bool branches required in the denominator (logical AND)')
+
+   parser.add_argument('-t', '--tree', dest='tree', action='store', default=DEFAULT_TREE,
+                       help='path to TTree inside the input files')
+
+   parser.add_argument('-j', '--jobs', dest='jobs', action='store', type=int, default=1,
+                       help='number of processes')
+
+   parser.add_argument('-c', '--chunk-size', dest='chunk_size', action='store', type=int, default=200000,
+                       help='max number of entries read at once')
+
+   parser.add_argument('--cl', dest='cl', action='store', type=float, default=0.682689492137,
+                       help='confidence level of the Clopper-Pearson intervals')
+
+   parser.add_argument('--cache-dir', dest='cache_dir', action='store', default=DEFAULT_CACHE_DIR,
+                       help='path to directory for the cache of the results of every input file (empty string: no cache)')
+
+   parser.add_argument('-v', '--verbosity', dest='verbosity', nargs='?', const=1, type=int, default=0,
+                       help='verbosity level')
+
+   opts, opts_unknown = parser.parse_known_args()
+   ### ----
+
+   if len(opts_unknown) > 0:
+      raise RuntimeError('unrecognized command-line arguments: '+str(opts_unknown))
+
+   t0 = time.time()
+
+   observables = dict(parseObservable(_obs) for _obs in opts.observables)
+
+   eff, nCached = run(opts.inputs, opts.paths, observables, selection=opts.selection, treeName=opts.tree,
+     cacheDir=(opts.cache_dir if opts.cache_dir else None), chunkSize=opts.chunk_size, nProcesses=opts.jobs)
+
+   results = eff.efficiencies(cl=opts.cl)
+
+   with open(opts.output, 'w') as _ofile:
+        json.dump(results, _ofile, sort_keys=True)
+
+   if opts.verbosity > 0:
+      for _path in sorted(results):
+          for _obs in sorted(results[_path]):
+              _res = results[_path][_obs]
+              print(_path, 'vs', _obs)
+              for _idx in range(len(_res['total'])):
+                  print('  [{:>9.2f}, {:>9.2f}) {:>10.0f} {:>10.0f} {:>8.4f} -{:.4f} +{:.4f}'.format(_res['edges'][_idx], _res['edges'][_idx+1],
+                    _res['pass'][_idx], _res['total'][_idx], _res['efficiency'][_idx],
+                    _res['efficiency'][_idx]-_res['low'][_idx], _res['high'][_idx]-_res['efficiency'][_idx]))
+
+   print('output:', opts.output, '({:.1f} s, {:d}/{:d} input files read from cache)'.format(time.time() - t0, nCached, len(opts.inputs)))
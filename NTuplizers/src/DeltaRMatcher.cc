@@ -0,0 +1,202 @@
+#include <JMETriggerAnalysis/NTuplizers/interface/DeltaRMatcher.h>
+#include <FWCore/Utilities/interface/Exception.h>
+#include <DataFormats/Math/interface/deltaPhi.h>
+
+#include <algorithm>
+#include <cmath>
+
+DeltaRMatcher::DeltaRMatcher(const double maxDeltaR, const bool unique)
+  : maxDeltaR_(maxDeltaR), maxDeltaR2_(maxDeltaR * maxDeltaR), unique_(unique),
+    etaMin_(0.), etaCellSize_(1.), nEtaCells_(1), phiCellSize_(2. * M_PI), nPhiCells_(1) {
+
+  if(not (maxDeltaR_ > 0.)){
+
+    throw cms::Exception("Configuration") << "DeltaRMatcher -- invalid maximum delta-R (must be positive): " << maxDeltaR_;
+  }
+
+  // cells in phi are not smaller than the maximum delta-R (one cell if the maximum delta-R is larger than pi)
+  nPhiCells_ = std::max(1, int(std::floor(2. * M_PI / maxDeltaR_)));
+  phiCellSize_ = 2. * M_PI / nPhiCells_;
+}
+
+int DeltaRMatcher::etaCell(const float eta) const {
+
+  return std::min(nEtaCells_-1, std::max(0, int(std::floor((eta - etaMin_) / etaCellSize_))));
+}
+
+int DeltaRMatcher::phiCell(const float phi) const {
+
+  // phi outside [-pi, pi] is wrapped into the periodic range of cells
+  return std::min(nPhiCells_-1, std::max(0, int(std::floor((reco::reduceRange(double(phi)) + M_PI) / phiCellSize_))));
+}
+
+void DeltaRMatcher::buildGrid(const std::vector<float>& eta, const std::vector<float>& phi){
+
+  // range in eta of the objects (objects with eta or phi not finite are not matched)
+  double etaMax(0.);
+  bool empty(true);
+
+  for(unsigned int idx=0; idx<eta.size(); ++idx){
+
+    if(not (std::isfinite(eta[idx]) and std::isfinite(phi[idx]))){ continue; }
+
+    etaMin_ = empty ? eta[idx] : std::min(etaMin_, double(eta[idx]));
+    etaMax = empty ? eta[idx] : std::max(etaMax, double(eta[idx]));
+    empty = false;
+  }
+
+  if(empty){
+
+    etaMin_ = 0.;
+  }
+
+  // the number of cells is limited to a few times the number of objects (cells are enlarged if needed)
+  const int maxEtaCells(std::max(1, (4 * int(eta.size()) + 16) / nPhiCells_));
+
+  etaCellSize_ = std::max(maxDeltaR_, (etaMax - etaMin_) / maxEtaCells * (1. + 1e-6));
+  nEtaCells_ = std::min(maxEtaCells, int(std::floor((etaMax - etaMin_) / etaCellSize_)) + 1);
+
+  // counting sort of the objects by cell (objects of a cell are in increasing order of index)
+  cellStart_.assign(nEtaCells_ * nPhiCells_ + 1, 0);
+  objectCells_.resize(eta.size());
+
+  for(unsigned int idx=0; idx<eta.size(); ++idx){
+
+    if(not (std::isfinite(eta[idx]) and std::isfinite(phi[idx]))){
+
+      objectCells_[idx] = -1;
+      continue;
+    }
+
+    objectCells_[idx] = etaCell(eta[idx]) * nPhiCells_ + phiCell(phi[idx]);
+    ++cellStart_[objectCells_[idx] + 1];
+  }
+
+  for(unsigned int idx=1; idx<cellStart_.size(); ++idx){
+
+    cellStart_[idx] += cellStart_[idx-1];
+  }
+
+  cellObjects_.resize(cellStart_.back());
+
+  // cellStart_[k] is used as insertion position of cell k, and it is then the end of cell k (start of cell k+1)
+  for(unsigned int idx=0; idx<eta.size(); ++idx){
+
+    if(objectCells_[idx] >= 0){
+
+      cellObjects_[cellStart_[objectCells_[idx]]++] = idx;
+    }
+  }
+
+  for(unsigned int idx=cellStart_.size()-1; idx>0; --idx){
+
+    cellStart_[idx] = cellStart_[idx-1];
+  }
+
+  cellStart_[0] = 0;
+}
+
+void DeltaRMatcher::match(const std::vector<float>& eta1, const std::vector<float>& phi1,
+                          const std::vector<float>& eta2, const std::vector<float>& phi2, std::vector<int>& result){
+
+  if((eta1.size() != phi1.size()) or (eta2.size() != phi2.size())){
+
+    throw cms::Exception("LogicError") << "DeltaRMatcher::match -- inputs with different number of values of eta and phi";
+  }
+
+  result.assign(eta1.size(), -1);
+
+  if(eta1.empty() or eta2.empty()){
+
+    return;
+  }
+
+  this->buildGrid(eta2, phi2);
+
+  if(unique_){
+
+    pairs_.clear();
+  }
+
+  // cells in phi around the object (without duplicates if there are less than 3 cells)
+  int phiCells[3];
+
+  for(unsigned int idx1=0; idx1<eta1.size(); ++idx1){
+
+    if(not (std::isfinite(eta1[idx1]) and std::isfinite(phi1[idx1]))){
+
+      continue;
+    }
+
+    // cell in eta, possibly outside the grid (only the adjacent cells inside the grid are used)
+    const int iEta(int(std::floor(std::max(-2., std::min(double(nEtaCells_+1), (eta1[idx1] - etaMin_) / etaCellSize_)))));
+    const int iPhi(phiCell(phi1[idx1]));
+
+    const int nPhi(std::min(3, nPhiCells_));
+
+    phiCells[0] = iPhi;
+
+    if(nPhi > 1){ phiCells[1] = (iPhi + 1) % nPhiCells_; }
+    if(nPhi > 2){ phiCells[2] = (iPhi + nPhiCells_ - 1) % nPhiCells_; }
+
+    double bestDR2(maxDeltaR2_);
+    int bestIdx(-1);
+
+    for(int jEta=std::max(0, iEta-1); jEta<=std::min(nEtaCells_-1, iEta+1); ++jEta){
+
+      for(int k=0; k<nPhi; ++k){
+
+        const int cell(jEta * nPhiCells_ + phiCells[k]);
+
+        for(unsigned int pos=cellStart_[cell]; pos<cellStart_[cell+1]; ++pos){
+
+          const unsigned int idx2(cellObjects_[pos]);
+
+          const float dEta(eta1[idx1] - eta2[idx2]);
+          const float dPhi(reco::deltaPhi(phi1[idx1], phi2[idx2]));
+          const float dR2(dEta * dEta + dPhi * dPhi);
+
+          if(dR2 > maxDeltaR2_){
+
+            continue;
+          }
+
+          if(unique_){
+
+            pairs_.emplace_back(dR2, std::make_pair(idx1, idx2));
+          }
+          else if((dR2 < bestDR2) or ((dR2 == bestDR2) and ((bestIdx < 0) or (int(idx2) < bestIdx)))){
+
+            bestDR2 = dR2;
+            bestIdx = idx2;
+          }
+        }
+      }
+    }
+
+    if(not unique_){
+
+      result[idx1] = bestIdx;
+    }
+  }
+
+  if(unique_){
+
+    // pairs in order of increasing delta-R (ties: by index in the first, then in the second collection)
+    std::sort(pairs_.begin(), pairs_.end());
+
+    matched_.assign(eta2.size(), false);
+
+    for(const auto& pair_i : pairs_){
+
+      const auto idx1(pair_i.second.first);
+      const auto idx2(pair_i.second.second);
+
+      if((result[idx1] < 0) and (not matched_[idx2])){
+
+        result[idx1] = idx2;
+        matched_[idx2] = true;
+      }
+    }
+  }
+}
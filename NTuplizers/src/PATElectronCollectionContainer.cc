@@ -66,3 +66,22 @@ void PATElectronCollectionContainer::emplace_back(const pat::Electron& obj){
 
   etaSC_.emplace_back(obj.superCluster()->eta());
 }
+
+void PATElectronCollectionContainer::swap(PATElectronCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pdgId_.swap(other.pdgId_);
+  pt_.swap(other.pt_);
+  eta_.swap(other.eta_);
+  phi_.swap(other.phi_);
+  mass_.swap(other.mass_);
+  vx_.swap(other.vx_);
+  vy_.swap(other.vy_);
+  vz_.swap(other.vz_);
+  dxyPV_.swap(other.dxyPV_);
+  dzPV_.swap(other.dzPV_);
+  id_.swap(other.id_);
+  pfIso_.swap(other.pfIso_);
+  etaSC_.swap(other.etaSC_);
+}
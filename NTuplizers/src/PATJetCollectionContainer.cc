@@ -28,3 +28,13 @@ void PATJetCollectionContainer::emplace_back(const pat::Jet& obj){
   phi_.emplace_back(obj.phi());
   mass_.emplace_back(obj.mass());
 }
+
+void PATJetCollectionContainer::swap(PATJetCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pt_.swap(other.pt_);
+  eta_.swap(other.eta_);
+  phi_.swap(other.phi_);
+  mass_.swap(other.mass_);
+}
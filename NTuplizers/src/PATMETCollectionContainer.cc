@@ -64,3 +64,25 @@ void PATMETCollectionContainer::emplace_back(const pat::MET& obj){
   Type6EtFraction_.emplace_back(obj.Type6EtFraction());
   Type7EtFraction_.emplace_back(obj.Type7EtFraction());
 }
+
+void PATMETCollectionContainer::swap(PATMETCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  Raw_pt_.swap(other.Raw_pt_);
+  Raw_phi_.swap(other.Raw_phi_);
+  Raw_sumEt_.swap(other.Raw_sumEt_);
+  Type1_pt_.swap(other.Type1_pt_);
+  Type1_phi_.swap(other.Type1_phi_);
+  Type1_sumEt_.swap(other.Type1_sumEt_);
+  Type1XY_pt_.swap(other.Type1XY_pt_);
+  Type1XY_phi_.swap(other.Type1XY_phi_);
+  Type1XY_sumEt_.swap(other.Type1XY_sumEt_);
+  NeutralEMFraction_.swap(other.NeutralEMFraction_);
+  NeutralHadEtFraction_.swap(other.NeutralHadEtFraction_);
+  ChargedEMEtFraction_.swap(other.ChargedEMEtFraction_);
+  ChargedHadEtFraction_.swap(other.ChargedHadEtFraction_);
+  MuonEtFraction_.swap(other.MuonEtFraction_);
+  Type6EtFraction_.swap(other.Type6EtFraction_);
+  Type7EtFraction_.swap(other.Type7EtFraction_);
+}
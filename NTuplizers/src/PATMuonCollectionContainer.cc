@@ -64,3 +64,21 @@ void PATMuonCollectionContainer::emplace_back(const pat::Muon& obj){
 
   pfIso_.emplace_back(obj.hasUserFloat("pfIsoR04") ? obj.userFloat("pfIsoR04") : -9999.);
 }
+
+void PATMuonCollectionContainer::swap(PATMuonCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pdgId_.swap(other.pdgId_);
+  pt_.swap(other.pt_);
+  eta_.swap(other.eta_);
+  phi_.swap(other.phi_);
+  mass_.swap(other.mass_);
+  vx_.swap(other.vx_);
+  vy_.swap(other.vy_);
+  vz_.swap(other.vz_);
+  dxyPV_.swap(other.dxyPV_);
+  dzPV_.swap(other.dzPV_);
+  id_.swap(other.id_);
+  pfIso_.swap(other.pfIso_);
+}
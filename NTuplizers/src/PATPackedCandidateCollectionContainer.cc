@@ -43,3 +43,18 @@ void PATPackedCandidateCollectionContainer::emplace_back(const pat::PackedCandid
   vz_.emplace_back(obj.vz());
   fromPV_.emplace_back(obj.fromPV());
 }
+
+void PATPackedCandidateCollectionContainer::swap(PATPackedCandidateCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pdgId_.swap(other.pdgId_);
+  pt_.swap(other.pt_);
+  eta_.swap(other.eta_);
+  phi_.swap(other.phi_);
+  mass_.swap(other.mass_);
+  vx_.swap(other.vx_);
+  vy_.swap(other.vy_);
+  vz_.swap(other.vz_);
+  fromPV_.swap(other.fromPV_);
+}
@@ -28,3 +28,13 @@ void RecoCaloJetCollectionContainer::emplace_back(const reco::CaloJet& obj){
   phi_.emplace_back(obj.phi());
   mass_.emplace_back(obj.mass());
 }
+
+void RecoCaloJetCollectionContainer::swap(RecoCaloJetCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pt_.swap(other.pt_);
+  eta_.swap(other.eta_);
+  phi_.swap(other.phi_);
+  mass_.swap(other.mass_);
+}
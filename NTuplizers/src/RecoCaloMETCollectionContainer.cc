@@ -25,3 +25,12 @@ void RecoCaloMETCollectionContainer::emplace_back(const reco::CaloMET& obj){
   phi_.emplace_back(obj.phi());
   sumEt_.emplace_back(obj.sumEt());
 }
+
+void RecoCaloMETCollectionContainer::swap(RecoCaloMETCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pt_.swap(other.pt_);
+  phi_.swap(other.phi_);
+  sumEt_.swap(other.sumEt_);
+}
@@ -43,3 +43,18 @@ void RecoGenMETCollectionContainer::emplace_back(const reco::GenMET& obj){
   MuonEtFraction_.emplace_back(obj.MuonEtFraction());
   InvisibleEtFraction_.emplace_back(obj.InvisibleEtFraction());
 }
+
+void RecoGenMETCollectionContainer::swap(RecoGenMETCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pt_.swap(other.pt_);
+  phi_.swap(other.phi_);
+  sumEt_.swap(other.sumEt_);
+  NeutralEMEtFraction_.swap(other.NeutralEMEtFraction_);
+  NeutralHadEtFraction_.swap(other.NeutralHadEtFraction_);
+  ChargedEMEtFraction_.swap(other.ChargedEMEtFraction_);
+  ChargedHadEtFraction_.swap(other.ChargedHadEtFraction_);
+  MuonEtFraction_.swap(other.MuonEtFraction_);
+  InvisibleEtFraction_.swap(other.InvisibleEtFraction_);
+}
@@ -40,3 +40,17 @@ void RecoPFCandidateCollectionContainer::emplace_back(const reco::PFCandidate& o
   vy_.emplace_back(obj.vy());
   vz_.emplace_back(obj.vz());
 }
+
+void RecoPFCandidateCollectionContainer::swap(RecoPFCandidateCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pdgId_.swap(other.pdgId_);
+  pt_.swap(other.pt_);
+  eta_.swap(other.eta_);
+  phi_.swap(other.phi_);
+  mass_.swap(other.mass_);
+  vx_.swap(other.vx_);
+  vy_.swap(other.vy_);
+  vz_.swap(other.vz_);
+}
@@ -46,3 +46,19 @@ void RecoPFMETCollectionContainer::emplace_back(const reco::PFMET& obj){
   Type6EtFraction_.emplace_back(obj.Type6EtFraction());
   Type7EtFraction_.emplace_back(obj.Type7EtFraction());
 }
+
+void RecoPFMETCollectionContainer::swap(RecoPFMETCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  pt_.swap(other.pt_);
+  phi_.swap(other.phi_);
+  sumEt_.swap(other.sumEt_);
+  NeutralEMFraction_.swap(other.NeutralEMFraction_);
+  NeutralHadEtFraction_.swap(other.NeutralHadEtFraction_);
+  ChargedEMEtFraction_.swap(other.ChargedEMEtFraction_);
+  ChargedHadEtFraction_.swap(other.ChargedHadEtFraction_);
+  MuonEtFraction_.swap(other.MuonEtFraction_);
+  Type6EtFraction_.swap(other.Type6EtFraction_);
+  Type7EtFraction_.swap(other.Type7EtFraction_);
+}
@@ -37,3 +37,16 @@ void RecoVertexCollectionContainer::emplace_back(const reco::Vertex& obj){
   y_.emplace_back(obj.y());
   z_.emplace_back(obj.z());
 }
+
+void RecoVertexCollectionContainer::swap(RecoVertexCollectionContainer& other){
+
+  this->swapBuffers(other);
+
+  tracksSize_.swap(other.tracksSize_);
+  isFake_.swap(other.isFake_);
+  chi2_.swap(other.chi2_);
+  ndof_.swap(other.ndof_);
+  x_.swap(other.x_);
+  y_.swap(other.y_);
+  z_.swap(other.z_);
+}
@@ -0,0 +1,142 @@
+#include <JMETriggerAnalysis/NTuplizers/interface/SkimIndexWriter.h>
+#include <FWCore/Utilities/interface/Exception.h>
+
+#include <fstream>
+#include <sstream>
+#include <numeric>
+#include <algorithm>
+#include <limits>
+#include <cmath>
+
+unsigned int SkimIndexWriter::addBit(const std::string& name){
+
+  if(nEntries_ > 0){
+
+    throw cms::Exception("LogicError") << "SkimIndexWriter::addBit -- bits must be added before the first entry";
+  }
+
+  const auto it = std::find(bitNames_.begin(), bitNames_.end(), name);
+
+  if(it != bitNames_.end()){
+
+    return std::distance(bitNames_.begin(), it);
+  }
+
+  bitNames_.emplace_back(name);
+  bitWords_.emplace_back();
+
+  return bitNames_.size()-1;
+}
+
+unsigned int SkimIndexWriter::addKey(const std::string& name){
+
+  if(nEntries_ > 0){
+
+    throw cms::Exception("LogicError") << "SkimIndexWriter::addKey -- keys must be added before the first entry";
+  }
+
+  const auto it = std::find(keyNames_.begin(), keyNames_.end(), name);
+
+  if(it != keyNames_.end()){
+
+    return std::distance(keyNames_.begin(), it);
+  }
+
+  keyNames_.emplace_back(name);
+  keyValues_.emplace_back();
+
+  return keyNames_.size()-1;
+}
+
+void SkimIndexWriter::addEntry(){
+
+  if(nEntries_ % 64 == 0){
+
+    for(auto& words_i : bitWords_){
+
+      words_i.emplace_back(0);
+    }
+  }
+
+  for(auto& values_i : keyValues_){
+
+    values_i.emplace_back(std::numeric_limits<float>::quiet_NaN());
+  }
+
+  ++nEntries_;
+}
+
+bool SkimIndexWriter::write(const std::string& fileName, const std::string& treePath) const {
+
+  if(nEntries_ > std::numeric_limits<uint32_t>::max()){
+
+    throw cms::Exception("LogicError") << "SkimIndexWriter::write -- too many entries for 32-bit entry numbers: " << nEntries_;
+  }
+
+  const uint16_t one(1);
+  const bool littleEndian(*reinterpret_cast<const char*>(&one) == 1);
+
+  // names of bits and keys are names of paths and branches (no characters to be escaped)
+  std::ostringstream header;
+  header << "{\"version\": 1, \"tree\": \"" << treePath << "\", \"entries\": " << nEntries_
+         << ", \"byteOrder\": \"" << (littleEndian ? "little" : "big") << "\", \"bitWords\": " << (nEntries_ + 63) / 64
+         << ", \"bits\": [";
+
+  for(size_t idx=0; idx<bitNames_.size(); ++idx){
+
+    header << (idx ? ", " : "") << "\"" << bitNames_[idx] << "\"";
+  }
+
+  header << "], \"keys\": [";
+
+  for(size_t idx=0; idx<keyNames_.size(); ++idx){
+
+    header << (idx ? ", " : "") << "\"" << keyNames_[idx] << "\"";
+  }
+
+  header << "]}";
+
+  // padding: the arrays start at offsets multiple of 8 bytes
+  std::string headerStr(header.str());
+  headerStr.resize(headerStr.size() + (8 - headerStr.size() % 8) % 8, ' ');
+
+  std::ofstream ofile(fileName, std::ios::binary);
+
+  if(not ofile.is_open()){
+
+    return false;
+  }
+
+  const uint64_t headerSize(headerStr.size());
+
+  ofile.write("JMETIDX1", 8);
+  ofile.write(reinterpret_cast<const char*>(&headerSize), sizeof(headerSize));
+  ofile.write(headerStr.data(), headerStr.size());
+
+  for(const auto& words_i : bitWords_){
+
+    ofile.write(reinterpret_cast<const char*>(words_i.data()), words_i.size() * sizeof(uint64_t));
+  }
+
+  std::vector<uint32_t> order(nEntries_);
+  std::vector<float> sortedValues(nEntries_);
+
+  for(const auto& values_i : keyValues_){
+
+    std::iota(order.begin(), order.end(), 0);
+    std::stable_sort(order.begin(), order.end(), [&values_i](const uint32_t i1, const uint32_t i2){
+
+      return std::isnan(values_i[i2]) ? (not std::isnan(values_i[i1])) : (values_i[i1] < values_i[i2]);
+    });
+
+    for(size_t idx=0; idx<order.size(); ++idx){
+
+      sortedValues[idx] = values_i[order[idx]];
+    }
+
+    ofile.write(reinterpret_cast<const char*>(sortedValues.data()), sortedValues.size() * sizeof(float));
+    ofile.write(reinterpret_cast<const char*>(order.data()), order.size() * sizeof(uint32_t));
+  }
+
+  return ofile.good();
+}
@@ -1,6 +1,6 @@
 #include <JMETriggerAnalysis/NTuplizers/interface/TriggerResultsContainer.h>
 #include <FWCore/MessageLogger/interface/MessageLogger.h>
-#include <FWCore/Common/interface/TriggerNames.h>
+#include <FWCore/Utilities/interface/Exception.h>
 
 TriggerResultsContainer::TriggerResultsContainer(const std::vector<std::string>& names, const std::string& inputTagLabel, const edm::EDGetToken& token)
   : inputTagLabel_(inputTagLabel), token_(token) {
@@ -38,46 +38,53 @@ void TriggerResultsContainer::clear(){
   }
 }
 
-void TriggerResultsContainer::fill(const edm::TriggerResults& triggerResults, const edm::Event& iEvent){
+void TriggerResultsContainer::initPathIndex(TriggerPathIndex& pathIndex){
+
+  pathIndexKeys_.clear();
+  pathIndexKeys_.reserve(entries_.size());
+
+  for(const auto& entry_i : entries_){
+
+    pathIndexKeys_.emplace_back(pathIndex.add(entry_i.name));
+  }
+}
+
+void TriggerResultsContainer::fill(const edm::TriggerResults& triggerResults, const TriggerPathIndex& pathIndex){
 
   // reset values to false
   this->clear();
 
-  const auto& triggerNames = iEvent.triggerNames(triggerResults).triggerNames();
+  if(not pathIndex.isValid()){
 
-  if(triggerResults.size() != triggerNames.size()){
+    return;
+  }
 
-    edm::LogWarning("TriggerResultsContainer::fill") << "input error: size of TriggerResults ("
-      << triggerResults.size() << ") and TriggerNames (" << triggerNames.size() << ") differ, exiting function";
+  if(pathIndexKeys_.size() != entries_.size()){
 
-    return;
+    throw cms::Exception("LogicError") << "TriggerResultsContainer::initPathIndex was not called before TriggerResultsContainer::fill";
   }
 
-  for(unsigned int idx=0; idx<triggerResults.size(); ++idx){
+  // Entry::name matches either full name (e.g. "HLT_IsoMu24_v10") or name without version (e.g. "HLT_IsoMu24")
+  for(unsigned int idx=0; idx<entries_.size(); ++idx){
 
-    // since default value of Entry::accept is false,
-    // value needs to be changed only for accepted triggers
-    if(triggerResults.at(idx).accept()){
+    entries_[idx].accept = pathIndex.accept(triggerResults, pathIndexKeys_[idx]);
 
-      const auto& triggerName = triggerNames.at(idx);
-      const auto triggerName_unv = triggerName.substr(0, triggerName.rfind("_v"));
+    LogDebug("Value") << "entry with name = " << entries_[idx].name << " (accept = " << entries_[idx].accept << ")";
+  }
+}
 
-      LogDebug("Value") << "path = " << triggerName << ", path (un-versioned) = " << triggerName_unv
-        << ", accept = " << triggerResults.at(idx).accept();
+void TriggerResultsContainer::swap(TriggerResultsContainer& other){
 
-      for(auto& entry_i : entries_){
+  if(entries_.size() != other.entries_.size()){
 
-        // require Entry::name to match either full name (e.g. "HLT_IsoMu24_v10")
-        // or name without version (e.g. "HLT_IsoMu24")
-        if((entry_i.name == triggerName_unv) || (entry_i.name == triggerName)){
+    throw cms::Exception("LogicError") << "attempt to swap TriggerResultsContainers with different number of entries ("
+      << entries_.size() << " and " << other.entries_.size() << ")";
+  }
 
-          entry_i.accept = triggerResults.at(idx).accept();
+  // only the accept flags are swapped, so that the addresses
+  // of the Entry objects (used by the output TBranches) do not change
+  for(unsigned int idx=0; idx<entries_.size(); ++idx){
 
-          LogDebug("Value") << "path = " << triggerName << ", path (un-versioned) = " << triggerName_unv
-            << ", accept = " << triggerResults.at(idx).accept()
-            << ", matched to entry with name = " << entry_i.name << " (accept = " << entry_i.accept << ")";
-        }
-      }
-    }
+    std::swap(entries_[idx].accept, other.entries_[idx].accept);
   }
 }
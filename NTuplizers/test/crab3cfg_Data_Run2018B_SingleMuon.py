@@ -18,10 +18,10 @@ config.section_('JobType')
 config.JobType.pluginName  = 'Analysis'
 config.JobType.psetName = 'jmeTriggerNTuple_cfg.py'
 config.JobType.inputFiles = []
-config.JobType.pyCfgParams = ['output='+sample_name+'.root']
+config.JobType.pyCfgParams = ['output='+sample_name+'.root', 'numThreads=4']
 config.JobType.maxJobRuntimeMin = 2500
-config.JobType.maxMemoryMB = 3000
-#config.JobType.numCores = 4
+config.JobType.maxMemoryMB = 6000
+config.JobType.numCores = 4
 
 config.section_('Data')
 config.Data.publication = False
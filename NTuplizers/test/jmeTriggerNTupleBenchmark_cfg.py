@@ -0,0 +1,183 @@
+### configuration file to benchmark the NTuple step (JMETriggerNTuple) alone,
+### without HLT re-emulation and without access to remote files or databases:
+###  - mode=synthetic : collections of SyntheticCollectionsProducer (EmptySource, no input files)
+###  - mode=input     : offline (MINIAOD) collections of local input files (option inputFiles)
+### see NTuplizers/scripts/benchmarkNTuple.py
+import FWCore.ParameterSet.Config as cms
+
+### command-line arguments
+import FWCore.ParameterSet.VarParsing as vpo
+opts = vpo.VarParsing('analysis')
+
+opts.register('n', 1000,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'max number of events to process')
+
+opts.register('mode', 'synthetic',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'source of the input collections ("synthetic" or "input")')
+
+opts.register('output', 'benchmark.root',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'Path to output ROOT file')
+
+opts.register('numThreads', 1,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'number of threads')
+
+opts.register('numStreams', 0,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'number of streams (0: same as number of threads)')
+
+opts.register('compressionProfile', 'default',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'compression profile of the output TTree (see JMETriggerAnalysis/NTuplizers/python/outputCompressionProfiles.py)')
+
+opts.register('outputLayout', 'vector',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'layout of the branches of the collections in the output TTree ("vector" or "flat")')
+
+opts.register('profile', '',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'prefix of output .json files with the profile of the job (empty string: no profile)')
+
+opts.register('seed', 12345,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              '[mode=synthetic] seed of the random numbers')
+
+opts.register('meanNumberOfPFCandidates', 1500.,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.float,
+              '[mode=synthetic] mean number of PF candidates per event')
+
+opts.parseArguments()
+
+process = cms.Process('BENCH')
+
+process.maxEvents = cms.untracked.PSet(input = cms.untracked.int32(opts.n))
+
+process.options = cms.untracked.PSet(
+  numberOfThreads = cms.untracked.uint32(opts.numThreads if (opts.numThreads > 1) else 1),
+  numberOfStreams = cms.untracked.uint32(opts.numStreams if (opts.numStreams > 0) else (opts.numThreads if (opts.numThreads > 1) else 1)),
+  wantSummary = cms.untracked.bool(False),
+)
+
+process.load('FWCore.MessageService.MessageLogger_cfi')
+process.MessageLogger.cerr.FwkReport.reportEvery = 1000
+
+## JMETrigger NTuple
+process.JMETriggerNTuple = cms.EDAnalyzer('JMETriggerNTuple',
+
+  TTreeName = cms.string('Events'),
+
+  TriggerResults = cms.InputTag('TriggerResults'+'::'+process.name_()),
+
+  TriggerResultsFilterOR = cms.vstring(),
+
+  TriggerResultsFilterAND = cms.vstring(),
+
+  TriggerResultsCollections = cms.vstring(),
+
+  outputBranchesToBeDropped = cms.vstring(),
+
+  stringCutObjectSelectors = cms.PSet(),
+
+  profileJSON = cms.string(opts.profile+'_ntuple.json' if opts.profile else ''),
+
+  outputLayout = cms.string(opts.outputLayout),
+)
+
+if opts.mode == 'synthetic':
+
+   process.source = cms.Source('EmptySource')
+
+   process.syntheticCollections = cms.EDProducer('SyntheticCollectionsProducer',
+     seed = cms.uint32(opts.seed),
+     meanNumberOfPFCandidates = cms.double(opts.meanNumberOfPFCandidates),
+     meanNumberOfPFJets = cms.double(25.),
+     meanNumberOfVertices = cms.double(35.),
+     meanPtPFCandidates = cms.double(1.5),
+     meanPtPFJets = cms.double(20.),
+   )
+   process.syntheticCollectionsPath = cms.Path(process.syntheticCollections)
+
+   process.JMETriggerNTuple.recoVertexCollections = cms.PSet(
+     syntheticVertices = cms.InputTag('syntheticCollections'),
+   )
+   process.JMETriggerNTuple.recoPFCandidateCollections = cms.PSet(
+     syntheticPFCandidates = cms.InputTag('syntheticCollections'),
+   )
+   process.JMETriggerNTuple.recoPFJetCollections = cms.PSet(
+     syntheticPFJets = cms.InputTag('syntheticCollections'),
+   )
+   process.JMETriggerNTuple.recoPFMETCollections = cms.PSet(
+     syntheticPFMET = cms.InputTag('syntheticCollections'),
+   )
+   process.JMETriggerNTuple.stringCutObjectSelectors.syntheticPFJets = cms.string('pt>15')
+
+elif opts.mode == 'input':
+
+   if not opts.inputFiles:
+      raise RuntimeError('mode=input requires a list of (local) input files: inputFiles=file1.root,file2.root')
+
+   process.source = cms.Source('PoolSource',
+     fileNames = cms.untracked.vstring([_tmp if ':' in _tmp else 'file:'+_tmp for _tmp in opts.inputFiles]),
+   )
+
+   process.JMETriggerNTuple.TriggerResults = 'TriggerResults::HLT'
+   process.JMETriggerNTuple.TriggerResultsCollections = [
+     'HLT_Ele32_WPTight_Gsf',
+     'HLT_IsoMu24',
+     'HLT_PFJet80',
+     'HLT_PFMET200_NotCleaned',
+   ]
+   process.JMETriggerNTuple.recoVertexCollections = cms.PSet(
+     offlinePrimaryVertices = cms.InputTag('offlineSlimmedPrimaryVertices'),
+   )
+   process.JMETriggerNTuple.patPackedCandidateCollections = cms.PSet(
+     offlinePFCandidates = cms.InputTag('packedPFCandidates'),
+   )
+   process.JMETriggerNTuple.recoCaloJetCollections = cms.PSet(
+     offlineAK4CaloJetsCorrected = cms.InputTag('slimmedCaloJets'),
+   )
+   process.JMETriggerNTuple.patJetCollections = cms.PSet(
+     offlineAK4PFCHSJetsCorrected = cms.InputTag('slimmedJets'),
+   )
+   process.JMETriggerNTuple.patMETCollections = cms.PSet(
+     offlineMETs = cms.InputTag('slimmedMETs'),
+     offlineMETsPuppi = cms.InputTag('slimmedMETsPuppi'),
+   )
+   process.JMETriggerNTuple.stringCutObjectSelectors.offlineAK4CaloJetsCorrected = cms.string('pt>15')
+   process.JMETriggerNTuple.stringCutObjectSelectors.offlineAK4PFCHSJetsCorrected = cms.string('pt>15')
+
+else:
+   raise RuntimeError('invalid value for option "mode" (expected "synthetic" or "input"): '+opts.mode)
+
+process.analysisNTupleEndPath = cms.EndPath(process.JMETriggerNTuple)
+
+# compression settings of the output TTree
+from JMETriggerAnalysis.NTuplizers.outputCompressionProfiles import outputBranchesCompression
+process.JMETriggerNTuple.outputBranchesCompression = outputBranchesCompression(opts.compressionProfile)
+
+# create TFileService to be accessed by JMETriggerNTuple plugin
+process.TFileService = cms.Service('TFileService', fileName = cms.string(opts.output))
+
+# timing of every module
+if opts.profile:
+   process.FastTimerService = cms.Service('FastTimerService',
+     printEventSummary = cms.untracked.bool(False),
+     printRunSummary = cms.untracked.bool(False),
+     printJobSummary = cms.untracked.bool(False),
+     enableDQM = cms.untracked.bool(False),
+     writeJSONSummary = cms.untracked.bool(True),
+     jsonFileName = cms.untracked.string(opts.profile+'_timing.json'),
+   )
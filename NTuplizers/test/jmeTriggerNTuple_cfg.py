@@ -1,307 +1,554 @@
 ### configuration file to re-run customized HLT Menu on RAW
-from JMETriggerAnalysis.NTuplizers.HLT_JetMETPFlowWithoutPreselV4_cfg import cms, process
+import FWCore.ParameterSet.Config as cms
 
-process.options.numberOfStreams = cms.untracked.uint32(1)
-process.options.numberOfThreads = cms.untracked.uint32(1)
-
-### remove RECO step (EDM output file will not be produced)
-process.schedule.remove(process.RECOSIMoutput_step)
-
-### add analysis sequence (JMETrigger NTuple)
-process.offlineEventSelectionSeq = cms.Sequence()
+### command-line arguments
+import FWCore.ParameterSet.VarParsing as vpo
+opts = vpo.VarParsing('analysis')
 
-## additional HLT-METs
-from JMETriggerAnalysis.NTuplizers.hltMETs_cff import hltMETsSeq
-hltMETsSeq(process,
-  particleFlow = 'hltParticleFlow'+'::'+process.name_(),
-  primaryVertices = 'hltPixelVertices'+'::'+process.name_(),
-)
-process.offlineEventSelectionSeq *= process.hltMETsSeq
+opts.register('n', 10,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'max number of events to process')
 
-## Muons
-process.load('JMETriggerAnalysis.NTuplizers.userMuons_cff')
-process.offlineEventSelectionSeq *= process.userMuonsSequence
+opts.register('output', 'out.root',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'Path to output ROOT file')
 
-## Electrons
-#from RecoEgamma.EgammaTools.EgammaPostRecoTools import setupEgammaPostRecoSeq
-#setupEgammaPostRecoSeq(process, runVID=True, runEnergyCorrections=False, era='2018-Prompt', phoIDModules=[])
-#process.offlineEventSelectionSeq *= process.egammaPostRecoSeq
+opts.register('numThreads', 1,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'number of threads')
 
-process.load('JMETriggerAnalysis.NTuplizers.userElectrons_cff')
-process.offlineEventSelectionSeq *= process.userElectronsSequence
+opts.register('numStreams', 0,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'number of streams (0: same as number of threads)')
 
-## Event Selection
-from PhysicsTools.PatAlgos.selectionLayer1.muonSelector_cfi import selectedPatMuons
+opts.register('compressionProfile', 'default',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'compression profile of the output TTree (see JMETriggerAnalysis/NTuplizers/python/outputCompressionProfiles.py)')
 
-process.eventSelMuons = selectedPatMuons.clone(
-  src = 'userIsolatedMuons',
-  cut = 'pt>27 && userInt("IDMedium") && userFloat("pfIsoR04") < 0.25',
-)
+opts.register('prefilter', False,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.bool,
+              'run the HLT re-emulation only on events passing the original-process triggers and the offline lepton selection')
 
-from PhysicsTools.PatAlgos.selectionLayer1.electronSelector_cfi import selectedPatElectrons
+opts.register('profile', '',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'prefix of output .json files with the profile of the job (empty string: no profile), see NTuplizers/scripts/aggregateProfiles.py')
 
-process.eventSelElectrons = selectedPatElectrons.clone(
-  src = 'userIsolatedElectrons',
-  cut = 'pt>35 && userInt("IDCutBasedMedium")',
-)
+opts.register('outputLayout', 'vector',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'layout of the branches of the collections in the output TTree ("vector": std::vector<T>, "flat": count branch "<collection>_n" and C-arrays)')
 
-process.eventSelLeptons = cms.EDProducer('CandViewMerger',
-  src = cms.VInputTag('eventSelMuons', 'eventSelElectrons'),
-)
+opts.register('skimIndex', False,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.bool,
+              'write the skim index of the output TTree to "<output>.idx" (see NTuplizers/scripts/printSkimIndex.py)')
 
-process.eventSelOneLepton = cms.EDFilter('CandViewCountFilter',
-  src = cms.InputTag('eventSelLeptons'),
-  minNumber = cms.uint32(1),
-)
+opts.register('lumis', None,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'Path to .json with list of luminosity sections')
 
-process.offlineEventSelectionSeq *= cms.Sequence(
-    process.eventSelMuons
-  * process.eventSelElectrons
-  * process.eventSelLeptons
-  * process.eventSelOneLepton
-)
+opts.register('lumisRunRange', '',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'range of runs "min:max" of the luminosity sections of option "lumis" (e.g. the runs of the input dataset)')
 
-process.METMinDeltaPtHLTwrtOfflinePFMETRaw = cms.EDFilter('METMinDeltaPt',
+opts.register('luminosityBlockSummary', True,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.bool,
+              'write the TTree "LuminosityBlocks" with the number of events seen, passing the TriggerResults filter and written, per luminosity block')
 
-  online = cms.InputTag('hltPFMETProducer'),
+opts.register('logs', False,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.bool,
+              'create log files configured via MessageLogger')
 
-  offline = cms.InputTag('slimmedMETs'),
-  offlineCorrectionLevel = cms.string('Raw'),
+opts.register('wantSummary', False,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.bool,
+              'show cmsRun summary at job completion')
 
-  minRelDiff = cms.double(4.0),
-)
+opts.register('processCache', '',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'path to directory of the cache of the cms.Process (see JMETriggerAnalysis/NTuplizers/python/processCache.py; empty: no cache)')
 
-## JMETrigger NTuple
-process.JMETriggerNTuple = cms.EDAnalyzer('JMETriggerNTuple',
+opts.register('dumpPython', None,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'Path to python file with content of cms.Process')
 
-  TTreeName = cms.string('Events'),
+opts.parseArguments()
 
-  TriggerResults = cms.InputTag('TriggerResults'+'::'+process.name_()),
+def buildProcess(opts):
+    """cms.Process of the configuration (HLT menu, analysis sequences and JMETriggerNTuple) for the given command-line options"""
+    from JMETriggerAnalysis.NTuplizers.HLT_JetMETPFlowWithoutPreselV4_cfg import process
+
+    ### remove RECO step (EDM output file will not be produced)
+    process.schedule.remove(process.RECOSIMoutput_step)
+
+    ### add analysis sequence (JMETrigger NTuple)
+    process.offlineEventSelectionSeq = cms.Sequence()
+
+    ## additional HLT-METs (one Path per variant)
+    from JMETriggerAnalysis.NTuplizers.hltMETs_cff import hltMETsSeq
+    hltMETsPaths = hltMETsSeq(process,
+      particleFlow = 'hltParticleFlow'+'::'+process.name_(),
+      primaryVertices = 'hltPixelVertices'+'::'+process.name_(),
+      paths = True,
+    )
+
+    ## Muons
+    process.load('JMETriggerAnalysis.NTuplizers.userMuons_cff')
+    process.offlineEventSelectionSeq *= process.userMuonsSequence
+
+    ## Electrons
+    #from RecoEgamma.EgammaTools.EgammaPostRecoTools import setupEgammaPostRecoSeq
+    #setupEgammaPostRecoSeq(process, runVID=True, runEnergyCorrections=False, era='2018-Prompt', phoIDModules=[])
+    #process.offlineEventSelectionSeq *= process.egammaPostRecoSeq
+
+    process.load('JMETriggerAnalysis.NTuplizers.userElectrons_cff')
+    process.offlineEventSelectionSeq *= process.userElectronsSequence
+
+    ## Event Selection
+    process.eventSelMuons = cms.EDProducer('PATMuonFastSelector',
+      src = cms.InputTag('userIsolatedMuons'),
+      cut = cms.string('pt>27 && userInt("IDMedium") && userFloat("pfIsoR04") < 0.25'),
+    )
+
+    process.eventSelElectrons = cms.EDProducer('PATElectronFastSelector',
+      src = cms.InputTag('userIsolatedElectrons'),
+      cut = cms.string('pt>35 && userInt("IDCutBasedMedium")'),
+    )
+
+    process.eventSelLeptons = cms.EDProducer('CandViewMerger',
+      src = cms.VInputTag('eventSelMuons', 'eventSelElectrons'),
+    )
+
+    process.eventSelOneLepton = cms.EDFilter('CandViewCountFilter',
+      src = cms.InputTag('eventSelLeptons'),
+      minNumber = cms.uint32(1),
+    )
+
+    process.offlineEventSelectionSeq *= cms.Sequence(
+        process.eventSelMuons
+      * process.eventSelElectrons
+      * process.eventSelLeptons
+      * process.eventSelOneLepton
+    )
+
+    # events with large differences between online and offline MET (one bool product per rule, used as fill conditions)
+    process.hltMETsWrtOfflineMETs = cms.EDFilter('METComparisonFilter',
+
+      rules = cms.VPSet(
 
-  TriggerResultsFilterOR = cms.vstring(
+        cms.PSet(
+          name = cms.string('hltPFMETWrtOfflineMETsRaw'),
+          online = cms.InputTag('hltPFMETProducer'),
+          offline = cms.InputTag('slimmedMETs'),
+          offlineCorrectionLevel = cms.string('Raw'),
+          minRelDiff = cms.double(4.0),
+        ),
 
-    'HLT_IsoMu24',
-    'HLT_Ele32_WPTight_Gsf',
-  ),
+        cms.PSet(
+          name = cms.string('hltPuppiMETWrtOfflineMETsPuppiRaw'),
+          online = cms.InputTag('hltPuppiMET'),
+          offline = cms.InputTag('slimmedMETsPuppi'),
+          offlineCorrectionLevel = cms.string('Raw'),
+          minRelDiff = cms.double(4.0),
+        ),
 
-  TriggerResultsFilterAND = cms.vstring(
+        cms.PSet(
+          name = cms.string('hltSoftKillerMETWrtOfflineMETsRaw'),
+          online = cms.InputTag('hltSoftKillerMET'),
+          offline = cms.InputTag('slimmedMETs'),
+          offlineCorrectionLevel = cms.string('Raw'),
+          minRelDiff = cms.double(4.0),
+        ),
 
-    'offlineEventSelectionPath',
-  ),
+        cms.PSet(
+          name = cms.string('hltCaloMETWrtOfflineMETsRawCalo'),
+          online = cms.InputTag('hltMet'),
+          offline = cms.InputTag('slimmedMETs'),
+          offlineCorrectionLevel = cms.string('RawCalo'),
+          minRelDiff = cms.double(4.0),
+        ),
+      ),
+    )
 
-  TriggerResultsCollections = cms.vstring(
+    ## JMETrigger NTuple
+    process.JMETriggerNTuple = cms.EDAnalyzer('JMETriggerNTuple',
 
-    'HLT_Ele23_Ele12_CaloIdL_TrackIdL_IsoVL_DZ',
-    'HLT_Ele32_WPTight_Gsf',
-    'HLT_IsoMu24',
-    'HLT_Mu12_TrkIsoVVL_Ele23_CaloIdL_TrackIdL_IsoVL',
-    'HLT_Mu17_TrkIsoVVL_Mu8_TrkIsoVVL_DZ_Mass8',
-    'HLT_Mu23_TrkIsoVVL_Ele12_CaloIdL_TrackIdL_IsoVL',
-    'HLT_PFJet80NoCaloJetCut',
-    'HLT_PFMET200NoCaloMETCut_NotCleaned',
-    'HLT_PFMETTypeOne200NoCaloMETCut_HBHE_BeamHaloCleaned',
-  ),
+      TTreeName = cms.string('Events'),
 
-  fillCollectionConditions = cms.PSet(
+      TriggerResults = cms.InputTag('TriggerResults'+'::'+process.name_()),
 
-    hltParticleFlow = cms.string('METMinDeltaPtHLTwrtOfflinePFMETRawPath'),
-    offlinePFCandidates = cms.string('METMinDeltaPtHLTwrtOfflinePFMETRawPath'),
-    hltPuppiForMET = cms.string('METMinDeltaPtHLTwrtOfflinePFMETRawPath'),
-  ),
+      TriggerResultsFilterOR = cms.vstring(
 
-  recoVertexCollections = cms.PSet(
+        'HLT_IsoMu24',
+        'HLT_Ele32_WPTight_Gsf',
+      ),
 
-    hltPixelVertices = cms.InputTag('hltPixelVertices'+'::'+process.name_()),
-    hltTrimmedPixelVertices = cms.InputTag('hltTrimmedPixelVertices'+'::'+process.name_()),
-    offlinePrimaryVertices = cms.InputTag('offlineSlimmedPrimaryVertices'),
-  ),
+      TriggerResultsFilterAND = cms.vstring(
 
-  recoPFCandidateCollections = cms.PSet(
+        'offlineEventSelectionPath',
+      ),
 
-    hltParticleFlow = cms.InputTag('hltParticleFlow'+'::'+process.name_()),
-    hltPuppiForMET = cms.InputTag('hltPuppiForMET'+'::'+process.name_()),
-  ),
+      TriggerResultsCollections = cms.vstring(
 
-  patPackedCandidateCollections = cms.PSet(
+        'HLT_Ele23_Ele12_CaloIdL_TrackIdL_IsoVL_DZ',
+        'HLT_Ele32_WPTight_Gsf',
+        'HLT_IsoMu24',
+        'HLT_Mu12_TrkIsoVVL_Ele23_CaloIdL_TrackIdL_IsoVL',
+        'HLT_Mu17_TrkIsoVVL_Mu8_TrkIsoVVL_DZ_Mass8',
+        'HLT_Mu23_TrkIsoVVL_Ele12_CaloIdL_TrackIdL_IsoVL',
+        'HLT_PFJet80NoCaloJetCut',
+        'HLT_PFMET200NoCaloMETCut_NotCleaned',
+        'HLT_PFMETTypeOne200NoCaloMETCut_HBHE_BeamHaloCleaned',
+      ),
 
-    offlinePFCandidates = cms.InputTag('packedPFCandidates'),
-  ),
+      fillCollectionConditions = cms.PSet(
 
-  recoCaloJetCollections = cms.PSet(
+        hltParticleFlow = cms.InputTag('hltMETsWrtOfflineMETs', 'hltPFMETWrtOfflineMETsRaw'),
+        offlinePFCandidates = cms.InputTag('hltMETsWrtOfflineMETs', 'hltPFMETWrtOfflineMETsRaw'),
+        hltPuppiForMET = cms.InputTag('hltMETsWrtOfflineMETs', 'hltPuppiMETWrtOfflineMETsPuppiRaw'),
+      ),
 
-    offlineAK4CaloJetsCorrected = cms.InputTag('slimmedCaloJets'),
-  ),
+      recoVertexCollections = cms.PSet(
 
-  recoPFJetCollections = cms.PSet(
+        hltPixelVertices = cms.InputTag('hltPixelVertices'+'::'+process.name_()),
+        hltTrimmedPixelVertices = cms.InputTag('hltTrimmedPixelVertices'+'::'+process.name_()),
+        offlinePrimaryVertices = cms.InputTag('offlineSlimmedPrimaryVertices'),
+      ),
 
-    hltAK4PFJetsCorrected = cms.InputTag('hltAK4PFJetsCorrected'+'::'+process.name_()),
-  ),
+      recoPFCandidateCollections = cms.PSet(
 
-  patJetCollections = cms.PSet(
+        hltParticleFlow = cms.InputTag('hltParticleFlow'+'::'+process.name_()),
+        hltPuppiForMET = cms.InputTag('hltPuppiForMET'+'::'+process.name_()),
+      ),
 
-    offlineAK4PFCHSJetsCorrected = cms.InputTag('slimmedJets'),
-  ),
+      patPackedCandidateCollections = cms.PSet(
 
-  recoCaloMETCollections = cms.PSet(
+        offlinePFCandidates = cms.InputTag('packedPFCandidates'),
+      ),
 
-    hltMet = cms.InputTag('hltMet'+'::'+process.name_()),
-    hltMetClean = cms.InputTag('hltMetClean'+'::'+process.name_()),
-  ),
+      recoCaloJetCollections = cms.PSet(
 
-  recoPFMETCollections = cms.PSet(
+        offlineAK4CaloJetsCorrected = cms.InputTag('slimmedCaloJets'),
+      ),
 
-    hltPFMET = cms.InputTag('hltPFMETProducer'+'::'+process.name_()),
-    hltPFMETTypeOne = cms.InputTag('hltPFMETTypeOne'+'::'+process.name_()),
+      recoPFJetCollections = cms.PSet(
 
-    hltPuppiMET = cms.InputTag('hltPuppiMET'+'::'+process.name_()),
-    hltPuppiMETWithPuppiForJets = cms.InputTag('hltPuppiMETWithPuppiForJets'+'::'+process.name_()),
+        hltAK4PFJetsCorrected = cms.InputTag('hltAK4PFJetsCorrected'+'::'+process.name_()),
+      ),
 
-    hltSoftKillerMET = cms.InputTag('hltSoftKillerMET'+'::'+process.name_()),
-  ),
+      patJetCollections = cms.PSet(
 
-  patMETCollections = cms.PSet(
+        offlineAK4PFCHSJetsCorrected = cms.InputTag('slimmedJets'),
+      ),
 
-    offlineMETs = cms.InputTag('slimmedMETs'),
-    offlineMETsPuppi = cms.InputTag('slimmedMETsPuppi'),
-  ),
+      recoCaloMETCollections = cms.PSet(
 
-  patMuonCollections = cms.PSet(
+        hltMet = cms.InputTag('hltMet'+'::'+process.name_()),
+        hltMetClean = cms.InputTag('hltMetClean'+'::'+process.name_()),
+      ),
 
-    offlineIsolatedMuons = cms.InputTag('userIsolatedMuons'+'::'+process.name_()),
-  ),
+      recoPFMETCollections = cms.PSet(
 
-  patElectronCollections = cms.PSet(
+        hltPFMET = cms.InputTag('hltPFMETProducer'+'::'+process.name_()),
+        hltPFMETTypeOne = cms.InputTag('hltPFMETTypeOne'+'::'+process.name_()),
 
-    offlineIsolatedElectrons = cms.InputTag('userIsolatedElectrons'+'::'+process.name_()),
-  ),
+        hltPuppiMET = cms.InputTag('hltPuppiMET'+'::'+process.name_()),
+        hltPuppiMETWithPuppiForJets = cms.InputTag('hltPuppiMETWithPuppiForJets'+'::'+process.name_()),
 
-  stringCutObjectSelectors = cms.PSet(
+        hltSoftKillerMET = cms.InputTag('hltSoftKillerMET'+'::'+process.name_()),
+      ),
 
-    hltAK4PFJetsCorrected = cms.string('pt>15'),
-    offlineAK4CaloJetsCorrected = cms.string('pt>15'),
-    offlineAK4PFCHSJetsCorrected = cms.string('pt>15'),
-  ),
+      patMETCollections = cms.PSet(
 
-  outputBranchesToBeDropped = cms.vstring(
+        offlineMETs = cms.InputTag('slimmedMETs'),
+        offlineMETsPuppi = cms.InputTag('slimmedMETsPuppi'),
+      ),
 
-    'hltPixelVertices_isFake',
-    'hltPixelVertices_chi2',
-    'hltPixelVertices_ndof',
+      patMuonCollections = cms.PSet(
 
-    'hltTrimmedPixelVertices_isFake',
-    'hltTrimmedPixelVertices_chi2',
-    'hltTrimmedPixelVertices_ndof',
+        offlineIsolatedMuons = cms.InputTag('userIsolatedMuons'+'::'+process.name_()),
+      ),
 
-    'offlinePrimaryVertices_tracksSize',
+      patElectronCollections = cms.PSet(
 
-    'hltPFMet_ChargedEMEtFraction',
-    'hltPFMetTypeOne_ChargedEMEtFraction',
-  ),
-)
+        offlineIsolatedElectrons = cms.InputTag('userIsolatedElectrons'+'::'+process.name_()),
+      ),
 
-process.offlineEventSelectionPath = cms.Path(process.offlineEventSelectionSeq)
-process.METMinDeltaPtHLTwrtOfflinePFMETRawPath = cms.Path(process.METMinDeltaPtHLTwrtOfflinePFMETRaw)
-process.offlineAnalysisSchedule = cms.Schedule(*(process.offlineEventSelectionPath, process.METMinDeltaPtHLTwrtOfflinePFMETRawPath))
-#process.offlineAnalysisSchedule = cms.Schedule(*(process.offlineEventSelectionPath, process.METMinDeltaPtHLTwrtOfflinePFMETRawPath, process.metFiltersPath))
-process.schedule.extend(process.offlineAnalysisSchedule)
+      # delta-R matching between collections: branch "<src>_matchIdx_<matched>" with, for every object of "src",
+      # the index of the matched object of "matched" (-1: no match); unique=True for a one-to-one matching
+      collectionMatches = cms.VPSet(
 
-process.analysisNTupleEndPath = cms.EndPath(process.JMETriggerNTuple)
-process.schedule.extend([process.analysisNTupleEndPath])
+        cms.PSet(src = cms.string('hltAK4PFJetsCorrected'), matched = cms.string('offlineAK4PFCHSJetsCorrected'), maxDeltaR = cms.double(0.2), unique = cms.bool(True)),
+        cms.PSet(src = cms.string('hltAK4PFJetsCorrected'), matched = cms.string('offlineAK4CaloJetsCorrected'), maxDeltaR = cms.double(0.2), unique = cms.bool(True)),
+        cms.PSet(src = cms.string('offlineAK4PFCHSJetsCorrected'), matched = cms.string('hltAK4PFJetsCorrected'), maxDeltaR = cms.double(0.2), unique = cms.bool(True)),
 
-### command-line arguments
-import FWCore.ParameterSet.VarParsing as vpo
-opts = vpo.VarParsing('analysis')
+        # closest HLT jet to every offline lepton (e.g. to remove the HLT jets overlapping with leptons)
+        cms.PSet(src = cms.string('offlineIsolatedMuons'), matched = cms.string('hltAK4PFJetsCorrected'), maxDeltaR = cms.double(0.4)),
+        cms.PSet(src = cms.string('offlineIsolatedElectrons'), matched = cms.string('hltAK4PFJetsCorrected'), maxDeltaR = cms.double(0.4)),
+      ),
 
-opts.register('n', 10,
-              vpo.VarParsing.multiplicity.singleton,
-              vpo.VarParsing.varType.int,
-              'max number of events to process')
+      stringCutObjectSelectors = cms.PSet(
 
-opts.register('output', 'out.root',
-              vpo.VarParsing.multiplicity.singleton,
-              vpo.VarParsing.varType.string,
-              'Path to output ROOT file')
+        hltAK4PFJetsCorrected = cms.string('pt>15'),
+        offlineAK4CaloJetsCorrected = cms.string('pt>15'),
+        offlineAK4PFCHSJetsCorrected = cms.string('pt>15'),
+      ),
 
-opts.register('lumis', None,
-              vpo.VarParsing.multiplicity.singleton,
-              vpo.VarParsing.varType.string,
-              'Path to .json with list of luminosity sections')
+      # number of events in which the native predicates of the cuts are cross-checked against StringCutObjectSelector
+      stringCutObjectSelectorsValidation = cms.PSet(
+    #    hltAK4PFJetsCorrected = cms.uint32(100),
+      ),
 
-opts.register('logs', False,
-              vpo.VarParsing.multiplicity.singleton,
-              vpo.VarParsing.varType.bool,
-              'create log files configured via MessageLogger')
+      # max number of objects stored per event (for pT-ordered collections, the leading objects are kept)
+      maxObjects = cms.PSet(
+    #    hltParticleFlow = cms.uint32(500),
+      ),
 
-opts.register('wantSummary', False,
-              vpo.VarParsing.multiplicity.singleton,
-              vpo.VarParsing.varType.bool,
-              'show cmsRun summary at job completion')
+      # number of mantissa bits stored for float branches (key: name of branch, or name of collection)
+      outputBranchesMantissaBits = cms.PSet(
+    #    hltParticleFlow = cms.uint32(10),
+    #    hltParticleFlow_vz = cms.uint32(16),
+      ),
 
-opts.register('dumpPython', None,
-              vpo.VarParsing.multiplicity.singleton,
-              vpo.VarParsing.varType.string,
-              'Path to python file with content of cms.Process')
+      # print uncompressed and compressed size of every output branch at the end of the job
+      outputBranchesSizeReport = cms.bool(False),
 
-opts.parseArguments()
+      # path to output .json file with fill time, buffers and size of every output collection (empty string: not created)
+      profileJSON = cms.string(''),
 
-# max number of events to be processed
-process.maxEvents.input = opts.n
-
-# show cmsRun summary at job completion
-process.options.wantSummary = cms.untracked.bool(opts.wantSummary)
-
-# create TFileService to be accessed by JMETriggerNTuple plugin
-process.TFileService = cms.Service('TFileService', fileName = cms.string(opts.output))
-
-# select luminosity sections from .json file
-if opts.lumis is not None:
-   import FWCore.PythonUtilities.LumiList as LumiList
-   process.source.lumisToProcess = LumiList.LumiList(filename = opts.lumis).getVLuminosityBlockRange()
-
-# MessageLogger
-if opts.logs:
-   process.MessageLogger = cms.Service('MessageLogger',
-     destinations = cms.untracked.vstring(
-       'cerr',
-       'logError',
-       'logInfo',
-       'logDebug',
-     ),
-     debugModules = cms.untracked.vstring(
-       'JMETriggerNTuple',
-     ),
-     categories = cms.untracked.vstring(
-       'FwkReport',
-     ),
-     cerr = cms.untracked.PSet(
-       threshold = cms.untracked.string('WARNING'),
-       FwkReport = cms.untracked.PSet(
-         reportEvery = cms.untracked.int32(1),
-       ),
-     ),
-     logError = cms.untracked.PSet(
-       threshold = cms.untracked.string('ERROR'),
-       extension = cms.untracked.string('.txt'),
-       FwkReport = cms.untracked.PSet(
-         reportEvery = cms.untracked.int32(1),
-       ),
-     ),
-     logInfo = cms.untracked.PSet(
-       threshold = cms.untracked.string('INFO'),
-       extension = cms.untracked.string('.txt'),
-       FwkReport = cms.untracked.PSet(
-         reportEvery = cms.untracked.int32(1),
-       ),
-     ),
-     # scram b USER_CXXFLAGS="-DEDM_ML_DEBUG"
-     logDebug = cms.untracked.PSet(
-       threshold = cms.untracked.string('DEBUG'),
-       extension = cms.untracked.string('.txt'),
-       FwkReport = cms.untracked.PSet(
-         reportEvery = cms.untracked.int32(1),
-       ),
-     ),
-   )
+      outputBranchesToBeDropped = cms.vstring(
+
+        'hltPixelVertices_isFake',
+        'hltPixelVertices_chi2',
+        'hltPixelVertices_ndof',
+
+        'hltTrimmedPixelVertices_isFake',
+        'hltTrimmedPixelVertices_chi2',
+        'hltTrimmedPixelVertices_ndof',
+
+        'offlinePrimaryVertices_tracksSize',
+
+        'hltPFMet_ChargedEMEtFraction',
+        'hltPFMetTypeOne_ChargedEMEtFraction',
+      ),
+    )
+
+    process.offlineEventSelectionPath = cms.Path(process.offlineEventSelectionSeq)
+    process.hltMETsWrtOfflineMETsPath = cms.Path(process.hltMETsWrtOfflineMETs)
+    process.offlineAnalysisSchedule = cms.Schedule(*(process.offlineEventSelectionPath, process.hltMETsWrtOfflineMETsPath))
+    #process.offlineAnalysisSchedule = cms.Schedule(*(process.offlineEventSelectionPath, process.hltMETsWrtOfflineMETsPath, process.metFiltersPath))
+    process.schedule.extend(process.offlineAnalysisSchedule)
+    process.schedule.extend(hltMETsPaths)
+
+    process.analysisNTupleEndPath = cms.EndPath(process.JMETriggerNTuple)
+    process.schedule.extend([process.analysisNTupleEndPath])
+
+    # multi-threading settings
+    process.options.numberOfThreads = cms.untracked.uint32(opts.numThreads if (opts.numThreads > 1) else 1)
+    process.options.numberOfStreams = cms.untracked.uint32(opts.numStreams if (opts.numStreams > 0) else process.options.numberOfThreads.value())
+
+    # show cmsRun summary at job completion
+    process.options.wantSummary = cms.untracked.bool(opts.wantSummary)
+
+    # compression settings of the output TTree
+    from JMETriggerAnalysis.NTuplizers.outputCompressionProfiles import outputBranchesCompression
+    process.JMETriggerNTuple.outputBranchesCompression = outputBranchesCompression(opts.compressionProfile)
+
+    # layout of the branches of the collections in the output TTree
+    process.JMETriggerNTuple.outputLayout = cms.string(opts.outputLayout)
+
+    # prefilter: events failing the original-process triggers (TriggerResultsFilterOR of JMETriggerNTuple)
+    # or the offline lepton selection are rejected at the beginning of every Path, before the HLT re-emulation;
+    # the re-emulated trigger bits of rejected events are all false, and these events are not saved in the NTuple
+    if opts.prefilter:
+       process.prefilterTriggerResults = cms.EDFilter('TriggerResultsFilter',
+         hltResults = cms.InputTag('TriggerResults', '', 'HLT'),
+         l1tResults = cms.InputTag(''),
+         l1tIgnoreMaskAndPrescale = cms.bool(False),
+         throw = cms.bool(False),
+         triggerConditions = cms.vstring([_tmp+'_v*' for _tmp in process.JMETriggerNTuple.TriggerResultsFilterOR]),
+       )
+
+       process.prefilterSeq = cms.Sequence(
+           process.prefilterTriggerResults
+         + process.userMuonsSequence
+         + process.userElectronsSequence
+         + process.eventSelMuons
+         + process.eventSelElectrons
+         + process.eventSelLeptons
+         + process.eventSelOneLepton
+       )
+
+       # offlineEventSelectionPath already contains the lepton selection
+       for _path in process.schedule:
+           if isinstance(_path, cms.Path) and (_path is not process.offlineEventSelectionPath):
+              _path.insert(0, process.prefilterSeq)
+
+       process.offlineEventSelectionSeq.insert(0, process.prefilterTriggerResults)
+
+       process.prefilterPath = cms.Path(process.prefilterSeq)
+       process.schedule.extend([process.prefilterPath])
+
+       # rough estimate of the wall time saved by the prefilter (time between events, printed at the end of the job);
+       # the CPU time saved is measured with the FastTimerService profiles (option "profile") of jobs with and without prefilter,
+       # see NTuplizers/scripts/comparePrefilterTiming.py
+       process.prefilterTimingSummary = cms.EDAnalyzer('PrefilterTimingSummary',
+         TriggerResults = cms.InputTag('TriggerResults'+'::'+process.name_()),
+         prefilterPath = cms.string('prefilterPath'),
+       )
+       process.prefilterTimingSummaryEndPath = cms.EndPath(process.prefilterTimingSummary)
+       process.schedule.extend([process.prefilterTimingSummaryEndPath])
+
+    # profile of the job:
+    #  - <profile>_timing.json : time (real and CPU) of every module, from FastTimerService
+    #                            (memory allocated by every module is included only when running with jemalloc, i.e. cmsRunJE)
+    #  - <profile>_ntuple.json : fill time, buffers and bytes written of every collection of JMETriggerNTuple
+    # (two files, because FastTimerService writes its .json file only after the endJob of all modules);
+    # the increase of memory of every module is reported by SimpleMemoryCheck in the job report
+    if opts.profile:
+       process.FastTimerService = cms.Service('FastTimerService',
+         printEventSummary = cms.untracked.bool(False),
+         printRunSummary = cms.untracked.bool(False),
+         printJobSummary = cms.untracked.bool(True),
+         enableDQM = cms.untracked.bool(False),
+         writeJSONSummary = cms.untracked.bool(True),
+       )
+
+       process.SimpleMemoryCheck = cms.Service('SimpleMemoryCheck',
+         ignoreTotal = cms.untracked.int32(1),
+         moduleMemorySummary = cms.untracked.bool(True),
+       )
+
+    # skim index of the output TTree (sidecar file "<output>.idx"):
+    # bits of TriggerResultsCollections and fillCollectionConditions, number of leptons and offline MET
+    if opts.skimIndex:
+       process.JMETriggerNTuple.skimIndex = cms.PSet(
+         multiplicities = cms.vstring(
+           'offlineIsolatedMuons',
+           'offlineIsolatedElectrons',
+         ),
+         leadingValues = cms.vstring(
+           'offlineMETs_Raw_pt',
+           'offlineMETs_Type1_pt',
+           'offlineMETsPuppi_Raw_pt',
+           'offlineMETsPuppi_Type1_pt',
+         ),
+       )
+
+    # select luminosity sections from .json file
+    # (merged intervals, optionally restricted to a range of runs, to minimize the number of ranges checked by the source)
+    if opts.lumis is not None:
+       from JMETriggerAnalysis.NTuplizers.lumiMask import LumiMask, parseRunRange
+       lumiMask = LumiMask.fromJSON(opts.lumis)
+       if opts.lumisRunRange:
+          lumiMask = lumiMask.restrict(*parseRunRange(opts.lumisRunRange))
+       process.source.lumisToProcess = cms.untracked.VLuminosityBlockRange(lumiMask.vLuminosityBlockRange())
+
+    # summary of every luminosity block (TTree "LuminosityBlocks")
+    process.JMETriggerNTuple.luminosityBlockSummary = cms.bool(opts.luminosityBlockSummary)
+
+    # MessageLogger
+    if opts.logs:
+       process.MessageLogger = cms.Service('MessageLogger',
+         destinations = cms.untracked.vstring(
+           'cerr',
+           'logError',
+           'logInfo',
+           'logDebug',
+         ),
+         debugModules = cms.untracked.vstring(
+           'JMETriggerNTuple',
+         ),
+         categories = cms.untracked.vstring(
+           'FwkReport',
+         ),
+         cerr = cms.untracked.PSet(
+           threshold = cms.untracked.string('WARNING'),
+           FwkReport = cms.untracked.PSet(
+             reportEvery = cms.untracked.int32(1),
+           ),
+         ),
+         logError = cms.untracked.PSet(
+           threshold = cms.untracked.string('ERROR'),
+           extension = cms.untracked.string('.txt'),
+           FwkReport = cms.untracked.PSet(
+             reportEvery = cms.untracked.int32(1),
+           ),
+         ),
+         logInfo = cms.untracked.PSet(
+           threshold = cms.untracked.string('INFO'),
+           extension = cms.untracked.string('.txt'),
+           FwkReport = cms.untracked.PSet(
+             reportEvery = cms.untracked.int32(1),
+           ),
+         ),
+         # scram b USER_CXXFLAGS="-DEDM_ML_DEBUG"
+         logDebug = cms.untracked.PSet(
+           threshold = cms.untracked.string('DEBUG'),
+           extension = cms.untracked.string('.txt'),
+           FwkReport = cms.untracked.PSet(
+             reportEvery = cms.untracked.int32(1),
+           ),
+         ),
+       )
+
+    return process
+
+# options of a single job: max number of events, input files and names of the output files
+# (not used by buildProcess, and set after the process is built or loaded from the cache)
+jobOptions = ['n', 'maxEvents', 'inputFiles', 'secondaryInputFiles', 'output', 'outputFile', 'secondaryOutputFile', 'profile']
+
+def setJobOptions(process, opts):
+    """settings of the cms.Process specific to a single job (options in jobOptions)"""
+    # max number of events to be processed
+    process.maxEvents.input = opts.n
+
+    # input files (default: input files of the HLT menu)
+    if opts.inputFiles:
+       process.source.fileNames = cms.untracked.vstring(opts.inputFiles)
+
+    # create TFileService to be accessed by JMETriggerNTuple plugin
+    process.TFileService = cms.Service('TFileService', fileName = cms.string(opts.output))
+
+    # skim index: sidecar file of the output file
+    if opts.skimIndex:
+       process.JMETriggerNTuple.skimIndex.fileName = cms.string(opts.output+'.idx')
+
+    # profile of the job: names of the output .json files
+    if opts.profile:
+       process.FastTimerService.jsonFileName = cms.untracked.string(opts.profile+'_timing.json')
+       process.JMETriggerNTuple.profileJSON = opts.profile+'_ntuple.json'
+
+### cms.Process: built from scratch, or loaded from the cache (option processCache)
+# (the key of the cache includes the values of the options, except the options of a single job (jobOptions),
+#  and the content of this file and of the lumi mask; for option "profile", only whether the profile is enabled is included;
+#  entries are not used if the python modules used to build the process changed, e.g. a new HLT menu)
+if opts.processCache:
+   from JMETriggerAnalysis.NTuplizers.processCache import ProcessCache, configFileName, varParsingValues
+   cacheOptions = varParsingValues(opts, exclude=['processCache', 'dumpPython']+jobOptions)
+   cacheOptions['profile'] = bool(opts.profile)
+   processCache = ProcessCache(opts.processCache, cacheOptions, files=[configFileName(), opts.lumis], verbosity=1)
+   process = processCache.load()
+   if process is None:
+      process = buildProcess(opts)
+      processCache.save(process)
+else:
+   process = buildProcess(opts)
+
+setJobOptions(process, opts)
 
 # dump content of cms.Process to python file
 if opts.dumpPython is not None:
@@ -0,0 +1,75 @@
+### configuration file to compare the per-event time of the PAT user-data producers
+### (MuonPATUserData, ElectronPATUserData) with and without batchMode, on local MINIAOD files:
+### both versions run in the same job on the same events (one Path each),
+### and the time per event of every module is printed by FastTimerService at the end of the job
+import FWCore.ParameterSet.Config as cms
+
+### command-line arguments
+import FWCore.ParameterSet.VarParsing as vpo
+opts = vpo.VarParsing('analysis')
+
+opts.register('n', 1000,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'max number of events to process')
+
+opts.register('numThreads', 1,
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.int,
+              'number of threads')
+
+opts.register('timingJSON', '',
+              vpo.VarParsing.multiplicity.singleton,
+              vpo.VarParsing.varType.string,
+              'path to output .json file of FastTimerService (empty string: no .json file)')
+
+opts.parseArguments()
+
+if not opts.inputFiles:
+   raise RuntimeError('list of (local) MINIAOD input files required: inputFiles=file1.root,file2.root')
+
+process = cms.Process('TIMING')
+
+process.maxEvents = cms.untracked.PSet(input = cms.untracked.int32(opts.n))
+
+process.options = cms.untracked.PSet(
+  numberOfThreads = cms.untracked.uint32(opts.numThreads if (opts.numThreads > 1) else 1),
+  numberOfStreams = cms.untracked.uint32(opts.numThreads if (opts.numThreads > 1) else 1),
+  wantSummary = cms.untracked.bool(False),
+)
+
+process.load('FWCore.MessageService.MessageLogger_cfi')
+process.MessageLogger.cerr.FwkReport.reportEvery = 1000
+
+process.source = cms.Source('PoolSource',
+  fileNames = cms.untracked.vstring([_tmp if ':' in _tmp else 'file:'+_tmp for _tmp in opts.inputFiles]),
+)
+
+process.load('JMETriggerAnalysis.NTuplizers.userMuons_cff')
+process.load('JMETriggerAnalysis.NTuplizers.userElectrons_cff')
+
+process.userMuonsWithUserDataBatch = process.userMuonsWithUserData.clone(batchMode = True)
+process.userElectronsWithUserDataBatch = process.userElectronsWithUserData.clone(batchMode = True)
+
+process.userDataPath = cms.Path(
+    process.userPreselectedMuons
+  * process.userMuonsWithUserData
+  * process.userPreselectedElectrons
+  * process.userElectronsWithUserData
+)
+
+process.userDataBatchPath = cms.Path(
+    process.userPreselectedMuons
+  * process.userMuonsWithUserDataBatch
+  * process.userPreselectedElectrons
+  * process.userElectronsWithUserDataBatch
+)
+
+process.FastTimerService = cms.Service('FastTimerService',
+  printEventSummary = cms.untracked.bool(False),
+  printRunSummary = cms.untracked.bool(False),
+  printJobSummary = cms.untracked.bool(True),
+  enableDQM = cms.untracked.bool(False),
+  writeJSONSummary = cms.untracked.bool(opts.timingJSON != ''),
+  jsonFileName = cms.untracked.string(opts.timingJSON if opts.timingJSON else 'resources.json'),
+)